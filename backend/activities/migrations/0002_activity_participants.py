@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:47
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _members(value):
+    """Member IDs of a JSON array field value (a list, or its JSON), without duplicates"""
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else []
+    if not isinstance(value, list):
+        return []
+    return list(dict.fromkeys(str(item) for item in value if item not in (None, '')))
+
+
+def copy_participants(apps, schema_editor):
+    CampusActivity = apps.get_model('activities', 'CampusActivity')
+    ActivityParticipant = apps.get_model('activities', 'ActivityParticipant')
+    ActivityParticipant.objects.bulk_create([
+        ActivityParticipant(activity_id=activity_id, member_id=user_id)
+        for activity_id, participants in CampusActivity.objects.exclude(participants__isnull=True)
+        .values_list('id', 'participants')
+        for user_id in _members(participants)
+    ], batch_size=1000)
+
+
+def restore_participants(apps, schema_editor):
+    CampusActivity = apps.get_model('activities', 'CampusActivity')
+    ActivityParticipant = apps.get_model('activities', 'ActivityParticipant')
+    participants = {}
+    for activity_id, user_id in ActivityParticipant.objects.order_by('id').values_list('activity_id', 'member_id'):
+        participants.setdefault(activity_id, []).append(user_id)
+    for activity_id, user_ids in participants.items():
+        CampusActivity.objects.filter(id=activity_id).update(participants=user_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(db_index=True, max_length=50)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('activity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_participants', to='activities.campusactivity')),
+            ],
+            options={
+                'ordering': ['id'],
+                'abstract': False,
+                'unique_together': {('activity', 'member_id')},
+            },
+        ),
+        migrations.RunPython(copy_participants, restore_participants),
+        migrations.RemoveField(
+            model_name='campusactivity',
+            name='participants',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from memberships import Membership
 
 
 class CampusActivity(models.Model):
@@ -9,7 +10,6 @@ class CampusActivity(models.Model):
     description = models.TextField()
     type = models.CharField(max_length=50)  # club, competition, student-feature
     organizer_id = models.CharField(max_length=50)  # reference to User
-    participants = models.JSONField(null=True, blank=True)  # array: user IDs
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     location = models.CharField(max_length=200)
@@ -35,12 +35,18 @@ class CampusActivity(models.Model):
     ]
     
     def add_participant(self, user_id):
-        """Add a participant to the activity"""
-        if self.participants is None:
-            self.participants = []
-        if isinstance(self.participants, list) and user_id not in self.participants:
-            self.participants.append(user_id)
-            self.save()
+        """
+        Add a participant to the activity, returning whether they were added.
+        
+        Raises:
+            MembershipFull: The activity has max_participants participants
+        """
+        _, created = ActivityParticipant.objects.add(self, user_id, capacity=self.max_participants)
+        return created
+    
+    def remove_participant(self, user_id):
+        """Remove a participant from the activity"""
+        return ActivityParticipant.objects.remove(self, user_id)
     
     def update_status(self, status):
         """Update the activity status"""
@@ -93,7 +99,7 @@ class CampusActivity(models.Model):
             'description': self.description,
             'type': self.type,
             'organizer_id': self.organizer_id,
-            'participants': self.participants,
+            'participants': [participant.member_id for participant in self.activity_participants.all()],
             'start_date': start_date_str,
             'end_date': end_date_str,
             'location': self.location,
@@ -107,3 +113,15 @@ class CampusActivity(models.Model):
     
     def __str__(self):
         return f"Campus Activity: {self.title}"
+
+
+class ActivityParticipant(Membership):
+    """A participant of a campus activity (member_id is the user ID)"""
+    group_field = 'activity'
+    activity = models.ForeignKey(CampusActivity, on_delete=models.CASCADE, related_name='activity_participants')
+    
+    class Meta(Membership.Meta):
+        unique_together = ('activity', 'member_id')
+    
+    def __str__(self):
+        return f"{self.member_id} in {self.activity_id}"
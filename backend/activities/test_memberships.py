@@ -0,0 +1,181 @@
+"""
+Tests for the membership tables replacing the JSON member arrays
+"""
+
+import json
+import threading
+import unittest
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase
+
+from communications.models import CalendarAttendance, CalendarEvent, EventAttendee
+from courses.models import Course, CourseWaitlistEntry
+from faculty import collaboration_views
+from faculty.models import Collaboration, CollaborationMember
+from memberships import MembershipFull
+from users.models import Faculty
+from .models import ActivityParticipant, CampusActivity
+
+User = get_user_model()
+
+
+def at(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class MembershipTest(TestCase):
+    def setUp(self):
+        self.activity = CampusActivity.objects.create(
+            id='A1', title='Chess club', description='', type='club', organizer_id='u0',
+            start_date=at(2026, 10, 1), end_date=at(2026, 10, 2), location='Hall',
+            registration_deadline=at(2026, 9, 30), max_participants=2, status='open',
+        )
+        self.course = Course.objects.create(id='CS101', code='CS101', name='Compilers', description='', credits=3,
+                                            instructor_id='FAC001', department='CSE', enrollment_limit=1,
+                                            start_date='2026-09-01', end_date='2026-12-15')
+
+    def test_participants_are_unique_and_capped(self):
+        self.assertTrue(self.activity.add_participant('u1'))
+        self.assertFalse(self.activity.add_participant('u1'))
+        self.assertTrue(self.activity.add_participant(2))
+        with self.assertRaises(MembershipFull):
+            self.activity.add_participant('u3')
+        self.assertEqual(self.activity.to_json()['participants'], ['u1', '2'])
+
+        # A member joining again is not refused for the capacity they already count in
+        self.assertFalse(self.activity.add_participant('u1'))
+        self.assertTrue(self.activity.remove_participant('u1'))
+        self.assertFalse(self.activity.remove_participant('u1'))
+        self.assertTrue(self.activity.add_participant('u3'))
+        self.assertEqual(ActivityParticipant.objects.member_ids(self.activity), ['2', 'u3'])
+
+    def test_waitlist_order_and_reverse_lookup(self):
+        other = Course.objects.create(id='MA101', code='MA101', name='Algebra', description='', credits=3,
+                                      instructor_id='FAC002', department='MATH', enrollment_limit=1,
+                                      start_date='2026-09-01', end_date='2026-12-15')
+        for student_id in ('S3', 'S1', 'S2', 'S1'):
+            self.course.add_to_waitlist(student_id)
+        other.add_to_waitlist('S1')
+        self.assertEqual([self.course.get_waitlist_position(s) for s in ('S3', 'S1', 'S2', 'S9')], [1, 2, 3, 0])
+
+        self.course.remove_from_waitlist('S3')
+        self.assertEqual(self.course.get_waitlist_position('S2'), 2)
+        self.assertEqual(CourseWaitlistEntry.objects.group_ids('S1'), ['CS101', 'MA101'])
+        with self.assertNumQueries(2):
+            waitlists = [course.to_json()['waitlist'] for course in Course.objects.prefetch_related('waitlist_entries')]
+        self.assertEqual(sorted(waitlists), [['S1'], ['S1', 'S2']])
+
+        self.course.delete()
+        self.assertEqual(CourseWaitlistEntry.objects.group_ids('S1'), ['MA101'])
+
+    def test_event_attendees_are_on_the_calendar(self):
+        event = CalendarEvent.objects.create(id='ev1', title='Office hours', start_datetime=at(2026, 10, 7, 15),
+                                             end_datetime=at(2026, 10, 7, 16), type='event', visibility='private',
+                                             recurrence={'frequency': 'weekly', 'count': 3})
+        self.assertTrue(event.add_attendee('7'))
+        self.assertFalse(event.add_attendee(7))
+        self.assertEqual(CalendarAttendance.objects.filter(user_id='7').count(), 3)
+        self.assertEqual(event.to_json()['attendees'], ['7'])
+
+        event.remove_attendee('7')
+        self.assertFalse(CalendarAttendance.objects.filter(user_id='7').exists())
+        self.assertFalse(EventAttendee.objects.exists())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'Concurrent joins need row locks (PostgreSQL)')
+class ConcurrentJoinTest(TransactionTestCase):
+    def join_concurrently(self, join, member_ids):
+        """Run join(member_id) for each member at once, each in its own connection; returns the failures"""
+        barrier = threading.Barrier(len(member_ids))
+        failures = []
+
+        def run(member_id):
+            try:
+                barrier.wait()
+                join(member_id)
+            except MembershipFull as error:
+                failures.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(member_id,)) for member_id in member_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return failures
+
+    def test_concurrent_joins_never_exceed_the_capacity(self):
+        activity = CampusActivity.objects.create(
+            id='A1', title='Chess club', description='', type='club', organizer_id='u0',
+            start_date=at(2026, 10, 1), end_date=at(2026, 10, 2), location='Hall',
+            registration_deadline=at(2026, 9, 30), max_participants=3, status='open',
+        )
+        failures = self.join_concurrently(
+            lambda member_id: CampusActivity.objects.get(id='A1').add_participant(member_id),
+            [f'u{i}' for i in range(12)],
+        )
+        self.assertEqual(ActivityParticipant.objects.filter(activity=activity).count(), 3)
+        self.assertEqual(len(failures), 9)
+
+    def test_concurrent_joins_are_not_lost(self):
+        course = Course.objects.create(id='CS101', code='CS101', name='Compilers', description='', credits=3,
+                                       instructor_id='FAC001', department='CSE', enrollment_limit=1,
+                                       start_date='2026-09-01', end_date='2026-12-15')
+        # The same student twice, as from a double-submitted form
+        member_ids = [f'S{i}' for i in range(10)] + ['S0']
+        self.join_concurrently(lambda member_id: Course.objects.get(id='CS101').add_to_waitlist(member_id), member_ids)
+        self.assertEqual(sorted(CourseWaitlistEntry.objects.member_ids(course)), sorted(set(member_ids)))
+
+
+class CollaborationMemberTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='lovelace', password=None, role='faculty', mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=self.user, employee_id='FAC001', department='CSE')
+
+    def request(self, method, body=None):
+        if method == 'get':
+            request = RequestFactory().get('/')
+        else:
+            request = getattr(RequestFactory(), method)('/', json.dumps(body or {}), content_type='application/json')
+        request.user = self.user
+        request.faculty = self.faculty
+        return request
+
+    def call(self, view, method, *args, body=None):
+        return json.loads(view(self.request(method, body), *args).content)
+
+    def test_collaborators_are_added_updated_and_removed(self):
+        data = self.call(collaboration_views.create_collaboration, 'post', body={
+            'title': 'Parsing', 'collaborators': [{'id': 1, 'name': 'Ann'}, {'name': 'Bob'}],
+        })
+        collaboration_id = data['collaboration']['id']
+        ann, bob = data['collaboration']['collaborators']
+        self.assertEqual(ann, {'id': 1, 'name': 'Ann'})
+        self.assertEqual(bob['name'], 'Bob')
+        self.assertTrue(bob['id'])
+
+        data = self.call(collaboration_views.add_collaborator, 'post', collaboration_id,
+                         body={'collaborator': {'id': 1, 'name': 'Ann', 'role': 'PI'}})
+        self.assertEqual(data['collaboration']['collaborators'][0], {'id': 1, 'name': 'Ann', 'role': 'PI'})
+        self.call(collaboration_views.add_collaborator, 'post', collaboration_id,
+                  body={'collaborator': {'id': 2, 'name': 'Cy'}})
+        response = collaboration_views.add_collaborator(self.request('post', {'collaborator': '5'}), collaboration_id)
+        self.assertEqual(response.status_code, 400)
+
+        data = self.call(collaboration_views.remove_collaborator, 'delete', collaboration_id, 1)
+        self.assertEqual([c['name'] for c in data['collaboration']['collaborators']], ['Bob', 'Cy'])
+
+        data = self.call(collaboration_views.update_collaboration, 'put', collaboration_id,
+                         body={'collaborators': [{'id': 2, 'name': 'Cy', 'role': 'RA'}, {'id': 4, 'name': 'Di'}]})
+        self.assertEqual(data['collaboration']['collaborators'], [{'id': 2, 'name': 'Cy', 'role': 'RA'},
+                                                                 {'id': 4, 'name': 'Di'}])
+        self.assertEqual(CollaborationMember.objects.group_ids('2'), [collaboration_id])
+
+        Collaboration.objects.create(faculty=self.faculty, title='Typing')
+        with self.assertNumQueries(2):
+            data = self.call(collaboration_views.get_collaborations, 'get')
+        self.assertEqual([len(c['collaborators']) for c in data['collaborations']], [0, 2])
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class AdminDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'admin_dashboard'
\ No newline at end of file
+    name = 'admin_dashboard'
+    
+    def ready(self):
+        # Import signal handlers that record changes for the reporting rollups
+        import admin_dashboard.signals
@@ -3,6 +3,7 @@ from django.views.decorators.csrf import csrf_exempt
 from courses.models import Course, Enrollment
 from users.models import Faculty, Student
 from .models import EnrollmentOverrideRequest
+from .reporting import ReportingService
 from django.db.models import Count, Q
 from django.utils import timezone
 import json
@@ -237,15 +238,8 @@ def get_enrollment_reports(request):
             department = request.GET.get('department', None)
             
             if report_type == 'by_department':
-                # Enrollment by department report
-                department_filter = Course.objects.all()
-                if department:
-                    department_filter = department_filter.filter(department=department)
-                    
-                departments = department_filter.values('department').annotate(
-                    course_count=Count('id'),
-                    total_enrollments=Count('students')
-                ).order_by('-total_enrollments')
+                # Enrollment by department report, from the rollups
+                departments = ReportingService.enrollments_by_department(department)
                 
                 data = {
                     'report_type': 'by_department',
@@ -269,29 +263,16 @@ def get_enrollment_reports(request):
                 }
             
             elif report_type == 'waitlist':
-                # Waitlist report
-                waitlisted_enrollments = Enrollment.objects.filter(status='waitlisted')
-                
-                # Group by course
-                waitlist_by_course = waitlisted_enrollments.values(
-                    'course_id'
-                ).annotate(
-                    waitlist_count=Count('id')
-                ).order_by('-waitlist_count')
-                
-                # Get course details
-                waitlist_data = []
-                for item in waitlist_by_course:
-                    try:
-                        course = Course.objects.get(id=item['course_id'])
-                        waitlist_data.append({
-                            'course_id': course.id,
-                            'course_code': course.code,
-                            'course_name': course.name,
-                            'waitlist_count': item['waitlist_count']
-                        })
-                    except Course.DoesNotExist:
-                        continue
+                # Waitlist report, from the rollups
+                waitlist_data = [
+                    {
+                        'course_id': row['course_id'],
+                        'course_code': row['course_code'],
+                        'course_name': row['course_name'],
+                        'waitlist_count': row['enrollment_count']
+                    }
+                    for row in ReportingService.enrollments_by_course('waitlisted')
+                ]
                 
                 data = {
                     'report_type': 'waitlist',
@@ -303,29 +284,15 @@ def get_enrollment_reports(request):
                 try:
                     course = Course.objects.get(id=course_id)
                     
-                    # Get all enrollments for this course
-                    enrollments = Enrollment.objects.filter(course_id=course_id)
-                    
-                    # Count by status
-                    active_count = enrollments.filter(status='active').count()
-                    waitlisted_count = enrollments.filter(status='waitlisted').count()
-                    dropped_count = enrollments.filter(status='dropped').count()
-                    completed_count = enrollments.filter(status='completed').count()
+                    # Count by status from the enrollments, like the student list below
+                    status_counts = ReportingService.enrollment_status_counts(course_id=course_id, live=True)
+                    active_count = status_counts.get('active', 0)
+                    waitlisted_count = status_counts.get('waitlisted', 0)
+                    dropped_count = status_counts.get('dropped', 0)
+                    completed_count = status_counts.get('completed', 0)
                     
                     # Get student details for active enrollments
-                    active_enrollments = enrollments.filter(status='active')
-                    student_details = []
-                    for enrollment in active_enrollments:
-                        try:
-                            student = Student.objects.get(student_id=enrollment.student_id)
-                            student_details.append({
-                                'student_id': student.student_id,
-                                'student_name': f'{student.user.first_name} {student.user.last_name}',
-                                'enrollment_date': enrollment.enrollment_date.isoformat() if enrollment.enrollment_date else None,
-                                'grade': enrollment.grade
-                            })
-                        except Student.DoesNotExist:
-                            continue
+                    student_details = ReportingService.active_students(course_id)
                     
                     data = {
                         'report_type': 'course_detail',
@@ -353,40 +320,22 @@ def get_enrollment_reports(request):
                     return JsonResponse({'success': False, 'message': 'Course not found'}, status=404)
             
             else:
-                # Default summary report
+                # Default summary report, from the rollups
                 course_filter = Course.objects.all()
-                enrollment_filter = Enrollment.objects.all()
-                
-                # Apply filters if provided
                 if department:
                     course_filter = course_filter.filter(department=department)
-                    enrollment_filter = enrollment_filter.filter(
-                        course_id__in=course_filter.values_list('id', flat=True)
-                    )
-                
                 total_courses = course_filter.count()
-                total_enrollments = enrollment_filter.filter(status='active').count()
-                total_waitlisted = enrollment_filter.filter(status='waitlisted').count()
-                total_dropped = enrollment_filter.filter(status='dropped').count()
-                total_completed = enrollment_filter.filter(status='completed').count()
                 
                 # Enrollment by status
-                enrollment_by_status = enrollment_filter.values('status').annotate(count=Count('status'))
-                
-                # Top courses by enrollment
-                top_courses = course_filter.annotate(
-                    enrollment_count=Count('students')
-                ).order_by('-enrollment_count')[:10]
+                status_counts = ReportingService.enrollment_status_counts(department=department)
+                total_enrollments = status_counts.get('active', 0)
+                total_waitlisted = status_counts.get('waitlisted', 0)
+                total_dropped = status_counts.get('dropped', 0)
+                total_completed = status_counts.get('completed', 0)
+                enrollment_by_status = [{'status': status, 'count': count} for status, count in status_counts.items()]
                 
-                top_courses_data = []
-                for course in top_courses:
-                    top_courses_data.append({
-                        'course_id': course.id,
-                        'course_code': course.code,
-                        'course_name': course.name,
-                        'department': course.department,
-                        'enrollment_count': course.get_student_count()
-                    })
+                # Top courses by active enrollment
+                top_courses_data = ReportingService.enrollments_by_course('active', department=department, limit=10)
                 
                 data = {
                     'report_type': 'summary',
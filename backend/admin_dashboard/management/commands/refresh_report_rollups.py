@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from admin_dashboard.reporting import ReportingService
+
+class Command(BaseCommand):
+    help = 'Refresh the admin reporting rollups (run hourly, e.g. from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute every rollup instead of only the changed keys')
+    
+    def handle(self, *args, **options):
+        self.stdout.write('Refreshing reporting rollups...')
+        refreshed = ReportingService.refresh(full=options['full'])
+        summary = ', '.join(f'{count} {metric} keys' for metric, count in refreshed.items())
+        self.stdout.write(self.style.SUCCESS(f'Successfully refreshed {summary}'))
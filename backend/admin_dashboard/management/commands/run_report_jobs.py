@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from admin_dashboard.reporting import ReportingService
+
+class Command(BaseCommand):
+    help = 'Run the report jobs lost by their background thread and fail interrupted ones (run with --loop)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep checking for lost jobs')
+        parser.add_argument('--interval', type=float, default=60.0,
+                            help='Seconds between checks with --loop')
+    
+    def handle(self, *args, **options):
+        while True:
+            try:
+                recovered = ReportingService.recover_jobs()
+            except Exception as e:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Recovering report jobs failed, retrying in {options["interval"]:.0f}s: {e}')
+                close_old_connections()
+                time.sleep(options['interval'])
+                continue
+            if recovered['run'] or recovered['failed'] or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Ran {recovered['run']} pending report jobs, failed {recovered['failed']} interrupted ones"
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -104,4 +104,110 @@ class EnrollmentOverrideRequest(models.Model):
         }
     
     def __str__(self):
-        return f"{self.student.student_id} - {self.course.code} - {self.request_type} ({self.status})"
\ No newline at end of file
+        return f"{self.student.student_id} - {self.course.code} - {self.request_type} ({self.status})"
+
+class EnrollmentRollup(models.Model):
+    """Number of enrollments of a course in one status, kept up to date by admin_dashboard.reporting"""
+    course_id = models.CharField(max_length=50)
+    department = models.CharField(max_length=100, blank=True)  # Empty when the course no longer exists
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        unique_together = ('course_id', 'status')
+        indexes = [models.Index(fields=['department', 'status'])]
+    
+    def __str__(self):
+        return f"{self.course_id} - {self.status}: {self.count}"
+
+
+class PaymentRollup(models.Model):
+    """Number and total amount of payments of one type and status"""
+    type = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        unique_together = ('type', 'status')
+    
+    def __str__(self):
+        return f"{self.type} - {self.status}: {self.count}"
+
+
+class UserRollup(models.Model):
+    """Number of users of one role registered on one day"""
+    role = models.CharField(max_length=20)
+    created_date = models.DateField()
+    count = models.IntegerField(default=0)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        unique_together = ('role', 'created_date')
+    
+    def __str__(self):
+        return f"{self.role} - {self.created_date}: {self.count}"
+
+
+class RollupChange(models.Model):
+    """A rollup key whose source rows changed since the rollups were last refreshed"""
+    METRIC_CHOICES = [
+        ('enrollments', 'Enrollments'),  # key: course ID
+        ('payments', 'Payments'),  # key: payment type
+        ('users', 'Users'),  # key: role
+    ]
+    
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    key = models.CharField(max_length=100)
+    
+    class Meta:
+        unique_together = ('metric', 'key')
+    
+    def __str__(self):
+        return f"{self.metric}: {self.key}"
+
+
+class ReportJob(models.Model):
+    """A report generated in the background, with its CSV result"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed')
+    ]
+    
+    id = models.CharField(max_length=50, primary_key=True)
+    report_type = models.CharField(max_length=50)
+    parameters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    requested_by = models.CharField(max_length=100, blank=True)  # Admin employee ID
+    row_count = models.IntegerField(default=0)
+    result_csv = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def to_json(self):
+        """Convert report job to JSON format"""
+        return {
+            'id': self.id,
+            'report_type': self.report_type,
+            'parameters': self.parameters,
+            'status': self.status,
+            'requested_by': self.requested_by,
+            'row_count': self.row_count,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'download_url': f'/api/v1/admin/reporting/jobs/{self.id}/download/' if self.status == 'completed' else None
+        }
+    
+    def __str__(self):
+        return f"{self.report_type} ({self.status})"
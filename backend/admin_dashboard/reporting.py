@@ -0,0 +1,377 @@
+"""
+Reporting engine for the admin dashboard.
+
+Reports read small rollup tables instead of scanning enrollments, payments and
+users on the request path:
+
+- EnrollmentRollup: enrollments by course and status (with the department)
+- PaymentRollup: payments by type and status
+- UserRollup: users by role and registration day
+
+Writes to the source tables only record the changed rollup key as a
+RollupChange (see admin_dashboard.signals). The hourly refresh
+(`manage.py refresh_report_rollups`, run by the scheduler service in
+docker-compose.yml) recomputes just those keys, or all of them on the first
+run or with --full. Until that first run, reports aggregate the source
+tables. A course's detail report reads its enrollments directly, so its
+counts match its student list.
+
+Reports too long for a request (e.g., the full enrollment roster) run as
+ReportJobs in a background thread and keep their result as CSV. Jobs that
+thread lost (e.g. to a restart) are picked up by `manage.py run_report_jobs`,
+which runs pending jobs queued over JOB_PENDING_GRACE ago and fails jobs
+running for over JOB_TIMEOUT.
+"""
+
+import csv
+import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from courses.models import Course, Enrollment
+from finance.models import Payment
+from users.models import Student
+from .models import EnrollmentRollup, PaymentRollup, ReportJob, RollupChange, UserRollup
+
+User = get_user_model()
+
+# Report jobs run one at a time so they don't compete with requests for the database
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-job')
+
+RECENT_REGISTRATION_DAYS = 30
+
+# Jobs still pending this long after being queued were lost by the thread
+JOB_PENDING_GRACE = timedelta(minutes=2)
+# Jobs running this long were interrupted
+JOB_TIMEOUT = timedelta(hours=1)
+
+# Rollup models known to have been built, so reads skip checking
+_built_rollups = set()
+
+def _rollups_built(model):
+    if model not in _built_rollups and model.objects.exists():
+        _built_rollups.add(model)
+    return model in _built_rollups
+
+def _enrollments(live=False):
+    """Enrollment rollups and the expression counting them, or the enrollments before the first refresh"""
+    if not live and _rollups_built(EnrollmentRollup):
+        return EnrollmentRollup.objects.all(), Sum('count')
+    departments = Course.objects.filter(id=OuterRef('course_id')).values('department')[:1]
+    return Enrollment.objects.annotate(department=Coalesce(Subquery(departments), Value(''))), Count('id')
+
+def _payments():
+    """Payment rollups with the expressions counting and totalling them, or the payments before the first refresh"""
+    if _rollups_built(PaymentRollup):
+        return PaymentRollup.objects.all(), Sum('count'), Sum('total_amount')
+    return Payment.objects.all(), Count('id'), Sum('amount')
+
+def _users():
+    """User rollups and the expression counting them, or the users before the first refresh"""
+    if _rollups_built(UserRollup):
+        return UserRollup.objects.all(), Sum('count')
+    return User.objects.annotate(created_date=TruncDate('created_at')), Count('id')
+
+def _enrollment_rows(course_ids=None):
+    enrollments = Enrollment.objects.all()
+    courses = Course.objects.all()
+    if course_ids is not None:
+        enrollments = enrollments.filter(course_id__in=course_ids)
+        courses = courses.filter(id__in=course_ids)
+    departments = dict(courses.values_list('id', 'department'))
+    now = timezone.now()
+    return [
+        EnrollmentRollup(course_id=row['course_id'], status=row['status'], count=row['count'],
+                         department=departments.get(row['course_id'], ''), refreshed_at=now)
+        for row in enrollments.order_by().values('course_id', 'status').annotate(count=Count('id'))
+    ]
+
+def _payment_rows(types=None):
+    payments = Payment.objects.all()
+    if types is not None:
+        payments = payments.filter(type__in=types)
+    now = timezone.now()
+    return [
+        PaymentRollup(type=row['type'], status=row['status'], count=row['count'],
+                      total_amount=row['total'] or 0, refreshed_at=now)
+        for row in payments.order_by().values('type', 'status').annotate(count=Count('id'), total=Sum('amount'))
+    ]
+
+def _user_rows(roles=None):
+    users = User.objects.all()
+    if roles is not None:
+        users = users.filter(role__in=roles)
+    now = timezone.now()
+    return [
+        UserRollup(role=row['role'], created_date=row['created_date'], count=row['count'], refreshed_at=now)
+        for row in users.annotate(created_date=TruncDate('created_at')).order_by()
+        .values('role', 'created_date').annotate(count=Count('id'))
+    ]
+
+# Metric -> (rollup model, rollup field holding the key, function computing rollup rows)
+ROLLUPS = {
+    'enrollments': (EnrollmentRollup, 'course_id', _enrollment_rows),
+    'payments': (PaymentRollup, 'type', _payment_rows),
+    'users': (UserRollup, 'role', _user_rows),
+}
+
+class ReportingService:
+    """Service class for the reporting rollups and report jobs"""
+
+    @staticmethod
+    def mark_changed(metric, key):
+        """Record that the rollups of a key need refreshing"""
+        RollupChange.objects.bulk_create([RollupChange(metric=metric, key=key or '')], ignore_conflicts=True)
+
+    @staticmethod
+    def refresh(full=False):
+        """Bring the rollups up to date, returning the number of keys refreshed per metric
+
+        Only keys with recorded changes are recomputed, unless full is set or
+        a rollup table is still empty.
+        """
+        refreshed = {}
+        for metric, (model, key_field, compute) in ROLLUPS.items():
+            with transaction.atomic():
+                # Changes recorded while refreshing stay for the next refresh
+                changes = RollupChange.objects.filter(metric=metric)
+                if full or not model.objects.exists():
+                    last_change = changes.aggregate(last=Max('id'))['last']
+                    changes.filter(id__lte=last_change or 0).delete()
+                    model.objects.all().delete()
+                    model.objects.bulk_create(compute())
+                    refreshed[metric] = model.objects.values(key_field).distinct().count()
+                    if refreshed[metric]:
+                        _built_rollups.add(model)
+                    continue
+
+                pending = list(changes.values_list('id', 'key'))
+                if not pending:
+                    refreshed[metric] = 0
+                    continue
+                keys = sorted({key for _, key in pending})
+                RollupChange.objects.filter(id__in=[change_id for change_id, _ in pending]).delete()
+                model.objects.filter(**{f'{key_field}__in': keys}).delete()
+                model.objects.bulk_create(compute(keys))
+                refreshed[metric] = len(keys)
+        return refreshed
+
+    @staticmethod
+    def enrollment_status_counts(department=None, course_id=None, live=False):
+        """Status -> number of enrollments (counted from the enrollments themselves if live)"""
+        rows, count = _enrollments(live)
+        if department:
+            rows = rows.filter(department=department)
+        if course_id:
+            rows = rows.filter(course_id=course_id)
+        return dict(rows.order_by().values('status').annotate(total=count).values_list('status', 'total'))
+
+    @staticmethod
+    def enrollments_by_course(status, department=None, limit=None):
+        """Courses with enrollments in a status, most enrollments first"""
+        rows, count = _enrollments()
+        rows = rows.filter(status=status)
+        if department:
+            rows = rows.filter(department=department)
+        rows = (rows.order_by().values('course_id', 'department').annotate(total=count)
+                .filter(total__gt=0).order_by('-total', 'course_id'))
+        if limit:
+            rows = rows[:limit]
+        rows = list(rows)
+        courses = Course.objects.in_bulk([row['course_id'] for row in rows])
+        return [
+            {
+                'course_id': row['course_id'],
+                'course_code': courses[row['course_id']].code,
+                'course_name': courses[row['course_id']].name,
+                'department': row['department'],
+                'enrollment_count': row['total']
+            }
+            for row in rows if row['course_id'] in courses
+        ]
+
+    @staticmethod
+    def enrollments_by_department(department=None):
+        """Departments with their number of courses and active enrollments"""
+        courses = Course.objects.all()
+        rows, count = _enrollments()
+        rows = rows.filter(status='active')
+        if department:
+            courses = courses.filter(department=department)
+            rows = rows.filter(department=department)
+        enrollments = dict(
+            rows.order_by().values('department').annotate(total=count).values_list('department', 'total')
+        )
+        departments = [
+            {'department': row['department'], 'course_count': row['course_count'],
+             'total_enrollments': enrollments.get(row['department'], 0)}
+            for row in courses.order_by().values('department').annotate(course_count=Count('id'))
+        ]
+        return sorted(departments, key=lambda row: -row['total_enrollments'])
+
+    @staticmethod
+    def users_by_role():
+        """Role -> number of users"""
+        rows, count = _users()
+        return dict(rows.order_by().values('role').annotate(total=count).values_list('role', 'total'))
+
+    @staticmethod
+    def recent_registrations(days=RECENT_REGISTRATION_DAYS):
+        """Users registered in the last days (whole days, as rolled up)"""
+        since = timezone.localdate() - timedelta(days=days)
+        rows, count = _users()
+        return rows.filter(created_date__gte=since).aggregate(total=count)['total'] or 0
+
+    @staticmethod
+    def payments_by_type():
+        """Payment counts and totals per type"""
+        rows, count, total = _payments()
+        return list(rows.order_by('type').values('type').annotate(count=count, total=total))
+
+    @staticmethod
+    def active_students(course_id):
+        """Active enrollments of a course with their students, in two queries"""
+        enrollments = list(Enrollment.objects.filter(course_id=course_id, status='active'))
+        students = {
+            student.student_id: student
+            for student in Student.objects.filter(
+                student_id__in=[enrollment.student_id for enrollment in enrollments]
+            ).select_related('user')
+        }
+        return [
+            {
+                'student_id': enrollment.student_id,
+                'student_name': f'{students[enrollment.student_id].user.first_name} {students[enrollment.student_id].user.last_name}',
+                'enrollment_date': enrollment.enrollment_date.isoformat() if enrollment.enrollment_date else None,
+                'grade': enrollment.grade
+            }
+            for enrollment in enrollments if enrollment.student_id in students
+        ]
+
+    @staticmethod
+    def create_job(report_type, parameters=None, requested_by=''):
+        """Queue a report job, run in the background once the transaction commits"""
+        if report_type not in REPORT_JOBS:
+            raise ValueError(f'Unknown report type: {report_type}')
+        job = ReportJob.objects.create(
+            id=str(uuid.uuid4()), report_type=report_type, parameters=parameters or {}, requested_by=requested_by
+        )
+        transaction.on_commit(lambda: _job_executor.submit(_run_job_in_thread, job.id))
+        return job
+
+    @staticmethod
+    def run_job(job_id):
+        """Generate a report job's CSV, recording its outcome on the job (unless it is no longer pending)"""
+        claimed = ReportJob.objects.filter(id=job_id, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        job = ReportJob.objects.get(id=job_id)
+        if not claimed:
+            # Run, or running, elsewhere
+            return job
+
+        try:
+            header, rows = REPORT_JOBS[job.report_type](**job.parameters)
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(header)
+            row_count = 0
+            for row in rows:
+                writer.writerow(row)
+                row_count += 1
+            job.result_csv = output.getvalue()
+            job.row_count = row_count
+            job.status = 'completed'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        job.completed_at = timezone.now()
+        job.save(update_fields=['result_csv', 'row_count', 'status', 'error', 'completed_at'])
+        return job
+
+    @staticmethod
+    def recover_jobs():
+        """Fail interrupted jobs and run the pending jobs the background thread lost
+
+        Returns the number of jobs run and failed.
+        """
+        now = timezone.now()
+        failed = ReportJob.objects.filter(status='running', started_at__lt=now - JOB_TIMEOUT).update(
+            status='failed', error='Interrupted before completing', completed_at=now
+        )
+        pending = ReportJob.objects.filter(status='pending', created_at__lt=now - JOB_PENDING_GRACE)
+        ran = 0
+        for job_id in pending.order_by('created_at').values_list('id', flat=True):
+            ReportingService.run_job(job_id)
+            ran += 1
+        return {'run': ran, 'failed': failed}
+
+def _run_job_in_thread(job_id):
+    close_old_connections()
+    try:
+        ReportingService.run_job(job_id)
+    finally:
+        close_old_connections()
+
+def enrollment_roster_report(department=None, course_id=None, status=None):
+    """Every enrollment with its student and course, streamed from the database"""
+    enrollments = Enrollment.objects.order_by('course_id', 'student_id')
+    courses = Course.objects.all()
+    if department:
+        courses = courses.filter(department=department)
+        enrollments = enrollments.filter(course_id__in=courses.values('id'))
+    if course_id:
+        enrollments = enrollments.filter(course_id=course_id)
+    if status:
+        enrollments = enrollments.filter(status=status)
+
+    course_details = {course['id']: course for course in courses.values('id', 'code', 'name', 'department')}
+    names = {
+        row['student_id']: f"{row['user__first_name']} {row['user__last_name']}"
+        for row in Student.objects.values('student_id', 'user__first_name', 'user__last_name').iterator()
+    }
+
+    def rows():
+        for enrollment in enrollments.values_list(
+                'course_id', 'student_id', 'status', 'grade', 'enrollment_date').iterator():
+            course = course_details.get(enrollment[0], {})
+            yield [enrollment[0], course.get('code', ''), course.get('name', ''), course.get('department', ''),
+                   enrollment[1], names.get(enrollment[1], ''), enrollment[2], enrollment[3],
+                   enrollment[4].isoformat() if enrollment[4] else '']
+
+    header = ['course_id', 'course_code', 'course_name', 'department', 'student_id', 'student_name',
+              'status', 'grade', 'enrollment_date']
+    return header, rows()
+
+def enrollments_by_course_report(department=None):
+    """Enrollments of every course by status, from the rollups"""
+    rollups = EnrollmentRollup.objects.order_by('department', 'course_id', 'status')
+    if department:
+        rollups = rollups.filter(department=department)
+    return (['course_id', 'department', 'status', 'count'],
+            rollups.values_list('course_id', 'department', 'status', 'count'))
+
+def payments_by_type_report():
+    """Payment counts and totals by type and status, from the rollups"""
+    return (['type', 'status', 'count', 'total_amount'],
+            PaymentRollup.objects.order_by('type', 'status').values_list('type', 'status', 'count', 'total_amount'))
+
+def user_registrations_report(role=None):
+    """Registrations per role and day, from the rollups"""
+    rollups = UserRollup.objects.order_by('created_date', 'role')
+    if role:
+        rollups = rollups.filter(role=role)
+    return (['created_date', 'role', 'count'], rollups.values_list('created_date', 'role', 'count'))
+
+# Report type -> function returning the CSV header and rows
+REPORT_JOBS = {
+    'enrollment_roster': enrollment_roster_report,
+    'enrollments_by_course': enrollments_by_course_report,
+    'payments_by_type': payments_by_type_report,
+    'user_registrations': user_registrations_report,
+}
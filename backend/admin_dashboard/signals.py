@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from courses.models import Course, Enrollment
+from finance.models import Payment
+from .reporting import ReportingService
+
+User = get_user_model()
+
+# User fields the user rollups are grouped by
+USER_ROLLUP_FIELDS = {'role', 'created_at'}
+
+# The rollup metric of each model and the field its rows are keyed by
+ROLLUP_KEYS = {Enrollment: ('enrollments', 'course_id'), Payment: ('payments', 'type'), User: ('users', 'role')}
+
+def _mark_changed(metric, instance, key):
+    """Mark the row's key, and its key before the save if that differs (see remember_rollup_key)"""
+    ReportingService.mark_changed(metric, key)
+    previous = instance.__dict__.pop('_previous_rollup_key', key)
+    if previous != key:
+        ReportingService.mark_changed(metric, previous)
+
+@receiver(pre_save, sender=Enrollment)
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=User)
+def remember_rollup_key(sender, instance, **kwargs):
+    """Keep the key an existing row is rolled up under, so a save moving it refreshes both keys"""
+    field = ROLLUP_KEYS[sender][1]
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or instance._state.adding or (update_fields and field not in update_fields):
+        return
+    instance._previous_rollup_key = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def mark_enrollment_rollup(sender, instance, **kwargs):
+    """Refresh the course's enrollment rollups on the next refresh"""
+    if kwargs.get('raw'):
+        return
+    _mark_changed('enrollments', instance, instance.course_id)
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def mark_course_rollup(sender, instance, **kwargs):
+    """Enrollment rollups carry the course's department"""
+    if kwargs.get('raw'):
+        return
+    ReportingService.mark_changed('enrollments', instance.id)
+
+@receiver(post_save, sender=Payment)
+@receiver(post_delete, sender=Payment)
+def mark_payment_rollup(sender, instance, **kwargs):
+    """Refresh the payment type's rollups on the next refresh"""
+    if kwargs.get('raw'):
+        return
+    _mark_changed('payments', instance, instance.type)
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def mark_user_rollup(sender, instance, **kwargs):
+    """Refresh the role's rollups on the next refresh, skipping saves that can't move a user"""
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or (update_fields and not USER_ROLLUP_FIELDS & set(update_fields)):
+        return
+    _mark_changed('users', instance, instance.role)
@@ -0,0 +1,101 @@
+"""
+Tests for the role dashboard counters
+"""
+
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from dashboard_metrics import get_dashboard_metrics
+from finance.models import Payment
+from finance_admin.views import dashboard_overview as finance_dashboard
+from it_admin.views import dashboard_overview as it_dashboard
+from library.models import LibraryBook
+from library_staff.views import dashboard_overview as library_dashboard
+from .views import dashboard_overview as admin_dashboard
+
+User = get_user_model()
+
+
+class DashboardMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i, role in enumerate(['student', 'student', 'faculty', 'admin']):
+            User.objects.create_user(username=f'user{i}', password=None, role=role, mfa_enabled=False)
+        Course.objects.create(id='CS101', code='CS101', name='CS', description='', credits=3, instructor_id='FAC001',
+                              department='CSE', enrollment_limit=30, start_date='2026-09-01', end_date='2026-12-15')
+
+        now = timezone.now()
+        Payment.objects.create(id='p1', user_id='u1', amount=Decimal('100'), type='tuition', status='completed')
+        Payment.objects.create(id='p2', user_id='u1', amount=Decimal('50.25'), type='fee',
+                               due_date=now - timedelta(days=2))
+        Payment.objects.create(id='p3', user_id='u2', amount=Decimal('10'), type='fee',
+                               created_at=now - timedelta(days=60))
+        for i, status in enumerate(['available', 'available', 'borrowed', 'reserved']):
+            LibraryBook.objects.create(
+                id=f'b{i}', title='Book', author='Author', isbn='1', call_number='QA1', status=status,
+                renewal_count=0, checkout_date=now - timedelta(days=1) if status == 'borrowed' else None,
+                due_date=now - timedelta(days=3) if status == 'borrowed' else None
+            )
+
+    def get(self, view, **attributes):
+        request = RequestFactory().get('/')
+        for name, value in attributes.items():
+            setattr(request, name, value)
+        return json.loads(view(request).content)
+
+    def test_admin_dashboard_is_one_statement(self):
+        with self.assertNumQueries(1):
+            data = self.get(admin_dashboard, admin=True)
+        self.assertEqual(data, {
+            'totalUsers': 4, 'totalStudents': 2, 'totalFaculty': 1, 'totalAdmins': 1, 'activeCourses': 1,
+            'recentPayments': 2, 'totalBooks': 4, 'borrowedBooks': 1, 'recentAssignments': 0,
+        })
+
+        # Served from the cache until it expires
+        with self.assertNumQueries(0):
+            self.get(admin_dashboard, admin=True)
+
+    def test_finance_dashboard(self):
+        # Counters in one statement, plus the grouped breakdown by type
+        with self.assertNumQueries(2):
+            data = self.get(finance_dashboard, staff=True)
+        self.assertEqual(data['totalPayments'], 3)
+        self.assertEqual(data['totalPaymentAmount'], 160.25)
+        self.assertEqual(data['recentPayments'], 2)
+        self.assertEqual(data['overduePayments'], 1)
+        self.assertEqual(data['pendingAidApplications'], 0)
+        self.assertEqual(sorted(data['paymentsByType'], key=lambda row: row['type']),
+                         [{'type': 'fee', 'count': 2}, {'type': 'tuition', 'count': 1}])
+
+    def test_library_dashboard_is_one_statement(self):
+        with self.assertNumQueries(1):
+            data = self.get(library_dashboard, staff=True)
+        self.assertEqual(data, {
+            'totalBooks': 4, 'availableBooks': 2, 'borrowedBooks': 1, 'reservedBooks': 1,
+            'overdueBooks': 1, 'recentCheckouts': 1, 'reservationRequests': 1,
+        })
+
+    def test_it_dashboard_needs_no_queries(self):
+        with self.assertNumQueries(0):
+            data = self.get(it_dashboard, staff=True)
+        self.assertIn('systemStats', data)
+
+    def test_concurrent_requests_wait_for_the_recomputation(self):
+        # Another request holds the recompute lock and publishes its result shortly
+        cache.add('dashboard_metrics:library_staff:lock', True)
+        published = {'totalBooks': 99}
+        timer = threading.Timer(0.1, cache.set, args=('dashboard_metrics:library_staff', published))
+        timer.start()
+        try:
+            with self.assertNumQueries(0):
+                self.assertEqual(get_dashboard_metrics('library_staff'), published)
+        finally:
+            timer.cancel()
@@ -0,0 +1,182 @@
+"""
+Tests for the reporting rollups and report jobs
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from finance.models import Payment
+from users.models import Admin, Student
+from .enrollment_views import get_enrollment_reports
+from . import reporting as reporting_engine
+from .models import EnrollmentRollup, PaymentRollup, ReportJob, RollupChange, UserRollup
+from .reporting import ReportingService
+from .views import download_report_job, reporting
+
+User = get_user_model()
+
+
+class ReportingTest(TestCase):
+    def setUp(self):
+        admin_user = User.objects.create_user(username='admin', password=None, role='admin', mfa_enabled=False)
+        self.admin = Admin.objects.create(user=admin_user, employee_id='ADM001')
+
+        for course_id, department in [('CS101', 'CSE'), ('CS102', 'CSE'), ('BUS101', 'Business')]:
+            Course.objects.create(
+                id=course_id, code=course_id, name=f'{course_id} name', description='', credits=3,
+                instructor_id='FAC001', department=department, enrollment_limit=30,
+                start_date='2026-09-01', end_date='2026-12-15'
+            )
+        for i in range(6):
+            user = User.objects.create_user(username=f'student{i}', password=None, role='student',
+                                            mfa_enabled=False, first_name='Student', last_name=str(i))
+            Student.objects.create(user=user, student_id=f'STU{i}')
+            Enrollment.objects.create(id=f'a{i}', student_id=f'STU{i}', course_id='CS101',
+                                      status='active' if i < 4 else 'waitlisted')
+        Enrollment.objects.create(id='b0', student_id='STU0', course_id='BUS101', status='completed', grade='A')
+        Payment.objects.create(id='p1', user_id='u1', amount=Decimal('100.50'), type='tuition', status='completed')
+        Payment.objects.create(id='p2', user_id='u2', amount=Decimal('20'), type='fee')
+
+        ReportingService.refresh()
+
+    def get(self, view, *args, **params):
+        request = RequestFactory().get('/', params)
+        request.admin = self.admin
+        response = view(request, *args)
+        return json.loads(response.content) if response['Content-Type'] == 'application/json' else response
+
+    def test_reports_read_the_rollups(self):
+        self.assertFalse(RollupChange.objects.exists())
+
+        # Rollups plus the course details, without touching enrollments
+        with self.assertNumQueries(2):
+            data = self.get(get_enrollment_reports, type='waitlist')
+        self.assertEqual(data['waitlist_data'], [
+            {'course_id': 'CS101', 'course_code': 'CS101', 'course_name': 'CS101 name', 'waitlist_count': 2}])
+
+        data = self.get(get_enrollment_reports, department='CSE')
+        self.assertEqual(data['summary']['total_courses'], 2)
+        self.assertEqual(data['summary']['total_active_enrollments'], 4)
+        self.assertEqual(data['summary']['total_completed'], 0)
+        self.assertEqual([course['course_id'] for course in data['top_courses']], ['CS101'])
+
+        data = self.get(get_enrollment_reports, type='by_department')
+        self.assertEqual(data['departments'], [
+            {'department': 'CSE', 'course_count': 2, 'total_enrollments': 4},
+            {'department': 'Business', 'course_count': 1, 'total_enrollments': 0},
+        ])
+
+        data = self.get(reporting, type='financial_summary')
+        self.assertEqual(data['total_payments'], 2)
+        self.assertEqual(data['total_payment_amount'], 120.5)
+
+        data = self.get(reporting, type='user_summary')
+        self.assertEqual(data['total_users'], 7)
+        self.assertEqual(data['recent_registrations'], 7)
+
+    def test_course_detail_loads_students_together(self):
+        # Course, rollups, active enrollments and their students
+        with self.assertNumQueries(4):
+            data = self.get(get_enrollment_reports, type='course_detail', course_id='CS101')
+        self.assertEqual(data['enrollment_stats'], {'active': 4, 'waitlisted': 2, 'dropped': 0, 'completed': 0})
+        self.assertEqual([student['student_name'] for student in data['students']],
+                         ['Student 0', 'Student 1', 'Student 2', 'Student 3'])
+
+    def test_refresh_only_recomputes_changed_keys(self):
+        Enrollment.objects.filter(id='a0').delete()
+        enrollment = Enrollment.objects.get(id='a4')
+        enrollment.status = 'active'
+        enrollment.save()
+        Payment.objects.create(id='p3', user_id='u3', amount=Decimal('5'), type='fee')
+
+        self.assertEqual(ReportingService.refresh(), {'enrollments': 1, 'payments': 1, 'users': 0})
+        self.assertEqual(ReportingService.enrollment_status_counts(course_id='CS101'), {'active': 4, 'waitlisted': 1})
+        self.assertEqual(EnrollmentRollup.objects.get(course_id='BUS101').count, 1)
+        self.assertEqual(ReportingService.refresh(), {'enrollments': 0, 'payments': 0, 'users': 0})
+
+        # Moving a row to another key refreshes both
+        payment = Payment.objects.get(id='p3')
+        payment.type = 'tuition'
+        payment.save()
+        user = User.objects.get(username='student5')
+        user.role = 'faculty'
+        user.save()
+        self.assertEqual(ReportingService.refresh(), {'enrollments': 0, 'payments': 2, 'users': 2})
+        self.assertEqual([(row['type'], row['count']) for row in ReportingService.payments_by_type()],
+                         [('fee', 1), ('tuition', 2)])
+        self.assertEqual(UserRollup.objects.get(role='student').count, 5)
+
+        # Moving a course to another department moves its rollups
+        Course.objects.filter(id='CS101').update(department='Engineering')
+        Course.objects.get(id='CS101').save()
+        ReportingService.refresh()
+        self.assertEqual(ReportingService.enrollment_status_counts(department='Engineering')['active'], 4)
+
+    def test_reports_read_the_source_tables_before_the_first_refresh(self):
+        reports = [(get_enrollment_reports, {'type': report_type}) for report_type in ('waitlist', 'by_department')]
+        reports += [(get_enrollment_reports, {'department': 'CSE'})]
+        reports += [(reporting, {'type': report_type}) for report_type in ('financial_summary', 'user_summary')]
+
+        def read():
+            results = [self.get(view, **params) for view, params in reports]
+            for data in results:
+                data.pop('generated_at', None)
+            return results
+
+        from_rollups = read()
+        for model in (EnrollmentRollup, PaymentRollup, UserRollup):
+            model.objects.all().delete()
+        reporting_engine._built_rollups.clear()
+        self.assertEqual(read(), from_rollups)
+
+    def test_course_detail_counts_match_its_students(self):
+        enrollment = Enrollment.objects.get(id='a4')
+        enrollment.status = 'active'
+        enrollment.save()
+        data = self.get(get_enrollment_reports, type='course_detail', course_id='CS101')
+        self.assertEqual(data['enrollment_stats']['active'], 5)
+        self.assertEqual(len(data['students']), 5)
+
+    def test_report_job_produces_a_csv(self):
+        job = ReportingService.create_job('enrollment_roster', {'department': 'Business'}, requested_by='ADM001')
+        self.assertEqual(job.status, 'pending')
+
+        # Jobs run in a background thread once the transaction commits; run it here
+        job = ReportingService.run_job(job.id)
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.row_count, 1)
+
+        response = self.get(download_report_job, job.id)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = response.content.decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['course_id', 'course_code'])
+        self.assertTrue(lines[1].startswith('BUS101,BUS101,BUS101 name,Business,STU0,Student 0,completed,A,'))
+
+        failed = ReportingService.run_job(ReportingService.create_job('payments_by_type', {'unknown': 1}).id)
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(self.get(download_report_job, failed.id)['success'], False)
+
+        with self.assertRaises(ValueError):
+            ReportingService.create_job('everything')
+
+    def test_lost_jobs_are_recovered(self):
+        old = timezone.now() - timedelta(hours=2)
+        lost = ReportingService.create_job('payments_by_type')
+        recent = ReportingService.create_job('payments_by_type')
+        interrupted = ReportingService.create_job('payments_by_type')
+        ReportJob.objects.filter(id=lost.id).update(created_at=old)
+        ReportJob.objects.filter(id=interrupted.id).update(status='running', created_at=old, started_at=old)
+
+        self.assertEqual(ReportingService.recover_jobs(), {'run': 1, 'failed': 1})
+        statuses = dict(ReportJob.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[job.id] for job in (lost, recent, interrupted)], ['completed', 'pending', 'failed'])
+
+        # A job is only run once
+        self.assertEqual(ReportingService.run_job(lost.id).row_count, 2)
+        self.assertEqual(ReportingService.run_job(interrupted.id).status, 'failed')
@@ -16,6 +16,9 @@ urlpatterns = [
     path('student-management/', views.student_management, name='admin_student_management'),
     path('grade-management/', views.grade_management, name='admin_grade_management'),
     path('reporting/', views.reporting, name='admin_reporting'),
+    path('reporting/jobs/', views.report_jobs, name='admin_report_jobs'),
+    path('reporting/jobs/<str:job_id>/', views.report_job_detail, name='admin_report_job_detail'),
+    path('reporting/jobs/<str:job_id>/download/', views.download_report_job, name='admin_download_report_job'),
     
     # Enrollment management endpoints
     path('enrollment/faculty-assignment/', enrollment_views.assign_faculty_to_course, name='admin_assign_faculty'),
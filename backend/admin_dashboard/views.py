@@ -1,4 +1,4 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from users.models import User, Admin, Faculty, Student
 from courses.models import Course, Enrollment
@@ -10,6 +10,9 @@ from django.db.models import Count, Sum
 from django.utils import timezone
 from datetime import timedelta
 import json
+from dashboard_metrics import get_dashboard_metrics
+from .reporting import REPORT_JOBS, ReportingService
+from .models import ReportJob
 
 def check_admin_role(request):
     """Check if the authenticated user has admin role"""
@@ -32,40 +35,8 @@ def dashboard_overview(request):
         return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
     
     try:
-        # Get system statistics
-        total_users = User.objects.count()
-        total_students = User.objects.filter(role='student').count()
-        total_faculty = User.objects.filter(role='faculty').count()
-        total_admins = User.objects.filter(role='admin').count()
-        
-        # Get active courses
-        active_courses = Course.objects.count()
-        
-        # Get recent payments
-        recent_payments = Payment.objects.filter(
-            created_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        # Get library statistics
-        total_books = LibraryBook.objects.count()
-        borrowed_books = LibraryBook.objects.filter(status='borrowed').count()
-        
-        # Get recent assignments
-        recent_assignments = Assignment.objects.filter(
-            created_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        data = {
-            'totalUsers': total_users,
-            'totalStudents': total_students,
-            'totalFaculty': total_faculty,
-            'totalAdmins': total_admins,
-            'activeCourses': active_courses,
-            'recentPayments': recent_payments,
-            'totalBooks': total_books,
-            'borrowedBooks': borrowed_books,
-            'recentAssignments': recent_assignments,
-        }
+        # All counters come from one statement, cached briefly (see dashboard_metrics)
+        data = get_dashboard_metrics('admin')
     
     except Exception as e:
         return JsonResponse({'success': False, 'message': 'Failed to fetch dashboard data'}, status=500)
@@ -268,7 +239,7 @@ def course_management(request):
     if request.method == 'GET':
         try:
             # Get all courses
-            courses = Course.objects.all()
+            courses = Course.objects.prefetch_related('waitlist_entries')
             courses_data = [course.to_json() for course in courses]
             
             # Get enrollment statistics
@@ -474,26 +445,23 @@ def reporting(request):
             # Get report type from query parameters
             report_type = request.GET.get('type', 'summary')
             
+            # Reports read the rollup tables (see admin_dashboard.reporting)
             if report_type == 'user_summary':
                 # User statistics report
-                total_users = User.objects.count()
-                users_by_role = User.objects.values('role').annotate(count=Count('role'))
-                recent_registrations = User.objects.filter(
-                    created_at__gte=timezone.now() - timedelta(days=30)
-                ).count()
+                users_by_role = ReportingService.users_by_role()
                 
                 data = {
                     'report_type': 'user_summary',
-                    'total_users': total_users,
-                    'users_by_role': list(users_by_role),
-                    'recent_registrations': recent_registrations
+                    'total_users': sum(users_by_role.values()),
+                    'users_by_role': [{'role': role, 'count': count} for role, count in users_by_role.items()],
+                    'recent_registrations': ReportingService.recent_registrations()
                 }
             
             elif report_type == 'course_summary':
                 # Course statistics report
                 total_courses = Course.objects.count()
                 courses_by_department = Course.objects.values('department').annotate(count=Count('department'))
-                total_enrollments = Enrollment.objects.count()
+                total_enrollments = sum(ReportingService.enrollment_status_counts().values())
                 
                 data = {
                     'report_type': 'course_summary',
@@ -504,15 +472,16 @@ def reporting(request):
             
             elif report_type == 'financial_summary':
                 # Financial report
-                total_payments = Payment.objects.count()
-                total_payment_amount = Payment.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-                payments_by_type = Payment.objects.values('type').annotate(count=Count('type'), total=Sum('amount'))
+                payments_by_type = ReportingService.payments_by_type()
                 
                 data = {
                     'report_type': 'financial_summary',
-                    'total_payments': total_payments,
-                    'total_payment_amount': float(total_payment_amount),
-                    'payments_by_type': list(payments_by_type)
+                    'total_payments': sum(row['count'] for row in payments_by_type),
+                    'total_payment_amount': float(sum(row['total'] or 0 for row in payments_by_type)),
+                    'payments_by_type': [
+                        {'type': row['type'], 'count': row['count'], 'total': float(row['total'] or 0)}
+                        for row in payments_by_type
+                    ]
                 }
             
             else:
@@ -521,9 +490,9 @@ def reporting(request):
                     'report_type': 'summary',
                     'generated_at': timezone.now().isoformat(),
                     'summary': {
-                        'total_users': User.objects.count(),
+                        'total_users': sum(ReportingService.users_by_role().values()),
                         'total_courses': Course.objects.count(),
-                        'total_payments': Payment.objects.count(),
+                        'total_payments': sum(row['count'] for row in ReportingService.payments_by_type()),
                         'total_books': LibraryBook.objects.count()
                     }
                 }
@@ -531,4 +500,74 @@ def reporting(request):
             return JsonResponse(data)
         
         except Exception as e:
-            return JsonResponse({'success': False, 'message': f'Failed to generate report: {str(e)}'}, status=500)
\ No newline at end of file
+            return JsonResponse({'success': False, 'message': f'Failed to generate report: {str(e)}'}, status=500)
+
+@csrf_exempt
+def report_jobs(request):
+    """List report jobs or queue a new one"""
+    # Check basic admin role
+    if not check_admin_role(request):
+        return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
+    
+    if request.method == 'GET':
+        jobs = ReportJob.objects.defer('result_csv')[:50]
+        return JsonResponse({
+            'success': True,
+            'report_types': list(REPORT_JOBS),
+            'jobs': [job.to_json() for job in jobs]
+        })
+    
+    elif request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            job = ReportingService.create_job(
+                data.get('report_type'), data.get('parameters', {}), requested_by=request.admin.employee_id
+            )
+            return JsonResponse({'success': True, 'job': job.to_json()}, status=202)
+        
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'Invalid JSON data'}, status=400)
+        except ValueError as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': f'Failed to queue report: {str(e)}'}, status=500)
+    
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def report_job_detail(request, job_id):
+    """Get the status of a report job"""
+    # Check basic admin role
+    if not check_admin_role(request):
+        return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
+    
+    if request.method == 'GET':
+        try:
+            job = ReportJob.objects.defer('result_csv').get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'Report job not found'}, status=404)
+        return JsonResponse({'success': True, 'job': job.to_json()})
+    
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+@csrf_exempt
+def download_report_job(request, job_id):
+    """Download the CSV result of a completed report job"""
+    # Check basic admin role
+    if not check_admin_role(request):
+        return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
+    
+    if request.method == 'GET':
+        try:
+            job = ReportJob.objects.get(id=job_id)
+        except ReportJob.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'Report job not found'}, status=404)
+        
+        if job.status != 'completed':
+            return JsonResponse({'success': False, 'message': f'Report is {job.status}'}, status=409)
+        
+        response = HttpResponse(job.result_csv, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{job.report_type}_{job.id}.csv"'
+        return response
+    
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
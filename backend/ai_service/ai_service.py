@@ -1,7 +1,6 @@
 import jwt
 import os
 import json
-import joblib
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 
@@ -17,12 +16,31 @@ class AIService:
         except:
             self.secret_key = os.environ.get('SECRET_KEY', 'fallback_secret_key')
         
-        # Load trained models
-        try:
-            self.recommendation_model = joblib.load('models/recommendation_model.pkl')
-        except FileNotFoundError:
-            self.recommendation_model = None
-            print("Warning: Recommendation model not found")
+        # Trained models are loaded on first use (see recommendation_model)
+        self._recommendation_model = None
+        self._recommendation_model_loaded = False
+    
+    @property
+    def recommendation_model(self):
+        """
+        The trained recommendation model, loaded on first access
+        
+        Arrays are memory-mapped, not read into memory. Importing NumPy and
+        opening the artifact is deferred so workers that never serve AI
+        requests don't pay for it.
+        
+        Returns:
+            ModelArtifact or None if no model has been trained
+        """
+        if not self._recommendation_model_loaded:
+            try:
+                from .model_store import load_artifact
+                self._recommendation_model = load_artifact('recommendation_model')
+            except (FileNotFoundError, ValueError, ImportError):
+                self._recommendation_model = None
+                print("Warning: Recommendation model not found")
+            self._recommendation_model_loaded = True
+        return self._recommendation_model
         
     def generate_mock_recommendations(self, user_id: str, user_role: str) -> Dict[str, Any]:
         """
@@ -105,36 +123,46 @@ class AIService:
     
     def predict_academic_performance(self, student_id: str, course_id: str) -> Dict[str, Any]:
         """
-        Generate a mock academic performance prediction
+        Predict academic performance of a student in a course
         
         Args:
             student_id (str): The student ID
             course_id (str): The course ID
             
         Returns:
-            Dict[str, Any]: Mock performance prediction
+            Dict[str, Any]: Performance prediction
+        """
+        from .model_server import get_performance_model_server, PREDICTION_FACTORS
+        
+        prediction = get_performance_model_server().predict_batch([(student_id, course_id)])[0]
+        
+        return {
+            "success": True,
+            **prediction,
+            "factors": PREDICTION_FACTORS,
+        }
+    
+    def predict_academic_performance_batch(self, pairs: List[tuple]) -> Dict[str, Any]:
+        """
+        Predict academic performance for many (student, course) pairs at once
+        
+        Args:
+            pairs (List[tuple]): List of (student_id, course_id) tuples
+            
+        Returns:
+            Dict[str, Any]: Predictions in the order of pairs
         """
-        # Simple mock prediction logic
-        import random
-        random.seed(student_id + course_id)
+        from .model_server import get_performance_model_server, PREDICTION_FACTORS
         
-        predicted_grade = random.choice(["A", "B+", "B", "B-", "C+", "C"])
-        confidence = round(random.uniform(0.7, 0.95), 2)
-        risk_level = "Low" if confidence > 0.85 else "Medium" if confidence > 0.75 else "High"
+        server = get_performance_model_server()
+        predictions = server.predict_batch(pairs)
         
         return {
             "success": True,
-            "student_id": student_id,
-            "course_id": course_id,
-            "predicted_grade": predicted_grade,
-            "confidence": confidence,
-            "risk_level": risk_level,
-            "factors": [
-                "Attendance record",
-                "Assignment submission pattern",
-                "Previous course performance",
-                "Engagement level"
-            ],
+            "model_version": server.model_version(),
+            "count": len(predictions),
+            "predictions": predictions,
+            "factors": PREDICTION_FACTORS,
             "generated_at": datetime.now().isoformat()
         }
     
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class AiServiceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_service'
+
+    def ready(self):
+        # The AI dependencies load on first use; workers that serve AI traffic
+        # set AI_WARMUP to load them at startup instead
+        if getattr(settings, 'AI_WARMUP', False):
+            from ai_service.warmup import warm_up
+            warm_up()
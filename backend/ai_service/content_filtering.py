@@ -5,13 +5,11 @@ Content-Based Filtering Module for Digital Campus AI Services
 This module implements content-based filtering for course recommendations.
 """
 
+import threading
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import Dict, List, Any, Tuple
-from .text_processing import text_processor
-from .feature_extraction import feature_extractor
+from .text_processing import get_course_token_store
 
 class ContentBasedRecommender:
     """
@@ -40,21 +38,22 @@ class ContentBasedRecommender:
         """
         course_profiles = {}
         
+        # Combine text fields for content profiling
+        content_texts = {
+            course.get('course_id', ''): f"{course.get('title', '')} {course.get('description', '')} {course.get('department', '')}"
+            for course in course_data
+        }
+        
+        # Preprocess the content text (only courses whose text changed are reprocessed)
+        course_tokens = get_course_token_store().get_tokens(content_texts)
+        
         for course in course_data:
             course_id = course.get('course_id', '')
-            title = course.get('title', '')
-            description = course.get('description', '')
             department = course.get('department', '')
             
-            # Combine text fields for content profiling
-            content_text = f"{title} {description} {department}"
-            
-            # Preprocess the content text
-            processed_text = text_processor.preprocess_text(content_text)
-            
             # Extract features
             features = {
-                'text_content': processed_text,
+                'text_content': ' '.join(course_tokens[course_id]),
                 'credits': course.get('credits', 0),
                 'department': department,
                 'prerequisites_count': len(course.get('prerequisites', []))
@@ -150,6 +149,10 @@ class ContentBasedRecommender:
             course_texts.append(profile['text_content'])
             self.course_ids.append(course_id)
         
+        # scikit-learn is imported here, on first use, because importing it is slow
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         # Create TF-IDF vectors
         self.tfidf_vectorizer = TfidfVectorizer(
             max_features=1000,
@@ -197,6 +200,7 @@ class ContentBasedRecommender:
             return self._get_popular_courses(num_recommendations)
         
         # Compute similarity between student and all courses
+        from sklearn.metrics.pairwise import cosine_similarity
         similarities = cosine_similarity(student_vector, self.course_similarity_matrix)[0]
         
         # Create list of (course_id, similarity) tuples
@@ -299,8 +303,27 @@ class ContentBasedRecommender:
         
         return similar_courses
 
-# Global instance of ContentBasedRecommender
-content_recommender = ContentBasedRecommender()
+# Global instance of ContentBasedRecommender, created on first use
+_content_recommender = None
+_instance_lock = threading.Lock()
+
+def get_content_recommender() -> ContentBasedRecommender:
+    """
+    Return the shared ContentBasedRecommender, creating it on first use.
+    """
+    global _content_recommender
+    if _content_recommender is None:
+        with _instance_lock:
+            if _content_recommender is None:
+                _content_recommender = ContentBasedRecommender()
+    return _content_recommender
+
+def __getattr__(name):
+    # Keeps `from .content_filtering import content_recommender` working without
+    # creating the instance when the module is imported
+    if name == 'content_recommender':
+        return get_content_recommender()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def generate_content_based_recommendations(student_id: str, 
                                          course_data: List[Dict[str, Any]],
@@ -318,16 +341,18 @@ def generate_content_based_recommendations(student_id: str,
     Returns:
         List of recommended courses
     """
+    recommender = get_content_recommender()
+    
     # Build course profiles
-    content_recommender.build_course_profiles(course_data)
+    recommender.build_course_profiles(course_data)
     
     # Build student profiles
     # For simplicity, we'll create a minimal student dataset
     student_data = [{'student_id': student_id}]
-    content_recommender.build_student_profiles(student_data, enrollment_data)
+    recommender.build_student_profiles(student_data, enrollment_data)
     
     # Get recommendations
-    recommendations = content_recommender.get_course_recommendations(
+    recommendations = recommender.get_course_recommendations(
         student_id, num_recommendations
     )
     
@@ -393,7 +418,7 @@ if __name__ == "__main__":
         print(f"- {rec['course_id']}: {rec['similarity_score']:.3f} ({rec['match_reason']})")
     
     # Get similar courses to CS101
-    similar_courses = content_recommender.get_similar_courses('CS101', 2)
+    similar_courses = get_content_recommender().get_similar_courses('CS101', 2)
     print("\nCourses similar to CS101:")
     for course in similar_courses:
         print(f"- {course['course_id']}: {course['similarity_score']:.3f}")
\ No newline at end of file
@@ -5,28 +5,23 @@ Feature Extraction Module for Digital Campus AI Services
 This module implements feature extraction from course and student data for AI models.
 """
 
-import re
-import nltk
+import threading
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Tuple
-from collections import Counter
-
-# Download required NLTK data (would be run once during setup)
-# nltk.download('punkt')
-# nltk.download('stopwords')
-# nltk.download('wordnet')
-
-try:
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    from nltk.stem import WordNetLemmatizer
-    STOPWORDS = set(stopwords.words('english'))
-    LEMMATIZER = WordNetLemmatizer()
-except LookupError:
-    # If NLTK data is not available, use basic preprocessing
-    STOPWORDS = set(['the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'])
-    LEMMATIZER = None
+from .text_processing import get_text_processor
+from .feature_store import (
+    COURSE_NUMERIC_COLUMNS,
+    STUDENT_NUMERIC_COLUMNS,
+    NUM_KEYWORDS,
+    CourseFeatureTable,
+    StudentFeatureTable,
+    FeatureStore,
+    build_course_table,
+    build_student_table,
+    compatibility_matrix,
+    credit_match_matrix,
+)
 
 class FeatureExtractor:
     """
@@ -37,78 +32,61 @@ class FeatureExtractor:
         """
         Initialize the Feature Extractor.
         """
-        self.course_features_cache = {}
-        self.student_features_cache = {}
+        # Vocabularies are kept across calls so category codes stay stable
+        self.department_vocabulary = {}
+        self.keyword_vocabulary = {}
+        self.course_table = None
+        self.student_table = None
     
-    def extract_course_features(self, course_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    def build_course_table(self, course_data: List[Dict[str, Any]]) -> CourseFeatureTable:
         """
-        Extract features from course data.
+        Extract columnar features from course data.
         
         Args:
             course_data: List of dictionaries containing course information
             
         Returns:
-            DataFrame with extracted course features
+            CourseFeatureTable with extracted course features
         """
-        features = []
+        # Process text features for all courses in one batch
+        keyword_lists = self._extract_keywords_batch(
+            [course.get('title', '') for course in course_data] +
+            [course.get('description', '') for course in course_data]
+        )
+        self.course_table = build_course_table(
+            course_data,
+            (keyword_lists[:len(course_data)], keyword_lists[len(course_data):]),
+            departments=self.department_vocabulary,
+            keywords=self.keyword_vocabulary,
+        )
+        return self.course_table
+    
+    def build_student_table(self, enrollment_data: List[Dict[str, Any]],
+                            performance_data: List[Dict[str, Any]]) -> StudentFeatureTable:
+        """
+        Extract columnar features from student data.
         
-        for course in course_data:
-            course_id = course.get('course_id', '')
-            
-            # Check cache first
-            if course_id in self.course_features_cache:
-                features.append(self.course_features_cache[course_id])
-                continue
-            
-            # Extract numerical features
-            credits = float(course.get('credits', 0))
-            department = course.get('department', '')
-            prerequisites_count = len(course.get('prerequisites', []))
-            
-            # Extract text features
-            title = course.get('title', '')
-            description = course.get('description', '')
-            
-            # Process text features
-            title_keywords = self._extract_keywords(title)
-            desc_keywords = self._extract_keywords(description)
-            
-            # Combine all features
-            course_features = {
-                'course_id': course_id,
-                'credits': credits,
-                'department_' + department: 1,  # One-hot encoding for department
-                'prerequisites_count': prerequisites_count,
-                'title_length': len(title),
-                'description_length': len(description),
-                'title_keywords_count': len(title_keywords),
-                'desc_keywords_count': len(desc_keywords),
-                'common_keywords': len(set(title_keywords) & set(desc_keywords)),
-            }
-            
-            # Add keyword features (top 20 most common)
-            all_keywords = title_keywords + desc_keywords
-            keyword_freq = Counter(all_keywords)
-            top_keywords = keyword_freq.most_common(20)
-            
-            for i, (keyword, freq) in enumerate(top_keywords):
-                course_features[f'keyword_{i}'] = keyword
-                course_features[f'keyword_{i}_freq'] = freq
+        Args:
+            enrollment_data: List of dictionaries containing enrollment information
+            performance_data: List of dictionaries containing performance information
             
-            # Cache the features
-            self.course_features_cache[course_id] = course_features
-            features.append(course_features)
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(features)
-        
-        # Handle one-hot encoding for departments
-        dept_columns = [col for col in df.columns if col.startswith('department_')]
-        if dept_columns:
-            # Fill NaN values with 0
-            df[dept_columns] = df[dept_columns].fillna(0)
+        Returns:
+            StudentFeatureTable with extracted student features
+        """
+        self.student_table = build_student_table(enrollment_data, performance_data)
+        return self.student_table
+    
+    def extract_course_features(self, course_data: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Extract features from course data.
         
-        return df
+        Args:
+            course_data: List of dictionaries containing course information
+            
+        Returns:
+            DataFrame with extracted course features
+        """
+        return self.build_course_table(course_data).to_frame()
     
     def extract_student_features(self, enrollment_data: List[Dict[str, Any]], 
                                performance_data: List[Dict[str, Any]]) -> pd.DataFrame:
@@ -122,62 +100,7 @@ class FeatureExtractor:
         Returns:
             DataFrame with extracted student features
         """
-        # Convert to DataFrames for easier processing
-        enrollments_df = pd.DataFrame(enrollment_data)
-        performance_df = pd.DataFrame(performance_data)
-        
-        # Group by student_id to calculate aggregate features
-        student_features = []
-        
-        for student_id in set(enrollments_df['student_id']):
-            # Check cache first
-            if student_id in self.student_features_cache:
-                student_features.append(self.student_features_cache[student_id])
-                continue
-            
-            # Filter data for this student
-            student_enrollments = enrollments_df[enrollments_df['student_id'] == student_id]
-            student_performance = performance_df[performance_df['student_id'] == student_id]
-            
-            # Calculate enrollment features
-            total_credits = student_enrollments['credits'].sum()
-            courses_count = len(student_enrollments)
-            departments = student_enrollments['course_id'].apply(
-                lambda x: x[:2] if len(x) >= 2 else x  # Simple department extraction
-            ).tolist()
-            dept_diversity = len(set(departments))
-            
-            # Calculate performance features
-            avg_grade_points = student_performance['grade_points'].mean() if not student_performance.empty else 0
-            avg_assignment_score = student_performance['avg_assignment_score'].mean() if 'avg_assignment_score' in student_performance.columns and not student_performance.empty else 0
-            avg_exam_score = student_performance['avg_exam_score'].mean() if 'avg_exam_score' in student_performance.columns and not student_performance.empty else 0
-            attendance_rate = student_performance['attendance_rate'].mean() if not student_performance.empty else 0
-            
-            # Calculate trend features (improvement/decline)
-            if len(student_performance) > 1:
-                grade_points = student_performance['grade_points'].tolist()
-                grade_trend = np.polyfit(range(len(grade_points)), grade_points, 1)[0] if len(grade_points) > 1 else 0
-            else:
-                grade_trend = 0
-            
-            # Compile features
-            features = {
-                'student_id': student_id,
-                'total_credits': total_credits,
-                'courses_count': courses_count,
-                'dept_diversity': dept_diversity,
-                'avg_grade_points': avg_grade_points,
-                'avg_assignment_score': avg_assignment_score,
-                'avg_exam_score': avg_exam_score,
-                'attendance_rate': attendance_rate,
-                'grade_trend': grade_trend,
-            }
-            
-            # Cache the features
-            self.student_features_cache[student_id] = features
-            student_features.append(features)
-        
-        return pd.DataFrame(student_features)
+        return self.build_student_table(enrollment_data, performance_data).to_frame()
     
     def _extract_keywords(self, text: str) -> List[str]:
         """
@@ -189,32 +112,25 @@ class FeatureExtractor:
         Returns:
             List of extracted keywords
         """
-        if not text:
-            return []
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove punctuation and special characters
-        text = re.sub(r'[^a-zA-Z0-9\s]', '', text)
-        
-        # Tokenize
-        if 'word_tokenize' in globals():
-            tokens = word_tokenize(text)
-        else:
-            tokens = text.split()
+        return self._extract_keywords_batch([text])[0]
+    
+    def _extract_keywords_batch(self, texts: List[str]) -> List[List[str]]:
+        """
+        Extract keywords from many texts at once.
         
-        # Remove stopwords
-        tokens = [token for token in tokens if token not in STOPWORDS]
+        Uses the shared TextProcessor pipeline (cleaning, stopword removal and
+        lemmatization), so texts seen before are served from its token cache.
         
-        # Lemmatize if available
-        if LEMMATIZER:
-            tokens = [LEMMATIZER.lemmatize(token) for token in tokens]
+        Args:
+            texts: List of input texts
+            
+        Returns:
+            List of keyword lists, one per input text
+        """
+        token_lists = get_text_processor().preprocess_batch(texts, remove_stopwords=True, stem=False, lemmatize=True)
         
         # Filter out short tokens
-        tokens = [token for token in tokens if len(token) > 2]
-        
-        return tokens
+        return [[token for token in tokens if len(token) > 2] for tokens in token_lists]
     
     def extract_text_features(self, texts: List[str], max_features: int = 100) -> Tuple[np.ndarray, List[str]]:
         """
@@ -258,51 +174,58 @@ class FeatureExtractor:
         Returns:
             DataFrame with interaction features
         """
-        interaction_features = []
+        students = StudentFeatureTable(
+            student_features['student_id'].to_numpy(),
+            student_features.reindex(columns=STUDENT_NUMERIC_COLUMNS, fill_value=0).to_numpy(dtype=np.float32),
+        )
+        courses = self.course_table_from_frame(course_features)
         
-        for _, student in student_features.iterrows():
-            for _, course in course_features.iterrows():
-                # Calculate compatibility score based on features
-                compatibility_score = self._calculate_compatibility(student, course)
-                
-                # Create interaction feature record
-                interaction = {
-                    'student_id': student['student_id'],
-                    'course_id': course['course_id'],
-                    'compatibility_score': compatibility_score,
-                    'credit_match': abs(student.get('total_credits', 0) - course.get('credits', 0)) < 2,
-                }
-                
-                interaction_features.append(interaction)
+        compatibility = compatibility_matrix(students, courses)
+        credit_match = credit_match_matrix(students, courses)
         
-        return pd.DataFrame(interaction_features)
+        # One row per (student, course) pair, students outermost
+        return pd.DataFrame({
+            'student_id': np.repeat(np.asarray(students.student_ids), len(courses)),
+            'course_id': np.tile(np.asarray(courses.course_ids), len(students)),
+            'compatibility_score': compatibility.ravel(),
+            'credit_match': credit_match.ravel(),
+        })
     
-    def _calculate_compatibility(self, student: pd.Series, course: pd.Series) -> float:
+    def course_table_from_frame(self, course_features: pd.DataFrame) -> CourseFeatureTable:
         """
-        Calculate compatibility score between student and course.
-        
-        Args:
-            student: Series with student features
-            course: Series with course features
-            
-        Returns:
-            Compatibility score between 0 and 1
+        Wrap a course feature DataFrame as a CourseFeatureTable (numeric columns only).
         """
-        # Simple heuristic: higher grade trends match with more challenging courses
-        grade_trend = student.get('grade_trend', 0)
-        credits = course.get('credits', 0)
-        
-        # Normalize credits to 0-1 range (assuming max 5 credits)
-        normalized_credits = min(credits / 5.0, 1.0)
-        
-        # Calculate compatibility (simple formula)
-        compatibility = 0.5 + 0.3 * grade_trend + 0.2 * normalized_credits
-        
-        # Ensure compatibility is between 0 and 1
-        return max(0, min(1, compatibility))
+        return CourseFeatureTable(
+            course_ids=course_features['course_id'].to_numpy(),
+            numeric=course_features.reindex(columns=COURSE_NUMERIC_COLUMNS, fill_value=0).to_numpy(dtype=np.float32),
+            department_codes=np.zeros(len(course_features), dtype=np.int32),
+            departments=np.array([], dtype=str),
+            keyword_codes=np.full((len(course_features), NUM_KEYWORDS), -1, dtype=np.int32),
+            keyword_freqs=np.zeros((len(course_features), NUM_KEYWORDS), dtype=np.int32),
+            keywords=np.array([], dtype=str),
+        )
+
+# Global instance of FeatureExtractor, created on first use
+_feature_extractor = None
+_instance_lock = threading.Lock()
+
+def get_feature_extractor() -> FeatureExtractor:
+    """
+    Return the shared FeatureExtractor, creating it on first use.
+    """
+    global _feature_extractor
+    if _feature_extractor is None:
+        with _instance_lock:
+            if _feature_extractor is None:
+                _feature_extractor = FeatureExtractor()
+    return _feature_extractor
 
-# Global instance of FeatureExtractor
-feature_extractor = FeatureExtractor()
+def __getattr__(name):
+    # Keeps `from .feature_extraction import feature_extractor` working without
+    # creating the instance when the module is imported
+    if name == 'feature_extractor':
+        return get_feature_extractor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def extract_all_features(enrollment_data: List[Dict[str, Any]], 
                         course_data: List[Dict[str, Any]],
@@ -318,14 +241,16 @@ def extract_all_features(enrollment_data: List[Dict[str, Any]],
     Returns:
         Dictionary containing all extracted features
     """
+    extractor = get_feature_extractor()
+    
     # Extract course features
-    course_features = feature_extractor.extract_course_features(course_data)
+    course_features = extractor.extract_course_features(course_data)
     
     # Extract student features
-    student_features = feature_extractor.extract_student_features(enrollment_data, performance_data)
+    student_features = extractor.extract_student_features(enrollment_data, performance_data)
     
     # Create interaction features
-    interaction_features = feature_extractor.create_interaction_features(student_features, course_features)
+    interaction_features = extractor.create_interaction_features(student_features, course_features)
     
     return {
         'course_features': course_features,
@@ -333,6 +258,28 @@ def extract_all_features(enrollment_data: List[Dict[str, Any]],
         'interaction_features': interaction_features
     }
 
+def build_feature_store(enrollment_data: List[Dict[str, Any]], 
+                        course_data: List[Dict[str, Any]],
+                        performance_data: List[Dict[str, Any]]) -> FeatureStore:
+    """
+    Build a feature store from the provided data.
+    
+    Call save() on the result to persist it for serving.
+    
+    Args:
+        enrollment_data: List of enrollment records
+        course_data: List of course records
+        performance_data: List of performance records
+        
+    Returns:
+        FeatureStore with course and student feature tables
+    """
+    extractor = get_feature_extractor()
+    return FeatureStore(
+        courses=extractor.build_course_table(course_data),
+        students=extractor.build_student_table(enrollment_data, performance_data),
+    )
+
 if __name__ == "__main__":
     # Example usage
     sample_courses = [
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from ai_service.warmup import warm_up
+
+class Command(BaseCommand):
+    help = 'Import the AI dependencies and load the trained models, reporting the time each step takes'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Warming up AI services...')
+        timings = warm_up()
+        for name, seconds in timings.items():
+            self.stdout.write(f'  {name}: {seconds:.2f}s')
+        self.stdout.write(
+            self.style.SUCCESS(f'AI services warmed up in {sum(timings.values()):.2f}s')
+        )
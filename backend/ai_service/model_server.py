@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Model Server for Digital Campus AI Services
+
+This module serves the trained performance prediction model. The model is loaded
+once per worker process on first use (memory-mapped from the model store) and
+scores any number of (student, course) pairs in one vectorized call. Features for
+a batch come from a single grouped query, and predictions are cached per model
+version so retraining invalidates them automatically.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .model_store import load_artifact
+from .performance_model import (
+    DEFAULT_WEIGHTS,
+    build_feature_matrix,
+    confidences,
+    letter_grades,
+    predict_grade_points,
+    risk_levels,
+)
+
+PERFORMANCE_MODEL_NAME = 'performance_model'
+
+# Version reported when no trained model is available
+DEFAULT_MODEL_VERSION = 'default'
+
+# Largest number of pairs accepted in one batch
+MAX_BATCH_SIZE = 5000
+
+PREDICTION_CACHE_TIMEOUT = 1800  # 30 minutes
+
+PREDICTION_FACTORS = [
+    "Current course performance",
+    "Overall academic record",
+    "Course difficulty",
+]
+
+
+class PerformanceModelServer:
+    """
+    Lazily loaded, batched server for the performance prediction model.
+    """
+
+    def __init__(self, base_dir: Optional[str] = None):
+        """
+        Initialize the Performance Model Server.
+
+        Args:
+            base_dir: Root models directory (defaults to ai_service/models)
+        """
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.weights = DEFAULT_WEIGHTS
+        self.version = DEFAULT_MODEL_VERSION
+        self.residual_std = None
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                artifact = load_artifact(PERFORMANCE_MODEL_NAME, base_dir=self.base_dir, mmap=True)
+                self.weights = artifact['weights']
+                self.version = artifact.version
+                self.residual_std = artifact.metadata.get('residual_std')
+            except (FileNotFoundError, ValueError):
+                self.weights = DEFAULT_WEIGHTS
+                self.version = DEFAULT_MODEL_VERSION
+                self.residual_std = None
+            self._loaded = True
+
+    def reload(self):
+        """
+        Drop the loaded model so the latest version is picked up on next use.
+        """
+        with self._lock:
+            self._loaded = False
+
+    def model_version(self) -> str:
+        self._ensure_loaded()
+        return self.version
+
+    def fetch_features(self, pairs: List[Tuple[str, str]]) -> Dict[str, np.ndarray]:
+        """
+        Fetch model inputs for a batch of (student_id, course_id) pairs with one query.
+
+        The query groups every grade of the requested students or courses by
+        (student, course). Per-pair, per-student and per-course aggregates are then
+        derived from those rows in memory.
+
+        Returns:
+            Dictionary of arrays aligned with pairs: course_percentage,
+            student_percentage, course_mean_percentage and graded_items
+        """
+        import pandas as pd
+        from assignments.models import Grade
+
+        student_ids = sorted({student_id for student_id, _ in pairs})
+        course_ids = sorted({course_id for _, course_id in pairs})
+
+        rows = list(
+            Grade.objects
+            .filter(Q(student_id__in=student_ids) | Q(course_id__in=course_ids))
+            .values('student_id', 'course_id')
+            .annotate(earned=Sum('value'), possible=Sum('max_points'), items=Count('id'))
+        )
+        df = pd.DataFrame(rows, columns=['student_id', 'course_id', 'earned', 'possible', 'items'])
+        df['earned'] = df['earned'].astype(float)
+        df['possible'] = df['possible'].astype(float)
+
+        def percentage(grouped):
+            totals = grouped[['earned', 'possible']].sum()
+            return 100 * totals['earned'] / totals['possible'].where(totals['possible'] > 0)
+
+        by_pair = df.set_index(['student_id', 'course_id'])
+        pair_index = pd.MultiIndex.from_tuples(pairs, names=['student_id', 'course_id'])
+        pair_rows = by_pair.reindex(pair_index)
+
+        student_percentage = percentage(df[df['student_id'].isin(student_ids)].groupby('student_id'))
+        course_mean = percentage(df[df['course_id'].isin(course_ids)].groupby('course_id'))
+
+        pair_students = [student_id for student_id, _ in pairs]
+        pair_courses = [course_id for _, course_id in pairs]
+        possible = pair_rows['possible'].to_numpy(dtype=float)
+
+        return {
+            'course_percentage': np.where(
+                possible > 0,
+                100 * pair_rows['earned'].to_numpy(dtype=float) / np.where(possible > 0, possible, 1),
+                np.nan,
+            ),
+            'student_percentage': student_percentage.reindex(pair_students).to_numpy(dtype=float),
+            'course_mean_percentage': course_mean.reindex(pair_courses).to_numpy(dtype=float),
+            'graded_items': pair_rows['items'].fillna(0).to_numpy(dtype=float),
+        }
+
+    def score(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Score a batch of feature arrays in one vectorized call.
+        """
+        self._ensure_loaded()
+        X = build_feature_matrix(features['course_percentage'],
+                                 features['student_percentage'],
+                                 features['course_mean_percentage'])
+        grade_points = predict_grade_points(X, self.weights)
+        return {
+            'grade_points': grade_points,
+            'letter_grades': letter_grades(grade_points),
+            'risk_levels': risk_levels(grade_points),
+            'confidences': confidences(features['graded_items'], self.residual_std),
+        }
+
+    def predict_batch(self, pairs: List[Tuple[str, str]], use_cache: bool = True) -> List[Dict[str, Any]]:
+        """
+        Predict performance for a batch of (student_id, course_id) pairs.
+
+        Args:
+            pairs: List of (student_id, course_id) tuples
+            use_cache: Serve and store predictions in the cache
+
+        Returns:
+            List of prediction dictionaries, in the order of pairs
+        """
+        if len(pairs) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} pairs can be scored per batch")
+
+        pairs = [(str(student_id), str(course_id)) for student_id, course_id in pairs]
+        version = self.model_version()
+        keys = [f"performance_{version}_{student_id}_{course_id}" for student_id, course_id in pairs]
+
+        cached = cache.get_many(keys) if use_cache else {}
+        missing = [(key, pair) for key, pair in zip(keys, pairs) if key not in cached]
+
+        if missing:
+            missing_pairs = list(dict.fromkeys(pair for _, pair in missing))
+            scores = self.score(self.fetch_features(missing_pairs))
+            generated_at = datetime.now().isoformat()
+
+            computed = {}
+            for i, (student_id, course_id) in enumerate(missing_pairs):
+                computed[f"performance_{version}_{student_id}_{course_id}"] = {
+                    'student_id': student_id,
+                    'course_id': course_id,
+                    'predicted_grade': str(scores['letter_grades'][i]),
+                    'predicted_grade_points': round(float(scores['grade_points'][i]), 2),
+                    'confidence': float(scores['confidences'][i]),
+                    'risk_level': str(scores['risk_levels'][i]),
+                    'model_version': version,
+                    'generated_at': generated_at,
+                }
+            if use_cache:
+                cache.set_many(computed, timeout=PREDICTION_CACHE_TIMEOUT)
+            cached.update(computed)
+
+        return [cached[key] for key in keys]
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_performance_model_server() -> PerformanceModelServer:
+    """
+    Return this worker's PerformanceModelServer, creating it on first use.
+    """
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = PerformanceModelServer()
+    return _server
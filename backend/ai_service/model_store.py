@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Model Artifact Store for Digital Campus AI Services
+
+This module saves and loads versioned model artifacts as plain NumPy arrays so that
+serving processes can memory-map them instead of unpickling large objects.
+
+Layout on disk:
+
+    models/<model_name>/<version>/manifest.json
+    models/<model_name>/<version>/<array_name>.npy
+    models/<model_name>/LATEST            (name of the current version)
+"""
+
+import os
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List
+
+import numpy as np
+
+# Bump when the on-disk layout changes in a backwards incompatible way
+ARTIFACT_FORMAT_VERSION = 1
+
+DEFAULT_MODELS_DIR = os.path.join(os.path.dirname(__file__), 'models')
+
+
+class ModelArtifact:
+    """
+    A loaded model artifact: a manifest plus a set of (possibly memory-mapped) arrays.
+    """
+
+    def __init__(self, model_name: str, version: str, manifest: Dict[str, Any],
+                 arrays: Dict[str, np.ndarray]):
+        self.model_name = model_name
+        self.version = version
+        self.manifest = manifest
+        self.arrays = arrays
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.manifest.get('metadata', {})
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.arrays[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.arrays
+
+    def __repr__(self):
+        return f"ModelArtifact({self.model_name!r}, version={self.version!r})"
+
+
+def _model_dir(model_name: str, base_dir: Optional[str] = None) -> str:
+    return os.path.join(base_dir or DEFAULT_MODELS_DIR, model_name)
+
+
+def new_version() -> str:
+    """
+    Generate a sortable version identifier based on the current UTC time.
+    """
+    return datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%fZ')
+
+
+def save_artifact(model_name: str,
+                  arrays: Dict[str, np.ndarray],
+                  metadata: Optional[Dict[str, Any]] = None,
+                  base_dir: Optional[str] = None,
+                  version: Optional[str] = None) -> str:
+    """
+    Save a model artifact as a new version and mark it as the latest one.
+
+    Args:
+        model_name: Name of the model (used as directory name)
+        arrays: Mapping of array name to NumPy array. Object arrays are rejected
+            because they cannot be memory-mapped.
+        metadata: JSON-serializable metadata stored in the manifest
+        base_dir: Root models directory (defaults to ai_service/models)
+        version: Explicit version identifier (defaults to a timestamp)
+
+    Returns:
+        The version identifier of the saved artifact
+    """
+    version = version or new_version()
+    model_dir = _model_dir(model_name, base_dir)
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    array_info = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype == object:
+            raise ValueError(f"Array '{name}' has dtype=object and cannot be memory-mapped")
+        np.save(os.path.join(version_dir, f'{name}.npy'), array, allow_pickle=False)
+        array_info[name] = {'dtype': array.dtype.str, 'shape': list(array.shape)}
+
+    manifest = {
+        'format_version': ARTIFACT_FORMAT_VERSION,
+        'model_name': model_name,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'arrays': array_info,
+        'metadata': metadata or {},
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    # Write the pointer last and atomically so readers never see a half-written version
+    latest_path = os.path.join(model_dir, 'LATEST')
+    tmp_path = latest_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, latest_path)
+
+    return version
+
+
+def latest_version(model_name: str, base_dir: Optional[str] = None) -> Optional[str]:
+    """
+    Return the latest saved version of a model, or None if it has never been saved.
+    """
+    latest_path = os.path.join(_model_dir(model_name, base_dir), 'LATEST')
+    try:
+        with open(latest_path, 'r') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(model_name: str, base_dir: Optional[str] = None) -> List[str]:
+    """
+    List all saved versions of a model, oldest first.
+    """
+    model_dir = _model_dir(model_name, base_dir)
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(model_dir)
+        if os.path.isfile(os.path.join(model_dir, name, 'manifest.json'))
+    )
+
+
+def load_artifact(model_name: str,
+                  version: Optional[str] = None,
+                  base_dir: Optional[str] = None,
+                  mmap: bool = True) -> ModelArtifact:
+    """
+    Load a model artifact.
+
+    Args:
+        model_name: Name of the model
+        version: Version to load (defaults to the latest one)
+        base_dir: Root models directory (defaults to ai_service/models)
+        mmap: Memory-map the arrays read-only instead of reading them into memory
+
+    Returns:
+        The loaded ModelArtifact
+
+    Raises:
+        FileNotFoundError: If the model or version does not exist
+        ValueError: If the artifact was written with an unsupported format version
+    """
+    version = version or latest_version(model_name, base_dir)
+    if not version:
+        raise FileNotFoundError(f"No saved versions of model '{model_name}'")
+
+    version_dir = os.path.join(_model_dir(model_name, base_dir), version)
+    with open(os.path.join(version_dir, 'manifest.json'), 'r') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported artifact format {manifest.get('format_version')} "
+            f"for model '{model_name}' version {version}"
+        )
+
+    arrays = {}
+    for name in manifest.get('arrays', {}):
+        arrays[name] = np.load(
+            os.path.join(version_dir, f'{name}.npy'),
+            mmap_mode='r' if mmap else None,
+            allow_pickle=False,
+        )
+
+    return ModelArtifact(model_name, version, manifest, arrays)
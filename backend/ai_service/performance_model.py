@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Performance Prediction Model for Digital Campus AI Services
+
+This module defines the features, fitting and scoring of the academic performance
+model. It only depends on NumPy so the trainer and the model server share exactly
+the same feature definitions.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+# Feature columns, in order. A bias column is prepended by build_feature_matrix.
+PERFORMANCE_FEATURES = [
+    'course_percentage',       # student's percentage in the course so far
+    'student_percentage',      # student's percentage across all courses
+    'course_mean_percentage',  # mean percentage of all students in the course
+]
+
+# Used when no course or student history exists at all
+POPULATION_MEAN_PERCENTAGE = 75.0
+
+# Weights used until a model has been trained: 100% maps to a 4.0 grade point,
+# with the course percentage counting more than the student's overall record
+DEFAULT_WEIGHTS = np.array([0.0, 0.028, 0.012, 0.0])
+
+# Lower bounds (grade points) of each predicted letter grade, ascending
+GRADE_POINT_THRESHOLDS = np.array([1.0, 1.85, 2.15, 2.5, 2.85, 3.15, 3.5, 3.85])
+LETTER_GRADES = np.array(['F', 'D', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A'])
+
+# Predicted grade points below these bounds are High / Medium risk
+HIGH_RISK_BELOW = 2.0
+MEDIUM_RISK_BELOW = 2.7
+
+
+def build_feature_matrix(course_percentage: np.ndarray,
+                         student_percentage: np.ndarray,
+                         course_mean_percentage: np.ndarray) -> np.ndarray:
+    """
+    Build the (n, 1 + len(PERFORMANCE_FEATURES)) design matrix.
+
+    Missing values fall back from the most specific signal to the least specific
+    one: course percentage -> student percentage -> course mean -> population mean.
+    """
+    course_mean = np.where(np.isnan(course_mean_percentage), POPULATION_MEAN_PERCENTAGE,
+                           course_mean_percentage)
+    student = np.where(np.isnan(student_percentage), course_mean, student_percentage)
+    course = np.where(np.isnan(course_percentage), student, course_percentage)
+    return np.column_stack([np.ones(len(course)), course, student, course_mean])
+
+
+def fit_weights(X: np.ndarray, y: np.ndarray, alpha: float = 1.0) -> np.ndarray:
+    """
+    Fit ridge regression weights in closed form (the bias is not regularized).
+    """
+    penalty = alpha * np.eye(X.shape[1])
+    penalty[0, 0] = 0.0
+    return np.linalg.solve(X.T @ X + penalty, X.T @ y)
+
+
+def predict_grade_points(X: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    return np.clip(X @ np.asarray(weights), 0.0, 4.0)
+
+
+def letter_grades(grade_points: np.ndarray) -> np.ndarray:
+    return LETTER_GRADES[np.searchsorted(GRADE_POINT_THRESHOLDS, grade_points, side='right')]
+
+
+def risk_levels(grade_points: np.ndarray) -> np.ndarray:
+    return np.where(grade_points < HIGH_RISK_BELOW, 'High',
+                    np.where(grade_points < MEDIUM_RISK_BELOW, 'Medium', 'Low'))
+
+
+def confidences(graded_items: np.ndarray, residual_std: Optional[float] = None) -> np.ndarray:
+    """
+    Confidence grows with the number of graded items already in the course and
+    shrinks with the model's residual error.
+    """
+    confidence = 0.5 + 0.45 * (1 - np.exp(-np.asarray(graded_items, dtype=float) / 5.0))
+    if residual_std:
+        confidence = confidence * (1 - min(residual_std / 4.0, 0.5))
+    return np.round(confidence, 2)
+
+
+def training_matrix(performance_data: List[dict]):
+    """
+    Build the design matrix and targets from performance records.
+
+    Each record's course percentage is the mean of its assignment and exam
+    scores; student and course percentages are means over the student's and
+    the course's records.
+
+    Returns:
+        Tuple of (X, y) for records that have grade points
+    """
+    import pandas as pd
+
+    df = pd.DataFrame(performance_data, columns=['student_id', 'course_id', 'grade_points',
+                                                 'avg_assignment_score', 'avg_exam_score'])
+    for column in ['grade_points', 'avg_assignment_score', 'avg_exam_score']:
+        df[column] = pd.to_numeric(df[column], errors='coerce')
+    df = df[df['grade_points'].notna()]
+
+    course_percentage = df[['avg_assignment_score', 'avg_exam_score']].mean(axis=1)
+    student_percentage = course_percentage.groupby(df['student_id']).transform('mean')
+    course_mean_percentage = course_percentage.groupby(df['course_id']).transform('mean')
+
+    X = build_feature_matrix(course_percentage.to_numpy(dtype=float),
+                             student_percentage.to_numpy(dtype=float),
+                             course_mean_percentage.to_numpy(dtype=float))
+    return X, df['grade_points'].to_numpy(dtype=float)
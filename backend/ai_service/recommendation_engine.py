@@ -5,12 +5,12 @@ Recommendation Engine for Digital Campus AI Services
 This module implements a hybrid recommendation engine combining multiple approaches.
 """
 
+import threading
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
-from .content_filtering import content_recommender
-from .feature_extraction import feature_extractor
+from .content_filtering import get_content_recommender
 
 class RecommendationEngine:
     """
@@ -29,6 +29,31 @@ class RecommendationEngine:
         }
         self.user_feedback = {}  # Store user feedback for reinforcement learning
         self.recommendation_history = {}  # Track recommendation history
+        
+        # The saved feature store is loaded on first use (see feature_store)
+        self._feature_store = None
+        self._feature_store_loaded = False
+    
+    @property
+    def feature_store(self):
+        """
+        The latest saved feature store, loaded on first access
+        
+        Its arrays are memory-mapped, so serving reads the features written
+        by training instead of recomputing them.
+        
+        Returns:
+            FeatureStore or None if none has been saved
+        """
+        if not self._feature_store_loaded:
+            try:
+                from .feature_store import FeatureStore
+                self._feature_store = FeatureStore.load()
+            except (FileNotFoundError, ValueError):
+                self._feature_store = None
+                print("Warning: Feature store not found")
+            self._feature_store_loaded = True
+        return self._feature_store
     
     def set_weights(self, weights: Dict[str, float]):
         """
@@ -131,6 +156,8 @@ class RecommendationEngine:
             List of content-based recommendations
         """
         try:
+            content_recommender = get_content_recommender()
+            
             # Build course profiles
             content_recommender.build_course_profiles(course_data)
             
@@ -227,23 +254,27 @@ class RecommendationEngine:
             List of popularity-based recommendations
         """
         # Simple popularity measure: courses with more prerequisites or higher credits
-        course_popularity = []
-        
-        for course in course_data:
-            course_id = course.get('course_id', '')
-            prerequisites_count = len(course.get('prerequisites', []))
-            credits = course.get('credits', 0)
-            
-            # Popularity score based on prerequisites and credits
-            popularity_score = prerequisites_count * 0.7 + credits * 0.3
-            course_popularity.append((course_id, popularity_score))
-        
-        # Sort by popularity
-        course_popularity.sort(key=lambda x: x[1], reverse=True)
+        course_ids = [course.get('course_id', '') for course in course_data]
+        prerequisites_count = np.array([len(course.get('prerequisites', []) or []) for course in course_data],
+                                       dtype=np.float32)
+        credits = np.array([float(course.get('credits', 0) or 0) for course in course_data], dtype=np.float32)
+        
+        # Courses in the feature store use its features
+        store = self.feature_store
+        if store is not None and course_ids:
+            positions = store.courses.index_of(course_ids)
+            known = positions >= 0
+            prerequisites_count[known] = store.courses.column('prerequisites_count')[positions[known]]
+            credits[known] = store.courses.column('credits')[positions[known]]
+        
+        # Popularity score based on prerequisites and credits, highest first
+        popularity = prerequisites_count * 0.7 + credits * 0.3
+        order = np.argsort(-popularity, kind='stable')[:limit]
         
         # Convert to recommendation format
         recommendations = []
-        for cid, score in course_popularity[:limit]:
+        for i in order:
+            cid, score = course_ids[i], float(popularity[i])
             recommendations.append({
                 'course_id': cid,
                 'popularity_score': score,
@@ -419,8 +450,27 @@ class RecommendationEngine:
         self.user_feedback[student_id].append(feedback_record)
         print(f"Recorded feedback for student {student_id} on course {course_id}: {rating}/5")
 
-# Global instance of RecommendationEngine
-recommendation_engine = RecommendationEngine()
+# Global instance of RecommendationEngine, created on first use
+_recommendation_engine = None
+_instance_lock = threading.Lock()
+
+def get_recommendation_engine() -> RecommendationEngine:
+    """
+    Return the shared RecommendationEngine, creating it on first use.
+    """
+    global _recommendation_engine
+    if _recommendation_engine is None:
+        with _instance_lock:
+            if _recommendation_engine is None:
+                _recommendation_engine = RecommendationEngine()
+    return _recommendation_engine
+
+def __getattr__(name):
+    # Keeps `from .recommendation_engine import recommendation_engine` working without
+    # creating the instance when the module is imported
+    if name == 'recommendation_engine':
+        return get_recommendation_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def generate_recommendations(student_id: str,
                            course_data: List[Dict[str, Any]],
@@ -440,7 +490,7 @@ def generate_recommendations(student_id: str,
     Returns:
         List of recommended courses
     """
-    return recommendation_engine.generate_hybrid_recommendations(
+    return get_recommendation_engine().generate_hybrid_recommendations(
         student_id, course_data, enrollment_data, performance_data, num_recommendations
     )
 
@@ -535,4 +585,4 @@ if __name__ == "__main__":
         print()
     
     # Record user feedback
-    recommendation_engine.record_user_feedback('STU001', 'CS201', 4.5, "Very relevant to my interests")
\ No newline at end of file
+    get_recommendation_engine().record_user_feedback('STU001', 'CS201', 4.5, "Very relevant to my interests")
\ No newline at end of file
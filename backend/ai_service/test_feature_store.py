@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar feature store.
+"""
+
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from .feature_extraction import FeatureExtractor, build_feature_store
+from .feature_store import COURSE_NUMERIC_COLUMNS, FeatureStore
+from .recommendation_engine import RecommendationEngine
+
+SAMPLE_COURSES = [
+    {'course_id': 'CS101', 'title': 'Introduction to Computer Science', 'department': 'CS',
+     'credits': 3, 'prerequisites': [], 'description': 'Computer programming and algorithms'},
+    {'course_id': 'MATH201', 'title': 'Calculus II', 'department': 'MATH',
+     'credits': 4, 'prerequisites': ['MATH101'], 'description': 'Integration techniques and series'},
+    {'course_id': 'CS201', 'title': 'Data Structures', 'department': 'CS',
+     'credits': 3, 'prerequisites': ['CS101'], 'description': 'Lists, trees and graphs in programming'},
+]
+
+SAMPLE_ENROLLMENTS = [
+    {'student_id': 'STU001', 'course_id': 'CS101', 'credits': 3},
+    {'student_id': 'STU001', 'course_id': 'MATH201', 'credits': 4},
+    {'student_id': 'STU002', 'course_id': 'CS101', 'credits': 3},
+]
+
+SAMPLE_PERFORMANCE = [
+    {'student_id': 'STU001', 'course_id': 'CS101', 'grade_points': 3.0,
+     'avg_assignment_score': 90.0, 'avg_exam_score': 80.0, 'attendance_rate': 0.9},
+    {'student_id': 'STU001', 'course_id': 'MATH201', 'grade_points': 3.5,
+     'avg_assignment_score': 80.0, 'avg_exam_score': 70.0, 'attendance_rate': 0.8},
+    {'student_id': 'STU001', 'course_id': 'CS201', 'grade_points': 4.0},
+    {'student_id': 'STU002', 'course_id': 'CS101', 'grade_points': 2.0},
+]
+
+
+class FeatureStoreTests(SimpleTestCase):
+    """
+    Tests for FeatureExtractor tables and FeatureStore persistence.
+    """
+
+    def test_course_table_has_fixed_schema_and_codes(self):
+        extractor = FeatureExtractor()
+        table = extractor.build_course_table(SAMPLE_COURSES)
+
+        self.assertEqual(table.numeric.shape, (3, len(COURSE_NUMERIC_COLUMNS)))
+        self.assertEqual(list(table.departments), ['CS', 'MATH'])
+        self.assertEqual(list(table.department_codes), [0, 1, 0])
+        np.testing.assert_array_equal(table.column('prerequisites_count'), [0, 1, 1])
+
+        # Codes stay stable when the catalog is extracted again in a different order
+        again = extractor.build_course_table(list(reversed(SAMPLE_COURSES)))
+        self.assertEqual(list(again.department_codes), [0, 1, 0])
+        self.assertEqual(list(extractor.extract_course_features(SAMPLE_COURSES).columns[:3]),
+                         ['course_id', 'credits', 'department'])
+
+    def test_student_table_matches_per_student_computation(self):
+        table = FeatureExtractor().build_student_table(SAMPLE_ENROLLMENTS, SAMPLE_PERFORMANCE)
+        stu001 = table.index_of(['STU001'])[0]
+
+        self.assertEqual(list(table.student_ids), ['STU001', 'STU002'])
+        self.assertAlmostEqual(table.column('total_credits')[stu001], 7)
+        self.assertAlmostEqual(table.column('avg_grade_points')[stu001], 3.5)
+        self.assertAlmostEqual(table.column('avg_exam_score')[stu001], 75.0)
+        # Same slope np.polyfit would give over the record order
+        self.assertAlmostEqual(table.column('grade_trend')[stu001], np.polyfit([0, 1, 2], [3.0, 3.5, 4.0], 1)[0],
+                               places=5)
+        self.assertEqual(table.column('grade_trend')[table.index_of(['STU002'])[0]], 0)
+
+    def test_interaction_features_are_vectorized_cross_product(self):
+        extractor = FeatureExtractor()
+        students = extractor.extract_student_features(SAMPLE_ENROLLMENTS, SAMPLE_PERFORMANCE)
+        courses = extractor.extract_course_features(SAMPLE_COURSES)
+
+        interactions = extractor.create_interaction_features(students, courses)
+
+        self.assertEqual(len(interactions), len(students) * len(courses))
+        row = interactions[(interactions.student_id == 'STU001') & (interactions.course_id == 'MATH201')].iloc[0]
+        self.assertAlmostEqual(row.compatibility_score, min(1, 0.5 + 0.3 * 0.5 + 0.2 * 0.8), places=5)
+        self.assertFalse(row.credit_match)
+
+    def test_store_round_trip(self):
+        store = build_feature_store(SAMPLE_ENROLLMENTS, SAMPLE_COURSES, SAMPLE_PERFORMANCE)
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+
+        version = store.save(base_dir=base_dir)
+        loaded = FeatureStore.load(base_dir=base_dir)
+
+        self.assertEqual(loaded.version, version)
+        np.testing.assert_array_equal(loaded.courses.numeric, store.courses.numeric)
+        np.testing.assert_array_equal(loaded.students.student_ids, store.students.student_ids)
+        self.assertEqual(list(loaded.courses.keywords), list(store.courses.keywords))
+
+    def test_recommendations_read_the_saved_store(self):
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+        # Served course records without prerequisites, and a course added since training
+        catalog = [{key: value for key, value in course.items() if key != 'prerequisites'}
+                   for course in SAMPLE_COURSES]
+        catalog.append({'course_id': 'PHY101', 'title': 'Physics I', 'department': 'PHY', 'credits': 2,
+                        'prerequisites': ['MATH101']})
+
+        with mock.patch('ai_service.model_store.DEFAULT_MODELS_DIR', base_dir):
+            self.assertIsNone(RecommendationEngine().feature_store)
+            build_feature_store(SAMPLE_ENROLLMENTS, SAMPLE_COURSES, SAMPLE_PERFORMANCE).save()
+            engine = RecommendationEngine()
+            recommendations = engine._get_popularity_based_recommendations(catalog, 10)
+
+        self.assertIsNotNone(engine.feature_store)
+        self.assertEqual([rec['course_id'] for rec in recommendations], ['MATH201', 'CS201', 'PHY101', 'CS101'])
+        self.assertAlmostEqual(recommendations[0]['popularity_score'], 0.7 + 4 * 0.3, places=5)
+        self.assertAlmostEqual(recommendations[2]['popularity_score'], 0.7 + 2 * 0.3, places=5)
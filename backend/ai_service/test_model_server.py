@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched performance prediction server.
+"""
+
+import json
+import shutil
+import tempfile
+
+import jwt
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from assignments.models import Grade
+from courses.models import Enrollment
+from .ai_service import ai_service
+from .model_server import PerformanceModelServer
+from .train_recommendation_model import save_performance_model, train_performance_prediction_model
+
+
+def _grade(grade_id, student_id, course_id, value, max_points=100):
+    return Grade(id=grade_id, student_id=student_id, course_id=course_id,
+                 value=value, max_points=max_points, weight=1)
+
+
+class PerformanceModelServerTests(TestCase):
+    """
+    Tests for PerformanceModelServer.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Grade.objects.bulk_create([
+            _grade('g1', 'S1', 'CS101', 90),
+            _grade('g2', 'S1', 'CS101', 70),
+            _grade('g3', 'S1', 'MATH201', 50),
+            _grade('g4', 'S2', 'CS101', 40),
+        ])
+        self.base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+    def test_features_come_from_one_query(self):
+        server = PerformanceModelServer(base_dir=self.base_dir)
+
+        with self.assertNumQueries(1):
+            features = server.fetch_features([('S1', 'CS101'), ('S2', 'MATH201'), ('S3', 'CS101')])
+
+        np.testing.assert_allclose(features['course_percentage'], [80.0, np.nan, np.nan])
+        np.testing.assert_allclose(features['student_percentage'], [70.0, 40.0, np.nan])
+        np.testing.assert_allclose(features['course_mean_percentage'], [200 / 3, 50.0, 200 / 3])
+        np.testing.assert_array_equal(features['graded_items'], [2, 0, 0])
+
+    def test_predictions_are_ordered_and_cached_per_version(self):
+        server = PerformanceModelServer(base_dir=self.base_dir)
+        pairs = [('S2', 'CS101'), ('S1', 'CS101')]
+
+        predictions = server.predict_batch(pairs)
+        self.assertEqual([(p['student_id'], p['course_id']) for p in predictions], pairs)
+        self.assertEqual(predictions[0]['model_version'], 'default')
+        self.assertEqual(predictions[0]['risk_level'], 'High')
+        self.assertEqual(predictions[1]['risk_level'], 'Low')
+
+        # Served from the cache: no queries
+        with self.assertNumQueries(0):
+            self.assertEqual(server.predict_batch(pairs), predictions)
+
+        # A newly trained model gets its own cache entries
+        model = train_performance_prediction_model([
+            {'student_id': f'S{i}', 'course_id': 'C', 'grade_points': i / 10,
+             'avg_assignment_score': i * 2.5, 'avg_exam_score': i * 2.5}
+            for i in range(41)
+        ])
+        version = save_performance_model(model, base_dir=self.base_dir)
+        server.reload()
+
+        with self.assertNumQueries(1):
+            retrained = server.predict_batch(pairs)
+        self.assertEqual(retrained[0]['model_version'], version)
+
+    def test_batch_endpoint_scores_active_enrollments(self):
+        Enrollment.objects.bulk_create([
+            Enrollment(id='e1', student_id='S1', course_id='CS101', status='active'),
+            Enrollment(id='e2', student_id='S1', course_id='MATH201', status='active'),
+            Enrollment(id='e3', student_id='S2', course_id='CS101', status='dropped'),
+        ])
+        token = jwt.encode({'user_id': 'advisor_1', 'role': 'faculty', 'exp': 9999999999},
+                           ai_service.secret_key, algorithm='HS256')
+
+        response = self.client.post(
+            reverse('v1:batch_performance_prediction'),
+            data=json.dumps({'student_ids': ['S1', 'S2']}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual({p['course_id'] for p in data['predictions']}, {'CS101', 'MATH201'})
+
+        response = self.client.post(
+            reverse('v1:batch_performance_prediction'),
+            data=json.dumps({'pairs': [{'student_id': 'S1'}]}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}',
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the sparse recommendation model trainer and the model artifact store.
+"""
+
+import shutil
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.metrics.pairwise import cosine_similarity
+
+from .model_store import load_artifact, latest_version, list_versions
+from .train_recommendation_model import (
+    build_interaction_matrix,
+    save_recommendation_model,
+    train_collaborative_filtering_model,
+)
+
+
+def _sample_data(num_students=40, num_courses=25, seed=7):
+    rng = np.random.default_rng(seed)
+    courses = [
+        {
+            'course_id': f'C{i:03d}',
+            'title': f'Course {i}',
+            'description': ' '.join(rng.choice(['algebra', 'biology', 'physics', 'poetry',
+                                                 'history', 'databases', 'networks'], size=4)),
+            'department': ['CS', 'MATH', 'BIO'][i % 3],
+        }
+        for i in range(num_courses)
+    ]
+    enrollments = []
+    for s in range(num_students):
+        for c in rng.choice(num_courses, size=5, replace=False):
+            enrollments.append({
+                'student_id': f'S{s:03d}',
+                'course_id': f'C{c:03d}',
+                'grade_points': float(rng.integers(1, 5)),
+            })
+    return enrollments, courses
+
+
+class SparseTrainingTests(SimpleTestCase):
+    """
+    Tests for train_collaborative_filtering_model.
+    """
+
+    def test_duplicate_enrollments_are_averaged(self):
+        enrollments = [
+            {'student_id': 'S1', 'course_id': 'A', 'grade_points': 4.0},
+            {'student_id': 'S1', 'course_id': 'A', 'grade_points': 2.0},
+            {'student_id': 'S2', 'course_id': 'B'},
+        ]
+        matrix, student_ids = build_interaction_matrix(enrollments, ['A', 'B'])
+
+        self.assertEqual(student_ids, ['S1', 'S2'])
+        np.testing.assert_allclose(matrix.toarray(), [[3.0, 0.0], [0.0, 1.0]])
+
+    def test_top_k_matches_dense_similarity(self):
+        enrollments, courses = _sample_data()
+        model = train_collaborative_filtering_model(enrollments, courses, k=5)
+
+        # Reference: the dense computation the sparse trainer replaces
+        matrix, _ = build_interaction_matrix(enrollments, [c['course_id'] for c in courses])
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        texts = [f"{c['title']} {c['description']} {c['department']}" for c in courses]
+        tfidf = TfidfVectorizer(stop_words='english').fit_transform(texts)
+        dense = (cosine_similarity(matrix.T) + cosine_similarity(tfidf)) / 2
+        np.fill_diagonal(dense, -np.inf)
+
+        expected_scores = -np.sort(-dense, axis=1)[:, :5]
+        np.testing.assert_allclose(model['neighbor_scores'], expected_scores, atol=1e-5)
+        self.assertEqual(model['neighbor_indices'].shape, (len(courses), 5))
+        self.assertEqual(model['metrics']['num_courses'], len(courses))
+
+    def test_chunking_does_not_change_result(self):
+        enrollments, courses = _sample_data()
+        whole = train_collaborative_filtering_model(enrollments, courses, k=5)
+        # Force one row per block
+        chunked = train_collaborative_filtering_model(enrollments, courses, k=5, max_block_bytes=1)
+
+        np.testing.assert_allclose(whole['neighbor_scores'], chunked['neighbor_scores'], atol=1e-6)
+
+    def test_duplicate_catalog_courses_are_merged(self):
+        enrollments, courses = _sample_data()
+        model = train_collaborative_filtering_model(enrollments, courses + [dict(courses[3], title='Copy')], k=5)
+
+        np.testing.assert_allclose(model['neighbor_scores'],
+                                   train_collaborative_filtering_model(enrollments, courses, k=5)['neighbor_scores'])
+        self.assertEqual(list(model['course_ids']), [c['course_id'] for c in courses])
+
+    def test_artifact_round_trip_is_memory_mapped(self):
+        enrollments, courses = _sample_data()
+        model = train_collaborative_filtering_model(enrollments, courses, k=3)
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir)
+
+        first = save_recommendation_model(model, base_dir=base_dir)
+        second = save_recommendation_model(model, base_dir=base_dir)
+        artifact = load_artifact('recommendation_model', base_dir=base_dir)
+
+        self.assertEqual(latest_version('recommendation_model', base_dir=base_dir), second)
+        self.assertEqual(list_versions('recommendation_model', base_dir=base_dir), [first, second])
+        self.assertEqual(artifact.version, second)
+        self.assertIsInstance(artifact['neighbor_indices'], np.memmap)
+        np.testing.assert_array_equal(artifact['course_ids'], model['course_ids'])
+        self.assertEqual(artifact.metadata['metrics']['num_neighbors'], 3)
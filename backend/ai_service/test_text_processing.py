@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for batch text preprocessing and the course token store.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from . import text_processing
+from .text_processing import CourseTokenStore, TextProcessor, TokenCache
+
+
+class BatchPreprocessingTests(SimpleTestCase):
+    """
+    Tests for TextProcessor.preprocess_batch.
+    """
+
+    def setUp(self):
+        self.processor = TextProcessor()
+
+    def test_clean_text_removes_noise_in_one_pass(self):
+        text = 'See <b>Notes</b> at https://example.com or mail prof@example.com!'
+        self.assertEqual(self.processor.clean_text(text), 'see notes at or mail')
+
+    def test_batch_matches_single_document_pipeline(self):
+        texts = ['Intro to Databases and SQL.', 'Linear algebra, matrices & vectors', '']
+        expected = [self.processor._preprocess_tokens_uncached(text) for text in texts]
+
+        self.assertEqual(self.processor.preprocess_batch(texts), expected)
+        self.assertEqual(self.processor.preprocess_text(texts[0]), ' '.join(expected[0]))
+
+    def test_repeated_documents_are_served_from_cache(self):
+        texts = ['Operating systems and concurrency'] * 3
+
+        with patch.object(self.processor, '_preprocess_tokens_uncached',
+                          wraps=self.processor._preprocess_tokens_uncached) as pipeline:
+            self.processor.preprocess_batch(texts)
+            self.processor.preprocess_batch(texts)
+
+        self.assertEqual(pipeline.call_count, 1)
+
+    def test_options_are_part_of_cache_key(self):
+        text = 'The theory of computation'
+        with_stopwords = self.processor.preprocess_tokens(text, remove_stopwords=False)
+        without_stopwords = self.processor.preprocess_tokens(text, remove_stopwords=True)
+
+        self.assertIn('the', with_stopwords)
+        self.assertNotIn('the', without_stopwords)
+
+    def test_large_batches_use_process_pool(self):
+        texts = [f'document number {i}' for i in range(5)]
+
+        with patch.object(text_processing, 'PARALLEL_THRESHOLD', 2), \
+                patch.object(text_processing, 'ProcessPoolExecutor', wraps=ProcessPoolExecutor) as executor:
+            result = self.processor.preprocess_batch(texts, workers=2)
+
+        executor.assert_called_once_with(max_workers=2)
+        self.assertEqual(result, [self.processor._preprocess_tokens_uncached(text) for text in texts])
+
+    def test_token_cache_is_bounded(self):
+        cache = TokenCache(maxsize=2)
+        cache.set('a', ('a',))
+        cache.set('b', ('b',))
+        cache.get('a')
+        cache.set('c', ('c',))
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), ('a',))
+
+
+class CourseTokenStoreTests(SimpleTestCase):
+    """
+    Tests for CourseTokenStore.
+    """
+
+    def test_only_changed_courses_are_reprocessed(self):
+        processor = TextProcessor()
+        store = CourseTokenStore(path=None, processor=processor)
+        catalog = {'CS101': 'Programming basics', 'MATH201': 'Calculus and series'}
+        store.get_tokens(catalog)
+
+        with patch.object(processor, 'preprocess_batch', wraps=processor.preprocess_batch) as batch:
+            store.get_tokens(catalog)
+            self.assertEqual(batch.call_count, 0)
+
+            catalog['CS101'] = 'Programming fundamentals'
+            tokens = store.get_tokens(catalog)
+
+        self.assertEqual(batch.call_args[0][0], ['Programming fundamentals'])
+        self.assertEqual(tokens['CS101'], processor.preprocess_tokens('Programming fundamentals'))
+
+    def test_concurrent_saves_leave_one_complete_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'tokens.json')
+        stores = []
+        for i in range(8):
+            store = CourseTokenStore(path=path, processor=TextProcessor())
+            store.get_tokens({f'C{i}': f'Course number {i}'})
+            stores.append(store)
+
+        threads = [threading.Thread(target=store.save) for store in stores]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(os.listdir(directory), ['tokens.json'])
+        with open(path) as f:
+            self.assertIsInstance(json.load(f), dict)
+
+    def test_threads_sharing_a_store_keep_every_course(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'tokens.json')
+        store = CourseTokenStore(path=path, processor=TextProcessor())
+        barrier = threading.Barrier(8)
+
+        def index(i):
+            barrier.wait()
+            for n in range(5):
+                store.get_tokens({f'C{i}-{n}': f'Course {i} part {n}'})
+
+        threads = [threading.Thread(target=index, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(path) as f:
+            self.assertEqual(len(json.load(f)), 40)
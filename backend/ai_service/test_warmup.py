@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for lazy loading and warm-up of the AI dependencies.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from .warmup import warm_up
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ['numpy', 'pandas', 'sklearn', 'nltk']
+
+
+def _modules_loaded_after(code):
+    """Run code in a fresh interpreter and return the heavy modules it imported."""
+    script = (
+        "import json, sys, django\n"
+        "django.setup()\n"
+        f"{code}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class LazyLoadingTests(SimpleTestCase):
+    """
+    Tests that the AI dependencies load on first use only.
+    """
+
+    def test_views_do_not_import_heavy_modules(self):
+        self.assertEqual(_modules_loaded_after("import ai_service.views"), [])
+
+    def test_text_processing_defers_nltk(self):
+        self.assertNotIn('nltk', _modules_loaded_after("import ai_service.text_processing"))
+        self.assertNotIn('sklearn', _modules_loaded_after("import ai_service.recommendation_engine"))
+
+    def test_warm_up_creates_shared_instances(self):
+        from . import content_filtering, text_processing
+
+        timings = warm_up()
+
+        self.assertEqual(list(timings), ['recommendation_model', 'performance_model',
+                                         'recommendation_engine', 'content_recommender', 'text_processor'])
+        self.assertIs(text_processing.text_processor, text_processing.get_text_processor())
+        self.assertIsNotNone(content_filtering._content_recommender)
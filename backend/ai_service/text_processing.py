@@ -5,14 +5,21 @@ Text Processing Module for Digital Campus AI Services
 This module implements text processing capabilities for content analysis in AI services.
 """
 
+import os
 import re
+import json
 import string
-from typing import List, Dict, Any, Tuple
-from collections import Counter
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.stem import PorterStemmer, WordNetLemmatizer
+import hashlib
+import tempfile
+import threading
+from itertools import repeat
+from typing import List, Dict, Any, Tuple, Optional
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# NLTK is imported by TextProcessor on first use: it takes over a second to
+# import and most processes that import this module never tokenize anything.
 
 # Download required NLTK data (would be run once during setup)
 # nltk.download('punkt')
@@ -20,6 +27,86 @@ from nltk.stem import PorterStemmer, WordNetLemmatizer
 # nltk.download('wordnet')
 # nltk.download('averaged_perceptron_tagger')
 
+# Patterns used by clean_text, compiled once. URLs, e-mail addresses and HTML
+# tags are removed in a single pass over the text.
+NOISE_PATTERN = re.compile(
+    r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
+    r'|\S+@\S+'
+    r'|<.*?>'
+)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+# Batches with more uncached documents than this are preprocessed on a process pool
+PARALLEL_THRESHOLD = 2000
+
+# Maximum number of token streams kept in the in-process cache
+TOKEN_CACHE_SIZE = 10000
+
+DEFAULT_TOKEN_STORE_PATH = os.path.join(os.path.dirname(__file__), 'models', 'course_tokens.json')
+
+def content_hash(text: str) -> str:
+    """
+    Hash text content so unchanged documents can be recognized cheaply.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        Hex digest of the text
+    """
+    return hashlib.blake2b((text or '').encode('utf-8'), digest_size=16).hexdigest()
+
+def _options_key(text: str, remove_stopwords: bool, stem: bool, lemmatize: bool) -> str:
+    """
+    Build the cache key for a document and a set of preprocessing options.
+    """
+    return f"{content_hash(text)}:{int(remove_stopwords)}{int(stem)}{int(lemmatize)}"
+
+class TokenCache:
+    """
+    Bounded LRU cache of token streams keyed by content hash, shared by the
+    request threads of a process.
+    """
+    
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        """
+        Initialize the Token Cache.
+        
+        Args:
+            maxsize: Maximum number of entries to keep
+        """
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Tuple[str, ...]]:
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self._entries.move_to_end(key)
+            return tokens
+    
+    def set(self, key: str, tokens: Tuple[str, ...]):
+        with self._lock:
+            self._entries[key] = tokens
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+def _preprocess_chunk(texts: List[str], options: Tuple[bool, bool, bool]) -> List[List[str]]:
+    """
+    Preprocess a chunk of documents in a worker process.
+    """
+    return [get_text_processor()._preprocess_tokens_uncached(text, *options) for text in texts]
+
 class TextProcessor:
     """
     Processes text for content analysis in AI services.
@@ -29,6 +116,12 @@ class TextProcessor:
         """
         Initialize the Text Processor.
         """
+        from nltk.corpus import stopwords
+        from nltk.tokenize import word_tokenize, sent_tokenize
+        from nltk.stem import PorterStemmer, WordNetLemmatizer
+        
+        self.word_tokenize = word_tokenize
+        self.sent_tokenize = sent_tokenize
         try:
             self.stop_words = set(stopwords.words('english'))
             self.stemmer = PorterStemmer()
@@ -40,6 +133,8 @@ class TextProcessor:
             self.stemmer = None
             self.lemmatizer = None
             self.nltk_available = False
+        
+        self.token_cache = TokenCache()
     
     def clean_text(self, text: str) -> str:
         """
@@ -57,20 +152,14 @@ class TextProcessor:
         # Convert to lowercase
         text = text.lower()
         
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Remove email addresses
-        text = re.sub(r'\S+@\S+', '', text)
-        
-        # Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
+        # Remove URLs, email addresses and HTML tags
+        text = NOISE_PATTERN.sub('', text)
         
         # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
+        text = text.translate(PUNCTUATION_TABLE)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE_PATTERN.sub(' ', text).strip()
         
         return text
     
@@ -89,7 +178,7 @@ class TextProcessor:
         
         if self.nltk_available:
             try:
-                tokens = word_tokenize(text)
+                tokens = self.word_tokenize(text)
             except:
                 tokens = text.split()
         else:
@@ -172,13 +261,11 @@ class TextProcessor:
         # Simple approach: extract noun phrases (if POS tagging available)
         # Fallback: extract frequent n-grams
         
-        sentences = sent_tokenize(text) if self.nltk_available else [text]
+        sentences = self.sent_tokenize(text) if self.nltk_available else [text]
         all_bigrams = []
         
-        for sentence in sentences:
-            cleaned = self.clean_text(sentence)
-            tokens = self.tokenize_text(cleaned)
-            tokens = self.remove_stopwords(tokens)
+        token_lists = self.preprocess_batch(sentences, remove_stopwords=True, stem=False, lemmatize=False)
+        for tokens in token_lists:
             bigrams = self.extract_ngrams(tokens, 2)
             all_bigrams.extend(bigrams)
         
@@ -200,7 +287,7 @@ class TextProcessor:
         tokens = self.tokenize_text(cleaned_text)
         tokens_no_stop = self.remove_stopwords(tokens)
         
-        sentences = sent_tokenize(text) if self.nltk_available else [text]
+        sentences = self.sent_tokenize(text) if self.nltk_available else [text]
         
         stats = {
             'character_count': len(text),
@@ -214,21 +301,12 @@ class TextProcessor:
         
         return stats
     
-    def preprocess_text(self, text: str, 
-                       remove_stopwords: bool = True,
-                       stem: bool = False,
-                       lemmatize: bool = True) -> str:
+    def _preprocess_tokens_uncached(self, text: str,
+                                    remove_stopwords: bool = True,
+                                    stem: bool = False,
+                                    lemmatize: bool = True) -> List[str]:
         """
-        Complete text preprocessing pipeline.
-        
-        Args:
-            text: Input text
-            remove_stopwords: Whether to remove stopwords
-            stem: Whether to stem tokens
-            lemmatize: Whether to lemmatize tokens
-            
-        Returns:
-            Preprocessed text
+        Run the preprocessing pipeline on one document without consulting the cache.
         """
         # Clean text
         cleaned = self.clean_text(text)
@@ -248,8 +326,215 @@ class TextProcessor:
         if lemmatize:
             tokens = self.lemmatize_tokens(tokens)
         
+        return tokens
+    
+    def preprocess_tokens(self, text: str,
+                          remove_stopwords: bool = True,
+                          stem: bool = False,
+                          lemmatize: bool = True) -> List[str]:
+        """
+        Complete text preprocessing pipeline returning tokens.
+        
+        Results are cached by content hash, so preprocessing the same text again is
+        a dictionary lookup.
+        
+        Args:
+            text: Input text
+            remove_stopwords: Whether to remove stopwords
+            stem: Whether to stem tokens
+            lemmatize: Whether to lemmatize tokens
+            
+        Returns:
+            List of preprocessed tokens
+        """
+        return self.preprocess_batch([text], remove_stopwords, stem, lemmatize)[0]
+    
+    def preprocess_text(self, text: str, 
+                       remove_stopwords: bool = True,
+                       stem: bool = False,
+                       lemmatize: bool = True) -> str:
+        """
+        Complete text preprocessing pipeline.
+        
+        Args:
+            text: Input text
+            remove_stopwords: Whether to remove stopwords
+            stem: Whether to stem tokens
+            lemmatize: Whether to lemmatize tokens
+            
+        Returns:
+            Preprocessed text
+        """
         # Join tokens back into text
-        return ' '.join(tokens)
+        return ' '.join(self.preprocess_tokens(text, remove_stopwords, stem, lemmatize))
+    
+    def preprocess_batch(self, texts: List[str],
+                         remove_stopwords: bool = True,
+                         stem: bool = False,
+                         lemmatize: bool = True,
+                         workers: Optional[int] = None) -> List[List[str]]:
+        """
+        Preprocess a list of documents.
+        
+        Duplicate and previously seen documents are served from the token cache.
+        When more than PARALLEL_THRESHOLD documents are left to process they are
+        spread over a process pool.
+        
+        Args:
+            texts: List of input texts
+            remove_stopwords: Whether to remove stopwords
+            stem: Whether to stem tokens
+            lemmatize: Whether to lemmatize tokens
+            workers: Number of worker processes (None uses all CPUs, 1 disables
+                the process pool)
+            
+        Returns:
+            List of token lists, one per input text
+        """
+        options = (remove_stopwords, stem, lemmatize)
+        texts = [text or '' for text in texts]
+        keys = [_options_key(text, *options) for text in texts]
+        
+        results = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in results or key in missing:
+                continue
+            cached = self.token_cache.get(key)
+            if cached is not None:
+                results[key] = cached
+            else:
+                missing[key] = text
+        
+        if missing:
+            pending_keys = list(missing)
+            pending_texts = [missing[key] for key in pending_keys]
+            
+            if workers != 1 and len(pending_texts) > PARALLEL_THRESHOLD:
+                token_lists = self._preprocess_parallel(pending_texts, options, workers)
+            else:
+                token_lists = [self._preprocess_tokens_uncached(text, *options) for text in pending_texts]
+            
+            for key, tokens in zip(pending_keys, token_lists):
+                tokens = tuple(tokens)
+                self.token_cache.set(key, tokens)
+                results[key] = tokens
+        
+        return [list(results[key]) for key in keys]
+    
+    def _preprocess_parallel(self, texts: List[str],
+                             options: Tuple[bool, bool, bool],
+                             workers: Optional[int] = None) -> List[List[str]]:
+        """
+        Preprocess documents on a process pool, falling back to the current process
+        if worker processes cannot be started.
+        """
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, -(-len(texts) // (workers * 4)))
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                token_lists = []
+                for chunk_result in pool.map(_preprocess_chunk, chunks, repeat(options)):
+                    token_lists.extend(chunk_result)
+                return token_lists
+        except (OSError, BrokenProcessPool):
+            return [self._preprocess_tokens_uncached(text, *options) for text in texts]
+
+class CourseTokenStore:
+    """
+    Stores preprocessed tokens per course, keyed by a hash of the course text.
+    
+    Only courses whose text changed since the last call are preprocessed again,
+    so re-indexing an unchanged catalog costs one hash per course.
+    """
+    
+    def __init__(self, path: Optional[str] = DEFAULT_TOKEN_STORE_PATH,
+                 processor: Optional['TextProcessor'] = None):
+        """
+        Initialize the Course Token Store.
+        
+        Args:
+            path: JSON file the tokens are persisted to (None keeps them in memory only)
+            processor: TextProcessor used for preprocessing (defaults to the global one)
+        """
+        self.path = path
+        self.processor = processor
+        self._entries = None
+        # The store is shared by the request threads (get_course_token_store)
+        self._lock = threading.Lock()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, 'r') as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    self._entries = {}
+        return self._entries
+    
+    def save(self):
+        """
+        Persist the stored tokens to disk.
+        """
+        with self._lock:
+            self._save()
+    
+    def _save(self):
+        if not self.path or self._entries is None:
+            return
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        # A temporary file of its own, so concurrent workers never write into each other's
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as f:
+            json.dump(self._entries, f)
+        try:
+            os.replace(f.name, self.path)
+        except OSError:
+            os.unlink(f.name)
+            raise
+    
+    def get_tokens(self, documents: Dict[str, str],
+                   remove_stopwords: bool = True,
+                   stem: bool = False,
+                   lemmatize: bool = True) -> Dict[str, List[str]]:
+        """
+        Get preprocessed tokens for a set of course documents.
+        
+        Args:
+            documents: Mapping of course ID to course text
+            remove_stopwords: Whether to remove stopwords
+            stem: Whether to stem tokens
+            lemmatize: Whether to lemmatize tokens
+            
+        Returns:
+            Mapping of course ID to its list of tokens
+        """
+        changed = []
+        with self._lock:
+            entries = self._load()
+            for course_id, text in documents.items():
+                key = _options_key(text or '', remove_stopwords, stem, lemmatize)
+                entry = entries.get(str(course_id))
+                if entry is None or entry.get('hash') != key:
+                    changed.append((str(course_id), key, text or ''))
+        
+        # Preprocessed without the lock; the entries are only updated and saved under it
+        if changed:
+            processor = self.processor or get_text_processor()
+            token_lists = processor.preprocess_batch(
+                [text for _, _, text in changed], remove_stopwords, stem, lemmatize
+            )
+        
+        with self._lock:
+            if changed:
+                for (course_id, key, _), tokens in zip(changed, token_lists):
+                    entries[course_id] = {'hash': key, 'tokens': tokens}
+                self._save()
+            return {course_id: entries[str(course_id)]['tokens'] for course_id in documents}
 
 def analyze_course_content(course_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
@@ -261,7 +546,7 @@ def analyze_course_content(course_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Dictionary with content analysis results
     """
-    processor = TextProcessor()
+    processor = get_text_processor()
     
     all_titles = []
     all_descriptions = []
@@ -287,11 +572,10 @@ def analyze_course_content(course_data: List[Dict[str, Any]]) -> Dict[str, Any]:
     desc_stats = processor.calculate_text_statistics(combined_descriptions)
     desc_key_phrases = processor.extract_key_phrases(combined_descriptions, 20)
     
-    # Overall vocabulary analysis
-    all_text = combined_titles + ' ' + combined_descriptions
-    cleaned_text = processor.clean_text(all_text)
-    tokens = processor.tokenize_text(cleaned_text)
-    tokens_no_stop = processor.remove_stopwords(tokens)
+    # Overall vocabulary analysis, one cached token stream per document
+    token_lists = processor.preprocess_batch(all_titles + all_descriptions,
+                                             remove_stopwords=True, stem=False, lemmatize=False)
+    tokens_no_stop = [token for tokens in token_lists for token in tokens]
     
     vocabulary = list(set(tokens_no_stop))
     word_freq = Counter(tokens_no_stop)
@@ -324,7 +608,7 @@ def extract_course_topics(course_data: List[Dict[str, Any]],
     Returns:
         List of topic dictionaries
     """
-    processor = TextProcessor()
+    processor = get_text_processor()
     
     # Collect all course descriptions
     descriptions = [course.get('description', '') for course in course_data if course.get('description')]
@@ -333,9 +617,7 @@ def extract_course_topics(course_data: List[Dict[str, Any]],
         return []
     
     # Simple topic extraction based on frequent terms
-    all_text = ' '.join(descriptions)
-    cleaned_text = processor.preprocess_text(all_text)
-    tokens = processor.tokenize_text(cleaned_text)
+    tokens = [token for tokens in processor.preprocess_batch(descriptions) for token in tokens]
     
     # Remove stopwords and short tokens
     tokens = [token for token in tokens if len(token) > 3]
@@ -357,8 +639,41 @@ def extract_course_topics(course_data: List[Dict[str, Any]],
     
     return topics
 
-# Global instance of TextProcessor
-text_processor = TextProcessor()
+# Global instances, created on first use by the accessors below
+_text_processor = None
+_course_token_store = None
+_instance_lock = threading.Lock()
+
+def get_text_processor() -> TextProcessor:
+    """
+    Return the shared TextProcessor, creating it on first use.
+    """
+    global _text_processor
+    if _text_processor is None:
+        with _instance_lock:
+            if _text_processor is None:
+                _text_processor = TextProcessor()
+    return _text_processor
+
+def get_course_token_store() -> CourseTokenStore:
+    """
+    Return the shared CourseTokenStore, creating it on first use.
+    """
+    global _course_token_store
+    if _course_token_store is None:
+        with _instance_lock:
+            if _course_token_store is None:
+                _course_token_store = CourseTokenStore()
+    return _course_token_store
+
+def __getattr__(name):
+    # Keeps `from .text_processing import text_processor` working without
+    # creating the instance when the module is imported
+    if name == 'text_processor':
+        return get_text_processor()
+    if name == 'course_token_store':
+        return get_course_token_store()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     # Example usage
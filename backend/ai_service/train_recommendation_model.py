@@ -2,15 +2,43 @@
 """
 Script to train a simple recommendation model for the Digital Campus AI service.
 This script trains a basic collaborative filtering model using the extracted training data.
+
+The recommendation model is built from sparse matrices and only keeps the top-k
+neighbors of each course, so memory grows linearly with the catalog size.
 """
 
 import os
+import sys
 import json
+import time
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import joblib
+from sklearn.preprocessing import normalize
+
+try:
+    from .model_store import save_artifact
+    from .performance_model import (
+        PERFORMANCE_FEATURES, DEFAULT_WEIGHTS as DEFAULT_PERFORMANCE_WEIGHTS,
+        fit_weights, predict_grade_points, training_matrix as performance_training_matrix,
+    )
+    from .feature_extraction import build_feature_store
+except ImportError:  # Running as a standalone script
+    from model_store import save_artifact
+    from performance_model import (
+        PERFORMANCE_FEATURES, DEFAULT_WEIGHTS as DEFAULT_PERFORMANCE_WEIGHTS,
+        fit_weights, predict_grade_points, training_matrix as performance_training_matrix,
+    )
+    build_feature_store = None
+
+# Number of neighbors kept per course in the recommendation model
+DEFAULT_NUM_NEIGHBORS = 50
+
+# Upper bound on one dense block of the similarity computation (16 MB). The
+# temporaries around each block (sparse product, argpartition indices) are a
+# small multiple of this.
+DEFAULT_MAX_BLOCK_BYTES = 16 * 1024 * 1024
 
 def load_training_data():
     """
@@ -66,114 +94,258 @@ def prepare_course_features(courses):
     course_df = pd.DataFrame(courses)
     
     # Create a simple feature representation
-    course_df['features'] = course_df['title'] + ' ' + course_df['description'] + ' ' + course_df['department']
+    text_columns = [course_df[column].fillna('').astype(str) if column in course_df.columns else ''
+                    for column in ('title', 'description', 'department')]
+    course_df['features'] = text_columns[0] + ' ' + text_columns[1] + ' ' + text_columns[2]
     
     return course_df
 
-def train_collaborative_filtering_model(enrollments, courses):
+def _peak_rss_mb():
+    """
+    Return the peak resident set size of this process in MB, or None if unavailable.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+def build_interaction_matrix(enrollments, course_ids):
+    """
+    Build a sparse student x course interaction matrix.
+    
+    Repeated (student, course) pairs are averaged. When enrollments carry no
+    grade_points the interaction is treated as implicit feedback (1.0).
+    
+    Args:
+        enrollments: List of enrollment records
+        course_ids: Ordered list of course IDs defining the matrix columns
+        
+    Returns:
+        Tuple of (CSR matrix of shape students x courses, list of student IDs)
+    """
+    course_index = {course_id: i for i, course_id in enumerate(course_ids)}
+    n_courses = len(course_ids)
+    
+    student_codes, student_ids = pd.factorize(
+        np.fromiter((e['student_id'] for e in enrollments), dtype=object, count=len(enrollments))
+    )
+    course_codes = np.fromiter((course_index[e['course_id']] for e in enrollments),
+                               dtype=np.int64, count=len(enrollments))
+    values = np.fromiter((e.get('grade_points', 1.0) or 0.0 for e in enrollments),
+                         dtype=np.float64, count=len(enrollments))
+    
+    # Average duplicate pairs without materializing a dense crosstab
+    keys = student_codes.astype(np.int64) * n_courses + course_codes
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    means = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    
+    matrix = sparse.csr_matrix(
+        (means.astype(np.float32), (unique_keys // n_courses, unique_keys % n_courses)),
+        shape=(len(student_ids), n_courses),
+    )
+    return matrix, list(student_ids)
+
+def top_k_neighbors(similarity_sources, k, max_block_bytes=DEFAULT_MAX_BLOCK_BYTES):
+    """
+    Compute the top-k most similar items for every item without building the full
+    n x n similarity matrix.
+    
+    Similarities are computed one block of rows at a time as a weighted sum of
+    cosine similarities from each source, so peak memory is bounded by
+    max_block_bytes rather than growing quadratically with the catalog size.
+    
+    Args:
+        similarity_sources: List of (matrix, weight) tuples. Each matrix is an
+            items x features sparse matrix with L2-normalized rows, so that the
+            dot product of two rows is their cosine similarity.
+        k: Number of neighbors to keep per item
+        max_block_bytes: Upper bound on the size of one dense similarity block
+        
+    Returns:
+        Tuple of (neighbor indices int32 array, neighbor scores float32 array),
+        both of shape (n_items, k) and sorted by descending score
+    """
+    n_items = similarity_sources[0][0].shape[0]
+    k = max(0, min(k, n_items - 1))
+    indices = np.zeros((n_items, k), dtype=np.int32)
+    scores = np.zeros((n_items, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    
+    transposed = [(matrix.T.tocsc(), weight) for matrix, weight in similarity_sources]
+    chunk_size = max(1, min(n_items, max_block_bytes // (4 * n_items)))
+    
+    for start in range(0, n_items, chunk_size):
+        stop = min(n_items, start + chunk_size)
+        block = np.zeros((stop - start, n_items), dtype=np.float32)
+        for (matrix, weight), (matrix_t, _) in zip(similarity_sources, transposed):
+            block += weight * (matrix[start:stop] @ matrix_t).toarray()
+        
+        # Negate in place so the smallest values are the most similar items;
+        # an item is never its own neighbor
+        np.negative(block, out=block)
+        block[np.arange(stop - start), np.arange(start, stop)] = np.inf
+        
+        candidates = np.argpartition(block, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        order = np.argsort(candidate_scores, axis=1, kind='stable')
+        indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:stop] = -np.take_along_axis(candidate_scores, order, axis=1)
+    
+    return indices, scores
+
+def train_collaborative_filtering_model(enrollments, courses, k=DEFAULT_NUM_NEIGHBORS,
+                                        max_block_bytes=DEFAULT_MAX_BLOCK_BYTES):
     """
-    Train a simple collaborative filtering model.
+    Train a hybrid item-item model combining collaborative and content similarity.
+    
+    Only the top-k neighbors of each course are kept, so the model size is
+    O(n_courses * k) instead of O(n_courses^2).
     
     Args:
         enrollments: List of enrollment records
         courses: List of course records
+        k: Number of neighbors to keep per course
+        max_block_bytes: Upper bound on the size of one dense similarity block
         
     Returns:
         Trained model components
     """
     print("Training collaborative filtering model...")
+    started = time.perf_counter()
     
-    # Convert to DataFrame for easier manipulation
-    enrollment_df = pd.DataFrame(enrollments)
-    course_df = pd.DataFrame(courses)
+    # A course listed twice in the catalog keeps its first record: one row per course
+    unique_courses = {}
+    for course in courses:
+        unique_courses.setdefault(course['course_id'], course)
+    courses = list(unique_courses.values())
     
-    # Create user-course matrix
-    user_course_matrix = pd.crosstab(enrollment_df['student_id'], enrollment_df['course_id'], values=enrollment_df.get('grade_points', 1), aggfunc='mean').fillna(0)
+    # Courses from the catalog first, then any course only seen in enrollments
+    course_ids = list(dict.fromkeys(
+        [course['course_id'] for course in courses] + [e['course_id'] for e in enrollments]
+    ))
     
-    # Compute item similarity matrix
-    item_similarity = cosine_similarity(user_course_matrix.T)
-    item_similarity_df = pd.DataFrame(item_similarity, index=user_course_matrix.columns, columns=user_course_matrix.columns)
+    # Collaborative signal: course x student matrix with unit-length rows
+    user_course_matrix, student_ids = build_interaction_matrix(enrollments, course_ids)
+    item_vectors = normalize(user_course_matrix.T.tocsr(), norm='l2', axis=1)
     
-    # Prepare course features for content-based filtering
+    # Content signal: TF-IDF rows are already L2-normalized
     course_features_df = prepare_course_features(courses)
-    
-    # Vectorize course features
-    tfidf = TfidfVectorizer(stop_words='english')
-    course_features = tfidf.fit_transform(course_features_df['features'])
-    
-    # Compute content-based similarity
-    content_similarity = cosine_similarity(course_features)
-    content_similarity_df = pd.DataFrame(content_similarity, index=course_features_df['course_id'], columns=course_features_df['course_id'])
+    tfidf = TfidfVectorizer(stop_words='english', dtype=np.float32)
+    try:
+        catalog_vectors = tfidf.fit_transform(course_features_df['features'])
+    except ValueError:
+        # Empty vocabulary (e.g. no descriptions at all)
+        catalog_vectors = sparse.csr_matrix((len(courses), 1), dtype=np.float32)
+    content_vectors = sparse.vstack([
+        catalog_vectors,
+        sparse.csr_matrix((len(course_ids) - len(courses), catalog_vectors.shape[1]), dtype=np.float32),
+    ]).tocsr()
     
     # Combine collaborative and content-based similarities
     # This is a simple average, but could be weighted differently
-    combined_similarity = (item_similarity_df + content_similarity_df) / 2
+    neighbor_indices, neighbor_scores = top_k_neighbors(
+        [(item_vectors, 0.5), (content_vectors, 0.5)], k, max_block_bytes=max_block_bytes
+    )
+    
+    metrics = {
+        'num_enrollments': len(enrollments),
+        'num_students': len(student_ids),
+        'num_courses': len(course_ids),
+        'num_neighbors': int(neighbor_indices.shape[1]),
+        'interaction_nnz': int(user_course_matrix.nnz),
+        'wall_time_seconds': round(time.perf_counter() - started, 3),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
     
     model_components = {
-        'user_course_matrix': user_course_matrix,
-        'item_similarity': item_similarity_df,
-        'content_similarity': content_similarity_df,
-        'combined_similarity': combined_similarity,
-        'tfidf_vectorizer': tfidf,
-        'course_features': course_features_df
+        'course_ids': np.array(course_ids, dtype=str),
+        'neighbor_indices': neighbor_indices,
+        'neighbor_scores': neighbor_scores,
+        'metrics': metrics,
     }
     
-    print("Collaborative filtering model training completed")
+    print(f"Collaborative filtering model training completed in {metrics['wall_time_seconds']}s "
+          f"(peak RSS: {metrics['peak_rss_mb']} MB)")
     return model_components
 
-def train_performance_prediction_model(performance_data):
+def save_recommendation_model(model_components, base_dir=None):
     """
-    Train a simple performance prediction model.
+    Save the recommendation model as a versioned, memory-mappable artifact.
+    
+    Args:
+        model_components: Output of train_collaborative_filtering_model
+        base_dir: Root models directory (defaults to ai_service/models)
+        
+    Returns:
+        The version identifier of the saved artifact
+    """
+    arrays = {name: value for name, value in model_components.items() if name != 'metrics'}
+    version = save_artifact('recommendation_model', arrays,
+                            metadata={'metrics': model_components['metrics']},
+                            base_dir=base_dir)
+    print(f"Recommendation model saved as version {version}")
+    return version
+
+def train_performance_prediction_model(performance_data, alpha=1.0):
+    """
+    Train the performance prediction model.
+    
+    Fits a ridge regression from the features in performance_model to the grade
+    points of each performance record.
     
     Args:
         performance_data: List of performance records
+        alpha: Ridge regularization strength
         
     Returns:
         Trained model components
     """
     print("Training performance prediction model...")
     
-    # This is a placeholder for a more complex model
-    # In practice, you would use regression techniques here
-    
-    # For now, we'll just compute some basic statistics
-    performance_df = pd.DataFrame(performance_data)
-    
-    # Calculate average scores by student
-    if 'assignment_scores' in performance_df.columns:
-        performance_df['avg_assignment_score'] = performance_df['assignment_scores'].apply(lambda x: np.mean(x) if x else 0)
+    X, y = performance_training_matrix(performance_data)
+    if len(y) < X.shape[1]:
+        print("Not enough graded records, keeping the default weights")
+        weights = DEFAULT_PERFORMANCE_WEIGHTS.copy()
+    else:
+        weights = fit_weights(X, y, alpha=alpha)
     
-    if 'exam_scores' in performance_df.columns:
-        performance_df['avg_exam_score'] = performance_df['exam_scores'].apply(lambda x: np.mean(x) if x else 0)
+    residuals = y - predict_grade_points(X, weights) if len(y) else np.array([])
     
-    # Basic statistics that could inform predictions
     model_components = {
-        'student_avg_scores': performance_df.groupby('student_id')[['avg_assignment_score', 'avg_exam_score']].mean(),
-        'overall_stats': {
-            'avg_assignment_score': performance_df['avg_assignment_score'].mean() if 'avg_assignment_score' in performance_df.columns else 0,
-            'avg_exam_score': performance_df['avg_exam_score'].mean() if 'avg_exam_score' in performance_df.columns else 0,
-            'std_assignment_score': performance_df['avg_assignment_score'].std() if 'avg_assignment_score' in performance_df.columns else 0,
-            'std_exam_score': performance_df['avg_exam_score'].std() if 'avg_exam_score' in performance_df.columns else 0
-        }
+        'weights': weights,
+        'metrics': {
+            'num_samples': int(len(y)),
+            'feature_names': PERFORMANCE_FEATURES,
+            'residual_std': float(residuals.std()) if len(residuals) else None,
+            'mean_absolute_error': float(np.abs(residuals).mean()) if len(residuals) else None,
+        },
     }
     
     print("Performance prediction model training completed")
     return model_components
 
-def save_model(model_components, model_name):
+def save_performance_model(model_components, base_dir=None):
     """
-    Save trained model components to disk.
+    Save the performance model as a versioned, memory-mappable artifact.
     
     Args:
-        model_components: Dictionary of model components
-        model_name: Name of the model
+        model_components: Output of train_performance_prediction_model
+        base_dir: Root models directory (defaults to ai_service/models)
+        
+    Returns:
+        The version identifier of the saved artifact
     """
-    models_dir = os.path.join(os.path.dirname(__file__), 'models')
-    os.makedirs(models_dir, exist_ok=True)
-    
-    model_path = os.path.join(models_dir, f'{model_name}.pkl')
-    joblib.dump(model_components, model_path)
-    print(f"Model saved to {model_path}")
+    version = save_artifact('performance_model', {'weights': model_components['weights']},
+                            metadata=model_components['metrics'], base_dir=base_dir)
+    print(f"Performance model saved as version {version}")
+    return version
 
 def main():
     """
@@ -184,17 +356,24 @@ def main():
     # Load training data
     data = load_training_data()
     
+    # Build the feature store shared by training and serving
+    if data['enrollments'] and data['courses'] and build_feature_store is not None:
+        feature_store = build_feature_store(data['enrollments'], data['courses'], data['performance'])
+        print(f"Feature store saved as version {feature_store.save()}")
+    elif build_feature_store is None:
+        print("Skipping feature store (run as `python -m ai_service.train_recommendation_model`)")
+    
     # Train recommendation model
     if data['enrollments'] and data['courses']:
         recommendation_model = train_collaborative_filtering_model(data['enrollments'], data['courses'])
-        save_model(recommendation_model, 'recommendation_model')
+        save_recommendation_model(recommendation_model)
     else:
         print("Insufficient data to train recommendation model")
     
     # Train performance prediction model
     if data['performance']:
         performance_model = train_performance_prediction_model(data['performance'])
-        save_model(performance_model, 'performance_model')
+        save_performance_model(performance_model)
     else:
         print("Insufficient data to train performance prediction model")
     
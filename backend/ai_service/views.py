@@ -137,19 +137,9 @@ def academic_performance_prediction(request):
                     'message': 'student_id and course_id are required'
                 }, status=400)
             
-            # Check cache first
-            cache_key = f"performance_{student_id}_{course_id}"
-            cached_result = cache.get(cache_key)
-            if cached_result:
-                logger.info(f"Performance prediction served from cache for {student_id}/{course_id}")
-                return JsonResponse(cached_result)
-            
-            # Generate performance prediction
+            # Generate performance prediction (cached per model version by the model server)
             result = ai_service.predict_academic_performance(student_id, course_id)
             
-            # Cache the result
-            cache.set(cache_key, result, timeout=1800)  # Cache for 30 minutes
-            
             duration = time.time() - start_time
             logger.info(f"Performance prediction generated for {student_id}/{course_id} in {duration:.2f}s")
             
@@ -172,6 +162,94 @@ def academic_performance_prediction(request):
             'message': 'Method not allowed'
         }, status=405)
 
+@csrf_exempt
+def batch_performance_prediction(request):
+    """
+    Batch Academic Performance Prediction endpoint
+    POST /api/v1/ai/performance-prediction/batch/
+    
+    Body is either {"pairs": [{"student_id": ..., "course_id": ...}, ...]} or
+    {"student_ids": [...]} to score every active enrollment of those students.
+    """
+    if request.method == 'POST':
+        start_time = time.time()
+        
+        try:
+            # Check for authorization header
+            auth_header = request.META.get('HTTP_AUTHORIZATION')
+            if not auth_header:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Authorization header is required'
+                }, status=401)
+            
+            # Verify JWT token
+            user_info = verify_jwt_token(auth_header)
+            if not user_info:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Invalid or expired token'
+                }, status=401)
+            
+            # Parse request data
+            data = json.loads(request.body)
+            pairs = data.get('pairs')
+            student_ids = data.get('student_ids')
+            
+            if pairs is not None:
+                if not isinstance(pairs, list) or not all(
+                    isinstance(pair, dict) and pair.get('student_id') and pair.get('course_id') for pair in pairs
+                ):
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'pairs must be a list of objects with student_id and course_id'
+                    }, status=400)
+                pairs = [(pair['student_id'], pair['course_id']) for pair in pairs]
+            elif isinstance(student_ids, list) and student_ids:
+                from courses.models import Enrollment
+                pairs = list(
+                    Enrollment.objects
+                    .filter(student_id__in=[str(student_id) for student_id in student_ids], status='active')
+                    .values_list('student_id', 'course_id')
+                    .distinct()
+                )
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'pairs or student_ids is required'
+                }, status=400)
+            
+            from .model_server import MAX_BATCH_SIZE
+            if len(pairs) > MAX_BATCH_SIZE:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'At most {MAX_BATCH_SIZE} pairs can be scored per request'
+                }, status=400)
+            
+            result = ai_service.predict_academic_performance_batch(pairs)
+            
+            duration = time.time() - start_time
+            logger.info(f"Batch performance prediction for {len(pairs)} pairs in {duration:.3f}s")
+            
+            return JsonResponse(result)
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON data'
+            }, status=400)
+        except Exception as e:
+            logger.error(f"Error in batch_performance_prediction: {str(e)}")
+            return JsonResponse({
+                'success': False,
+                'message': 'Internal server error'
+            }, status=500)
+    else:
+        return JsonResponse({
+            'success': False,
+            'message': 'Method not allowed'
+        }, status=405)
+
 @csrf_exempt
 def ai_search(request):
     """
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Warm-up Module for Digital Campus AI Services
+
+The AI modules import NumPy, pandas, scikit-learn and NLTK and load trained
+models on first use, so Django workers that never serve AI traffic don't pay
+for them. Workers that do serve AI traffic can pay that cost up front instead,
+either with the AI_WARMUP setting (checked when the app is ready) or by
+calling warm_up() from a server hook.
+"""
+
+import time
+from typing import Dict
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Import the heavy AI dependencies and create the shared AI instances.
+
+    Returns:
+        Seconds spent on each step, in the order they ran
+    """
+    from .ai_service import ai_service
+    from .model_server import get_performance_model_server
+
+    def load_recommendation_engine():
+        from .recommendation_engine import get_recommendation_engine
+        from .feature_extraction import get_feature_extractor
+        get_feature_extractor()
+        get_recommendation_engine().feature_store
+
+    def load_content_recommender():
+        from .content_filtering import get_content_recommender
+        import sklearn.feature_extraction.text  # noqa: F401
+        import sklearn.metrics.pairwise  # noqa: F401
+        get_content_recommender()
+
+    def load_text_processor():
+        from .text_processing import get_text_processor
+        get_text_processor()
+
+    steps = [
+        ('recommendation_model', lambda: ai_service.recommendation_model),
+        ('performance_model', lambda: get_performance_model_server().model_version()),
+        ('recommendation_engine', load_recommendation_engine),
+        ('content_recommender', load_content_recommender),
+        ('text_processor', load_text_processor),
+    ]
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = time.perf_counter() - start
+    return timings
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AssignmentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'assignments'
+    
+    def ready(self):
+        # Import signal handlers that keep the cached grade statistics fresh
+        import assignments.signals
@@ -0,0 +1,168 @@
+"""
+Grade statistics engine for assignments.
+
+Scores are grades as a percentage of their maximum points. On PostgreSQL the
+count, mean, standard deviation, extremes, percentiles (percentile_cont) and a
+fixed-bin histogram (width_bucket) of any number of assignments come from a
+single query; other databases (SQLite in tests) fetch the scores and compute
+the same statistics with NumPy.
+
+Statistics are cached per assignment and dropped when one of its grades is
+written (see assignments.signals).
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from .models import Grade
+
+# Percentiles reported for every assignment
+PERCENTILES = [10, 25, 50, 75, 90]
+
+# Histogram bins spanning 0-100%; scores outside the range (e.g., extra
+# credit) are counted in the first or last bin
+DEFAULT_BINS = 10
+MAX_BINS = 100
+
+LETTER_GRADES = ['A', 'B', 'C', 'D', 'F']
+
+STATISTICS_CACHE_TIMEOUT = 3600
+
+STATISTICS_SQL = """
+    WITH scores AS (
+        SELECT assignment_id, letter_grade, (value * 100.0 / max_points)::float8 AS score
+        FROM {table}
+        WHERE assignment_id = ANY(%(assignment_ids)s) AND max_points > 0
+    ),
+    buckets AS (
+        SELECT assignment_id, GREATEST(1, LEAST(%(bins)s, width_bucket(score, 0, 100, %(bins)s))) AS bucket,
+               COUNT(*) AS bucket_count
+        FROM scores
+        GROUP BY 1, 2
+    )
+    SELECT s.assignment_id, COUNT(*), AVG(s.score), STDDEV_POP(s.score), MIN(s.score), MAX(s.score),
+           percentile_cont(%(fractions)s::float8[]) WITHIN GROUP (ORDER BY s.score),
+           (SELECT array_agg(ARRAY[b.bucket, b.bucket_count]) FROM buckets b WHERE b.assignment_id = s.assignment_id),
+           {letters}
+    FROM scores s
+    GROUP BY s.assignment_id
+"""
+
+def cache_key(assignment_id):
+    return f'grade_statistics:{assignment_id}'
+
+def bin_labels(bins):
+    """Labels of the histogram bins, e.g. '0-10', ..., '90-100'"""
+    width = 100 / bins
+    return [f'{i * width:g}-{(i + 1) * width:g}' for i in range(bins)]
+
+def empty_statistics(bins):
+    return {
+        'count': 0,
+        'mean': 0.0,
+        'std_dev': 0.0,
+        'min': 0.0,
+        'max': 0.0,
+        'percentiles': {str(p): 0.0 for p in PERCENTILES},
+        'histogram': [{'range': label, 'count': 0} for label in bin_labels(bins)],
+        'letter_grades': {letter: 0 for letter in LETTER_GRADES},
+    }
+
+def build_statistics(count, mean, std_dev, minimum, maximum, percentiles, bin_counts, letter_counts, bins):
+    """Statistics of one assignment, rounded the way the API reports them"""
+    return {
+        'count': count,
+        'mean': round(mean, 2),
+        'std_dev': round(std_dev or 0.0, 2),
+        'min': round(minimum, 2),
+        'max': round(maximum, 2),
+        'percentiles': {str(p): round(value, 2) for p, value in zip(PERCENTILES, percentiles)},
+        'histogram': [
+            {'range': label, 'count': bin_counts.get(i + 1, 0)}
+            for i, label in enumerate(bin_labels(bins))
+        ],
+        'letter_grades': dict(zip(LETTER_GRADES, letter_counts)),
+    }
+
+def _query_statistics(assignment_ids, bins):
+    """Statistics of the assignments in one PostgreSQL query"""
+    letters = ', '.join(f"COUNT(*) FILTER (WHERE s.letter_grade = '{letter}')" for letter in LETTER_GRADES)
+    sql = STATISTICS_SQL.format(table=connection.ops.quote_name(Grade._meta.db_table), letters=letters)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {
+            'assignment_ids': list(assignment_ids),
+            'bins': bins,
+            'fractions': [p / 100 for p in PERCENTILES],
+        })
+        rows = cursor.fetchall()
+
+    statistics = {}
+    for assignment_id, count, mean, std_dev, minimum, maximum, percentiles, buckets, *letter_counts in rows:
+        bin_counts = {bucket: bucket_count for bucket, bucket_count in buckets or []}
+        statistics[assignment_id] = build_statistics(
+            count, mean, std_dev, minimum, maximum, percentiles, bin_counts, letter_counts, bins
+        )
+    return statistics
+
+def _compute_statistics(assignment_ids, bins):
+    """Statistics of the assignments computed from their scores with NumPy"""
+    import numpy as np
+
+    scores = {}
+    letters = {}
+    grades = Grade.objects.filter(assignment_id__in=assignment_ids, max_points__gt=0)
+    for assignment_id, value, max_points, letter_grade in grades.values_list(
+            'assignment_id', 'value', 'max_points', 'letter_grade'):
+        scores.setdefault(assignment_id, []).append(float(value) * 100 / float(max_points))
+        letters.setdefault(assignment_id, []).append(letter_grade)
+
+    statistics = {}
+    for assignment_id, values in scores.items():
+        values = np.array(values)
+        # Same buckets as width_bucket, with out of range scores in the end bins
+        buckets = np.clip(np.floor(values * bins / 100).astype(int) + 1, 1, bins)
+        bin_counts = dict(zip(*(array.tolist() for array in np.unique(buckets, return_counts=True))))
+        letter_counts = [letters[assignment_id].count(letter) for letter in LETTER_GRADES]
+        statistics[assignment_id] = build_statistics(
+            len(values), float(values.mean()), float(values.std()), float(values.min()), float(values.max()),
+            np.percentile(values, PERCENTILES).tolist(), bin_counts, letter_counts, bins
+        )
+    return statistics
+
+def assignment_statistics(assignment_ids, bins=DEFAULT_BINS):
+    """Grade statistics of each assignment, keyed by assignment ID
+
+    Cached statistics are reused; the rest are computed together in one query.
+    Assignments without scored grades get empty statistics.
+    """
+    if not 1 <= bins <= MAX_BINS:
+        raise ValueError(f'bins must be between 1 and {MAX_BINS}')
+
+    assignment_ids = list(dict.fromkeys(assignment_ids))
+    cached = cache.get_many([cache_key(assignment_id) for assignment_id in assignment_ids])
+
+    # Each assignment's cache entry holds its statistics by number of bins
+    statistics = {}
+    missing = []
+    for assignment_id in assignment_ids:
+        entry = cached.get(cache_key(assignment_id), {})
+        if bins in entry:
+            statistics[assignment_id] = entry[bins]
+        else:
+            missing.append(assignment_id)
+
+    if missing:
+        compute = _query_statistics if connection.vendor == 'postgresql' else _compute_statistics
+        computed = compute(missing, bins)
+        entries = {}
+        for assignment_id in missing:
+            statistics[assignment_id] = computed.get(assignment_id) or empty_statistics(bins)
+            entry = cached.get(cache_key(assignment_id), {})
+            entries[cache_key(assignment_id)] = {**entry, bins: statistics[assignment_id]}
+        cache.set_many(entries, timeout=STATISTICS_CACHE_TIMEOUT)
+
+    return statistics
+
+def invalidate_statistics(assignment_id):
+    """Drop an assignment's cached statistics"""
+    if assignment_id:
+        cache.delete(cache_key(assignment_id))
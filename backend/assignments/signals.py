@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .grade_statistics import invalidate_statistics
+from .models import Grade
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def invalidate_grade_statistics(sender, instance, **kwargs):
+    """Drop the cached statistics of the grade's assignment"""
+    if kwargs.get('raw'):
+        return
+    invalidate_statistics(instance.assignment_id)
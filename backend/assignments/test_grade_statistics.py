@@ -0,0 +1,99 @@
+"""
+Tests for the grade statistics engine
+"""
+
+import json
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from faculty.assignment_views import calculate_grade_statistics
+from users.models import Faculty
+from .grade_statistics import _compute_statistics, _query_statistics, assignment_statistics
+from .models import Assignment, Grade
+
+User = get_user_model()
+
+
+class GradeStatisticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        for assignment_id in ('HW1', 'HW2', 'HW3'):
+            Assignment.objects.create(
+                id=assignment_id, course_id='CS101', title=assignment_id, description='', due_date=now,
+                points=50, type='homework', start_date=now, allow_late_submission=False, late_penalty=0,
+                max_submissions=1, visible_to_students=True, weight=1
+            )
+        # HW1 scores 20, 40, 60, 80, 100 and 110% (extra credit); HW2 a single 45%
+        for n, value in enumerate([10, 20, 30, 40, 50, 55]):
+            Grade.objects.create(id=f'g{n}', student_id=f'STU{n}', course_id='CS101', assignment_id='HW1',
+                                 value=value, max_points=50, letter_grade='ABCDFA'[n], weight=1)
+        Grade.objects.create(id='h0', student_id='STU0', course_id='CS101', assignment_id='HW2',
+                             value=45, max_points=100, letter_grade='F', weight=1)
+        # Grades without maximum points have no score
+        Grade.objects.create(id='h1', student_id='STU1', course_id='CS101', assignment_id='HW2',
+                             value=5, max_points=0, weight=1)
+
+    def test_statistics_of_many_assignments(self):
+        statistics = assignment_statistics(['HW1', 'HW2', 'HW3'], bins=5)
+
+        hw1 = statistics['HW1']
+        self.assertEqual(hw1['count'], 6)
+        self.assertEqual(hw1['mean'], 68.33)
+        self.assertEqual(hw1['std_dev'], 31.84)
+        self.assertEqual((hw1['min'], hw1['max']), (20.0, 110.0))
+        self.assertEqual(hw1['percentiles'], {'10': 30.0, '25': 45.0, '50': 70.0, '75': 95.0, '90': 105.0})
+        # 100% and 110% both fall in the last bin
+        self.assertEqual([(b['range'], b['count']) for b in hw1['histogram']],
+                         [('0-20', 0), ('20-40', 1), ('40-60', 1), ('60-80', 1), ('80-100', 3)])
+        self.assertEqual(hw1['letter_grades'], {'A': 2, 'B': 1, 'C': 1, 'D': 1, 'F': 1})
+
+        self.assertEqual(statistics['HW2']['count'], 1)
+        self.assertEqual(statistics['HW2']['percentiles']['50'], 45.0)
+        self.assertEqual(statistics['HW3']['count'], 0)
+        self.assertEqual(len(statistics['HW3']['histogram']), 5)
+
+        with self.assertRaises(ValueError):
+            assignment_statistics(['HW1'], bins=0)
+
+    def test_cached_until_a_grade_is_written(self):
+        assignment_statistics(['HW1', 'HW2'])
+        with self.assertNumQueries(0):
+            self.assertEqual(assignment_statistics(['HW1'])['HW1']['count'], 6)
+
+        Grade.objects.create(id='g9', student_id='STU9', course_id='CS101', assignment_id='HW1',
+                             value=0, max_points=50, weight=1)
+        with self.assertNumQueries(1):
+            statistics = assignment_statistics(['HW1', 'HW2'])
+        self.assertEqual(statistics['HW1']['count'], 7)
+
+        Grade.objects.get(id='g9').delete()
+        self.assertEqual(assignment_statistics(['HW1'])['HW1']['count'], 6)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'percentile_cont and width_bucket need PostgreSQL')
+    def test_query_matches_the_numpy_fallback(self):
+        self.assertEqual(_query_statistics(['HW1', 'HW2'], 7), _compute_statistics(['HW1', 'HW2'], 7))
+
+    def test_statistics_view(self):
+        user = User.objects.create_user(username='faculty', password='pw', role='faculty', mfa_enabled=False)
+        faculty = Faculty.objects.create(user=user, employee_id='FAC001')
+        Course.objects.create(id='CS101', code='CS101', name='CS', description='', credits=3, instructor_id='FAC001',
+                              department='CSE', enrollment_limit=30, start_date='2026-09-01', end_date='2026-12-15')
+        Enrollment.objects.create(id='e1', student_id='STU0', course_id='CS101')
+
+        request = RequestFactory().get('/', {'bins': '4'})
+        request.faculty = faculty
+        data = json.loads(calculate_grade_statistics(request, 'HW1').content)['data']
+        self.assertEqual(data['total_grades'], 6)
+        self.assertEqual(data['median_percentage'], 70.0)
+        self.assertEqual([b['range'] for b in data['histogram']], ['0-25', '25-50', '50-75', '75-100'])
+
+        request = RequestFactory().get('/', {'bins': '1000'})
+        request.faculty = faculty
+        self.assertEqual(calculate_grade_statistics(request, 'HW1').status_code, 400)
@@ -191,6 +191,26 @@ REDIS_CONFIG = {
     'RETRY_ON_TIMEOUT': False,
 }
 
+# Backend of the faculty modal session and form draft store: 'redis' (shared
+# by all workers; falls back to 'local' when Redis is unreachable) or 'local'
+FACULTY_SESSION_STORE = os.getenv('FACULTY_SESSION_STORE', 'redis')
+
+# Event bus of the server-push stream: 'redis' (across workers) or 'memory'
+EVENT_BUS = os.getenv('EVENT_BUS', 'redis')
+
+# Threads verifying password hashes for async logins (users.login_service)
+LOGIN_HASH_WORKERS = int(os.getenv('LOGIN_HASH_WORKERS', '4'))
+
+# Search backend (search_service): 'auto' uses Typesense while it is healthy
+# and the local SQLite index otherwise; 'typesense' or 'local' force one.
+# Unless 'local', indexing changes stay in the outbox until Typesense takes them
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+SEARCH_INDEX_PATH = os.getenv('SEARCH_INDEX_PATH', str(BASE_DIR / 'search_index.sqlite3'))
+
+# AI services load NumPy, pandas, scikit-learn, NLTK and trained models on first
+# use. Set AI_WARMUP=True for workers that serve AI traffic to load them at startup.
+AI_WARMUP = os.getenv('AI_WARMUP', 'False') == 'True'
+
 
 # Create logs directory if it doesn't exist
 import os as _os
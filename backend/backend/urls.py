@@ -20,6 +20,7 @@ from django.urls import path, include
 api_v1_patterns = ([
     path('ai/', include('ai_service.urls')),
     path('auth/', include('users.urls')),
+    path('events/', include('communications.urls')),
     path('faculty/', include('faculty.urls')),
     path('admin/', include('admin_dashboard.urls')),
     path('library/', include('library_staff.urls')),
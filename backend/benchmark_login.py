@@ -0,0 +1,110 @@
+"""
+Login Benchmark Script
+Measures login throughput of the previous login path (two lookups, two hash
+checks, full save) against LoginService, sequentially and through the hash pool
+Run with: python benchmark_login.py [--users N] [--logins N] [--workers N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+from asgiref.sync import sync_to_async  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.hashers import check_password, make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from users.login_service import LoginService  # noqa: E402
+from users.models import User  # noqa: E402
+
+PASSWORD = 'benchmark-password'
+
+
+def create_users(count):
+    """Users sharing one password hash, so setup doesn't hash count times"""
+    encoded = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f'bench{i}', email=f'bench{i}@example.com', password=encoded, role='student',
+             mfa_enabled=False)
+        for i in range(count)
+    ])
+
+
+def previous_login(identifier):
+    """The login path before LoginService"""
+    user = None
+    if '@' in identifier:
+        try:
+            user = User.objects.get(email=identifier)
+        except User.DoesNotExist:
+            pass
+    if not user:
+        try:
+            user = User.objects.get(username=identifier)
+        except User.DoesNotExist:
+            pass
+    check_password(PASSWORD, user.password)
+    if user and check_password(PASSWORD, user.password) and user.status == 'active':
+        user.last_login = timezone.now()
+        user.save()
+    return user
+
+
+def service_login(identifier):
+    user, error = LoginService.authenticate(identifier, PASSWORD)
+    if error is None:
+        LoginService.record_login(user)
+    return user
+
+
+async def pooled_logins(identifiers):
+    """Concurrent logins with hash verification in the pool, the way an async worker runs them"""
+    async def login(identifier):
+        user, error = await LoginService.authenticate_async(identifier, PASSWORD)
+        if error is None:
+            await sync_to_async(LoginService.record_login)(user)
+
+    await asyncio.gather(*(login(identifier) for identifier in identifiers))
+
+
+def measure(label, run, logins):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {logins / elapsed:8.1f} logins/s  ({elapsed * 1000 / logins:.1f} ms per login)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=200, help='number of users to create')
+    parser.add_argument('--logins', type=int, default=50, help='number of logins per measurement')
+    parser.add_argument('--workers', type=int, default=4, help='hash pool threads')
+    args = parser.parse_args()
+    settings.LOGIN_HASH_WORKERS = args.workers
+
+    # Work on a throwaway test database
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        create_users(args.users)
+        identifiers = [f'bench{i % args.users}@example.com' for i in range(args.logins)]
+
+        measure('previous login path', lambda: [previous_login(i) for i in identifiers], args.logins)
+        measure('LoginService', lambda: [service_login(i) for i in identifiers], args.logins)
+        measure(f'LoginService, {args.workers} hash threads', lambda: asyncio.run(pooled_logins(identifiers)),
+                args.logins)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
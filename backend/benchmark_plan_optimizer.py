@@ -0,0 +1,86 @@
+"""
+Plan Optimizer Benchmark Script
+Plans a synthetic 120-credit program of 60 courses and reports the search time,
+the number of terms against the lower bound and the search nodes explored
+Run with: python benchmark_plan_optimizer.py [--programs N] [--credit-cap C] [--summer]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from courses.plan_optimizer import PlanCourse, optimize_plan  # noqa: E402
+
+# Credits of the program's courses: 20 lectures of 3 credits, 20 seminars of
+# 2 credits and 20 labs of 1 credit make up 120 credits
+COURSE_CREDITS = [3] * 20 + [2] * 20 + [1] * 20
+
+
+def build_program(seed):
+    """A random 60-course program over five levels, with its catalog and requirements"""
+    rng = random.Random(seed)
+    credits = COURSE_CREDITS[:]
+    rng.shuffle(credits)
+
+    catalog = {}
+    codes = []
+    for i, course_credits in enumerate(credits):
+        level = i * 5 // len(credits)
+        code = f'PRG{level + 1}{i:02d}'
+        earlier = [c for c in codes if int(c[3]) < level + 1]
+        prerequisites = rng.sample(earlier, min(len(earlier), rng.choice([0, 1, 1, 2, 2, 3]))) if earlier else []
+        seasons = None
+        if rng.random() < 0.2:
+            seasons = [rng.choice(['Spring', 'Fall'])]
+        catalog[code] = PlanCourse(code, course_credits, name=f'Course {i}', department='Program',
+                                   prerequisites=prerequisites, seasons=seasons)
+        codes.append(code)
+
+    # Labs are corequisites of a lecture at their level
+    for code in codes:
+        if catalog[code].credits == 1:
+            lectures = [c for c in codes if c[3] == code[3] and catalog[c].credits == 3]
+            if lectures:
+                catalog[rng.choice(lectures)].corequisites.add(code)
+
+    requirements = {
+        'total_credits': 120,
+        'categories': {
+            'Core': {'credits_required': 60, 'course_codes': codes[:30]},
+            'Program': {'credits_required': 60, 'course_codes': codes[30:]},
+        }
+    }
+    return catalog, requirements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--programs', type=int, default=20, help='number of random programs to plan')
+    parser.add_argument('--credit-cap', type=int, default=18, help='most credits per term')
+    parser.add_argument('--summer', action='store_true', help='plan summer terms too')
+    args = parser.parse_args()
+
+    durations = []
+    optimal = 0
+    for seed in range(args.programs):
+        catalog, requirements = build_program(seed)
+        start = time.perf_counter()
+        plan = optimize_plan(catalog, requirements, start=('Fall', 2026), include_summer=args.summer,
+                             credit_cap=args.credit_cap)
+        durations.append(time.perf_counter() - start)
+        optimal += plan['optimal']
+        print(f"program {seed:2d}: {plan['terms_needed']} terms (lower bound {plan['lower_bound']}), "
+              f"{plan['credits_planned']} credits, {plan['search_nodes']} nodes, "
+              f"{'optimal' if plan['optimal'] else 'best found'}, {durations[-1] * 1000:.1f} ms")
+
+    print(f"\n{args.programs} programs: median {statistics.median(durations) * 1000:.1f} ms, "
+          f"max {max(durations) * 1000:.1f} ms, {optimal} proven optimal")
+
+
+if __name__ == '__main__':
+    main()
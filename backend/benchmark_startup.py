@@ -0,0 +1,97 @@
+"""
+Startup Benchmark Script
+Measures `manage.py check` time and the memory of a freshly booted worker
+Run with: python benchmark_startup.py [--runs N] [--warm]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; RSS is left out there
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ['numpy', 'pandas', 'sklearn', 'nltk', 'scipy']
+
+# Boots the WSGI application and resolves every URL pattern, which imports all
+# views the way a worker does before serving its first request
+WORKER_BOOT = """
+import json, sys, time
+try:
+    import resource
+except ImportError:
+    resource = None
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+start = time.perf_counter()
+from backend.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+booted = time.perf_counter() - start
+result = {'boot_seconds': booted,
+          'rss_mb': rss_mb(),
+          'heavy_modules': [m for m in %(heavy)r if m in sys.modules]}
+if %(warm)r:
+    from ai_service.warmup import warm_up
+    start = time.perf_counter()
+    warm_up()
+    result['warm_seconds'] = time.perf_counter() - start
+    result['warm_rss_mb'] = rss_mb()
+print(json.dumps(result))
+"""
+
+
+def time_check(runs):
+    """Run `manage.py check` several times and return (median seconds, peak child RSS in MB or None)."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'manage.py', 'check'], cwd=BACKEND_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024 if resource else None
+    return statistics.median(durations), peak_rss
+
+
+def format_rss(label, mb):
+    """The RSS part of a result line, empty where it can't be measured."""
+    return f"{label} {mb:.0f} MB" if mb is not None else ''
+
+
+def boot_worker(warm):
+    """Boot one worker in a fresh interpreter and return its measurements."""
+    env = dict(os.environ, AI_WARMUP='False')
+    output = subprocess.run([sys.executable, '-c', WORKER_BOOT % {'heavy': HEAVY_MODULES, 'warm': warm}],
+                            cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Django startup time and worker memory')
+    parser.add_argument('--runs', type=int, default=5, help='Number of `manage.py check` runs')
+    parser.add_argument('--warm', action='store_true', help='Also measure an AI warm-up after boot')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+    check_seconds, check_rss = time_check(args.runs)
+    print(f"manage.py check: {check_seconds:.2f}s median over {args.runs} runs{format_rss(', peak RSS', check_rss)}")
+
+    worker = boot_worker(args.warm)
+    print(f"worker boot:     {worker['boot_seconds']:.2f}s{format_rss(', RSS', worker['rss_mb'])}")
+    print(f"heavy modules loaded at boot: {', '.join(worker['heavy_modules']) or 'none'}")
+    if args.warm:
+        print(f"AI warm-up:      {worker['warm_seconds']:.2f}s{format_rss(', RSS', worker['warm_rss_mb'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CommunicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communications'
+
+    def ready(self):
+        # Import signal handlers that push changes to the event stream and
+        # maintain the calendar occurrences
+        import communications.signals
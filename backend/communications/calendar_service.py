@@ -0,0 +1,464 @@
+"""
+Calendar query engine: recurrence expansion and occurrence range queries.
+
+CalendarEvents and course meetings (the Course.schedule slots, weekly from
+the course's start date to its end date) are expanded into
+CalendarOccurrence rows within the horizon: from HORIZON_PAST_DAYS ago to
+HORIZON_DAYS ahead (CalendarHorizon). Each occurrence has a
+CalendarAttendance row per attendee: the event's attendees (EventAttendee)
+and the course instructor. Range queries are index range scans:
+
+- a user's calendar: (user_id, start_datetime) of CalendarAttendance, and
+  for students (course_id, start_datetime) of their courses' occurrences
+- a course's calendar: (course_id, start_datetime) of CalendarOccurrence
+
+Saving or deleting an event or a course re-materializes its occurrences
+(see communications.signals). The horizon is created, and everything in it
+expanded, on first use; `migrate` does this right after the calendar tables
+are created. `manage.py materialize_calendar`, run daily (the scheduler
+service in docker-compose.yml), moves the horizon forward, expanding only
+the days it adds.
+
+Recurrence is RRULE-style, either a string such as
+'RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;UNTIL=20261215T000000Z' or an
+object such as {"frequency": "weekly", "interval": 2, "by_day": ["MO", "WE"],
+"until": "2026-12-15", "count": 10}, with the frequency DAILY, WEEKLY,
+MONTHLY or YEARLY. Queries return occurrences starting in the range.
+"""
+
+import calendar
+import json
+import re
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from courses.models import Course, Enrollment
+from users.models import Faculty, Student
+from .models import CalendarAttendance, CalendarEvent, CalendarHorizon, CalendarOccurrence
+
+HORIZON_NAME = 'occurrences'
+HORIZON_PAST_DAYS = 30
+HORIZON_DAYS = 180
+# Occurrences of one series materialized at most (bounds malformed rules)
+MAX_OCCURRENCES = 2000
+DEFAULT_MEETING_MINUTES = 90
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+# Letters of schedules such as 'MWF' or 'TTh'
+DAY_LETTERS = {'M': 0, 'T': 1, 'Tu': 1, 'W': 2, 'R': 3, 'Th': 3, 'F': 4, 'S': 5, 'Sa': 5, 'U': 6, 'Su': 6}
+TIME_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*([AaPp][Mm])?')
+
+
+def _local(value):
+    """Naive local datetime of an aware one"""
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _aware(value):
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _date(value):
+    """A date of a DateField value, which is a string on instances not read from the database"""
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def _parse_until(value):
+    """End of a recurrence's UNTIL, as an aware datetime"""
+    if not value:
+        return None
+    value = str(value)
+    if re.fullmatch(r'\d{8}', value):
+        parsed = datetime.strptime(value, '%Y%m%d').date()
+    elif re.fullmatch(r'\d{8}T\d{6}Z?', value):
+        parsed = datetime.strptime(value[:15], '%Y%m%dT%H%M%S')
+        if value.endswith('Z'):
+            return parsed.replace(tzinfo=dt_timezone.utc)
+    elif re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        parsed = parse_date(value)
+    else:
+        parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Invalid UNTIL: {value}')
+    if not isinstance(parsed, datetime):
+        # A date includes the whole day
+        parsed = datetime.combine(parsed, time.max)
+    return _aware(parsed)
+
+
+class Recurrence:
+    """An RRULE-style recurrence rule"""
+
+    def __init__(self, frequency, interval=1, count=None, until=None, by_day=None):
+        if frequency not in FREQUENCIES:
+            raise ValueError(f'Unsupported frequency: {frequency}')
+        self.frequency = frequency
+        self.interval = max(int(interval or 1), 1)
+        self.count = int(count) if count else None
+        self.until = until
+        # Weekdays (0 is Monday) of weekly rules
+        self.by_day = sorted(set(by_day)) if by_day else None
+
+    def _periods(self, first, skip_to):
+        """Index of the first period (day, week, month or year) that can reach skip_to"""
+        if skip_to is None or self.count is not None or skip_to <= first:
+            return 0
+        if self.frequency == 'DAILY':
+            elapsed = (skip_to.date() - first.date()).days
+        elif self.frequency == 'WEEKLY':
+            elapsed = (skip_to.date() - first.date()).days // 7
+        elif self.frequency == 'MONTHLY':
+            elapsed = (skip_to.year - first.year) * 12 + skip_to.month - first.month
+        else:
+            elapsed = skip_to.year - first.year
+        return max(elapsed // self.interval - 1, 0)
+
+    def _candidates(self, first, skip_to=None):
+        """Local start times of the series, in order (unbounded)"""
+        day, at = first.date(), first.time()
+        period = self._periods(first, skip_to)
+        if self.frequency == 'WEEKLY':
+            weekdays = self.by_day or [day.weekday()]
+            week_start = day - timedelta(days=day.weekday())
+        while True:
+            if self.frequency == 'DAILY':
+                yield datetime.combine(day + timedelta(days=period * self.interval), at)
+            elif self.frequency == 'WEEKLY':
+                week = week_start + timedelta(weeks=period * self.interval)
+                for weekday in weekdays:
+                    candidate = week + timedelta(days=weekday)
+                    if candidate >= day:
+                        yield datetime.combine(candidate, at)
+            else:
+                months = day.month - 1 + period * self.interval * (12 if self.frequency == 'YEARLY' else 1)
+                year, month = day.year + months // 12, months % 12 + 1
+                # Months (or Februaries) without the day are skipped
+                if day.day <= calendar.monthrange(year, month)[1]:
+                    yield datetime.combine(date(year, month, day.day), at)
+            period += 1
+
+    def occurrences(self, start, window_start, window_end):
+        """Start times of the series beginning at start that fall in [window_start, window_end)"""
+        first = _local(start)
+        counted = 0
+        for candidate in self._candidates(first, _local(window_start)):
+            occurrence = timezone.make_aware(candidate)
+            if self.until is not None and occurrence > self.until:
+                return
+            if self.count is not None and counted >= self.count:
+                return
+            counted += 1
+            if occurrence >= window_end or counted > MAX_OCCURRENCES:
+                return
+            if occurrence >= window_start:
+                yield occurrence
+
+
+def _weekdays(value):
+    """Weekdays (0 is Monday) of BYDAY codes, names or schedule letters"""
+    if isinstance(value, str):
+        value = re.split(r'[\s,/;&]+', value)
+    day_names = [name[:3].lower() for name in WEEKDAY_NAMES]
+    weekdays = []
+    for token in value or []:
+        token = str(token).strip()
+        code = re.fullmatch(r'[+-]?\d*(MO|TU|WE|TH|FR|SA|SU)', token.upper())
+        if code:
+            # RRULE codes; ordinals ('1MO') are ignored
+            weekdays.append(WEEKDAY_CODES.index(code.group(1)))
+        elif len(token) >= 3 and token[:3].lower() in day_names:
+            weekdays.append(day_names.index(token[:3].lower()))
+        else:
+            # Letters such as 'MWF' or 'TTh'
+            weekdays.extend(DAY_LETTERS[letters] for letters in re.findall(r'Th|Tu|Sa|Su|[MTWRFSU]', token))
+    return sorted(set(weekdays))
+
+
+def parse_recurrence(value):
+    """The Recurrence of a CalendarEvent.recurrence value, or None if it doesn't repeat"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('{'):
+            return parse_recurrence(json.loads(value))
+        fields = dict(
+            part.split('=', 1) for part in value.split(':', 1)[-1].split(';') if '=' in part
+        )
+        fields = {key.upper(): field for key, field in fields.items()}
+        if not fields.get('FREQ'):
+            return None
+        return Recurrence(fields['FREQ'].upper(), fields.get('INTERVAL'), fields.get('COUNT'),
+                          _parse_until(fields.get('UNTIL')), _weekdays(fields.get('BYDAY', '').split(',')))
+    if isinstance(value, dict):
+        frequency = str(value.get('frequency') or value.get('freq') or '').upper()
+        if frequency in ('', 'NONE', 'ONCE'):
+            return None
+        by_day = value.get('by_day') or value.get('byday') or value.get('days')
+        return Recurrence(frequency, value.get('interval'), value.get('count'), _parse_until(value.get('until')),
+                          _weekdays(by_day) if by_day else None)
+    raise ValueError(f'Invalid recurrence: {value!r}')
+
+
+def _time(match):
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2)), (match.group(3) or '').lower()
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    return time(hour, minute)
+
+
+def _minutes(duration):
+    """Minutes of a duration such as '1.5 hours', '90 minutes' or 1.5 (hours)"""
+    if isinstance(duration, (int, float)):
+        return int(duration * 60)
+    match = re.match(r'\s*(\d+(?:\.\d+)?)\s*(m|min|minutes?|h|hrs?|hours?)?', str(duration or ''))
+    if not match:
+        return DEFAULT_MEETING_MINUTES
+    amount = float(match.group(1))
+    return int(amount if (match.group(2) or 'h').startswith('m') else amount * 60)
+
+
+def parse_meeting(slot):
+    """(weekdays, start time, minutes) of a Course.schedule slot, or None if it has no day and time"""
+    if not isinstance(slot, dict):
+        return None
+    weekdays = _weekdays(slot.get('day') or slot.get('days') or '')
+    start, end = slot.get('start') or slot.get('start_time'), slot.get('end') or slot.get('end_time')
+    times = [TIME_PATTERN.search(str(value)) for value in (start, end) if value]
+    if not times:
+        times = list(TIME_PATTERN.finditer(str(slot.get('time') or '')))
+    times = [match for match in times if match]
+    if not weekdays or not times:
+        return None
+    start = _time(times[0])
+    if len(times) > 1:
+        end = _time(times[1])
+        minutes = (end.hour * 60 + end.minute) - (start.hour * 60 + start.minute)
+    else:
+        minutes = _minutes(slot.get('duration'))
+    return weekdays, start, minutes if minutes > 0 else DEFAULT_MEETING_MINUTES
+
+
+def format_duration(minutes):
+    return f'{minutes / 60:g} hours'
+
+
+class CalendarService:
+    """Materialization and range queries of calendar occurrences"""
+
+    @staticmethod
+    def horizon():
+        """The materialization window, created (and everything in it expanded) on first use"""
+        now = timezone.now()
+        with transaction.atomic():
+            horizon, created = CalendarHorizon.objects.get_or_create(name=HORIZON_NAME, defaults={
+                'start': now - timedelta(days=HORIZON_PAST_DAYS), 'end': now + timedelta(days=HORIZON_DAYS),
+            })
+            if created:
+                CalendarService._materialize_all(horizon.start, horizon.end)
+        return horizon
+
+    @staticmethod
+    def event_occurrences(event, window_start, window_end, instructors=None):
+        """(occurrence, attendee IDs) pairs of a CalendarEvent in a window"""
+        recurrence = parse_recurrence(event.recurrence)
+        if recurrence is None:
+            starts = [event.start_datetime] if window_start <= event.start_datetime < window_end else []
+        else:
+            starts = recurrence.occurrences(event.start_datetime, window_start, window_end)
+        attendees = [attendee.member_id for attendee in event.event_attendees.all()]
+        if event.course_id:
+            if instructors is None:
+                instructors = CalendarService.instructor_users([event.course_id])
+            attendees.append(instructors.get(event.course_id))
+        attendees = [user_id for user_id in dict.fromkeys(attendees) if user_id]
+        duration = event.end_datetime - event.start_datetime
+        return [
+            (CalendarOccurrence(event_id=event.id, course_id=event.course_id or '', title=event.title,
+                                location=event.location, type=event.type, start_datetime=start,
+                                end_datetime=start + duration), attendees)
+            for start in starts
+        ]
+
+    @staticmethod
+    def course_occurrences(course, window_start, window_end, instructors=None):
+        """(occurrence, attendee IDs) pairs of a course's meetings in a window"""
+        if instructors is None:
+            instructors = CalendarService.instructor_users([course.id])
+        attendees = [instructors[course.id]] if instructors.get(course.id) else []
+        start_date, end_date = _date(course.start_date), _date(course.end_date)
+        pairs = []
+        for slot_index, slot in enumerate(course.schedule if isinstance(course.schedule, list) else []):
+            meeting = parse_meeting(slot)
+            if meeting is None or not start_date or not end_date:
+                continue
+            weekdays, start_time, minutes = meeting
+            recurrence = Recurrence('WEEKLY', by_day=weekdays, until=_aware(datetime.combine(end_date, time.max)))
+            first = _aware(datetime.combine(start_date, start_time))
+            for start in recurrence.occurrences(first, window_start, window_end):
+                pairs.append((CalendarOccurrence(
+                    course_id=course.id, slot=slot_index, title=course.name,
+                    location=slot.get('location') or slot.get('room') or '', type=slot.get('type') or 'lecture',
+                    start_datetime=start, end_datetime=start + timedelta(minutes=minutes),
+                ), attendees))
+        return pairs
+
+    @staticmethod
+    def instructor_users(course_ids):
+        """{course ID: user ID of its instructor}"""
+        courses = dict(Course.objects.filter(id__in=course_ids).values_list('id', 'instructor_id'))
+        users = dict(Faculty.objects.filter(employee_id__in=set(courses.values()))
+                     .values_list('employee_id', 'user_id'))
+        return {course_id: str(users[employee_id]) for course_id, employee_id in courses.items()
+                if employee_id in users}
+
+    @staticmethod
+    def _insert(pairs):
+        occurrences = CalendarOccurrence.objects.bulk_create([occurrence for occurrence, _ in pairs])
+        CalendarAttendance.objects.bulk_create([
+            CalendarAttendance(user_id=user_id, occurrence=occurrence, start_datetime=occurrence.start_datetime)
+            for occurrence, (_, attendees) in zip(occurrences, pairs) for user_id in attendees
+        ], ignore_conflicts=True)
+        return len(occurrences)
+
+    @staticmethod
+    def materialize_event(event):
+        """Replace an event's occurrences within the horizon, returning how many there are"""
+        horizon = CalendarService.horizon()
+        with transaction.atomic():
+            CalendarOccurrence.objects.filter(event_id=event.id).delete()
+            return CalendarService._insert(CalendarService.event_occurrences(event, horizon.start, horizon.end))
+
+    @staticmethod
+    def materialize_course(course):
+        """Replace a course's meeting occurrences within the horizon"""
+        horizon = CalendarService.horizon()
+        with transaction.atomic():
+            CalendarOccurrence.objects.filter(course_id=course.id, event_id='').delete()
+            return CalendarService._insert(CalendarService.course_occurrences(course, horizon.start, horizon.end))
+
+    @staticmethod
+    def add_attendee(event_id, user_id):
+        """Add a user to the materialized occurrences of an event"""
+        CalendarAttendance.objects.bulk_create([
+            CalendarAttendance(user_id=str(user_id), occurrence_id=occurrence_id, start_datetime=start_datetime)
+            for occurrence_id, start_datetime in CalendarOccurrence.objects.filter(event_id=event_id)
+            .values_list('id', 'start_datetime')
+        ], ignore_conflicts=True)
+
+    @staticmethod
+    def remove_attendee(event_id, user_id):
+        """Remove a user from the materialized occurrences of an event, unless they teach its course"""
+        course_id = CalendarEvent.objects.filter(id=event_id).values_list('course_id', flat=True).first()
+        if course_id and CalendarService.instructor_users([course_id]).get(course_id) == str(user_id):
+            return
+        CalendarAttendance.objects.filter(user_id=str(user_id), occurrence__event_id=event_id).delete()
+
+    @staticmethod
+    def remove_event(event_id):
+        CalendarOccurrence.objects.filter(event_id=event_id).delete()
+
+    @staticmethod
+    def remove_course(course_id):
+        CalendarOccurrence.objects.filter(course_id=course_id, event_id='').delete()
+
+    @staticmethod
+    def _materialize_window(window_start, window_end, events, courses):
+        events, courses = list(events.prefetch_related('event_attendees')), list(courses)
+        instructors = CalendarService.instructor_users(
+            {course.id for course in courses} | {event.course_id for event in events if event.course_id}
+        )
+        pairs = []
+        for event in events:
+            pairs.extend(CalendarService.event_occurrences(event, window_start, window_end, instructors))
+        for course in courses:
+            pairs.extend(CalendarService.course_occurrences(course, window_start, window_end, instructors))
+        return CalendarService._insert(pairs)
+
+    @staticmethod
+    def extend_horizon(now=None):
+        """Move the horizon forward, expanding the days it adds; returns the occurrences added"""
+        now = now or timezone.now()
+        with transaction.atomic():
+            horizon = CalendarService.horizon()
+            start, end = now - timedelta(days=HORIZON_PAST_DAYS), now + timedelta(days=HORIZON_DAYS)
+            added = 0
+            if end > horizon.end:
+                # Events are expanded only from horizon.end, so any that start before are candidates
+                events = CalendarEvent.objects.filter(
+                    Q(start_datetime__gte=horizon.end) | Q(recurrence__isnull=False), start_datetime__lt=end,
+                )
+                courses = Course.objects.filter(start_date__lte=end.date(), end_date__gte=horizon.end.date())
+                added = CalendarService._materialize_window(horizon.end, end, events, courses)
+            if start > horizon.start:
+                CalendarOccurrence.objects.filter(start_datetime__lt=start).delete()
+            horizon.start, horizon.end = max(start, horizon.start), max(end, horizon.end)
+            horizon.save()
+            return added
+
+    @staticmethod
+    def rebuild(now=None):
+        """Materialize every event and course from scratch; returns the occurrences created"""
+        now = now or timezone.now()
+        with transaction.atomic():
+            CalendarOccurrence.objects.all().delete()
+            start, end = now - timedelta(days=HORIZON_PAST_DAYS), now + timedelta(days=HORIZON_DAYS)
+            CalendarHorizon.objects.update_or_create(name=HORIZON_NAME, defaults={'start': start, 'end': end})
+            return CalendarService._materialize_all(start, end)
+
+    @staticmethod
+    def _materialize_all(start, end):
+        return CalendarService._materialize_window(
+            start, end, CalendarEvent.objects.filter(start_datetime__lt=end),
+            Course.objects.filter(start_date__lte=end.date(), end_date__gte=start.date()),
+        )
+
+    @staticmethod
+    def occurrences_for_user(user_id, start, end):
+        """
+        Occurrences on a user's calendar starting in [start, end), in order.
+
+        One range scan of the user's attendances; for students, unioned with
+        a range scan per enrolled course.
+        """
+        user_id = str(user_id)
+        attended = CalendarOccurrence.objects.filter(
+            attendances__user_id=user_id, attendances__start_datetime__gte=start,
+            attendances__start_datetime__lt=end,
+        )
+        student_ids = Student.objects.filter(user_id=user_id).values('student_id')
+        course_ids = Enrollment.objects.filter(student_id__in=student_ids, status='active').values('course_id')
+        enrolled = CalendarOccurrence.objects.filter(course_id__in=course_ids, start_datetime__gte=start,
+                                                     start_datetime__lt=end)
+        return list(attended.union(enrolled).order_by('start_datetime', 'id'))
+
+    @staticmethod
+    def attended_occurrences(user_id, start, end):
+        """Occurrences a user attends (as listed or as instructor) starting in [start, end): one range scan"""
+        return list(CalendarOccurrence.objects.filter(
+            attendances__user_id=str(user_id), attendances__start_datetime__gte=start,
+            attendances__start_datetime__lt=end,
+        ).order_by('attendances__start_datetime', 'id'))
+
+    @staticmethod
+    def occurrences_for_course(course_id, start, end):
+        """Occurrences of a course's meetings and events starting in [start, end)"""
+        return list(CalendarOccurrence.objects.filter(
+            course_id=course_id, start_datetime__gte=start, start_datetime__lt=end,
+        ).order_by('start_datetime', 'id'))
+
+    @staticmethod
+    def week(day=None):
+        """[start, end) of the week (from Monday) containing a date, today by default"""
+        day = day or timezone.localdate()
+        monday = day - timedelta(days=day.weekday())
+        start = timezone.make_aware(datetime.combine(monday, time.min))
+        return start, start + timedelta(days=7)
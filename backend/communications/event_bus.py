@@ -0,0 +1,256 @@
+"""
+Event bus of the server-push stream (communications.views.event_stream).
+
+Events are published to channels:
+
+- user:<user_id>: notifications of a user
+- student:<student_id>: enrollment and waitlist changes of a student
+- course:<course_id>, department:<name>, role:<role>, campus: alerts and
+  notifications sent to an audience
+
+Publishing is synchronous, so views and signal handlers can call publish()
+directly. Streams subscribe from the event loop: each connection is an
+asyncio.Queue registered under its channels, so an idle connection costs a
+queue and a suspended coroutine, no thread.
+
+With settings.EVENT_BUS 'redis' (the default, when Redis is reachable),
+events go through Redis pub/sub and every worker receives them on one
+pattern subscription per event loop, dispatching to its local queues. With
+'memory', or without Redis, events only reach streams of this process.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
+
+CHANNEL_PREFIX = 'events:'
+# Events a slow stream may fall behind by before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+def course_channel(course_id):
+    return f'course:{course_id}'
+
+
+def department_channel(department):
+    return f'department:{department}'
+
+
+def role_channel(role):
+    return f'role:{role}'
+
+
+def student_channel(student_id):
+    return f'student:{student_id}'
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+CAMPUS_CHANNEL = 'campus'
+
+
+def audience_channels(audience, audience_ids=None):
+    """Channels reaching an alert or notification audience (see NotificationService.audience_user_ids)"""
+    audience_ids = [str(audience_id) for audience_id in audience_ids or []]
+    if audience == 'campus':
+        return [CAMPUS_CHANNEL]
+    channel = {
+        'role': role_channel,
+        'department': department_channel,
+        'course': course_channel,
+        'individual': user_channel,
+    }.get(audience)
+    return [channel(audience_id) for audience_id in audience_ids] if channel else []
+
+
+class Subscription:
+    """Events of a set of channels, read by one stream"""
+
+    def __init__(self, bus, channels):
+        self.bus = bus
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        # An event published to several of the channels arrives once per channel
+        self._recent = deque(maxlen=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        """Queue an event (from the subscription's event loop)"""
+        if event['id'] in self._recent:
+            return
+        self._recent.append(event['id'])
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The client isn't reading; it reconnects and reloads
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """The next event, or None if none arrives within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """In-process event bus"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}  # channel: set of Subscriptions
+
+    def publish(self, channels, event_type, data):
+        """Publish an event to channels; returns the event"""
+        event = {'id': uuid.uuid4().hex, 'type': event_type, 'data': data, 'sent_at': time.time()}
+        for channel in dict.fromkeys(channels):
+            self._send(channel, event)
+        return event
+
+    def _send(self, channel, event):
+        self.dispatch(channel, event)
+
+    def dispatch(self, channel, event):
+        """Deliver an event to the local subscriptions of a channel, from any thread"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is subscription.loop:
+                subscription.deliver(event)
+            else:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # Its event loop is closed
+                    self.unsubscribe(subscription)
+
+    def subscribe(self, channels):
+        """Subscribe the running event loop to channels"""
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._subscriptions[channel]
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({subscription for subscriptions in self._subscriptions.values()
+                        for subscription in subscriptions})
+
+
+class RedisEventBus(EventBus):
+    """Event bus across workers through Redis pub/sub"""
+
+    def __init__(self, client, url):
+        super().__init__()
+        self.client = client
+        self.url = url
+        self._listeners = {}  # event loop: listener task
+
+    def _send(self, channel, event):
+        try:
+            self.client.publish(CHANNEL_PREFIX + channel, json.dumps(event))
+        except redis.RedisError as e:
+            # Streams of this worker still get it; the others catch up when clients reload
+            print(f"Error publishing event: {e}")
+            self.dispatch(channel, event)
+
+    def subscribe(self, channels):
+        subscription = super().subscribe(channels)
+        loop = subscription.loop
+        with self._lock:
+            listener = self._listeners.get(loop)
+            if listener is None or listener.done():
+                self._listeners[loop] = loop.create_task(self._listen())
+        return subscription
+
+    async def _listen(self):
+        """Dispatch the events of every channel to this event loop's subscriptions"""
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.psubscribe(CHANNEL_PREFIX + '*')
+                async for message in pubsub.listen():
+                    channel = message['channel'].decode()[len(CHANNEL_PREFIX):]
+                    self.dispatch(channel, json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Event bus connection lost ({type(e).__name__}), reconnecting")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+
+_event_bus = None
+_event_bus_lock = threading.Lock()
+
+
+def _redis_url():
+    config = getattr(settings, 'REDIS_CONFIG', {})
+    return f"redis://{config.get('HOST', 'localhost')}:{config.get('PORT', 6379)}/{config.get('DB', 0)}"
+
+
+def _redis_client():
+    """A connected Redis client, or None if Redis is not available"""
+    if redis is None:
+        return None
+    config = getattr(settings, 'REDIS_CONFIG', {})
+    try:
+        client = redis.Redis.from_url(
+            _redis_url(),
+            socket_connect_timeout=config.get('SOCKET_CONNECT_TIMEOUT', 2),
+            socket_timeout=config.get('SOCKET_TIMEOUT', 2),
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Redis not available ({type(e).__name__}), delivering events in process")
+        return None
+
+
+def get_event_bus():
+    """The process-wide event bus, created on first use"""
+    global _event_bus
+    with _event_bus_lock:
+        if _event_bus is None:
+            client = _redis_client() if getattr(settings, 'EVENT_BUS', 'redis') == 'redis' else None
+            _event_bus = RedisEventBus(client, _redis_url()) if client else EventBus()
+        return _event_bus
+
+
+def publish(channels, event_type, data):
+    """Publish an event to the streams subscribed to any of channels"""
+    return get_event_bus().publish(channels, event_type, data)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from communications.calendar_service import CalendarService
+
+class Command(BaseCommand):
+    help = 'Move the calendar occurrence horizon forward (run daily, e.g. from cron)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Expand every event and course meeting from scratch')
+    
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write('Rebuilding calendar occurrences...')
+            count = CalendarService.rebuild()
+        else:
+            self.stdout.write('Extending the calendar horizon...')
+            count = CalendarService.extend_horizon()
+        horizon = CalendarService.horizon()
+        self.stdout.write(self.style.SUCCESS(
+            f'Materialized {count} occurrences; horizon {horizon.start:%Y-%m-%d} to {horizon.end:%Y-%m-%d}'
+        ))
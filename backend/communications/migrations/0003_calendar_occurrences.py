@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0002_notification_user_read_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarHorizon',
+            fields=[
+                ('name', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('start', models.DateTimeField()),
+                ('end', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CalendarOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(blank=True, max_length=50)),
+                ('course_id', models.CharField(blank=True, max_length=50)),
+                ('slot', models.IntegerField(default=0)),
+                ('title', models.CharField(max_length=200)),
+                ('location', models.CharField(blank=True, max_length=200)),
+                ('type', models.CharField(max_length=20)),
+                ('start_datetime', models.DateTimeField()),
+                ('end_datetime', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_id', 'start_datetime'], name='occurrence_course_start_idx'), models.Index(fields=['event_id', 'start_datetime'], name='occurrence_event_start_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CalendarAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(max_length=50)),
+                ('start_datetime', models.DateTimeField()),
+                ('occurrence', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendances', to='communications.calendaroccurrence')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'start_datetime'], name='attendance_user_start_idx')],
+                'unique_together': {('user_id', 'occurrence')},
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:48
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _members(value):
+    """Member IDs of a JSON array field value (a list, or its JSON), without duplicates"""
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else []
+    if not isinstance(value, list):
+        return []
+    return list(dict.fromkeys(str(item) for item in value if item not in (None, '')))
+
+
+def copy_attendees(apps, schema_editor):
+    CalendarEvent = apps.get_model('communications', 'CalendarEvent')
+    EventAttendee = apps.get_model('communications', 'EventAttendee')
+    CalendarOccurrence = apps.get_model('communications', 'CalendarOccurrence')
+    CalendarAttendance = apps.get_model('communications', 'CalendarAttendance')
+    attendees = {
+        event_id: _members(value)
+        for event_id, value in CalendarEvent.objects.exclude(attendees__isnull=True).values_list('id', 'attendees')
+    }
+    EventAttendee.objects.bulk_create([
+        EventAttendee(event_id=event_id, member_id=user_id)
+        for event_id, user_ids in attendees.items() for user_id in user_ids
+    ], batch_size=1000)
+    # The attendees' calendars, for occurrences already materialized
+    CalendarAttendance.objects.bulk_create([
+        CalendarAttendance(user_id=user_id, occurrence_id=occurrence_id, start_datetime=start_datetime)
+        for occurrence_id, event_id, start_datetime in CalendarOccurrence.objects.filter(
+            event_id__in=[event_id for event_id, user_ids in attendees.items() if user_ids]
+        ).values_list('id', 'event_id', 'start_datetime')
+        for user_id in attendees[event_id]
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+def restore_attendees(apps, schema_editor):
+    CalendarEvent = apps.get_model('communications', 'CalendarEvent')
+    EventAttendee = apps.get_model('communications', 'EventAttendee')
+    attendees = {}
+    for event_id, user_id in EventAttendee.objects.order_by('id').values_list('event_id', 'member_id'):
+        attendees.setdefault(event_id, []).append(user_id)
+    for event_id, user_ids in attendees.items():
+        CalendarEvent.objects.filter(id=event_id).update(attendees=user_ids)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communications', '0003_calendar_occurrences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventAttendee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(db_index=True, max_length=50)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_attendees', to='communications.calendarevent')),
+            ],
+            options={
+                'ordering': ['id'],
+                'abstract': False,
+                'unique_together': {('event', 'member_id')},
+            },
+        ),
+        migrations.RunPython(copy_attendees, restore_attendees),
+        migrations.RemoveField(
+            model_name='calendarevent',
+            name='attendees',
+        ),
+    ]
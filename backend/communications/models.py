@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from memberships import Membership
 
 
 class Notification(models.Model):
@@ -19,6 +20,12 @@ class Notification(models.Model):
         ('success', 'Success'),
     ]
     
+    class Meta:
+        indexes = [
+            # Unread counts and mark-all-read
+            models.Index(fields=['user_id', 'is_read'], name='notification_user_read_idx'),
+        ]
+    
     def mark_as_read(self):
         """Mark the notification as read"""
         self.is_read = True
@@ -58,7 +65,6 @@ class CalendarEvent(models.Model):
     end_datetime = models.DateTimeField()
     location = models.CharField(max_length=200, blank=True)
     type = models.CharField(max_length=20)  # event, deadline, exam
-    attendees = models.JSONField(null=True, blank=True)  # array: user IDs
     course_id = models.CharField(max_length=50, blank=True)  # optional reference to Course
     created_at = models.DateTimeField(default=timezone.now)
     recurrence = models.JSONField(null=True, blank=True)  # object: recurrence pattern
@@ -79,12 +85,13 @@ class CalendarEvent(models.Model):
     ]
     
     def add_attendee(self, user_id):
-        """Add an attendee to the event"""
-        if self.attendees is None:
-            self.attendees = []
-        if isinstance(self.attendees, list) and user_id not in self.attendees:
-            self.attendees.append(user_id)
-            self.save()
+        """Add an attendee to the event, returning whether they were added"""
+        _, created = EventAttendee.objects.add(self, user_id)
+        return created
+    
+    def remove_attendee(self, user_id):
+        """Remove an attendee from the event"""
+        return EventAttendee.objects.remove(self, user_id)
     
     def is_all_day(self):
         """Check if the event is an all-day event"""
@@ -124,7 +131,7 @@ class CalendarEvent(models.Model):
             'end_datetime': end_datetime_str,
             'location': self.location,
             'type': self.type,
-            'attendees': self.attendees,
+            'attendees': [attendee.member_id for attendee in self.event_attendees.all()],
             'course_id': self.course_id,
             'created_at': created_at_str,
             'recurrence': self.recurrence,
@@ -137,6 +144,81 @@ class CalendarEvent(models.Model):
         return f"Calendar Event: {self.title}"
 
 
+
+class EventAttendee(Membership):
+    """An attendee of a calendar event (member_id is the user ID)"""
+    group_field = 'event'
+    event = models.ForeignKey(CalendarEvent, on_delete=models.CASCADE, related_name='event_attendees')
+    
+    class Meta(Membership.Meta):
+        unique_together = ('event', 'member_id')
+    
+    def __str__(self):
+        return f"{self.member_id} attending {self.event_id}"
+
+
+class CalendarOccurrence(models.Model):
+    """
+    One occurrence of a CalendarEvent or course meeting, materialized by
+    communications.calendar_service within its horizon
+    """
+    event_id = models.CharField(max_length=50, blank=True)  # reference to CalendarEvent; blank for course meetings
+    course_id = models.CharField(max_length=50, blank=True)  # optional reference to Course
+    slot = models.IntegerField(default=0)  # index of the meeting in Course.schedule
+    title = models.CharField(max_length=200)
+    location = models.CharField(max_length=200, blank=True)
+    type = models.CharField(max_length=20)  # event, deadline, exam, lecture, lab, ...
+    start_datetime = models.DateTimeField()
+    end_datetime = models.DateTimeField()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['course_id', 'start_datetime'], name='occurrence_course_start_idx'),
+            models.Index(fields=['event_id', 'start_datetime'], name='occurrence_event_start_idx'),
+        ]
+    
+    def to_json(self):
+        """Convert occurrence to JSON format"""
+        return {
+            'event_id': self.event_id or None,
+            'course_id': self.course_id or None,
+            'title': self.title,
+            'location': self.location,
+            'type': self.type,
+            'start_datetime': self.start_datetime.isoformat(),
+            'end_datetime': self.end_datetime.isoformat(),
+        }
+    
+    def __str__(self):
+        return f"Occurrence: {self.title} at {self.start_datetime}"
+
+
+class CalendarAttendance(models.Model):
+    """An attendee of an occurrence, with its start time for per-user range scans"""
+    user_id = models.CharField(max_length=50)  # reference to User
+    occurrence = models.ForeignKey(CalendarOccurrence, on_delete=models.CASCADE, related_name='attendances')
+    start_datetime = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ('user_id', 'occurrence')
+        indexes = [
+            models.Index(fields=['user_id', 'start_datetime'], name='attendance_user_start_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} at {self.start_datetime}"
+
+
+class CalendarHorizon(models.Model):
+    """Time window in which occurrences are materialized"""
+    name = models.CharField(max_length=20, primary_key=True)
+    start = models.DateTimeField()
+    end = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name}: {self.start} to {self.end}"
+
 class Alert(models.Model):
     """Alert model"""
     id = models.CharField(max_length=50, primary_key=True)
@@ -0,0 +1,358 @@
+"""
+Notification delivery: audiences, fan-out and unread counts.
+
+An audience (a course roster, roles, departments, the campus or a list of
+users) resolves to its user IDs in one query of set operations. A fan-out
+inserts one Notification per user with bulk_create, NOTIFICATION_BATCH_SIZE
+rows per statement, in one transaction; notifying a 2,000-student course is
+a roster query and a couple of INSERTs. Once committed, it is pushed to the
+event streams as one event per audience channel (see event_bus).
+
+Unread counts are kept per user in Redis (notifications:unread:<user_id>),
+filled from the database on first read and expiring after UNREAD_COUNT_TTL.
+Fan-outs and reads adjust the counters already cached with HINCRBY, one
+round trip per batch. A change bumps the user's generation before it is
+written and again once it is applied, so a counter is only filled (like
+cache.add, if still missing) when no change landed while it was counted,
+and a counter filled while a change was being written is dropped instead of
+adjusted, as its count may already include it. Without Redis the count is
+read from the database.
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from users.models import Admin, Faculty, Staff, Student
+from .event_bus import audience_channels, publish, user_channel
+from .models import Notification
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
+
+User = get_user_model()
+
+NOTIFICATION_BATCH_SIZE = 1000
+UNREAD_COUNT_TTL = 24 * 60 * 60
+UNREAD_KEY = 'notifications:unread:{}'
+UNREAD_GENERATION_KEY = 'notifications:unread_generation:{}'
+
+# Bumps the generation of each of KEYS, returning the new generations
+BEGIN_CHANGE = """
+local generations = {}
+for i, key in ipairs(KEYS) do
+    generations[i] = redis.call('INCR', key)
+    redis.call('EXPIRE', key, ARGV[1])
+end
+return generations
+"""
+
+# KEYS are counters then their generations, ARGV the amount, the TTL and the
+# generations returned by BEGIN_CHANGE. Counters filled before the change began
+# are adjusted (never below 0), those filled since are dropped.
+APPLY_CHANGE = """
+local n = #KEYS / 2
+for i = 1, n do
+    local filled = redis.call('HGET', KEYS[i], 'generation')
+    if filled and tonumber(filled) < tonumber(ARGV[2 + i]) then
+        if redis.call('HINCRBY', KEYS[i], 'count', ARGV[1]) < 0 then
+            redis.call('HSET', KEYS[i], 'count', 0)
+        end
+    elseif filled then
+        redis.call('DEL', KEYS[i])
+    end
+    redis.call('INCR', KEYS[n + i])
+    redis.call('EXPIRE', KEYS[n + i], ARGV[2])
+end
+"""
+
+# Fills a missing counter with ARGV[1], unless its generation moved past ARGV[2]
+FILL = """
+local generation = redis.call('GET', KEYS[2]) or '0'
+if generation == ARGV[2] and redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], 'count', ARGV[1], 'generation', generation)
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+"""
+
+# Sets a counter to 0 as of a new generation
+RESET = """
+local generation = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'count', 0, 'generation', generation)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+"""
+
+
+class UnreadCounter:
+    """Unread notification counts of users, cached in Redis"""
+
+    def __init__(self, client=None):
+        self.client = client
+        if client is not None:
+            self._begin = client.register_script(BEGIN_CHANGE)
+            self._apply = client.register_script(APPLY_CHANGE)
+            self._fill = client.register_script(FILL)
+            self._reset = client.register_script(RESET)
+
+    @staticmethod
+    def count_unread(user_id):
+        return Notification.objects.filter(user_id=str(user_id), is_read=False).count()
+
+    def get(self, user_id):
+        """Unread count of a user"""
+        if self.client is None:
+            return self.count_unread(user_id)
+        key = UNREAD_KEY.format(user_id)
+        generation_key = UNREAD_GENERATION_KEY.format(user_id)
+        try:
+            value, generation = self.client.pipeline().hget(key, 'count').get(generation_key).execute()
+            if value is not None:
+                return int(value)
+            count = self.count_unread(user_id)
+            self._fill(keys=[key, generation_key], args=[count, generation or '0', UNREAD_COUNT_TTL])
+            return count
+        except redis.RedisError as e:
+            print(f"Error reading unread count: {e}")
+            return self.count_unread(user_id)
+
+    def begin(self, user_ids):
+        """
+        Call before writing a change to users' unread notifications.
+
+        Returns:
+            What to pass to increment once the change is written (None
+            without Redis or if it failed, which drops the counters instead)
+        """
+        if self.client is None:
+            return None
+        user_ids = list(user_ids)
+        try:
+            started = []
+            for start in range(0, len(user_ids), NOTIFICATION_BATCH_SIZE):
+                batch = user_ids[start:start + NOTIFICATION_BATCH_SIZE]
+                started += self._begin(keys=[UNREAD_GENERATION_KEY.format(user_id) for user_id in batch],
+                                       args=[UNREAD_COUNT_TTL])
+            return started
+        except redis.RedisError as e:
+            print(f"Error updating unread counts: {e}")
+            return None
+
+    def increment(self, user_ids, amount=1, started=None):
+        """Adjust the cached counts of users once a change begun with begin is written"""
+        if self.client is None:
+            return
+        user_ids = list(user_ids)
+        if started is None:
+            self.invalidate(user_ids)
+            return
+        try:
+            for start in range(0, len(user_ids), NOTIFICATION_BATCH_SIZE):
+                batch = user_ids[start:start + NOTIFICATION_BATCH_SIZE]
+                keys = ([UNREAD_KEY.format(user_id) for user_id in batch]
+                        + [UNREAD_GENERATION_KEY.format(user_id) for user_id in batch])
+                self._apply(keys=keys, args=[amount, UNREAD_COUNT_TTL, *started[start:start + len(batch)]])
+        except redis.RedisError as e:
+            # Counts off until they expire; drop them instead
+            print(f"Error updating unread counts: {e}")
+            self.invalidate(user_ids)
+
+    def reset(self, user_id):
+        """All of a user's notifications were read"""
+        if self.client is None:
+            return
+        try:
+            self._reset(keys=[UNREAD_KEY.format(user_id), UNREAD_GENERATION_KEY.format(user_id)],
+                        args=[UNREAD_COUNT_TTL])
+        except redis.RedisError as e:
+            print(f"Error resetting unread count: {e}")
+            self.invalidate([user_id])
+
+    def invalidate(self, user_ids):
+        """Drop cached counts, which are recounted on their next read"""
+        if self.client is None or not user_ids:
+            return
+        try:
+            pipeline = self.client.pipeline()
+            pipeline.delete(*[UNREAD_KEY.format(user_id) for user_id in user_ids])
+            for user_id in user_ids:
+                # Counts being filled may predate what was dropped
+                pipeline.incr(UNREAD_GENERATION_KEY.format(user_id))
+                pipeline.expire(UNREAD_GENERATION_KEY.format(user_id), UNREAD_COUNT_TTL)
+            pipeline.execute()
+        except redis.RedisError as e:
+            print(f"Error invalidating unread counts: {e}")
+
+
+_unread_counter = None
+_unread_counter_lock = threading.Lock()
+
+
+def _redis_client():
+    """A connected Redis client, or None if Redis is not available"""
+    if redis is None:
+        return None
+    config = getattr(settings, 'REDIS_CONFIG', {})
+    try:
+        client = redis.Redis(
+            host=config.get('HOST', 'localhost'),
+            port=config.get('PORT', 6379),
+            db=config.get('DB', 0),
+            socket_connect_timeout=config.get('SOCKET_CONNECT_TIMEOUT', 2),
+            socket_timeout=config.get('SOCKET_TIMEOUT', 2),
+            retry_on_timeout=config.get('RETRY_ON_TIMEOUT', False),
+            decode_responses=True,
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Redis not available ({type(e).__name__}), counting unread notifications in the database")
+        return None
+
+
+def get_unread_counter():
+    """The process-wide unread counter, created on first use"""
+    global _unread_counter
+    with _unread_counter_lock:
+        if _unread_counter is None:
+            _unread_counter = UnreadCounter(_redis_client())
+        return _unread_counter
+
+
+class NotificationService:
+    """Audience resolution, fan-out and read state of notifications"""
+
+    AUDIENCES = ('campus', 'role', 'department', 'course', 'individual')
+
+    @staticmethod
+    def course_roster(course_ids):
+        """User IDs of the students actively enrolled in the courses"""
+        enrolled = Enrollment.objects.filter(course_id__in=course_ids, status='active').values('student_id')
+        return Student.objects.filter(student_id__in=enrolled).values_list('user_id', flat=True)
+
+    @staticmethod
+    def audience_user_ids(audience, audience_ids=None):
+        """
+        User IDs of an audience, as one query.
+
+        Args:
+            audience: 'campus' (active users), 'role', 'department' (its
+                faculty and staff, and the students enrolled in its courses),
+                'course' (the roster) or 'individual'
+            audience_ids: Roles, departments, course IDs or user IDs
+
+        Returns:
+            A queryset of user IDs, or a list for 'individual'
+        """
+        audience_ids = [str(audience_id) for audience_id in audience_ids or []]
+        if audience == 'campus':
+            return User.objects.filter(status='active').values_list('id', flat=True)
+        if audience == 'role':
+            return User.objects.filter(role__in=audience_ids, status='active').values_list('id', flat=True)
+        if audience == 'course':
+            return NotificationService.course_roster(audience_ids)
+        if audience == 'department':
+            courses = Course.objects.filter(department__in=audience_ids).values('id')
+            students = NotificationService.course_roster(courses)
+            return User.objects.filter(
+                Q(pk__in=Faculty.objects.filter(department__in=audience_ids).values('user_id'))
+                | Q(pk__in=Admin.objects.filter(department__in=audience_ids).values('user_id'))
+                | Q(pk__in=Staff.objects.filter(department__in=audience_ids).values('user_id'))
+                | Q(pk__in=students),
+                status='active',
+            ).values_list('id', flat=True)
+        if audience == 'individual':
+            return audience_ids
+        raise ValueError(f'Unknown audience: {audience}')
+
+    @staticmethod
+    def notify_users(user_ids, title, message, type='info', batch_size=NOTIFICATION_BATCH_SIZE, channels=None):
+        """
+        Create one notification per user, returning how many were created.
+
+        Once committed, the notification is pushed to the users' event
+        streams, as one event on each of channels when given (the audience's
+        channels) or one event per user.
+        """
+        user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+        now = timezone.now()
+        if channels is None:
+            channels = [user_channel(user_id) for user_id in user_ids]
+        counter = get_unread_counter()
+        started = counter.begin(user_ids)
+
+        def delivered():
+            counter.increment(user_ids, 1, started)
+            publish(channels, 'notification', {'title': title, 'message': message, 'type': type,
+                                               'created_at': str(now)})
+
+        with transaction.atomic():
+            Notification.objects.bulk_create([
+                Notification(id=str(uuid.uuid4()), user_id=user_id, title=title, message=message, type=type,
+                             is_read=False, created_at=now)
+                for user_id in user_ids
+            ], batch_size=batch_size)
+            transaction.on_commit(delivered)
+        return len(user_ids)
+
+    @staticmethod
+    def notify_audience(audience, audience_ids, title, message, type='info'):
+        """Notify every user of an audience"""
+        user_ids = NotificationService.audience_user_ids(audience, audience_ids)
+        return NotificationService.notify_users(user_ids, title, message, type,
+                                                channels=audience_channels(audience, audience_ids))
+
+    @staticmethod
+    def notify_course(course_id, title, message, type='info'):
+        """Notify the roster of a course (e.g., of a course event)"""
+        return NotificationService.notify_audience('course', [course_id], title, message, type)
+
+    @staticmethod
+    def mark_read(user_id, notification_id):
+        """Mark a user's notification read, returning it (None if it doesn't exist)"""
+        notification = Notification.objects.filter(id=notification_id, user_id=str(user_id)).first()
+        if notification is None:
+            return None
+        if not notification.is_read:
+            counter = get_unread_counter()
+            started = counter.begin([user_id])
+            updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(is_read=True)
+            notification.is_read = True
+            if updated:
+                counter.increment([user_id], -1, started)
+        return notification
+
+    @staticmethod
+    def mark_all_read(user_id):
+        """Mark all of a user's notifications read in one UPDATE, returning how many were unread"""
+        count = Notification.objects.filter(user_id=str(user_id), is_read=False).update(is_read=True)
+        get_unread_counter().reset(user_id)
+        return count
+
+    @staticmethod
+    def delete(user_id, notification_id):
+        """Delete a user's notification, returning whether it existed"""
+        notification = Notification.objects.filter(id=notification_id, user_id=str(user_id)).first()
+        if notification is None:
+            return False
+        if notification.is_read:
+            notification.delete()
+            return True
+        counter = get_unread_counter()
+        started = counter.begin([user_id])
+        notification.delete()
+        counter.increment([user_id], -1, started)
+        return True
+
+    @staticmethod
+    def unread_count(user_id):
+        return get_unread_counter().get(user_id)
@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from courses.models import Course, Enrollment
+from .calendar_service import CalendarService
+from .event_bus import audience_channels, publish, student_channel, user_channel
+from .models import Alert, CalendarEvent, EventAttendee, Notification
+
+# Course fields the materialized meeting occurrences are built from
+COURSE_CALENDAR_FIELDS = {'schedule', 'start_date', 'end_date', 'instructor_id', 'name'}
+
+# Events are published once the change is committed, so clients reloading
+# on them read it
+
+@receiver(post_save, sender=Notification)
+def push_notification(sender, instance, created, **kwargs):
+    """Push a notification created one at a time (fan-outs push one event per audience)"""
+    if kwargs.get('raw') or not created:
+        return
+    transaction.on_commit(lambda: publish([user_channel(instance.user_id)], 'notification', instance.to_json()))
+
+@receiver(post_save, sender=Alert)
+def push_alert(sender, instance, **kwargs):
+    """Push sent alerts to their audience"""
+    if kwargs.get('raw') or instance.status != 'sent' or instance.sent_at is None:
+        return
+    channels = audience_channels(instance.audience, instance.audience_ids)
+    transaction.on_commit(lambda: publish(channels, 'alert', instance.to_json()))
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def push_enrollment(sender, instance, **kwargs):
+    """Push enrollment and waitlist status changes to the student"""
+    if kwargs.get('raw'):
+        return
+    data = {
+        'id': instance.id,
+        'course_id': instance.course_id,
+        'status': 'deleted' if kwargs.get('signal') is post_delete else instance.status,
+    }
+    transaction.on_commit(lambda: publish([student_channel(instance.student_id)], 'enrollment', data))
+
+@receiver(post_save, sender=CalendarEvent)
+def materialize_calendar_event(sender, instance, **kwargs):
+    """Re-expand the event's occurrences"""
+    if kwargs.get('raw'):
+        return
+    CalendarService.materialize_event(instance)
+
+@receiver(post_delete, sender=CalendarEvent)
+def remove_calendar_event(sender, instance, **kwargs):
+    CalendarService.remove_event(instance.id)
+
+@receiver(post_save, sender=EventAttendee)
+def add_calendar_attendee(sender, instance, created, **kwargs):
+    """Put the event's occurrences on the new attendee's calendar"""
+    if kwargs.get('raw') or not created:
+        return
+    CalendarService.add_attendee(instance.event_id, instance.member_id)
+
+@receiver(post_delete, sender=EventAttendee)
+def remove_calendar_attendee(sender, instance, **kwargs):
+    CalendarService.remove_attendee(instance.event_id, instance.member_id)
+
+@receiver(post_save, sender=Course)
+def materialize_course_meetings(sender, instance, **kwargs):
+    """Re-expand the course's meetings when its schedule, dates or instructor may have changed"""
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or (update_fields and not COURSE_CALENDAR_FIELDS & set(update_fields)):
+        return
+    CalendarService.materialize_course(instance)
+
+@receiver(post_delete, sender=Course)
+def remove_course_meetings(sender, instance, **kwargs):
+    CalendarService.remove_course(instance.id)
+
+@receiver(post_migrate)
+def materialize_calendar_horizon(sender, app_config=None, apps=None, **kwargs):
+    """Expand existing events and course meetings once the calendar tables exist (e.g. on deploy)"""
+    if app_config is None or app_config.label != 'communications' or apps is None:
+        # Not migrating the calendar app (flush sends post_migrate without a migration state)
+        return
+    try:
+        apps.get_model('communications', 'CalendarHorizon')
+        apps.get_model('communications', 'EventAttendee')
+    except LookupError:
+        # Migrated to a state without the calendar tables
+        return
+    CalendarService.horizon()
@@ -0,0 +1,201 @@
+"""
+Tests for recurrence expansion and the materialized calendar occurrences
+"""
+
+import json
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from faculty import schedule_views
+from users.models import Faculty, Student
+from .calendar_service import CalendarService, parse_meeting, parse_recurrence
+from .models import CalendarAttendance, CalendarEvent, CalendarHorizon, CalendarOccurrence
+
+User = get_user_model()
+
+
+def at(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class RecurrenceTest(SimpleTestCase):
+    def expand(self, recurrence, start, window_start, window_end):
+        return list(parse_recurrence(recurrence).occurrences(start, window_start, window_end))
+
+    def test_weekly_by_day_with_interval_and_until(self):
+        occurrences = self.expand({'frequency': 'weekly', 'interval': 2, 'by_day': ['MO', 'WE'],
+                                   'until': '2026-09-30'},
+                                  at(2026, 9, 2, 10), at(2026, 9, 1), at(2026, 12, 1))
+        # From Wednesday the 2nd, every other week, through the 30th
+        self.assertEqual(occurrences, [at(2026, 9, 2, 10), at(2026, 9, 14, 10), at(2026, 9, 16, 10),
+                                       at(2026, 9, 28, 10), at(2026, 9, 30, 10)])
+
+    def test_count_is_counted_from_the_start_of_the_series(self):
+        occurrences = self.expand({'frequency': 'daily', 'count': 5}, at(2026, 9, 1, 8),
+                                  at(2026, 9, 4), at(2026, 10, 1))
+        self.assertEqual(occurrences, [at(2026, 9, 4, 8), at(2026, 9, 5, 8)])
+
+    def test_monthly_skips_months_without_the_day(self):
+        occurrences = self.expand({'frequency': 'monthly'}, at(2026, 1, 31, 9), at(2026, 1, 1), at(2026, 6, 1))
+        self.assertEqual(occurrences, [at(2026, 1, 31, 9), at(2026, 3, 31, 9), at(2026, 5, 31, 9)])
+
+    def test_windows_far_from_the_start_are_reached_directly(self):
+        occurrences = self.expand({'frequency': 'daily', 'interval': 3}, at(2000, 1, 1, 12),
+                                  at(2026, 9, 1), at(2026, 9, 8))
+        self.assertEqual(len(occurrences), 2)
+        self.assertTrue(all((occurrence - at(2000, 1, 1, 12)).days % 3 == 0 for occurrence in occurrences))
+
+    def test_rrule_strings_and_non_recurring_values(self):
+        occurrences = self.expand('RRULE:FREQ=WEEKLY;BYDAY=TU,TH;COUNT=3', at(2026, 9, 1, 14),
+                                  at(2026, 9, 1), at(2026, 12, 1))
+        self.assertEqual(occurrences, [at(2026, 9, 1, 14), at(2026, 9, 3, 14), at(2026, 9, 8, 14)])
+        self.assertIsNone(parse_recurrence(None))
+        self.assertIsNone(parse_recurrence({'frequency': 'none'}))
+
+    def test_course_schedule_slots(self):
+        self.assertEqual(parse_meeting({'day': 'MWF', 'time': '10:00 - 10:50'}), ([0, 2, 4], datetime(1, 1, 1, 10).time(), 50))
+        self.assertEqual(parse_meeting({'days': ['Tuesday', 'Thursday'], 'start': '1:30 PM', 'duration': '1.5 hours'}),
+                         ([1, 3], datetime(1, 1, 1, 13, 30).time(), 90))
+        self.assertIsNone(parse_meeting({'day': 'TBA', 'time': 'TBA'}))
+
+
+class CalendarServiceTest(TestCase):
+    def setUp(self):
+        # Horizon [2026-09-01, 2027-03-30)
+        CalendarService.rebuild(now=at(2026, 10, 1))
+
+        self.faculty_user = User.objects.create_user(username='hopper', password=None, role='faculty',
+                                                     mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=self.faculty_user, employee_id='FAC001', department='CSE')
+        self.student_user = User.objects.create_user(username='ada', password=None, role='student',
+                                                     mfa_enabled=False)
+        Student.objects.create(user=self.student_user, student_id='STU001')
+        self.course = Course.objects.create(
+            id='CS101', code='CS101', name='Compilers', description='', credits=3, instructor_id='FAC001',
+            department='CSE', enrollment_limit=30, start_date='2026-09-01', end_date='2026-12-15',
+            schedule=[{'day': 'Monday', 'time': '09:00 - 10:30', 'location': 'B12'},
+                      {'day': 'Thursday', 'time': '14:00', 'duration': '2 hours', 'type': 'lab'},
+                      {'day': 'TBA', 'time': 'TBA'}],
+        )
+        Enrollment.objects.create(id='e1', student_id='STU001', course_id='CS101')
+        self.week = (at(2026, 10, 5), at(2026, 10, 12))
+
+    def test_course_meetings_are_materialized_for_the_instructor(self):
+        occurrences = CalendarService.attended_occurrences(self.faculty_user.pk, *self.week)
+        self.assertEqual([(o.start_datetime, o.end_datetime, o.type) for o in occurrences], [
+            (at(2026, 10, 5, 9), at(2026, 10, 5, 10, 30), 'lecture'),
+            (at(2026, 10, 8, 14), at(2026, 10, 8, 16), 'lab'),
+        ])
+        # Nothing after the course ends
+        self.assertEqual(CalendarService.occurrences_for_course('CS101', at(2026, 12, 16), at(2027, 3, 1)), [])
+
+        self.course.schedule = [{'day': 'Friday', 'time': '11:00 - 12:00'}]
+        self.course.save()
+        occurrences = CalendarService.attended_occurrences(self.faculty_user.pk, *self.week)
+        self.assertEqual([o.start_datetime for o in occurrences], [at(2026, 10, 9, 11)])
+
+        self.course.delete()
+        self.assertFalse(CalendarOccurrence.objects.exists())
+
+    def test_events_follow_saves_and_deletes(self):
+        event = CalendarEvent.objects.create(
+            id='ev1', title='Office hours', start_datetime=at(2026, 9, 2, 15), end_datetime=at(2026, 9, 2, 16),
+            type='event', visibility='private', recurrence={'frequency': 'weekly', 'by_day': ['WE']},
+        )
+        event.add_attendee(self.student_user.pk)
+        # Weekly until the end of the horizon
+        self.assertEqual(CalendarOccurrence.objects.filter(event_id='ev1').count(), 30)
+        self.assertEqual(CalendarAttendance.objects.filter(occurrence__event_id='ev1').count(), 30)
+
+        event.recurrence = {'frequency': 'weekly', 'by_day': ['WE'], 'count': 2}
+        event.save()
+        self.assertEqual(list(CalendarOccurrence.objects.filter(event_id='ev1')
+                              .order_by('start_datetime').values_list('start_datetime', flat=True)),
+                         [at(2026, 9, 2, 15), at(2026, 9, 9, 15)])
+
+        event.delete()
+        self.assertFalse(CalendarOccurrence.objects.filter(event_id='ev1').exists())
+        self.assertFalse(CalendarAttendance.objects.filter(user_id=str(self.student_user.pk)).exists())
+
+    def test_a_week_of_a_faculty_calendar_is_one_query(self):
+        CalendarEvent.objects.create(id='exam', title='Midterm', start_datetime=at(2026, 10, 7, 9),
+                                     end_datetime=at(2026, 10, 7, 11), type='exam', course_id='CS101',
+                                     visibility='course')
+        with self.assertNumQueries(1):
+            occurrences = CalendarService.attended_occurrences(self.faculty_user.pk, *self.week)
+        self.assertEqual([o.title for o in occurrences], ['Compilers', 'Midterm', 'Compilers'])
+
+    def test_students_see_their_events_and_enrolled_courses(self):
+        event = CalendarEvent.objects.create(id='ev2', title='Advising', start_datetime=at(2026, 10, 6, 12),
+                                             end_datetime=at(2026, 10, 6, 12, 30), type='event',
+                                             visibility='private')
+        event.add_attendee(self.student_user.pk)
+        with self.assertNumQueries(1):
+            occurrences = CalendarService.occurrences_for_user(self.student_user.pk, *self.week)
+        self.assertEqual([o.title for o in occurrences], ['Compilers', 'Advising', 'Compilers'])
+
+        Enrollment.objects.filter(id='e1').update(status='dropped')
+        occurrences = CalendarService.occurrences_for_user(self.student_user.pk, *self.week)
+        self.assertEqual([o.title for o in occurrences], ['Advising'])
+
+    def test_a_new_horizon_expands_existing_events(self):
+        # As after deploying: events exist, nothing is materialized yet
+        CalendarHorizon.objects.all().delete()
+        CalendarOccurrence.objects.all().delete()
+        start = timezone.now() + timedelta(days=1)
+        CalendarEvent.objects.bulk_create([CalendarEvent(id='ev4', title='Defense', start_datetime=start,
+                                                         end_datetime=start + timedelta(hours=1), type='event',
+                                                         visibility='public')])
+
+        CalendarService.horizon()
+        self.assertEqual(list(CalendarOccurrence.objects.filter(event_id='ev4')
+                              .values_list('start_datetime', flat=True)), [start])
+
+    def test_extending_the_horizon_expands_only_the_new_days(self):
+        event = CalendarEvent.objects.create(id='ev3', title='Seminar', start_datetime=at(2026, 9, 1, 16),
+                                             end_datetime=at(2026, 9, 1, 17), type='event', visibility='public',
+                                             recurrence='RRULE:FREQ=DAILY')
+        event.add_attendee(self.faculty_user.pk)
+        before = set(CalendarOccurrence.objects.filter(event_id='ev3').values_list('id', flat=True))
+
+        added = CalendarService.extend_horizon(now=at(2026, 10, 11))
+        self.assertEqual(added, 10)
+        occurrences = CalendarOccurrence.objects.filter(event_id='ev3')
+        # Ten days added at the end, ten pruned at the start, the rest untouched
+        self.assertEqual(occurrences.count(), len(before))
+        self.assertEqual(len(before - set(occurrences.values_list('id', flat=True))), 10)
+        horizon = CalendarHorizon.objects.get()
+        self.assertEqual((horizon.start, horizon.end), (at(2026, 9, 11), at(2027, 4, 9)))
+        self.assertFalse(occurrences.filter(start_datetime__lt=horizon.start).exists())
+        self.assertEqual(occurrences.latest('start_datetime').start_datetime, at(2027, 4, 8, 16))
+
+    def faculty_request(self, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.faculty_user
+        request.faculty = self.faculty
+        return request
+
+    def test_schedule_views(self):
+        response = json.loads(schedule_views.get_schedule(self.faculty_request(week='2026-10-07')).content)
+        self.assertEqual(response['week_start'], '2026-10-05')
+        self.assertEqual(response['sessions'][0], {
+            'id': 'CS101_0', 'course': 'Compilers', 'courseCode': 'CS101', 'courseId': 'CS101',
+            'date': '2026-10-05', 'time': '09:00', 'day': 'Monday', 'duration': '1.5 hours', 'location': 'B12',
+            'type': 'lecture', 'recordingStatus': 'not-started',
+        })
+        self.assertEqual([session['day'] for session in response['sessions']], ['Monday', 'Thursday'])
+
+        response = json.loads(schedule_views.get_weekly_overview(self.faculty_request(week='2026-10-07')).content)
+        self.assertEqual(response['weekly_overview']['Monday'], 1)
+        self.assertEqual(sum(response['weekly_overview'].values()), 2)
+
+        response = json.loads(schedule_views.get_calendar(
+            self.faculty_request(start='2026-10-01', end='2026-10-15')).content)
+        self.assertEqual([o['start_datetime'][:10] for o in response['occurrences']],
+                         ['2026-10-01', '2026-10-05', '2026-10-08', '2026-10-12'])
+        self.assertEqual(date.fromisoformat(response['end'][:10]) - date.fromisoformat(response['start'][:10]),
+                         timedelta(days=14))
@@ -0,0 +1,173 @@
+"""
+Tests for the event bus and the server-push event stream
+"""
+
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+import jwt
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from courses.models import Course, Enrollment
+from users import token_blacklist
+from users.models import Student
+from users.token_blacklist import TokenRevocationList, add_token_to_blacklist
+from . import event_bus, notification_service, views
+from .event_bus import EventBus, course_channel, student_channel, user_channel
+from .models import Alert
+from .notification_service import NotificationService, UnreadCounter
+from .views import _event_messages, event_stream
+
+User = get_user_model()
+
+
+class EventBusTest(SimpleTestCase):
+    def test_events_reach_subscribers_once(self):
+        bus = EventBus()
+
+        async def receive():
+            subscription = bus.subscribe([user_channel('1'), course_channel('CS101')])
+            # Published from another thread, to both channels
+            thread = threading.Thread(target=bus.publish, args=(
+                [user_channel('1'), course_channel('CS101'), user_channel('2')], 'alert', {'title': 'Closed'}
+            ))
+            thread.start()
+            first = await subscription.get(timeout=1)
+            second = await subscription.get(timeout=0.05)
+            subscription.close()
+            thread.join()
+            return first, second
+
+        first, second = asyncio.run(receive())
+        self.assertEqual((first['type'], first['data']), ('alert', {'title': 'Closed'}))
+        self.assertIsNone(second)
+        self.assertEqual(bus.subscriber_count(), 0)
+
+    def test_one_event_loop_holds_many_idle_streams(self):
+        bus = EventBus()
+        event_bus._event_bus = bus
+        self.addCleanup(setattr, event_bus, '_event_bus', None)
+
+        async def streams(count):
+            async def stream():
+                messages = _event_messages({event_bus.CAMPUS_CHANNEL}, heartbeat_interval=60)
+                try:
+                    await messages.__anext__()
+                    return await messages.__anext__()
+                finally:
+                    await messages.aclose()
+
+            tasks = [asyncio.create_task(stream()) for _ in range(count)]
+            while bus.subscriber_count() < count:
+                await asyncio.sleep(0.01)
+            bus.publish([event_bus.CAMPUS_CHANNEL], 'alert', {'title': 'Snow day'})
+            return await asyncio.gather(*tasks)
+
+        messages = asyncio.run(streams(10000))
+        self.assertEqual(len(messages), 10000)
+        self.assertTrue(all('event: alert\n' in message and 'Snow day' in message for message in messages))
+        self.assertEqual(bus.subscriber_count(), 0)
+
+
+class EventStreamTest(TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        event_bus._event_bus = self.bus
+        self.addCleanup(setattr, event_bus, '_event_bus', None)
+        notification_service._unread_counter = UnreadCounter()
+        self.addCleanup(setattr, notification_service, '_unread_counter', None)
+
+        self.user = User.objects.create_user(username='ada', password=None, role='student', mfa_enabled=False)
+        Student.objects.create(user=self.user, student_id='STU001')
+        Course.objects.create(id='CS101', code='CS101', name='Computability', description='', credits=3,
+                              instructor_id='FAC001', department='CSE', enrollment_limit=30,
+                              start_date='2026-09-01', end_date='2026-12-15')
+        Enrollment.objects.create(id='e1', student_id='STU001', course_id='CS101')
+
+    def token(self):
+        now = timezone.now()
+        return jwt.encode({'user_id': self.user.pk, 'role': 'student', 'iat': now.timestamp(),
+                           'exp': (now + timedelta(hours=1)).timestamp(), 'jti': 'stream-test'},
+                          settings.SECRET_KEY, algorithm='HS256')
+
+    def stream_until_closed(self, token, during=lambda: None):
+        """Every message of a stream opened through the middleware, calling during() once it is open"""
+        token_blacklist._revocation_list = TokenRevocationList()
+        self.addCleanup(setattr, token_blacklist, '_revocation_list', None)
+
+        async def read():
+            response = await AsyncClient().get('/api/v1/events/stream/', {'token': token})
+            messages = response.streaming_content
+            received = [(await messages.__anext__()).decode()]
+            await sync_to_async(during)()
+            try:
+                while True:
+                    received.append((await asyncio.wait_for(messages.__anext__(), 5)).decode())
+            except StopAsyncIteration:
+                return response.status_code, received
+
+        return async_to_sync(read)()
+
+    def stream(self, publish, **params):
+        """The messages of a stream until publish() has been called and its events received"""
+        async def read():
+            response = await event_stream(RequestFactory().get('/api/v1/events/stream/', params))
+            if response.status_code != 200:
+                return response.status_code, []
+            messages = response.streaming_content
+            received = [(await messages.__anext__()).decode()]
+            await sync_to_async(publish)()
+            while 'event: done' not in received[-1]:
+                received.append((await asyncio.wait_for(messages.__anext__(), 1)).decode())
+            return response.status_code, received
+
+        return async_to_sync(read)()
+
+    def test_stream_requires_a_token(self):
+        self.assertEqual(self.stream(lambda: None)[0], 401)
+        self.assertEqual(self.stream(lambda: None, token='not-a-token')[0], 401)
+
+    def test_notifications_alerts_and_enrollments_are_pushed(self):
+        def changes():
+            with self.captureOnCommitCallbacks(execute=True):
+                NotificationService.notify_course('CS101', 'Midterm moved', 'Now on Friday')
+                Alert.objects.create(id='a1', title='Snow day', message='Campus closed', type='emergency',
+                                     priority='urgent', audience='campus', status='sent', created_by='admin',
+                                     sent_at=timezone.now())
+                enrollment = Enrollment.objects.get(id='e1')
+                enrollment.status = 'waitlisted'
+                enrollment.save()
+            # Not the student's
+            self.bus.publish([student_channel('STU002')], 'enrollment', {})
+            self.bus.publish([user_channel(self.user.pk)], 'done', {})
+
+        status, messages = self.stream(changes, token=self.token())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(messages[0], 'retry: 3000\n\n')
+        events = [message.split('\n')[1] for message in messages[1:]]
+        self.assertEqual(events, ['event: notification', 'event: alert', 'event: enrollment', 'event: done'])
+        self.assertIn('"status": "waitlisted"', messages[3])
+
+    def test_streams_end_when_the_token_expires(self):
+        # Once the stream is open, its clock moves past the token's expiry
+        later = mock.patch.object(views, 'time', mock.Mock(time=lambda: time.time() + 2 * 60 * 60))
+        self.addCleanup(later.stop)
+        with mock.patch.object(views, 'HEARTBEAT_INTERVAL', 0.05):
+            status, messages = self.stream_until_closed(self.token(), during=later.start)
+        self.assertEqual(status, 200)
+        self.assertEqual(messages[-1], 'event: token_expired\ndata: {}\n\n')
+
+    def test_streams_end_at_the_next_heartbeat_once_the_token_is_revoked(self):
+        token = self.token()
+        with mock.patch.object(views, 'HEARTBEAT_INTERVAL', 0.05):
+            status, messages = self.stream_until_closed(token, during=lambda: add_token_to_blacklist(token))
+        self.assertEqual(status, 200)
+        self.assertNotIn('event: token_expired\ndata: {}\n\n', messages)
@@ -0,0 +1,186 @@
+"""
+Tests for notification fan-out and unread counts
+"""
+
+import json
+import unittest
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from courses.models import Course, Enrollment
+from faculty import announcement_views, notification_views
+from users.models import Faculty, Staff, Student
+from . import notification_service
+from .models import Notification
+from .notification_service import NotificationService, UnreadCounter
+
+User = get_user_model()
+
+
+class NotificationServiceTest(TestCase):
+    def setUp(self):
+        # Without Redis, unread counts come from the database
+        notification_service._unread_counter = UnreadCounter()
+        self.addCleanup(setattr, notification_service, '_unread_counter', None)
+
+        self.faculty_user = User.objects.create_user(username='turing', password='pw', role='faculty',
+                                                     mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=self.faculty_user, employee_id='FAC001', department='CSE')
+        staff_user = User.objects.create_user(username='clerk', password=None, role='staff', mfa_enabled=False)
+        Staff.objects.create(user=staff_user, employee_id='STF001', department='CSE')
+        User.objects.create_user(username='retired', password=None, role='faculty', status='inactive',
+                                 mfa_enabled=False)
+
+        for course_id, department in (('CS101', 'CSE'), ('MA101', 'MATH')):
+            Course.objects.create(id=course_id, code=course_id, name=course_id, description='', credits=3,
+                                  instructor_id='FAC001', department=department, enrollment_limit=3000,
+                                  start_date='2026-09-01', end_date='2026-12-15')
+
+    def enroll_students(self, count, course_id='CS101'):
+        password = make_password(None)
+        users = User.objects.bulk_create([
+            User(username=f'{course_id}-{i}', password=password, role='student', mfa_enabled=False)
+            for i in range(count)
+        ])
+        Student.objects.bulk_create([Student(user=user, student_id=f'STU-{user.username}') for user in users])
+        Enrollment.objects.bulk_create([
+            Enrollment(id=f'e-{user.username}', student_id=f'STU-{user.username}', course_id=course_id)
+            for user in users
+        ])
+        Enrollment.objects.filter(id=f'e-{users[0].username}').update(status='dropped')
+        return [str(user.pk) for user in users[1:]]
+
+    def test_course_fan_out_is_a_handful_of_statements(self):
+        roster = self.enroll_students(2001)
+        self.enroll_students(3, course_id='MA101')
+
+        with CaptureQueriesContext(connection) as queries:
+            notified = NotificationService.notify_course('CS101', 'Midterm moved', 'The midterm is on Friday')
+        self.assertEqual(notified, 2000)
+        # One roster query, then INSERTs of as many rows as the database takes per statement
+        batch_size = connection.ops.bulk_batch_size(['id', 'user_id', 'title', 'message', 'type', 'is_read',
+                                                     'created_at'], [])
+        inserts = -(-2000 // min(batch_size, notification_service.NOTIFICATION_BATCH_SIZE))
+        self.assertLessEqual(len([q for q in queries if q['sql'].startswith('INSERT')]), inserts)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('SELECT')]), 1)
+
+        self.assertEqual(sorted(Notification.objects.values_list('user_id', flat=True)), sorted(roster))
+        self.assertEqual(NotificationService.unread_count(roster[0]), 1)
+
+    def test_audiences(self):
+        cse_students = self.enroll_students(3)
+        math_students = self.enroll_students(2, course_id='MA101')
+        staff_id = str(Staff.objects.get().pk)
+        faculty_id = str(self.faculty_user.pk)
+
+        def audience(name, ids=None):
+            return sorted(str(user_id) for user_id in NotificationService.audience_user_ids(name, ids))
+
+        self.assertEqual(audience('department', ['CSE']), sorted(cse_students + [faculty_id, staff_id]))
+        self.assertEqual(audience('course', ['CS101', 'MA101']), sorted(cse_students + math_students))
+        self.assertEqual(audience('role', ['faculty']), [faculty_id])
+        self.assertEqual(len(audience('campus')), User.objects.filter(status='active').count())
+        self.assertEqual(audience('individual', [faculty_id]), [faculty_id])
+        with self.assertRaises(ValueError):
+            audience('planet')
+
+    def test_read_state(self):
+        user_id = str(self.faculty_user.pk)
+        NotificationService.notify_users([user_id, user_id], 'First', 'Hello')
+        NotificationService.notify_users([user_id], 'Second', 'Hello')
+        self.assertEqual(NotificationService.unread_count(user_id), 2)
+
+        first = Notification.objects.get(title='First')
+        self.assertTrue(NotificationService.mark_read(user_id, first.id).is_read)
+        self.assertIsNone(NotificationService.mark_read('someone-else', first.id))
+        self.assertEqual(NotificationService.unread_count(user_id), 1)
+
+        NotificationService.notify_users([user_id], 'Third', 'Hello')
+        with self.assertNumQueries(1):
+            self.assertEqual(NotificationService.mark_all_read(user_id), 2)
+        self.assertEqual(NotificationService.unread_count(user_id), 0)
+        self.assertTrue(NotificationService.delete(user_id, first.id))
+        self.assertFalse(NotificationService.delete(user_id, first.id))
+
+    def faculty_request(self, method, body=None):
+        if method == 'get':
+            request = RequestFactory().get('/')
+        else:
+            request = getattr(RequestFactory(), method)('/', json.dumps(body or {}), content_type='application/json')
+        request.user = self.faculty_user
+        request.faculty = self.faculty
+        return request
+
+    def test_views(self):
+        roster = self.enroll_students(4)
+        response = json.loads(announcement_views.create_announcement(self.faculty_request('post', {
+            'title': 'Lab cancelled', 'message': 'No lab this week', 'targetAudience': 'specific-course',
+            'courseId': 'CS101',
+        })).content)
+        self.assertEqual(response['notified'], 3)
+        self.assertEqual(Notification.objects.filter(user_id__in=roster, title='Lab cancelled').count(), 3)
+
+        user_id = str(self.faculty_user.pk)
+        NotificationService.notify_users([user_id, user_id], 'Office hours', 'Moved to 3pm')
+        response = json.loads(notification_views.get_unread_count(self.faculty_request('get')).content)
+        self.assertEqual(response['unread_count'], 1)
+        response = json.loads(notification_views.mark_all_notifications_read(self.faculty_request('put')).content)
+        self.assertEqual(response['count'], 1)
+        response = json.loads(notification_views.get_notifications(self.faculty_request('get')).content)
+        self.assertEqual(response['unread_count'], 0)
+
+
+@unittest.skipUnless(notification_service._redis_client(), 'Redis is not available')
+class RedisUnreadCounterTest(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.counter = UnreadCounter(notification_service._redis_client())
+        self.user_id = f'test-{uuid.uuid4()}'
+        self.addCleanup(self.counter.invalidate, [self.user_id])
+
+    def change(self, amount):
+        self.counter.increment([self.user_id], amount, self.counter.begin([self.user_id]))
+
+    def test_cached_counts_are_adjusted(self):
+        counter, user_id = self.counter, self.user_id
+
+        # Not cached yet: left to be filled on the next read
+        self.change(1)
+        self.assertEqual(counter.get(user_id), 0)
+        self.change(3)
+        self.change(-1)
+        self.assertEqual(counter.get(user_id), 2)
+        self.change(-5)
+        self.assertEqual(counter.get(user_id), 0)
+        self.change(2)
+        counter.reset(user_id)
+        self.assertEqual(counter.get(user_id), 0)
+
+    def test_changes_made_while_counting_are_not_lost(self):
+        def count_unread(user_id):
+            if count.call_count == 1:
+                # A notification committed and applied after it was counted
+                self.change(1)
+                return 0
+            return 1
+
+        with mock.patch.object(self.counter, 'count_unread', side_effect=count_unread) as count:
+            self.assertEqual(self.counter.get(self.user_id), 0)
+            self.assertEqual(self.counter.get(self.user_id), 1)
+            self.assertEqual(self.counter.get(self.user_id), 1)
+        self.assertEqual(count.call_count, 2)
+
+    def test_counts_filled_while_a_change_is_written_are_dropped(self):
+        started = self.counter.begin([self.user_id])
+        # Counted once the notification was committed, before it was applied
+        with mock.patch.object(self.counter, 'count_unread', return_value=1):
+            self.assertEqual(self.counter.get(self.user_id), 1)
+            self.counter.increment([self.user_id], 1, started)
+            self.assertEqual(self.counter.get(self.user_id), 1)
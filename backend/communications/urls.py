@@ -0,0 +1,6 @@
+from django.urls import path
+from communications.views import event_stream
+
+urlpatterns = [
+    path('stream/', event_stream, name='event_stream'),
+]
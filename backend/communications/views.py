@@ -1,3 +1,133 @@
-from django.shortcuts import render
+"""
+Server-push stream of notifications, alerts and enrollment changes.
 
-# Create your views here.
+GET /api/v1/events/stream/ is a Server-Sent Events stream replacing polling
+of the notification and announcement endpoints. It must be served through
+ASGI (backend/asgi.py, e.g. `uvicorn backend.asgi:application`): the
+response is an async generator waiting on the event bus, so a worker holds
+thousands of idle streams in one event loop. Under WSGI each stream would
+hold a thread.
+
+Browsers' EventSource can't send headers, so the JWT may also be passed as
+the `token` query parameter. A stream ends when its token expires (after a
+`token_expired` event, so the client reconnects with a fresh token) and, at
+the next heartbeat, once the token is revoked.
+"""
+
+import json
+import time
+
+import jwt
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from courses.models import Course, Enrollment
+from users.models import Admin, Faculty, Staff, Student
+from users.token_blacklist import is_payload_revoked
+from .event_bus import (
+    CAMPUS_CHANNEL, course_channel, department_channel, get_event_bus, role_channel, student_channel, user_channel,
+)
+
+User = get_user_model()
+
+# Seconds between comments keeping idle streams open through proxies
+HEARTBEAT_INTERVAL = 25
+# Milliseconds clients wait before reconnecting
+RECONNECT_DELAY = 3000
+
+
+def stream_channels(user_id):
+    """Event bus channels of a user's stream, or None if the user can't stream"""
+    user = User.objects.filter(pk=user_id, status='active').first()
+    if user is None:
+        return None
+    channels = {user_channel(user.pk), CAMPUS_CHANNEL, role_channel(user.role)}
+
+    # The audiences the user is part of (see NotificationService.audience_user_ids)
+    student = Student.objects.filter(user_id=user.pk).first()
+    if student is not None:
+        channels.add(student_channel(student.student_id))
+        course_ids = list(Enrollment.objects.filter(student_id=student.student_id, status='active')
+                          .values_list('course_id', flat=True))
+        channels.update(course_channel(course_id) for course_id in course_ids)
+        channels.update(department_channel(department) for department in
+                        Course.objects.filter(id__in=course_ids).values_list('department', flat=True).distinct())
+    for model in (Faculty, Admin, Staff):
+        department = model.objects.filter(user_id=user.pk).values_list('department', flat=True).first()
+        if department:
+            channels.add(department_channel(department))
+    return channels
+
+
+def _token_payload(request):
+    """(claims, token) of the request's valid, unrevoked JWT, or (None, None)"""
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    token = auth_header[len('Bearer '):] if auth_header.startswith('Bearer ') else request.GET.get('token')
+    if not token:
+        return None, None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+    except jwt.InvalidTokenError:
+        return None, None
+    if is_payload_revoked(payload, token):
+        return None, None
+    return payload, token
+
+
+def format_event(event):
+    """Server-Sent Events message of an event"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+async def _event_messages(channels, heartbeat_interval, payload=None, token=None):
+    """Messages of a stream, until its token (payload) expires or is revoked"""
+    expires_at = payload.get('exp') if payload else None
+    subscription = get_event_bus().subscribe(channels)
+    try:
+        yield f'retry: {RECONNECT_DELAY}\n\n'
+        # A client that fell too far behind reconnects and reloads
+        while not subscription.overflowed:
+            timeout = heartbeat_interval
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield 'event: token_expired\ndata: {}\n\n'
+                    return
+                timeout = min(timeout, remaining)
+            event = await subscription.get(timeout=timeout)
+            if event is not None:
+                yield format_event(event)
+            elif payload is not None and await sync_to_async(is_payload_revoked)(payload, token):
+                return
+            else:
+                yield ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+@csrf_exempt
+async def event_stream(request):
+    """Stream the events of the authenticated user"""
+    if request.method != 'GET':
+        return JsonResponse({
+            'success': False,
+            'message': 'Method not allowed'
+        }, status=405)
+
+    payload, token = await sync_to_async(_token_payload)(request)
+    channels = await sync_to_async(stream_channels)(payload.get('user_id')) if payload else None
+    if channels is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Authentication required'
+        }, status=401)
+
+    response = StreamingHttpResponse(_event_messages(channels, HEARTBEAT_INTERVAL, payload, token),
+                                     content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,108 @@
+"""
+Degree requirements by major.
+
+Each major needs a total number of credits split over requirement categories.
+A category lists the course codes that count toward it; a category without
+course codes (electives) is filled by courses that belong to no other category.
+"""
+
+DEGREE_REQUIREMENTS = {
+    'Computer Science & Engineering': {
+        'total_credits': 120,
+        'categories': {
+            'Core Computer Science': {
+                'credits_required': 45,
+                'course_codes': ['CSE101', 'CSE102', 'CSE201', 'CSE202', 'CSE301', 'CSE302', 'CSE401', 'CSE402']
+            },
+            'Mathematics': {
+                'credits_required': 18,
+                'course_codes': ['MA-101', 'MA-102', 'MA-201', 'MA-301', 'MA-401']
+            },
+            'General Education': {
+                'credits_required': 30,
+                'course_codes': ['ENG101', 'ENG102', 'SOC101', 'PHI101', 'HIS101']
+            },
+            'Electives': {
+                'credits_required': 27,
+                'course_codes': []
+            }
+        }
+    },
+    'Business Administration': {
+        'total_credits': 120,
+        'categories': {
+            'Core Business': {
+                'credits_required': 45,
+                'course_codes': ['BUS101', 'BUS102', 'BUS201', 'BUS301', 'BUS401']
+            },
+            'Mathematics': {
+                'credits_required': 12,
+                'course_codes': ['MA-101', 'MA-102', 'MA-201']
+            },
+            'General Education': {
+                'credits_required': 30,
+                'course_codes': ['ENG101', 'ENG102', 'SOC101', 'ECO101']
+            },
+            'Electives': {
+                'credits_required': 33,
+                'course_codes': []
+            }
+        }
+    },
+    'Microbiology': {
+        'total_credits': 120,
+        'categories': {
+            'Core Microbiology': {
+                'credits_required': 45,
+                'course_codes': ['BIO101', 'BIO102', 'BIO201', 'BIO301', 'CHE101']
+            },
+            'Laboratory Sciences': {
+                'credits_required': 18,
+                'course_codes': ['LAB101', 'LAB201', 'LAB301']
+            },
+            'General Education': {
+                'credits_required': 30,
+                'course_codes': ['ENG101', 'ENG102', 'MA-101']
+            },
+            'Electives': {
+                'credits_required': 27,
+                'course_codes': []
+            }
+        }
+    }
+}
+
+# Requirements of majors not listed above
+DEFAULT_REQUIREMENTS = {
+    'total_credits': 120,
+    'categories': {
+        'General Education': {
+            'credits_required': 120,
+            'course_codes': []
+        }
+    }
+}
+
+
+def get_degree_requirements(major):
+    """Get the degree requirements of a major"""
+    return DEGREE_REQUIREMENTS.get(major, DEFAULT_REQUIREMENTS)
+
+
+def normalize_code(code):
+    """Normalize a course code for matching, e.g. 'ma-101' -> 'MA101'"""
+    return (code or '').replace('-', '').replace(' ', '').upper()
+
+
+def category_for_code(requirements, code):
+    """Name of the first category listing a course code, or None if no category lists it"""
+    normalized = normalize_code(code)
+    for name, category in requirements['categories'].items():
+        if any(normalize_code(listed) == normalized for listed in category['course_codes']):
+            return name
+    return None
+
+
+def elective_categories(requirements):
+    """Names of the categories without course codes"""
+    return [name for name, category in requirements['categories'].items() if not category['course_codes']]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:47
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def _members(value):
+    """Member IDs of a JSON array field value (a list, or its JSON), without duplicates"""
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip() else []
+    if not isinstance(value, list):
+        return []
+    return list(dict.fromkeys(str(item) for item in value if item not in (None, '')))
+
+
+def copy_waitlists(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseWaitlistEntry = apps.get_model('courses', 'CourseWaitlistEntry')
+    CourseWaitlistEntry.objects.bulk_create([
+        CourseWaitlistEntry(course_id=course_id, member_id=student_id)
+        for course_id, waitlist in Course.objects.exclude(waitlist__isnull=True).values_list('id', 'waitlist')
+        for student_id in _members(waitlist)
+    ], batch_size=1000)
+
+
+def restore_waitlists(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    CourseWaitlistEntry = apps.get_model('courses', 'CourseWaitlistEntry')
+    waitlists = {}
+    for course_id, student_id in CourseWaitlistEntry.objects.order_by('id').values_list('course_id', 'member_id'):
+        waitlists.setdefault(course_id, []).append(student_id)
+    for course_id, waitlist in waitlists.items():
+        Course.objects.filter(id=course_id).update(waitlist=waitlist)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_courseprerequisite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseWaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(db_index=True, max_length=50)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='courses.course')),
+            ],
+            options={
+                'ordering': ['id'],
+                'abstract': False,
+                'unique_together': {('course', 'member_id')},
+            },
+        ),
+        migrations.RunPython(copy_waitlists, restore_waitlists),
+        migrations.RemoveField(
+            model_name='course',
+            name='waitlist',
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from memberships import Membership
 
 class Course(models.Model):
     """Course model"""
@@ -18,7 +19,6 @@ class Course(models.Model):
     syllabus = models.CharField(max_length=200, blank=True)  # URL or file reference
     textbooks = models.JSONField(null=True, blank=True)  # Array: book references
     enrollment_limit = models.IntegerField()
-    waitlist = models.JSONField(null=True, blank=True)  # Array: student IDs
     start_date = models.DateField()
     end_date = models.DateField()
     grading_scale = models.JSONField(null=True, blank=True)  # Object: grade thresholds
@@ -36,26 +36,15 @@ class Course(models.Model):
     
     def add_to_waitlist(self, student_id):
         """Add a student to the course waitlist"""
-        if self.waitlist is None:
-            self.waitlist = []
-        if isinstance(self.waitlist, list) and student_id not in self.waitlist:
-            self.waitlist.append(student_id)
-            self.save()
+        CourseWaitlistEntry.objects.add(self, student_id)
     
     def remove_from_waitlist(self, student_id):
         """Remove a student from the course waitlist"""
-        if self.waitlist is not None and isinstance(self.waitlist, list) and student_id in self.waitlist:
-            self.waitlist.remove(student_id)
-            self.save()
+        CourseWaitlistEntry.objects.remove(self, student_id)
     
     def get_waitlist_position(self, student_id):
         """Get a student's position in the waitlist (0 if not on waitlist)"""
-        if self.waitlist is not None and isinstance(self.waitlist, list):
-            try:
-                return self.waitlist.index(student_id) + 1
-            except ValueError:
-                return 0
-        return 0
+        return CourseWaitlistEntry.objects.position(self, student_id)
     
     def remove_student(self, student_id):
         """Remove a student from the course"""
@@ -118,7 +107,7 @@ class Course(models.Model):
             'syllabus': self.syllabus,
             'textbooks': self.textbooks,
             'enrollment_limit': self.enrollment_limit,
-            'waitlist': self.waitlist,
+            'waitlist': [entry.member_id for entry in self.waitlist_entries.all()],
             'start_date': start_date_str,
             'end_date': end_date_str,
             'grading_scale': self.grading_scale,
@@ -131,6 +120,18 @@ class Course(models.Model):
         return f"{self.code}: {self.name}"
 
 
+class CourseWaitlistEntry(Membership):
+    """A student on a course's waitlist (member_id is the student ID), in waitlist order"""
+    group_field = 'course'
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='waitlist_entries')
+    
+    class Meta(Membership.Meta):
+        unique_together = ('course', 'member_id')
+    
+    def __str__(self):
+        return f"{self.member_id} waitlisted for {self.course_id}"
+
+
 class CoursePrerequisite(models.Model):
     """Model to represent course prerequisite relationships"""
     id = models.CharField(max_length=50, primary_key=True)
@@ -0,0 +1,666 @@
+"""
+Multi-term academic plan optimizer.
+
+Plans the courses a student still needs for their degree into terms so they
+graduate as early as possible. Courses are first selected to cover the degree
+requirement categories, then scheduled term by term subject to prerequisites
+(taken in an earlier term), corequisites (taken in the same or an earlier
+term), the seasons each course is offered in and a per-term credit cap.
+
+Scheduling is a branch-and-bound search over the set of remaining courses,
+kept as a bitmask:
+
+- a term only takes maximal sets of available courses, since moving an
+  available course earlier never delays graduation
+- interchangeable courses (same credits, requisites, dependents and seasons)
+  are only taken in one fixed order
+- a branch is cut when its lower bound (remaining credits over the cap, or the
+  longest remaining prerequisite chain) can't beat the best plan found
+- the best plan from each (remaining courses, season) state is memoized, so
+  sub-plans reached through different orders of earlier terms are solved once
+
+plan_for_student and plan_for_major cache their plans, keyed by a version of
+the catalog and of the student's enrollments; courses.signals starts new
+versions when those change (invalidate_catalog, invalidate_student).
+"""
+
+import hashlib
+import json
+import uuid
+from datetime import date
+
+from django.core.cache import cache
+
+from .degree_requirements import elective_categories, normalize_code
+
+SEASONS = ['Spring', 'Summer', 'Fall']
+
+# Seasons planned when summer terms are left out
+REGULAR_SEASONS = ['Spring', 'Fall']
+
+DEFAULT_CREDIT_CAP = 18
+DEFAULT_MAX_TERMS = 16
+
+# Search steps (terms and course choices tried) before settling for the best
+# plan found so far
+DEFAULT_NODE_LIMIT = 200000
+
+# Plans are also recomputed after this long, e.g. for enrollments changed in bulk
+PLAN_CACHE_TIMEOUT = 60 * 60
+CATALOG_VERSION_KEY = 'academic_plan:catalog_version'
+STUDENT_VERSION_KEY = 'academic_plan:student_version:{}'
+
+
+class PlanCourse:
+    """A catalog course with its credits, requisites and the seasons it is offered in"""
+
+    def __init__(self, code, credits, name='', department='', prerequisites=(), corequisites=(), seasons=None):
+        self.code = code
+        self.credits = credits
+        self.name = name
+        self.department = department
+        self.prerequisites = set(prerequisites)
+        self.corequisites = set(corequisites)
+        # None when the course is offered every season
+        self.seasons = set(seasons) if seasons else None
+
+    def is_offered(self, season):
+        return self.seasons is None or season in self.seasons
+
+
+def season_for_date(day):
+    """Season of the term a date falls in"""
+    if day.month <= 4:
+        return 'Spring'
+    if day.month <= 7:
+        return 'Summer'
+    return 'Fall'
+
+
+def next_term(day=None, include_summer=False):
+    """(season, year) of the first term after the one a date falls in"""
+    day = day or date.today()
+    seasons = SEASONS if include_summer else REGULAR_SEASONS
+    index = SEASONS.index(season_for_date(day))
+    year = day.year
+    while True:
+        index += 1
+        if index == len(SEASONS):
+            index = 0
+            year += 1
+        if SEASONS[index] in seasons:
+            return SEASONS[index], year
+
+
+def term_sequence(start, count, include_summer=False):
+    """Labels of count consecutive terms from start, e.g. ['Fall 2026', 'Spring 2027']"""
+    seasons = SEASONS if include_summer else REGULAR_SEASONS
+    season, year = start
+    index = SEASONS.index(season)
+    terms = []
+    while len(terms) < count:
+        if SEASONS[index] in seasons:
+            terms.append((SEASONS[index], year))
+        index += 1
+        if index == len(SEASONS):
+            index = 0
+            year += 1
+    return terms
+
+
+def load_catalog():
+    """Load every course and its requisites with two queries
+
+    Sections of a course share its code; the course is offered in the seasons
+    any of them starts in.
+    """
+    from .models import Course, CoursePrerequisite
+
+    catalog = {}
+    seasons = {}
+    for row in Course.objects.values('code', 'name', 'credits', 'department', 'start_date'):
+        if row['code'] not in catalog:
+            catalog[row['code']] = PlanCourse(row['code'], row['credits'], row['name'], row['department'])
+            seasons[row['code']] = set()
+        if row['start_date']:
+            seasons[row['code']].add(season_for_date(row['start_date']))
+    for code, offered in seasons.items():
+        catalog[code].seasons = offered or None
+
+    requisites = CoursePrerequisite.objects.values_list('course__code', 'prerequisite_course__code', 'is_corequisite')
+    for code, requisite, is_corequisite in requisites:
+        if code == requisite:
+            continue
+        if is_corequisite:
+            catalog[code].corequisites.add(requisite)
+        else:
+            catalog[code].prerequisites.add(requisite)
+    return catalog
+
+
+def load_student_history(student_id):
+    """Course code -> credits of the courses a student has passed or is taking"""
+    from .models import Course, Enrollment
+
+    enrollments = Enrollment.objects.filter(
+        student_id=student_id, status__in=['completed', 'active']
+    ).exclude(grade__iexact='F').values_list('course_id', flat=True)
+    return dict(Course.objects.filter(id__in=list(enrollments)).values_list('code', 'credits'))
+
+
+def select_courses(catalog, requirements, done=None, department=''):
+    """Choose the courses still needed to meet each requirement category
+
+    Completed and in-progress courses count first. Each category with course
+    codes then takes its listed courses, those with the fewest missing
+    requisites first. Elective categories and any credits still short of the
+    total take other courses, the student's department first. A course brings
+    its missing requisites along; credits beyond a category's requirement
+    count toward the electives.
+
+    Returns:
+        (selected course codes with requisites first, category progress,
+         credits that no catalog course could cover)
+    """
+    done = done or {}
+    categories = requirements['categories']
+    electives = elective_categories(requirements)
+
+    by_normalized_code = {normalize_code(code): code for code in catalog}
+    listed = {}
+    for name, category in categories.items():
+        for code in category['course_codes']:
+            catalog_code = by_normalized_code.get(normalize_code(code))
+            if catalog_code:
+                listed.setdefault(catalog_code, name)
+
+    progress = {
+        name: {'name': name, 'credits_required': category['credits_required'],
+               'credits_completed': 0, 'credits_planned': 0, 'planned_courses': []}
+        for name, category in categories.items()
+    }
+    totals = {'completed': 0, 'planned': 0}
+
+    def needed(name):
+        category = progress[name]
+        return category['credits_required'] - category['credits_completed'] - category['credits_planned']
+
+    def count(code, credits, planned):
+        """Count a course toward its category, or an elective category once that is met"""
+        name = listed.get(code)
+        if name is None or needed(name) <= 0:
+            name = next((n for n in electives if needed(n) > 0), None)
+        if planned:
+            totals['planned'] += credits
+        else:
+            totals['completed'] += credits
+        if name is not None:
+            progress[name]['credits_planned' if planned else 'credits_completed'] += credits
+            if planned:
+                progress[name]['planned_courses'].append(code)
+        return name
+
+    # Courses the student already has count before anything is planned
+    for code, credits in sorted(done.items(), key=lambda item: item[0] not in listed):
+        count(code, credits or 0, planned=False)
+
+    taken = set(done)
+    selected = []
+
+    def missing(code, seen=None):
+        """Requisites of a course not taken yet, prerequisites before the courses needing them"""
+        seen = set() if seen is None else seen
+        if code in taken or code in seen or code not in catalog:
+            return []
+        seen.add(code)
+        course = catalog[code]
+        result = []
+        for requisite in sorted(course.prerequisites | course.corequisites):
+            result.extend(missing(requisite, seen))
+        result.append(code)
+        return result
+
+    def take(code):
+        for requisite in missing(code):
+            taken.add(requisite)
+            selected.append(requisite)
+            count(requisite, catalog[requisite].credits, planned=True)
+
+    def cost(code):
+        chain = missing(code)
+        return len(chain), -catalog[code].credits, code
+
+    for name, category in categories.items():
+        options = [code for code, listed_name in listed.items() if listed_name == name]
+        while needed(name) > 0:
+            options = [code for code in options if code not in taken]
+            if not options:
+                break
+            take(min(options, key=cost))
+
+    def elective_cost(code):
+        return catalog[code].department != department, cost(code)
+
+    def fill(pool, short):
+        while short():
+            pool = [code for code in pool if code not in taken]
+            if not pool:
+                break
+            take(min(pool, key=elective_cost))
+
+    # Electives come from courses no category lists, then any credits still
+    # short of the total from whatever courses are left
+    required_total = requirements.get('total_credits', 0)
+    fill([code for code in catalog if code not in listed],
+         lambda: any(needed(name) > 0 for name in electives))
+    fill(list(catalog), lambda: totals['completed'] + totals['planned'] < required_total)
+
+    shortfall = sum(max(0, needed(name)) for name in categories)
+    shortfall = max(shortfall, required_total - totals['completed'] - totals['planned'])
+    for category in progress.values():
+        category['shortfall'] = max(0, needed(category['name']))
+    return selected, list(progress.values()), shortfall
+
+
+def _bits(mask):
+    """Indices of the set bits of a mask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PlanScheduler:
+    """Branch-and-bound scheduler of courses into the fewest terms
+
+    Requisites that are not among the courses being scheduled are treated as
+    done. Terms cycle through seasons, starting with the first one.
+    """
+
+    def __init__(self, courses, seasons, credit_cap=DEFAULT_CREDIT_CAP, max_terms=DEFAULT_MAX_TERMS,
+                 node_limit=DEFAULT_NODE_LIMIT):
+        self.courses = sorted(courses, key=lambda course: course.code)
+        self.seasons = list(seasons)
+        self.credit_cap = credit_cap
+        self.max_terms = max_terms
+        self.node_limit = node_limit
+
+        index = {course.code: i for i, course in enumerate(self.courses)}
+        count = len(self.courses)
+        self.credits = [course.credits or 0 for course in self.courses]
+        self.prerequisites = [
+            sum(1 << index[code] for code in course.prerequisites if code in index) for course in self.courses
+        ]
+        self.corequisites = [
+            sum(1 << index[code] for code in course.corequisites if code in index) for course in self.courses
+        ]
+
+        # Courses heavier than a term, alone or with their corequisites, can never be taken
+        too_heavy = 0
+        for i in range(count):
+            if self._mask_credits(self._bundle(i, 0)) > credit_cap:
+                too_heavy |= 1 << i
+        self.offered = [
+            sum(1 << i for i, course in enumerate(self.courses) if course.is_offered(season)) & ~too_heavy
+            for season in self.seasons
+        ]
+
+        # Taking every available course each term finds the courses that can
+        # never be scheduled
+        self.unschedulable, _ = self._schedule_uncapped((1 << count) - 1)
+        self.schedulable = ((1 << count) - 1) & ~self.unschedulable
+
+        # Terms from taking a course to finishing everything that depends on it
+        self.tail = [1] * count
+        for _ in range(count + 1):
+            changed = False
+            for i in _bits(self.schedulable):
+                tail = 1
+                for j in _bits(self.schedulable):
+                    if self.prerequisites[j] >> i & 1:
+                        tail = max(tail, self.tail[j] + 1)
+                    elif self.corequisites[j] >> i & 1:
+                        tail = max(tail, self.tail[j])
+                if tail != self.tail[i]:
+                    self.tail[i] = tail
+                    changed = True
+            if not changed:
+                break
+
+        # Longest chains first, then the heaviest courses
+        self.priority = sorted(range(count), key=lambda i: (-self.tail[i], -self.credits[i], self.courses[i].code))
+
+        # Courses that can stand in for each other share a class
+        dependents = [
+            tuple(self.prerequisites[j] >> i & 1 for j in range(count)) +
+            tuple(self.corequisites[j] >> i & 1 for j in range(count))
+            for i in range(count)
+        ]
+        keys = {}
+        self.classes = [
+            keys.setdefault((self.credits[i], self.prerequisites[i], self.corequisites[i], dependents[i],
+                             tuple(offered >> i & 1 for offered in self.offered)), len(keys))
+            for i in range(count)
+        ]
+
+        self.memo = {}
+        self.nodes = 0
+        self.truncated = False
+
+    def _mask_credits(self, mask):
+        return sum(self.credits[i] for i in _bits(mask))
+
+    def _bundle(self, i, done):
+        """A course with the corequisites, not done yet, that must be taken with it"""
+        bundle = 1 << i
+        frontier = bundle
+        while frontier:
+            added = 0
+            for j in _bits(frontier):
+                added |= self.corequisites[j]
+            frontier = added & ~done & ~bundle
+            bundle |= frontier
+        return bundle
+
+    def _available(self, remaining, done, season):
+        """Remaining courses that can be taken in a term of a season"""
+        available = 0
+        for i in _bits(remaining & self.offered[season]):
+            if not self.prerequisites[i] & ~done:
+                available |= 1 << i
+
+        # A course's corequisites must be done or taken alongside it
+        changed = True
+        while changed:
+            changed = False
+            for i in _bits(available):
+                if self.corequisites[i] & ~(done | available):
+                    available &= ~(1 << i)
+                    changed = True
+        return available
+
+    def _schedule_uncapped(self, remaining, done=0, season=0):
+        """Schedule without a credit cap: (courses never available, terms used)"""
+        terms = 0
+        idle = 0
+        while remaining and idle < len(self.seasons):
+            available = self._available(remaining, done, (season + terms) % len(self.seasons))
+            terms += 1
+            if available:
+                done |= available
+                remaining &= ~available
+                idle = 0
+            else:
+                idle += 1
+        return remaining, terms - idle
+
+    def _lower_bound(self, remaining, season):
+        """Fewest terms the remaining courses could take
+
+        Courses with a tail of h or more terms must all be taken h - 1 terms
+        before the end, so their credits over the cap bound the terms needed;
+        taking every available course each term bounds it too.
+        """
+        credits_by_tail = {}
+        for i in _bits(remaining):
+            credits_by_tail[self.tail[i]] = credits_by_tail.get(self.tail[i], 0) + self.credits[i]
+        bound = 0
+        credits = 0
+        for tail in sorted(credits_by_tail, reverse=True):
+            credits += credits_by_tail[tail]
+            bound = max(bound, tail - 1 - (-credits // self.credit_cap))
+        _, uncapped_terms = self._schedule_uncapped(remaining, self.schedulable & ~remaining, season)
+        return max(bound, uncapped_terms)
+
+    def _term_options(self, remaining, season):
+        """Maximal sets of available courses that fit in a term, the greedy choice first"""
+        done = self.schedulable & ~remaining
+        available = self._available(remaining, done, season)
+        if not available:
+            yield 0
+            return
+
+        order = [i for i in self.priority if available >> i & 1]
+        bundles = {i: self._bundle(i, done) for i in order}
+        # Credits of the candidates from each position on
+        later_credits = [0] * (len(order) + 1)
+        for k in range(len(order) - 1, -1, -1):
+            later_credits[k] = later_credits[k + 1] + self.credits[order[k]]
+        seen = set()
+
+        def extend(k, chosen, credits, excluded, excluded_classes, smallest_excluded):
+            self.nodes += 1
+            if self.nodes >= self.node_limit:
+                self.truncated = True
+                return
+            # A left out course that will still fit whatever else is taken
+            # means no maximal set can come from here
+            if self.credit_cap - credits - later_credits[k] >= smallest_excluded:
+                return
+            if k == len(order):
+                # Maximal: nothing left out still fits
+                for i in _bits(excluded):
+                    if credits + self._mask_credits(bundles[i] & ~chosen) <= self.credit_cap:
+                        return
+                if chosen not in seen:
+                    seen.add(chosen)
+                    yield chosen
+                return
+            i = order[k]
+            if chosen >> i & 1:
+                yield from extend(k + 1, chosen, credits, excluded, excluded_classes, smallest_excluded)
+                return
+            extra = bundles[i] & ~chosen
+            extra_credits = self._mask_credits(extra)
+            # Sets with a course left out earlier come from the branch that took it
+            if (credits + extra_credits <= self.credit_cap and not extra & excluded
+                    and self.classes[i] not in excluded_classes):
+                yield from extend(k + 1, chosen | extra, credits + extra_credits, excluded, excluded_classes,
+                                  smallest_excluded)
+            yield from extend(k + 1, chosen, credits, excluded | 1 << i, excluded_classes | {self.classes[i]},
+                              min(smallest_excluded, extra_credits))
+
+        yield from extend(0, 0, 0, 0, frozenset(), float('inf'))
+
+    def _search(self, remaining, term, budget):
+        """Fewest terms (a list of course masks) for the remaining courses, or None if over budget"""
+        if not remaining:
+            return []
+        season = term % len(self.seasons)
+        bound = self._lower_bound(remaining, season)
+        if bound > budget:
+            return None
+
+        key = (remaining, season)
+        known = self.memo.get(key)
+        if isinstance(known, list):
+            return known if len(known) <= budget else None
+        if known is not None and budget <= known:
+            # Known to need more than `known` terms
+            return None
+
+        self.nodes += 1
+        best = None
+        for option in self._term_options(remaining, season):
+            if self.nodes >= self.node_limit:
+                self.truncated = True
+                break
+            limit = (len(best) - 1 if best is not None else budget) - 1
+            rest = self._search(remaining & ~option, term + 1, limit)
+            if rest is not None:
+                best = [option] + rest
+                if len(best) == bound:
+                    break
+
+        # Plans found after the node limit are not known to be the shortest
+        if not self.truncated:
+            self.memo[key] = best if best is not None else budget
+        return best
+
+    def _greedy(self):
+        """Plan taking the highest priority courses that fit each term, or None if over max_terms"""
+        remaining = self.schedulable
+        plan = []
+        while remaining and len(plan) < self.max_terms:
+            done = self.schedulable & ~remaining
+            available = self._available(remaining, done, len(plan) % len(self.seasons))
+            chosen = 0
+            credits = 0
+            for i in self.priority:
+                if available >> i & 1 and not chosen >> i & 1:
+                    extra = self._bundle(i, done) & ~chosen
+                    extra_credits = self._mask_credits(extra)
+                    if credits + extra_credits <= self.credit_cap:
+                        chosen |= extra
+                        credits += extra_credits
+            plan.append(chosen)
+            remaining &= ~chosen
+        return None if remaining else plan
+
+    def solve(self):
+        """Schedule the courses
+
+        Returns:
+            Dictionary with the courses of each term, whether the plan is known
+            to be optimal, the lower bound it was measured against and the
+            courses that can't be scheduled; terms is None when no plan fits
+            in max_terms
+        """
+        lower_bound = self._lower_bound(self.schedulable, 0)
+        # The greedy plan is the one to beat, and the answer if the search runs out of steps
+        plan = self._greedy()
+        if plan is None or len(plan) > lower_bound:
+            budget = len(plan) - 1 if plan is not None else self.max_terms
+            plan = self._search(self.schedulable, 0, budget) or plan
+        return {
+            'terms': None if plan is None else [
+                [self.courses[i] for i in sorted(_bits(mask), key=lambda i: self.courses[i].code)] for mask in plan
+            ],
+            'optimal': plan is not None and (not self.truncated or len(plan) == lower_bound),
+            'lower_bound': lower_bound,
+            'nodes': self.nodes,
+            'unschedulable': [self.courses[i].code for i in _bits(self.unschedulable)],
+        }
+
+
+def optimize_plan(catalog, requirements, done=None, department='', start=None, include_summer=False,
+                  credit_cap=DEFAULT_CREDIT_CAP, max_terms=DEFAULT_MAX_TERMS, node_limit=DEFAULT_NODE_LIMIT):
+    """Plan the courses a student still needs into the fewest terms
+
+    Args:
+        catalog: Dictionary of course code -> PlanCourse
+        requirements: Degree requirements (see courses.degree_requirements)
+        done: Dictionary of course code -> credits of passed and in-progress courses
+        department: Department whose courses are preferred as electives
+        start: (season, year) of the first planned term, the next term by default
+        include_summer: Whether summer terms are planned
+        credit_cap: Most credits per term
+        max_terms: Most terms a plan may take
+        node_limit: Search nodes explored before settling for the best plan found
+
+    Returns:
+        Dictionary with the planned terms and the progress of each requirement category
+
+    Raises:
+        ValueError: If the remaining courses can't be planned within max_terms
+    """
+    if credit_cap <= 0 or max_terms <= 0:
+        raise ValueError("credit_cap and max_terms must be positive")
+
+    start = start or next_term(include_summer=include_summer)
+    cycle = len(SEASONS if include_summer else REGULAR_SEASONS)
+    seasons = [season for season, _ in term_sequence(start, cycle, include_summer)]
+
+    selected, categories, shortfall = select_courses(catalog, requirements, done, department)
+    scheduler = PlanScheduler([catalog[code] for code in selected], seasons, credit_cap, max_terms, node_limit)
+    schedule = scheduler.solve()
+    if schedule['terms'] is None:
+        raise ValueError(f"The remaining courses can't be planned within {max_terms} terms")
+
+    category_of = {code: category['name'] for category in categories for code in category['planned_courses']}
+    planned_terms = []
+    for (season, year), courses in zip(term_sequence(start, len(schedule['terms']), include_summer),
+                                       schedule['terms']):
+        planned_terms.append({
+            'term': f'{season} {year}',
+            'credits': sum(course.credits for course in courses),
+            'courses': [
+                {'code': course.code, 'name': course.name, 'credits': course.credits,
+                 'category': category_of.get(course.code)}
+                for course in courses
+            ],
+        })
+
+    return {
+        'terms': planned_terms,
+        'terms_needed': len(planned_terms),
+        'graduation_term': planned_terms[-1]['term'] if planned_terms else None,
+        'optimal': schedule['optimal'],
+        'lower_bound': schedule['lower_bound'],
+        'search_nodes': schedule['nodes'],
+        'credit_cap': credit_cap,
+        'total_credits_required': requirements.get('total_credits', 0),
+        'credits_done': sum(credits or 0 for credits in (done or {}).values()),
+        'credits_planned': sum(term['credits'] for term in planned_terms),
+        'categories': categories,
+        'shortfall_credits': shortfall,
+        'unschedulable': schedule['unschedulable'],
+    }
+
+
+def _version(key):
+    """Version token stored under key, starting one if there is none"""
+    cache.add(key, uuid.uuid4().hex, None)
+    return cache.get(key)
+
+
+def invalidate_catalog():
+    """Recompute every cached plan (courses or requisites changed)"""
+    cache.delete(CATALOG_VERSION_KEY)
+
+
+def invalidate_student(student_id):
+    """Recompute a student's cached plans (their enrollments changed)"""
+    cache.delete(STUDENT_VERSION_KEY.format(student_id))
+
+
+def _cached_plan(key_parts, options, compute):
+    """The cached plan of key_parts and options, computing and caching it if missing
+
+    The start term is part of the key, so plans move on with the calendar.
+    """
+    start = options.get('start') or next_term(include_summer=options.get('include_summer', False))
+    options = dict(options, start=start)
+    key_parts = [_version(CATALOG_VERSION_KEY)] + key_parts + [sorted(options.items())]
+    key = 'academic_plan:' + hashlib.sha256(json.dumps(key_parts, default=str).encode()).hexdigest()
+    plan = cache.get(key)
+    if plan is None:
+        plan = compute(options)
+        cache.set(key, plan, PLAN_CACHE_TIMEOUT)
+    return plan
+
+
+def plan_for_student(student_id, major, **options):
+    """Plan a student's remaining courses from their enrollments and the catalog (cached)"""
+    from .degree_requirements import get_degree_requirements
+
+    return _cached_plan(
+        [_version(STUDENT_VERSION_KEY.format(student_id)), student_id, major], options,
+        lambda options: optimize_plan(
+            load_catalog(),
+            get_degree_requirements(major),
+            load_student_history(student_id),
+            department=major,
+            **options
+        )
+    )
+
+
+def plan_for_major(major, **options):
+    """Plan a major's courses for a student starting it (cached)"""
+    from .degree_requirements import get_degree_requirements
+
+    return _cached_plan(
+        [major], options,
+        lambda options: optimize_plan(load_catalog(), get_degree_requirements(major), department=major, **options)
+    )
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Course, CoursePrerequisite, Enrollment
+from .plan_optimizer import invalidate_catalog, invalidate_student
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=CoursePrerequisite)
+@receiver(post_delete, sender=CoursePrerequisite)
+def invalidate_catalog_plans(sender, instance, **kwargs):
+    """Plans are built from the catalog's courses and requisites"""
+    if kwargs.get('raw'):
+        return
+    invalidate_catalog()
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_student_plans(sender, instance, **kwargs):
+    """A student's plans count the courses they passed or are taking"""
+    if kwargs.get('raw'):
+        return
+    invalidate_student(instance.student_id)
@@ -0,0 +1,195 @@
+"""
+Tests for the academic plan optimizer
+"""
+
+import json
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from faculty import advising_views
+from . import plan_optimizer
+from faculty.real_advising_views import optimize_academic_plan
+from users.models import Faculty, Student
+from .models import Course, CoursePrerequisite, Enrollment
+from .plan_optimizer import PlanCourse, PlanScheduler, load_catalog, optimize_plan, plan_for_student
+
+User = get_user_model()
+
+
+def codes(terms):
+    return [[course.code for course in term] for term in terms]
+
+
+class PlanSchedulerTest(SimpleTestCase):
+    def test_beats_the_greedy_plan(self):
+        # Taking the heaviest courses first needs four terms of 4 credits
+        courses = [
+            PlanCourse('C0', 2), PlanCourse('C1', 2), PlanCourse('C2', 1),
+            PlanCourse('C3', 1, prerequisites=['C0']),
+            PlanCourse('C4', 3, prerequisites=['C0', 'C2']),
+            PlanCourse('C5', 3),
+        ]
+        scheduler = PlanScheduler(courses, ['Fall', 'Spring'], credit_cap=4)
+        self.assertEqual(len(scheduler._greedy()), 4)
+
+        schedule = scheduler.solve()
+        self.assertEqual(codes(schedule['terms']), [['C0', 'C1'], ['C2', 'C5'], ['C3', 'C4']])
+        self.assertTrue(schedule['optimal'])
+
+    def test_requisites_seasons_and_cap(self):
+        courses = [
+            PlanCourse('CS101', 3),
+            PlanCourse('CS101L', 1),
+            PlanCourse('CS102', 3, prerequisites=['CS101'], corequisites=['CS101L']),
+            PlanCourse('CS201', 3, prerequisites=['CS102'], seasons=['Fall']),
+            PlanCourse('CS999', 20),
+        ]
+        schedule = PlanScheduler(courses, ['Fall', 'Spring'], credit_cap=6).solve()
+
+        # CS201 waits for the next Fall; CS999 never fits in a term
+        self.assertEqual(codes(schedule['terms']), [['CS101', 'CS101L'], ['CS102'], ['CS201']])
+        self.assertEqual(schedule['unschedulable'], ['CS999'])
+
+        # Starting in Spring, CS201 skips a Spring term with nothing to take
+        schedule = PlanScheduler(courses[:4], ['Spring', 'Fall'], credit_cap=6).solve()
+        self.assertEqual(codes(schedule['terms']), [['CS101', 'CS101L'], ['CS102'], [], ['CS201']])
+
+
+class OptimizePlanTest(SimpleTestCase):
+    def setUp(self):
+        self.catalog = {
+            'MA-101': PlanCourse('MA-101', 3, department='Mathematics'),
+            'MA-102': PlanCourse('MA-102', 3, department='Mathematics', prerequisites=['MA-101']),
+            'CSE101': PlanCourse('CSE101', 4, department='CSE'),
+            'CSE201': PlanCourse('CSE201', 4, department='CSE', prerequisites=['CSE101', 'MA-102']),
+            'ART100': PlanCourse('ART100', 3, department='Arts'),
+            'CSE150': PlanCourse('CSE150', 3, department='CSE'),
+        }
+        self.requirements = {
+            'total_credits': 18,
+            'categories': {
+                'Core': {'credits_required': 8, 'course_codes': ['CSE101', 'CSE201']},
+                'Mathematics': {'credits_required': 3, 'course_codes': ['MA101', 'MA102']},
+                'Electives': {'credits_required': 3, 'course_codes': []},
+            }
+        }
+
+    def test_selects_requirements_and_plans_fewest_terms(self):
+        plan = optimize_plan(self.catalog, self.requirements, done={'MA-101': 3}, department='CSE',
+                             start=('Fall', 2026), credit_cap=10)
+
+        self.assertEqual([term['term'] for term in plan['terms']], ['Fall 2026', 'Spring 2027'])
+        planned = {course['code']: course['category'] for term in plan['terms'] for course in term['courses']}
+        # CSE201 brings MA-102 along, which counts as an elective once Mathematics
+        # is met; the rest of the total comes from the student's department first
+        self.assertEqual(planned, {'CSE101': 'Core', 'CSE201': 'Core', 'MA-102': 'Electives',
+                                   'CSE150': None, 'ART100': None})
+        self.assertEqual(plan['credits_done'] + plan['credits_planned'], 20)
+        self.assertEqual(plan['shortfall_credits'], 0)
+        self.assertTrue(plan['optimal'])
+
+    def test_raises_when_plan_exceeds_max_terms(self):
+        with self.assertRaises(ValueError):
+            optimize_plan(self.catalog, self.requirements, credit_cap=4, max_terms=2, start=('Fall', 2026))
+
+
+class PlanForStudentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        advisor = User.objects.create_user(username='advisor', password='pw', role='faculty', mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=advisor, employee_id='FAC001')
+        user = User.objects.create_user(username='student', password='pw', role='student', mfa_enabled=False)
+        Student.objects.create(user=user, student_id='STU001', advisor_id='FAC001',
+                               degree_program='Business Administration')
+
+        for course_id, credits, start_date in [('BUS101', 3, '2024-09-01'), ('BUS102', 3, '2025-01-10'),
+                                               ('BUS201', 3, '2024-09-01'), ('BUS201-S2', 3, '2025-01-10')]:
+            Course.objects.create(
+                id=course_id, code=course_id.split('-')[0], name=course_id, description='', credits=credits,
+                instructor_id='FAC001', department='Business Administration', enrollment_limit=30,
+                start_date=start_date, end_date=start_date
+            )
+        CoursePrerequisite.objects.create(id='p1', course_id='BUS102', prerequisite_course_id='BUS101')
+        CoursePrerequisite.objects.create(id='p2', course_id='BUS201', prerequisite_course_id='BUS102')
+        Enrollment.objects.create(id='e1', student_id='STU001', course_id='BUS101', status='completed', grade='B')
+
+    def test_loads_catalog_and_history(self):
+        catalog = load_catalog()
+        self.assertEqual(catalog['BUS102'].prerequisites, {'BUS101'})
+        self.assertEqual(catalog['BUS102'].seasons, {'Spring'})
+        # Sections starting in both seasons make BUS201 offered in both
+        self.assertEqual(catalog['BUS201'].seasons, {'Spring', 'Fall'})
+
+        plan = plan_for_student('STU001', 'Business Administration', start=('Fall', 2026))
+        self.assertEqual([[c['code'] for c in term['courses']] for term in plan['terms']],
+                         [[], ['BUS102'], ['BUS201']])
+        self.assertEqual(plan['credits_done'], 3)
+
+    def test_plans_are_cached_until_the_catalog_or_enrollments_change(self):
+        def plan():
+            return plan_for_student('STU001', 'Business Administration', start=('Fall', 2026))
+
+        with mock.patch.object(plan_optimizer, 'optimize_plan', wraps=optimize_plan) as optimize:
+            plan()
+            plan()
+            self.assertEqual(optimize.call_count, 1)
+
+            Enrollment.objects.create(id='e2', student_id='STU001', course_id='BUS102', status='active')
+            self.assertEqual(plan()['credits_done'], 6)
+            # Another student's enrollments don't touch the plan
+            Enrollment.objects.create(id='e3', student_id='STU002', course_id='BUS101', status='active')
+            plan()
+            self.assertEqual(optimize.call_count, 2)
+
+            CoursePrerequisite.objects.get(id='p2').delete()
+            self.assertEqual([[c['code'] for c in term['courses']] for term in plan()['terms']], [['BUS201']])
+            self.assertEqual(optimize.call_count, 3)
+
+    def test_view_plans_advisees_only(self):
+        factory = RequestFactory()
+        request = factory.post('/', data=json.dumps({'start_term': 'spring 2027', 'credit_cap': 12}),
+                               content_type='application/json')
+        request.faculty = self.faculty
+        response = optimize_academic_plan(request, 'STU001')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['terms'][0], {'term': 'Spring 2027', 'credits': 3, 'courses': [
+            {'code': 'BUS102', 'name': 'BUS102', 'credits': 3, 'category': 'Core Business'}]})
+
+        request = factory.post('/', data=json.dumps({'start_term': 'soon'}), content_type='application/json')
+        request.faculty = self.faculty
+        self.assertEqual(optimize_academic_plan(request, 'STU001').status_code, 400)
+        self.assertEqual(optimize_academic_plan(request, 'STU999').status_code, 404)
+
+    def test_advising_tools_plan_once_and_reject_unplannable_timelines(self):
+        factory = RequestFactory()
+        request = factory.get('/')
+        request.faculty = self.faculty
+        with mock.patch.object(plan_optimizer, 'optimize_plan', wraps=optimize_plan) as optimize:
+            response = advising_views.get_course_recommendations(request, 'STU001')
+            self.assertEqual(response.status_code, 200)
+            optimize.assert_called_once()
+            # Served from the cache afterwards
+            advising_views.get_course_recommendations(request, 'STU001')
+            optimize.assert_called_once()
+
+        request = factory.post('/', data=json.dumps({'timeline_semesters': 2}), content_type='application/json')
+        request.faculty = self.faculty
+        with mock.patch.object(advising_views, 'plan_for_student', side_effect=ValueError('No plan fits')):
+            response = advising_views.optimize_academic_plan(request, 'STU001')
+        self.assertEqual((response.status_code, json.loads(response.content)['message']), (400, 'No plan fits'))
+
+    def test_degree_planning_counts_planned_semesters(self):
+        token = jwt.encode({'user_id': User.objects.get(username='student').id}, settings.SECRET_KEY, algorithm='HS256')
+        response = self.client.get('/api/v1/student/degree-planning/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['major'], 'Business Administration')
+        self.assertEqual([term['courses'] for term in data['plannedSemesters']][-2:], [['BUS102'], ['BUS201']])
+        # 111 credits no catalog course covers take 7 more semesters of 18 credits
+        self.assertEqual(data['semestersRemaining'], len(data['plannedSemesters']) + 7)
@@ -0,0 +1,155 @@
+"""
+Counters of the role dashboards.
+
+All counters of a dashboard come from one SQL statement: every table's
+counters are conditional aggregates over one scan of that table, and the
+tables' single-row results are cross joined:
+
+    SELECT * FROM (SELECT COUNT(id), COUNT(CASE WHEN role = 'student' THEN 1 END), ... FROM users_user) m0
+    CROSS JOIN (SELECT COUNT(id) FROM courses_course) m1 ...
+
+Results are cached for a few seconds. When they expire, one request
+recomputes them while concurrent requests wait for its result instead of
+all querying the database at once.
+"""
+
+import time
+from datetime import timedelta
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Count, DecimalField, F, Func, IntegerField, Q, When
+from django.utils import timezone
+from assignments.models import Assignment
+from courses.models import Course
+from finance.models import FinancialAid, Payment
+from library.models import LibraryBook
+from users.models import User
+
+DASHBOARD_CACHE_TIMEOUT = 30
+
+# How long the request recomputing a dashboard holds its lock, and how long
+# other requests wait for its result before computing it themselves
+RECOMPUTE_LOCK_TIMEOUT = 10
+RECOMPUTE_WAIT = 5
+RECOMPUTE_POLL_INTERVAL = 0.05
+
+def start_of_today():
+    """Midnight of the current local day, for "due before today" counters"""
+    return timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+
+class RowCount(Func):
+    """COUNT of the rows of a counter query, or of those matching a condition
+
+    Unlike Count, the ORM doesn't treat it as an aggregate, so a counter query
+    is not grouped and always returns exactly one row.
+    """
+    function = 'COUNT'
+    output_field = IntegerField()
+
+    def __init__(self, condition=None):
+        super().__init__(Case(When(condition, then=1)) if condition is not None else F('pk'))
+
+class RowSum(Func):
+    """SUM of a field over the rows of a counter query"""
+    function = 'SUM'
+    output_field = DecimalField()
+
+def counters_statement(counters):
+    """SQL and params of one statement computing every (queryset, {name: expression}) counter"""
+    parts = []
+    params = []
+    for i, (queryset, expressions) in enumerate(counters):
+        sql, part_params = queryset.order_by().annotate(**expressions).values(*expressions).query.sql_with_params()
+        parts.append(f'({sql}) m{i}')
+        params.extend(part_params)
+    return 'SELECT * FROM ' + ' CROSS JOIN '.join(parts), params
+
+def fetch_counters(counters):
+    """Run the counters' statement, returning {name: value}"""
+    sql, params = counters_statement(counters)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+        names = [column[0] for column in cursor.description]
+    return dict(zip(names, row))
+
+def admin_counters():
+    now = timezone.now()
+    return fetch_counters([
+        (User.objects.all(), {
+            'totalUsers': RowCount(),
+            'totalStudents': RowCount(Q(role='student')),
+            'totalFaculty': RowCount(Q(role='faculty')),
+            'totalAdmins': RowCount(Q(role='admin')),
+        }),
+        (Course.objects.all(), {'activeCourses': RowCount()}),
+        (Payment.objects.filter(created_at__gte=now - timedelta(days=30)), {'recentPayments': RowCount()}),
+        (LibraryBook.objects.all(), {
+            'totalBooks': RowCount(),
+            'borrowedBooks': RowCount(Q(status='borrowed')),
+        }),
+        (Assignment.objects.filter(created_at__gte=now - timedelta(days=7)), {'recentAssignments': RowCount()}),
+    ])
+
+def finance_admin_counters():
+    now = timezone.now()
+    counters = fetch_counters([
+        (Payment.objects.all(), {
+            'totalPayments': RowCount(),
+            'totalPaymentAmount': RowSum('amount'),
+            'recentPayments': RowCount(Q(created_at__gte=now - timedelta(days=30))),
+            'overduePayments': RowCount(Q(due_date__lt=start_of_today(), status='pending')),
+        }),
+        (FinancialAid.objects.filter(status='pending'), {'pendingAidApplications': RowCount()}),
+    ])
+    counters['totalPaymentAmount'] = float(counters['totalPaymentAmount'] or 0)
+    # The breakdown by type is a grouped query of its own
+    counters['paymentsByType'] = list(Payment.objects.order_by().values('type').annotate(count=Count('type')))
+    return counters
+
+def library_staff_counters():
+    now = timezone.now()
+    counters = fetch_counters([
+        (LibraryBook.objects.all(), {
+            'totalBooks': RowCount(),
+            'availableBooks': RowCount(Q(status='available')),
+            'borrowedBooks': RowCount(Q(status='borrowed')),
+            'reservedBooks': RowCount(Q(status='reserved')),
+            'overdueBooks': RowCount(Q(due_date__lt=start_of_today(), status='borrowed')),
+            'recentCheckouts': RowCount(Q(checkout_date__gte=now - timedelta(days=7))),
+        }),
+    ])
+    counters['reservationRequests'] = counters['reservedBooks']
+    return counters
+
+# Dashboard role -> function computing its counters
+DASHBOARD_COUNTERS = {
+    'admin': admin_counters,
+    'finance_admin': finance_admin_counters,
+    'library_staff': library_staff_counters,
+}
+
+def get_dashboard_metrics(role):
+    """Counters of a role's dashboard, from the cache or recomputed by a single request"""
+    key = f'dashboard_metrics:{role}'
+    metrics = cache.get(key)
+    if metrics is not None:
+        return metrics
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, True, RECOMPUTE_LOCK_TIMEOUT):
+        # Another request is recomputing the counters: wait for its result
+        deadline = time.monotonic() + RECOMPUTE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(RECOMPUTE_POLL_INTERVAL)
+            metrics = cache.get(key)
+            if metrics is not None:
+                return metrics
+        return DASHBOARD_COUNTERS[role]()
+
+    try:
+        metrics = DASHBOARD_COUNTERS[role]()
+        cache.set(key, metrics, DASHBOARD_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return metrics
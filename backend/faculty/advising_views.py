@@ -4,6 +4,7 @@ from django.db.models import Q
 import json
 import uuid
 from courses.models import Course, Enrollment
+from courses.plan_optimizer import plan_for_major, plan_for_student
 from users.models import Faculty
 import decimal
 
@@ -615,6 +616,8 @@ def get_course_recommendations(request, student_id):
             # In a real implementation, this would use complex algorithms based on student history
             major = student_profile.get('major', 'Unknown')
             year = student_profile.get('year', 'Unknown')
+            # Both planning tools read the same plan: optimize it once
+            terms = plan_terms_from_start(major)
             
             recommendations = {
                 'student_id': student_id,
@@ -623,8 +626,8 @@ def get_course_recommendations(request, student_id):
                 'recommended_courses': generate_course_recommendations(major, year),
                 'prerequisites_needed': check_prerequisites(student_profile.get('enrolled_courses', [])),
                 'planning_tools': {
-                    'four_year_plan': generate_four_year_plan(major),
-                    'next_semester': generate_next_semester_plan(major, year)
+                    'four_year_plan': generate_four_year_plan(major, terms),
+                    'next_semester': generate_next_semester_plan(major, year, terms)
                 }
             }
             
@@ -686,20 +689,32 @@ def check_prerequisites(enrolled_courses):
         }
     ]
 
-def generate_four_year_plan(major):
-    """Generate a four-year academic plan"""
-    # In a real implementation, this would be more detailed
-    return {
-        'freshman': ['CS101', 'CS102', 'MATH101', 'MATH102'],
-        'sophomore': ['CS201', 'CS202', 'MATH201', 'PHYS101'],
-        'junior': ['CS301', 'CS302', 'CS303', 'ELECTIVE1'],
-        'senior': ['CS401', 'CS402', 'CAPSTONE', 'ELECTIVE2']
-    }
+def plan_terms_from_start(major):
+    """Course codes of each term of the shortest plan for a student starting the major"""
+    try:
+        plan = plan_for_major(major)
+    except ValueError:
+        return []
+    return [[course['code'] for course in term['courses']] for term in plan['terms']]
 
-def generate_next_semester_plan(major, year):
-    """Generate a plan for the next semester"""
-    # In a real implementation, this would be more detailed
-    return ['CS301', 'CS302', 'MATH201'] if year == 'Sophomore' else ['CS401', 'CS402']
+def generate_four_year_plan(major, terms=None):
+    """Generate a four-year academic plan (from the plan_terms_from_start terms, if already computed)"""
+    if terms is None:
+        terms = plan_terms_from_start(major)
+    years = ['freshman', 'sophomore', 'junior', 'senior']
+    four_year_plan = {}
+    for index, courses in enumerate(terms):
+        year = years[index // 2] if index // 2 < len(years) else f'year_{index // 2 + 1}'
+        four_year_plan.setdefault(year, []).extend(courses)
+    return four_year_plan
+
+def generate_next_semester_plan(major, year, terms=None):
+    """Generate a plan for the next semester (from the plan_terms_from_start terms, if already computed)"""
+    if terms is None:
+        terms = plan_terms_from_start(major)
+    years = ['Freshman', 'Sophomore', 'Junior', 'Senior']
+    index = 2 * years.index(year) if year in years else 0
+    return terms[index] if index < len(terms) else []
 
 @csrf_exempt
 def simulate_cgpa(request, student_id):
@@ -778,40 +793,25 @@ def simulate_cgpa(request, student_id):
 
 def calculate_projected_cgpa(current_gpa, current_credits, scenario_courses, scenario_grades):
     """Calculate projected CGPA based on current data and scenario"""
-    # Grade point mapping
-    grade_points = {
-        'A+': 4.0, 'A': 4.0, 'A-': 3.7,
-        'B+': 3.3, 'B': 3.0, 'B-': 2.7,
-        'C+': 2.3, 'C': 2.0, 'C-': 1.7,
-        'D+': 1.3, 'D': 1.0, 'F': 0.0
-    }
-    
-    # Calculate current grade points
-    current_grade_points = current_gpa * current_credits
+    from .cgpa_simulation import GRADE_POINTS, Transcript, grade_point_matrix, project_cgpa
     
-    # Calculate scenario grade points
-    scenario_grade_points = 0
-    scenario_credits = 0
+    # Current record as a single block of credits at the current GPA
+    transcript = Transcript(None, [current_credits], [current_gpa])
     
-    for course in scenario_courses:
-        course_code = course.get('code', '')
-        credits = course.get('credits', 3)
-        grade = scenario_grades.get(course_code, 'B')  # Default to B if not specified
-        
-        grade_point = grade_points.get(grade, 3.0)  # Default to 3.0 (B) if grade not found
-        scenario_grade_points += grade_point * credits
-        scenario_credits += credits
+    codes = [course.get('code', '') for course in scenario_courses]
+    credits = [course.get('credits', 3) for course in scenario_courses]
     
-    # Calculate projected CGPA
-    total_grade_points = current_grade_points + scenario_grade_points
-    total_credits = current_credits + scenario_credits
+    # Default to B if a grade is not specified or not found
+    grades = {code: grade for code, grade in scenario_grades.items() if code in codes and grade in GRADE_POINTS}
+    grade_points = grade_point_matrix([grades], codes, [GRADE_POINTS['B']] * len(codes))
     
-    projected_cgpa = total_grade_points / total_credits if total_credits > 0 else 0
+    projected_cgpa = float(project_cgpa(transcript, credits, grade_points)[0])
+    scenario_grade_points = float(grade_points[0] @ credits) if codes else 0
     
     return {
         'projected_cgpa': round(projected_cgpa, 2),
-        'total_credits': total_credits,
-        'current_grade_points': current_grade_points,
+        'total_credits': current_credits + sum(credits),
+        'current_grade_points': current_gpa * current_credits,
         'scenario_grade_points': scenario_grade_points,
         'improvement': round(projected_cgpa - current_gpa, 2)
     }
@@ -1053,33 +1053,26 @@ def project_graduation_timeline(request, student_id):
 
 def calculate_graduation_timeline(student_id, student_profile):
     """Calculate projected graduation timeline"""
-    current_credits = len(student_profile.get('enrolled_courses', [])) * 3
-    required_credits = 120  # Typical for a bachelor's degree
-    credits_per_semester = 15  # Standard full-time load
-    
-    remaining_credits = max(0, required_credits - current_credits)
-    semesters_needed = remaining_credits / credits_per_semester
+    plan = plan_for_student(student_id, student_profile.get('major', ''))
+    current_credits = plan['credits_done']
+    required_credits = plan['total_credits_required']
+    semesters_needed = plan['terms_needed']
     
     # Calculate timeline
     timeline = {
         'student_id': student_id,
         'current_credits': current_credits,
         'required_credits': required_credits,
-        'remaining_credits': remaining_credits,
-        'credits_per_semester': credits_per_semester,
-        'semesters_needed': round(semesters_needed, 1),
+        'remaining_credits': max(0, required_credits - current_credits),
+        'credits_per_semester': plan['credit_cap'],
+        'semesters_needed': semesters_needed,
         'years_needed': round(semesters_needed / 2, 1),
-        'graduation_date': calculate_projected_graduation_date(semesters_needed),
+        'graduation_date': plan['graduation_term'],
         'on_track': semesters_needed <= 8  # 4 years max
     }
     
     return timeline
 
-def calculate_projected_graduation_date(semesters_needed):
-    """Calculate projected graduation date"""
-    # In a real implementation, this would calculate actual dates
-    return f"{int(semesters_needed)} semesters from now"
-
 @csrf_exempt
 def optimize_academic_plan(request, student_id):
     """Optimize academic plan for CGPA improvement and graduation"""
@@ -1109,12 +1102,19 @@ def optimize_academic_plan(request, student_id):
             timeline_semesters = data.get('timeline_semesters', 8)
             
             # Optimize academic plan
-            optimized_plan = generate_optimized_academic_plan(
-                student_id, 
-                student_profile, 
-                target_cgpa, 
-                timeline_semesters
-            )
+            try:
+                optimized_plan = generate_optimized_academic_plan(
+                    student_id, 
+                    student_profile, 
+                    target_cgpa, 
+                    timeline_semesters
+                )
+            except (TypeError, ValueError) as e:
+                # Bad parameters, or requirements no plan can meet
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
             
             return JsonResponse({
                 'success': True,
@@ -1136,7 +1136,6 @@ def generate_optimized_academic_plan(student_id, student_profile, target_cgpa, t
     """Generate optimized academic plan"""
     current_gpa = student_profile.get('gpa', 0)
     major = student_profile.get('major', 'Unknown')
-    year = student_profile.get('year', 'Unknown')
     
     # Analyze gap
     gpa_gap = target_cgpa - current_gpa
@@ -1164,14 +1163,25 @@ def generate_optimized_academic_plan(student_id, student_profile, target_cgpa, t
             ]
         })
     
-    # Generate semester-by-semester plan
-    for semester in range(1, int(timeline_semesters) + 1):
-        semester_courses = generate_semester_courses(major, year, semester, current_gpa)
+    # Generate semester-by-semester plan, the shortest one if it can't fit the timeline
+    try:
+        plan = plan_for_student(student_id, major, max_terms=int(timeline_semesters))
+    except ValueError:
+        plan = plan_for_student(student_id, major)
+        strategy['recommendations'].append({
+            'type': 'timeline',
+            'message': f"Remaining requirements need {plan['terms_needed']} semesters",
+            'actions': [
+                'Consider summer terms',
+                'Review transfer credit options'
+            ]
+        })
+    for semester, term in enumerate(plan['terms'], start=1):
         strategy['semester_plan'].append({
             'semester': semester,
-            'courses': semester_courses,
-            'credits': sum(course['credits'] for course in semester_courses),
-            'projected_gpa': calculate_semester_projected_gpa(semester_courses, current_gpa)
+            'term': term['term'],
+            'courses': term['courses'],
+            'credits': term['credits']
         })
     
     # Add resources
@@ -1183,34 +1193,3 @@ def generate_optimized_academic_plan(student_id, student_profile, target_cgpa, t
     ]
     
     return strategy
-
-def generate_semester_courses(major, year, semester, current_gpa):
-    """Generate courses for a specific semester"""
-    # In a real implementation, this would be more sophisticated
-    base_courses = [
-        {
-            'code': f'{major[:2]}{300 + semester * 10}',
-            'name': f'Advanced {major} Course {semester}',
-            'credits': 3,
-            'difficulty': 'medium' if current_gpa >= 3.0 else 'low'
-        }
-    ]
-    
-    # Add additional courses for higher-performing students
-    if current_gpa >= 3.5 and semester <= 4:
-        base_courses.append({
-            'code': f'{major[:2]}{400 + semester * 10}',
-            'name': f'Honors {major} Course {semester}',
-            'credits': 3,
-            'difficulty': 'high'
-        })
-    
-    return base_courses
-
-def calculate_semester_projected_gpa(courses, current_gpa):
-    """Calculate projected GPA for a semester"""
-    # In a real implementation, this would be more accurate
-    # For now, we'll simulate based on course difficulty
-    difficulty_factor = sum(1 if course['difficulty'] == 'high' else 0 for course in courses) / len(courses)
-    projected_gpa = current_gpa + (0.2 * (1 - difficulty_factor))  # Simpler courses = higher GPA
-    return min(4.0, round(projected_gpa, 2))
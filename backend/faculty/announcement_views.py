@@ -8,6 +8,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from communications.models import Alert
+from communications.notification_service import NotificationService
 from .decorators import faculty_required
 import json
 import uuid
@@ -113,15 +114,22 @@ def create_announcement(request):
         
         announcement.save()
         
-        # If status is published, mark as sent
+        # If status is published, mark as sent and notify its audience
+        notified = 0
         if announcement.status == 'sent':
             announcement.sent_at = timezone.now()
             announcement.save()
+            # Year audiences have no user mapping to notify
+            if audience != 'individual':
+                notified = NotificationService.notify_audience(
+                    audience, audience_ids, announcement.title, announcement.message
+                )
         
         return JsonResponse({
             'success': True,
             'message': 'Announcement created successfully',
-            'announcement': announcement.to_json()
+            'announcement': announcement.to_json(),
+            'notified': notified
         })
         
     except json.JSONDecodeError:
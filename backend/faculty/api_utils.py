@@ -1,138 +1,66 @@
-import time
+import asyncio
 import logging
 from functools import wraps
 from django.core.cache import cache
 from django.utils import timezone
 from .error_handling import api_error
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 logger = logging.getLogger('faculty_api')
 
-def retry_api_call(max_retries=3, delay=1, backoff=2, exceptions=(Exception,)):
-    """Decorator to retry API calls with exponential backoff"""
+def retry_api_call(max_retries=3, delay=1, backoff=2, exceptions=(Exception,), max_delay=30, timeout=None):
+    """Decorator to retry API calls with jittered exponential backoff
+
+    Retries stop at the deadline of the enclosing resilience.deadline() block,
+    or timeout seconds after the first attempt. Coroutine functions back off
+    with asyncio.sleep instead of blocking the thread.
+    """
+    policy = RetryPolicy(max_retries, delay, backoff, max_delay, exceptions, timeout)
+
     def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await policy.acall(func, *args, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            retries = 0
-            current_delay = delay
-            
-            while retries < max_retries:
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    retries += 1
-                    if retries >= max_retries:
-                        logger.error(
-                            f"API call failed after {max_retries} retries: {str(e)}",
-                            extra={
-                                'function': func.__name__,
-                                'args': args,
-                                'kwargs': kwargs
-                            }
-                        )
-                        raise e
-                    
-                    logger.warning(
-                        f"API call failed, retrying in {current_delay} seconds: {str(e)}",
-                        extra={
-                            'function': func.__name__,
-                            'retry': retries,
-                            'max_retries': max_retries
-                        }
-                    )
-                    
-                    time.sleep(current_delay)
-                    current_delay *= backoff
-            
-            # This should never be reached due to the raise above
-            return None
+            return policy.call(func, *args, **kwargs)
         return wrapper
     return decorator
 
 def circuit_breaker(failure_threshold=5, recovery_timeout=60):
-    """Decorator to implement circuit breaker pattern"""
+    """Decorator to implement circuit breaker pattern
+
+    The breaker state is shared by all workers (see resilience.CircuitBreaker).
+    While it is open, calls are rejected with a 503 response.
+    """
     def decorator(func):
+        breaker = CircuitBreaker.get(func.__name__, failure_threshold, recovery_timeout)
+
+        def unavailable():
+            return api_error(
+                "Service temporarily unavailable due to repeated failures",
+                "service_unavailable",
+                503
+            )
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await breaker.acall(func, *args, **kwargs)
+                except CircuitOpenError:
+                    return unavailable()
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Create circuit breaker key based on function name
-            cb_key = f"circuit_breaker_{func.__name__}"
-            
-            # Check circuit breaker state
             try:
-                cb_state = cache.get(cb_key, {
-                    'status': 'closed',  # closed, open, half_open
-                    'failure_count': 0,
-                    'last_failure_time': None
-                })
-            except:
-                # If cache is not available, proceed normally
-                return func(*args, **kwargs)
-            
-            # If circuit is open, check if recovery timeout has passed
-            if cb_state['status'] == 'open':
-                if cb_state['last_failure_time']:
-                    time_since_failure = (timezone.now() - cb_state['last_failure_time']).total_seconds()
-                    if time_since_failure >= recovery_timeout:
-                        # Switch to half-open state
-                        cb_state['status'] = 'half_open'
-                        try:
-                            cache.set(cb_key, cb_state, timeout=3600)
-                        except:
-                            pass
-                    else:
-                        # Circuit still open, reject request
-                        logger.warning(
-                            f"Circuit breaker open for {func.__name__}, rejecting request",
-                            extra={
-                                'failure_count': cb_state['failure_count'],
-                                'time_since_failure': time_since_failure
-                            }
-                        )
-                        return api_error(
-                            "Service temporarily unavailable due to repeated failures",
-                            "service_unavailable",
-                            503
-                        )
-            
-            # Attempt the function call
-            try:
-                result = func(*args, **kwargs)
-                
-                # If successful and circuit was half-open, close it
-                if cb_state['status'] == 'half_open':
-                    cb_state['status'] = 'closed'
-                    cb_state['failure_count'] = 0
-                    cb_state['last_failure_time'] = None
-                    try:
-                        cache.set(cb_key, cb_state, timeout=3600)
-                    except:
-                        pass
-                    logger.info(f"Circuit breaker closed for {func.__name__}")
-                
-                return result
-                
-            except Exception as e:
-                # Record failure
-                cb_state['failure_count'] += 1
-                cb_state['last_failure_time'] = timezone.now()
-                
-                # If failure threshold reached, open circuit
-                if cb_state['failure_count'] >= failure_threshold:
-                    cb_state['status'] = 'open'
-                    logger.error(
-                        f"Circuit breaker opened for {func.__name__} after {failure_threshold} failures",
-                        extra={
-                            'failure_count': cb_state['failure_count'],
-                            'last_failure': str(e)
-                        }
-                    )
-                
-                try:
-                    cache.set(cb_key, cb_state, timeout=3600)
-                except:
-                    pass
-                
-                raise e
-                
+                return breaker.call(func, *args, **kwargs)
+            except CircuitOpenError:
+                return unavailable()
         return wrapper
     return decorator
 
@@ -4,8 +4,9 @@ from django.utils import timezone
 from django.db import models
 import json
 import uuid
+from assignments.grade_statistics import DEFAULT_BINS, assignment_statistics
 from assignments.models import Assignment
-from courses.models import Course
+from courses.models import Course, Enrollment
 import decimal
 
 @csrf_exempt
@@ -368,22 +369,23 @@ def get_assignment_analytics(request, assignment_id):
                     'message': 'Access denied - you do not teach this course'
                 }, status=403)
             
-            # Generate analytics data
-            # In a real implementation, you would get actual data from the database
-            # For now, we'll just create placeholder analytics
+            # Grade statistics come from one aggregate query (or the cache)
+            statistics = assignment_statistics([assignment_id])[assignment_id]
+            total_students = Enrollment.objects.filter(course_id=course.id).count()  # type: ignore
             
             analytics_data = {
                 'assignment_id': assignment_id,
                 'title': assignment.title,
-                'total_students': 0,  # Would get from course enrollment
-                'total_submissions': 0,
-                'graded_submissions': 0,
-                'pending_submissions': 0,
-                'late_submissions': 0,
+                'total_students': total_students,
+                'total_submissions': statistics['count'],
+                'graded_submissions': statistics['count'],
+                'pending_submissions': max(total_students - statistics['count'], 0),
+                'late_submissions': 0,  # Submissions are not tracked yet
                 'on_time_submissions': 0,
-                'average_score': 0.0,
-                'score_distribution': {},  # Would contain grade distribution data
-                'completion_rate': 0.0,
+                'average_score': statistics['mean'],
+                'score_distribution': statistics['histogram'],
+                'percentiles': statistics['percentiles'],
+                'completion_rate': round(statistics['count'] / total_students * 100, 2) if total_students else 0.0,
                 'on_time_submission_rate': 0.0,
                 'average_late_penalty': 0.0
             }
@@ -701,58 +703,22 @@ def calculate_grade_statistics(request, assignment_id):
                     'message': 'Access denied - you do not teach this course'
                 }, status=403)
             
-            # Get all grades for this assignment
-            from assignments.models import Grade
-            grades = Grade.objects.filter(assignment_id=assignment_id)  # type: ignore
-            
-            # Calculate statistics
-            grade_values = []
-            for grade in grades:
-                try:
-                    percentage = grade.calculate_percentage()
-                    if percentage is not None:
-                        grade_values.append(percentage)
-                except:
-                    pass
-            
-            # Calculate basic statistics
-            if grade_values:
-                average = sum(grade_values) / len(grade_values)
-                minimum = min(grade_values)
-                maximum = max(grade_values)
-                
-                # Calculate median
-                sorted_values = sorted(grade_values)
-                n = len(sorted_values)
-                if n % 2 == 0:
-                    median = (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-                else:
-                    median = sorted_values[n//2]
-            else:
-                average = 0
-                minimum = 0
-                maximum = 0
-                median = 0
-            
-            # Calculate grade distribution
-            grade_distribution = {
-                'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0
-            }
-            
-            for grade in grades:
-                letter_grade = getattr(grade, 'letter_grade', '')
-                if letter_grade in grade_distribution:
-                    grade_distribution[letter_grade] += 1
+            # Statistics come from one aggregate query (or the cache)
+            bins = int(request.GET.get('bins', DEFAULT_BINS))
+            statistics = assignment_statistics([assignment_id], bins=bins)[assignment_id]
             
             statistics_data = {
                 'assignment_id': assignment_id,
                 'assignment_title': assignment.title,
-                'total_grades': len(grade_values),
-                'average_percentage': round(average, 2),
-                'median_percentage': round(median, 2),
-                'min_percentage': round(minimum, 2),
-                'max_percentage': round(maximum, 2),
-                'grade_distribution': grade_distribution
+                'total_grades': statistics['count'],
+                'average_percentage': statistics['mean'],
+                'median_percentage': statistics['percentiles']['50'],
+                'min_percentage': statistics['min'],
+                'max_percentage': statistics['max'],
+                'std_dev_percentage': statistics['std_dev'],
+                'percentiles': statistics['percentiles'],
+                'histogram': statistics['histogram'],
+                'grade_distribution': statistics['letter_grades']
             }
             
             return JsonResponse({
@@ -760,6 +726,11 @@ def calculate_grade_statistics(request, assignment_id):
                 'data': statistics_data
             })
             
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
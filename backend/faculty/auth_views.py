@@ -7,6 +7,8 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 import json
 from users.models import User, Faculty
+from users.login_service import LoginService
+from users.token_blacklist import new_jti
 
 def generate_jwt_token(user):
     """Generate JWT token for user"""
@@ -22,7 +24,8 @@ def generate_jwt_token(user):
         'username': user.username,
         'role': user.role,
         'exp': exp.timestamp(),  # Convert to timestamp
-        'iat': now.timestamp()   # Convert to timestamp
+        'iat': now.timestamp(),  # Convert to timestamp
+        'jti': new_jti()
     }
     print(f"Token payload: {payload}")
     token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
@@ -38,32 +41,9 @@ def faculty_login(request):
             identifier = data.get('identifier')  # email or username
             password = data.get('password')
             
-            # Try to authenticate with email or username (ID)
-            user = None
-            
-            # First try with email
-            if '@' in identifier:
-                try:
-                    user = User.objects.get(email=identifier, role='faculty')  # type: ignore
-                except User.DoesNotExist:  # type: ignore
-                    pass
-            
-            # If not found by email, try with username (ID)
-            if not user:
-                try:
-                    user = User.objects.get(username=identifier, role='faculty')  # type: ignore
-                except User.DoesNotExist:  # type: ignore
-                    pass
-            
-            # If user not found
-            if not user:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'Invalid credentials'
-                }, status=401)
-            
-            # Check password
-            if not check_password(password, user.password):
+            # One lookup by email or username (ID) and one password check
+            user = LoginService.find_user(identifier, role='faculty')
+            if not LoginService.verify_password(user, password or ''):
                 return JsonResponse({
                     'success': False,
                     'message': 'Invalid credentials'
@@ -77,8 +57,7 @@ def faculty_login(request):
                 }, status=403)
             
             # Update last login
-            user.last_login = timezone.now()
-            user.save()
+            LoginService.record_login(user)
             
             # Generate JWT token
             token = generate_jwt_token(user)
@@ -94,15 +73,13 @@ def faculty_login(request):
                 'status': user.status
             }
             
-            # Include faculty-specific information
-            try:
-                faculty_profile = Faculty.objects.get(user=user)  # type: ignore
+            # Include faculty-specific information (joined by the lookup)
+            faculty_profile = LoginService.profile(user)
+            if faculty_profile:
                 user_data['employee_id'] = faculty_profile.employee_id
                 user_data['department'] = faculty_profile.department
                 user_data['title'] = faculty_profile.title
                 user_data['office_location'] = faculty_profile.office_location
-            except Faculty.DoesNotExist:  # type: ignore
-                pass
             
             return JsonResponse({
                 'success': True,
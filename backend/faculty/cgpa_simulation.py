@@ -0,0 +1,288 @@
+"""
+What-if CGPA simulation engine for advising.
+
+A student's transcript is loaded once from their enrollments and grades. Grade
+scenarios for a set of planned courses are then evaluated together as arrays:
+each scenario is a row of grade points, so projecting the CGPA of n scenarios
+over m courses is a single (n, m) @ (m,) product.
+"""
+
+import numpy as np
+
+# Grade point of each letter grade
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'F': 0.0
+}
+
+# Distinct grade point levels, ascending, and the letter reported for each
+GRADE_LEVELS = np.array([0.0, 1.0, 1.3, 1.7, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0])
+LEVEL_LETTERS = ['F', 'D', 'D+', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A']
+
+# Grade assumed for a planned course when nothing better is known
+DEFAULT_GRADE = 'B'
+DEFAULT_CREDITS = 3
+
+# Sampled scenarios: how many, and the standard deviation (in grade points)
+# of each course's grade around its expected grade
+DEFAULT_SAMPLES = 10000
+DEFAULT_SPREAD = 0.5
+
+# Largest number of explicit plus sampled scenarios per simulation
+MAX_SCENARIOS = 50000
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+
+class Transcript:
+    """A student's graded credit history and in-progress courses"""
+
+    def __init__(self, student_id, credits, grade_points, in_progress=None):
+        self.student_id = student_id
+        self.credits = np.asarray(credits, dtype=float)
+        self.grade_points = np.asarray(grade_points, dtype=float)
+        # List of {'course_id', 'code', 'credits', 'expected_grade_points'}
+        self.in_progress = in_progress or []
+
+    @property
+    def total_credits(self):
+        return float(self.credits.sum())
+
+    @property
+    def quality_points(self):
+        return float(self.grade_points @ self.credits)
+
+    @property
+    def cgpa(self):
+        return self.quality_points / self.total_credits if self.total_credits else 0.0
+
+
+def to_grade_points(grade):
+    """Convert a letter grade or a number to grade points (None if unknown)"""
+    if isinstance(grade, (int, float)) and not isinstance(grade, bool):
+        return float(min(4.0, max(0.0, grade)))
+    if isinstance(grade, str):
+        return GRADE_POINTS.get(grade.strip().upper())
+    return None
+
+
+def to_letters(grade_points):
+    """Letter grade of the highest grade level at or below each grade point value"""
+    indices = np.searchsorted(GRADE_LEVELS, np.asarray(grade_points) + 1e-9, side='right') - 1
+    return [LEVEL_LETTERS[i] for i in np.clip(indices, 0, len(LEVEL_LETTERS) - 1)]
+
+
+def load_transcript(student_id):
+    """Load a student's transcript from their enrollments and grades
+
+    Completed courses use the enrollment's letter grade when one is recorded and
+    otherwise the grade points of the student's graded work in the course.
+    Active courses become in-progress courses with the grade points earned so
+    far as their expected grade.
+    """
+    from courses.models import Enrollment
+    from student.models import StudentCourseSummary
+    from student.services import AcademicSummaryService
+
+    # Builds the student's course summaries if they don't exist yet
+    AcademicSummaryService.get_student_summary(student_id)
+    summaries = StudentCourseSummary.objects.filter(
+        student_id=student_id,
+        enrollment_status__in=['completed', 'active'],
+        credits__isnull=False
+    )
+    letter_grades = dict(
+        Enrollment.objects.filter(student_id=student_id, status='completed').values_list('id', 'grade')
+    )
+
+    credits = []
+    grade_points = []
+    in_progress = []
+    for summary in summaries:
+        if summary.enrollment_status == 'completed':
+            points = to_grade_points(letter_grades.get(summary.id))
+            if points is None:
+                points = summary.grade_points
+            if points is not None:
+                credits.append(summary.credits)
+                grade_points.append(points)
+        else:
+            in_progress.append({
+                'course_id': summary.course_id,
+                'code': summary.course_code,
+                'credits': summary.credits,
+                'expected_grade_points': summary.grade_points,
+            })
+
+    return Transcript(student_id, credits, grade_points, in_progress)
+
+
+def grade_point_matrix(scenarios, course_codes, default_grade_points):
+    """Build an (n, m) grade point matrix from scenarios
+
+    A scenario is either a dict of course code -> grade, where courses it leaves
+    out get their default grade points, or a list of one grade per course.
+    Grades are letter grades or grade points.
+    """
+    if not scenarios:
+        return np.empty((0, len(course_codes)))
+
+    if all(isinstance(scenario, dict) for scenario in scenarios):
+        unknown = set().union(*scenarios) - set(course_codes)
+        if unknown:
+            raise ValueError(f"Unknown course {sorted(unknown)[0]!r} in scenarios")
+        rows = [[scenario.get(code) for code in course_codes] for scenario in scenarios]
+    elif all(isinstance(scenario, list) and len(scenario) == len(course_codes) for scenario in scenarios):
+        rows = scenarios
+    else:
+        raise ValueError("Each scenario must map course codes to grades or list one grade per course")
+
+    # Convert each distinct grade once, then index the converted values
+    labels, inverse = np.unique(np.array(rows, dtype=object).astype(str), return_inverse=True)
+    values = np.empty(len(labels))
+    for i, label in enumerate(labels):
+        if label == 'None':
+            values[i] = np.nan
+            continue
+        points = GRADE_POINTS.get(label.strip().upper())
+        if points is None:
+            try:
+                points = to_grade_points(float(label))
+            except ValueError:
+                raise ValueError(f"Invalid grade {label!r} in scenarios")
+        values[i] = points
+
+    matrix = values[inverse].reshape(len(rows), len(course_codes))
+    default = np.broadcast_to(np.asarray(default_grade_points, dtype=float), matrix.shape)
+    return np.where(np.isnan(matrix), default, matrix)
+
+
+def sample_grade_points(expected, samples, spread=DEFAULT_SPREAD, rng=None):
+    """Sample (samples, m) grade points around each course's expected grade
+
+    Each draw is snapped to the nearest grade level.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    draws = rng.normal(np.asarray(expected, dtype=float), spread, size=(samples, len(expected)))
+    upper = np.clip(np.searchsorted(GRADE_LEVELS, draws), 1, len(GRADE_LEVELS) - 1)
+    lower = upper - 1
+    nearest = np.where(draws - GRADE_LEVELS[lower] < GRADE_LEVELS[upper] - draws, lower, upper)
+    return GRADE_LEVELS[nearest]
+
+
+def project_cgpa(transcript, credits, grade_points):
+    """Projected CGPA of each scenario (row of grade_points) over courses with credits"""
+    credits = np.asarray(credits, dtype=float)
+    total_credits = transcript.total_credits + credits.sum()
+    if total_credits == 0:
+        return np.zeros(len(grade_points))
+    return (transcript.quality_points + grade_points @ credits) / total_credits
+
+
+def required_average(transcript, credits, target_cgpa):
+    """Average grade points needed over the planned courses to reach target_cgpa"""
+    planned_credits = float(np.sum(credits))
+    if planned_credits == 0:
+        return None
+    needed = target_cgpa * (transcript.total_credits + planned_credits) - transcript.quality_points
+    return needed / planned_credits
+
+
+def minimal_grades(transcript, credits, expected, target_cgpa):
+    """Lowest grade level in each course that reaches target_cgpa, others at their expected grade
+
+    Returns:
+        Array of grade points, NaN where even an A is not enough
+    """
+    credits = np.asarray(credits, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    total_credits = transcript.total_credits + credits.sum()
+    others = expected @ credits - expected * credits
+    needed = (target_cgpa * total_credits - transcript.quality_points - others) / credits
+
+    indices = np.searchsorted(GRADE_LEVELS, needed - 1e-9)
+    reachable = indices < len(GRADE_LEVELS)
+    return np.where(reachable, GRADE_LEVELS[np.minimum(indices, len(GRADE_LEVELS) - 1)], np.nan)
+
+
+def summarize_distribution(cgpas, target_cgpa=None):
+    """Summary statistics of projected CGPAs"""
+    summary = {
+        'count': int(len(cgpas)),
+        'mean': round(float(cgpas.mean()), 3),
+        'std': round(float(cgpas.std()), 3),
+        'min': round(float(cgpas.min()), 3),
+        'max': round(float(cgpas.max()), 3),
+        'percentiles': {
+            str(p): round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(cgpas, PERCENTILES))
+        },
+    }
+    if target_cgpa is not None:
+        summary['probability_of_target'] = round(float(np.mean(cgpas >= target_cgpa - 1e-9)), 4)
+    return summary
+
+
+def simulate(transcript, courses, scenarios=None, samples=DEFAULT_SAMPLES, target_cgpa=None,
+             spread=DEFAULT_SPREAD, seed=None):
+    """Evaluate explicit and sampled grade scenarios for planned courses
+
+    Args:
+        transcript: The student's Transcript
+        courses: Planned courses, dicts with code, credits and optional expected_grade
+        scenarios: Explicit scenarios, dicts of course code -> grade or lists of
+            one grade per course; grades are letters or grade points
+        samples: Number of scenarios sampled around each course's expected grade
+        target_cgpa: CGPA to report the probability of and the grades needed for
+        spread: Standard deviation of sampled grades, in grade points
+        seed: Random seed for reproducible samples
+
+    Returns:
+        Dictionary with the projected CGPA of each explicit scenario, the
+        distribution of sampled CGPAs and, with a target, the grades needed
+    """
+    scenarios = scenarios or []
+    if len(scenarios) + samples > MAX_SCENARIOS:
+        raise ValueError(f"At most {MAX_SCENARIOS} scenarios can be simulated at once")
+    if not courses:
+        raise ValueError("At least one planned course is required")
+
+    codes = [course['code'] for course in courses]
+    credits = np.array([course.get('credits') or DEFAULT_CREDITS for course in courses], dtype=float)
+    fallback = transcript.cgpa if transcript.total_credits else GRADE_POINTS[DEFAULT_GRADE]
+    expected = np.array([to_grade_points(course.get('expected_grade')) for course in courses], dtype=float)
+    expected = np.where(np.isnan(expected), fallback, expected)
+
+    result = {
+        'current_cgpa': round(transcript.cgpa, 3),
+        'completed_credits': transcript.total_credits,
+        'courses': [
+            {'code': code, 'credits': float(c), 'expected_grade_points': round(float(e), 2)}
+            for code, c, e in zip(codes, credits, expected)
+        ],
+        'expected_cgpa': round(float(project_cgpa(transcript, credits, expected[np.newaxis, :])[0]), 3),
+    }
+
+    if scenarios:
+        explicit = project_cgpa(transcript, credits, grade_point_matrix(scenarios, codes, expected))
+        result['scenarios'] = np.round(explicit, 3).tolist()
+
+    if samples:
+        sampled = sample_grade_points(expected, samples, spread, np.random.default_rng(seed))
+        result['distribution'] = summarize_distribution(project_cgpa(transcript, credits, sampled), target_cgpa)
+
+    if target_cgpa is not None:
+        average = required_average(transcript, credits, target_cgpa)
+        needed = minimal_grades(transcript, credits, expected, target_cgpa)
+        result['target'] = {
+            'target_cgpa': target_cgpa,
+            'required_average_grade_points': round(average, 2),
+            'reachable': bool(average <= GRADE_LEVELS[-1]),
+            'minimal_grades': [
+                {'code': code, 'grade': None if np.isnan(points) else to_letters([points])[0]}
+                for code, points in zip(codes, needed)
+            ],
+        }
+
+    return result
@@ -2,16 +2,29 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 import json
+import uuid
 from datetime import datetime
-from .models import Collaboration
+from .models import Collaboration, CollaborationMember
 from .decorators import faculty_required
 
+def _collaborator_id(collaborator):
+    """ID of a collaborator record, generating one for records without"""
+    return str(collaborator.get('id') or uuid.uuid4().hex)
+
+def _set_collaborators(collaboration, collaborators):
+    CollaborationMember.objects.replace(collaboration, {
+        _collaborator_id(collaborator): {'details': collaborator}
+        for collaborator in collaborators or [] if isinstance(collaborator, dict)
+    })
+
 @csrf_exempt
 @faculty_required
 def get_collaborations(request):
     """Get all collaborations for the faculty member"""
     try:
-        collaborations = Collaboration.objects.filter(faculty=request.faculty).order_by('-created_at')
+        collaborations = (Collaboration.objects.filter(faculty=request.faculty)
+                          .select_related('faculty').prefetch_related('collaboration_members')
+                          .order_by('-created_at'))
         collaborations_data = [collaboration.to_json() for collaboration in collaborations]
         
         return JsonResponse({
@@ -67,10 +80,10 @@ def create_collaboration(request):
             end_date=data.get('end_date') if data.get('end_date') else None,
             status=data.get('status', 'active'),
             project_id=data.get('project_id', ''),
-            collaborators=data.get('collaborators', []),
             documents=data.get('documents', []),
             communications=data.get('communications', [])
         )
+        _set_collaborators(collaboration, data.get('collaborators', []))
         
         return JsonResponse({
             'success': True,
@@ -100,12 +113,14 @@ def update_collaboration(request, collaboration_id):
         # Updateable fields
         updatable_fields = [
             'title', 'description', 'start_date', 'end_date', 'status',
-            'project_id', 'collaborators', 'documents', 'communications'
+            'project_id', 'documents', 'communications'
         ]
         
         for field in updatable_fields:
             if field in data:
                 setattr(collaboration, field, data[field])
+        if 'collaborators' in data:
+            _set_collaborators(collaboration, data['collaborators'])
         
         collaboration.updated_at = timezone.now()
         collaboration.save()
@@ -173,10 +188,18 @@ def add_collaborator(request, collaboration_id):
         
         # Add collaborator to the collaboration
         collaborator = data.get('collaborator', {})
+        if collaborator and not isinstance(collaborator, dict):
+            return JsonResponse({
+                'success': False,
+                'message': 'Collaborator must be an object'
+            }, status=400)
         if collaborator:
-            collaborators = collaboration.collaborators or []
-            collaborators.append(collaborator)
-            collaboration.collaborators = collaborators
+            member, created = CollaborationMember.objects.add(
+                collaboration, _collaborator_id(collaborator), details=collaborator
+            )
+            if not created and member.details != collaborator:
+                member.details = collaborator
+                member.save(update_fields=['details'])
             collaboration.updated_at = timezone.now()
             collaboration.save()
         
@@ -210,9 +233,7 @@ def remove_collaborator(request, collaboration_id, collaborator_id):
         collaboration = Collaboration.objects.get(id=collaboration_id, faculty=request.faculty)
         
         # Remove collaborator from the collaboration
-        collaborators = collaboration.collaborators or []
-        collaborators = [c for c in collaborators if str(c.get('id', '')) != str(collaborator_id)]
-        collaboration.collaborators = collaborators
+        CollaborationMember.objects.remove(collaboration, collaborator_id)
         collaboration.updated_at = timezone.now()
         collaboration.save()
         
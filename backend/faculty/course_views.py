@@ -1,10 +1,11 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q
 import json
 import uuid
 from courses.models import Course, Enrollment
+from assignments.grade_statistics import assignment_statistics
 from assignments.models import Assignment
 from users.models import Faculty
 from .pagination import paginate_courses, paginate_assignments, paginate_enrollments
@@ -587,33 +588,39 @@ def get_course_analytics(request, course_id):
             # Apply filtering to enrollments for analytics
             enrollments = apply_filtering_and_sorting(enrollments, request, 'enrollments')
             
-            # Calculate analytics
-            total_enrollments = enrollments.count()
-            active_enrollments = enrollments.filter(status='active').count()
-            completed_enrollments = enrollments.filter(status='completed').count()
-            dropped_enrollments = enrollments.filter(status='dropped').count()
-            
-            # Grade distribution
-            grade_distribution = {}
-            completed_enrollments_qs = enrollments.filter(status='completed')
-            for enrollment in completed_enrollments_qs:
-                grade = enrollment.grade
-                if grade:
-                    if grade in grade_distribution:
-                        grade_distribution[grade] += 1
-                    else:
-                        grade_distribution[grade] = 1
+            # Calculate analytics in one aggregate query
+            counts = enrollments.aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status='active')),
+                completed=Count('id', filter=Q(status='completed')),
+                dropped=Count('id', filter=Q(status='dropped')),
+            )
+            
+            # Grade distribution of completed enrollments
+            grade_distribution = dict(
+                enrollments.filter(status='completed').exclude(grade__isnull=True).exclude(grade='')
+                .order_by().values('grade').annotate(count=Count('id')).values_list('grade', 'count')
+            )
+            
+            # Score statistics of every assignment in the course, in one query
+            assignments = list(Assignment.objects.filter(course_id=course_id).order_by('due_date').values('id', 'title'))  # type: ignore
+            statistics = assignment_statistics([assignment['id'] for assignment in assignments])
+            assignment_statistics_data = [
+                {'assignment_id': assignment['id'], 'title': assignment['title'], **statistics[assignment['id']]}
+                for assignment in assignments
+            ]
             
             # Student count
             student_count = course.get_student_count()
             
             analytics_data = {
-                'total_enrollments': total_enrollments,
-                'active_enrollments': active_enrollments,
-                'completed_enrollments': completed_enrollments,
-                'dropped_enrollments': dropped_enrollments,
+                'total_enrollments': counts['total'],
+                'active_enrollments': counts['active'],
+                'completed_enrollments': counts['completed'],
+                'dropped_enrollments': counts['dropped'],
                 'student_count': student_count,
-                'grade_distribution': grade_distribution
+                'grade_distribution': grade_distribution,
+                'assignment_statistics': assignment_statistics_data
             }
             
             return JsonResponse({
@@ -0,0 +1,249 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Upper
+from django.utils import timezone
+from django.utils.functional import cached_property
+from assignments.models import Assignment, Grade
+from courses.models import Course, Enrollment
+from users.models import Student
+from .models import FacultySettings
+
+# Widgets shown on the dashboard overview and on the analytics page
+DASHBOARD_WIDGETS = ['classes', 'students', 'pending_grades', 'advisees', 'attendance']
+ANALYTICS_WIDGETS = ['course_attendance', 'grade_distribution', 'performance', 'engagement', 'courses_taught']
+
+# Cached widgets expire on their own too, since "due within a week" moves with time
+DASHBOARD_CACHE_TIMEOUT = 300
+
+LETTER_GRADES = ['A', 'B', 'C', 'D', 'F']
+PERFORMANCE_WEEKS = ['Week 1', 'Week 2', 'Week 3', 'Week 4']
+
+def course_number(course_id):
+    """Numeric part of a course ID (e.g., COURSE001 -> 1), or None if it has none"""
+    digits = ''.join(filter(str.isdigit, course_id))
+    return int(digits) if digits else None
+
+def course_attendance(course_id):
+    """Attendance rate of a course
+
+    In a real system, this would come from actual attendance records. Until
+    there is an Attendance model, it varies between 75-95% with the course ID.
+    """
+    number = course_number(course_id)
+    base_attendance = 75 + (number % 20) if number is not None else 85
+    return min(base_attendance, 100)  # Cap at 100%
+
+class FacultyDashboardMetrics:
+    """Grouped aggregates behind the dashboard widgets of one faculty member
+
+    Each aggregate is one query, run the first time a widget needs it, so the
+    number of queries is fixed however many courses the faculty member teaches.
+    """
+
+    def __init__(self, employee_id):
+        self.employee_id = employee_id
+
+    @cached_property
+    def courses(self):
+        return list(Course.objects.filter(instructor_id=self.employee_id).values('id', 'code'))
+
+    @cached_property
+    def course_ids(self):
+        return [course['id'] for course in self.courses]
+
+    @cached_property
+    def enrollment_counts(self):
+        """Course ID -> number of enrollments"""
+        return dict(
+            Enrollment.objects.filter(course_id__in=self.course_ids)
+            .values('course_id').annotate(count=Count('id')).values_list('course_id', 'count')
+        )
+
+    @cached_property
+    def grades(self):
+        """Grades of assignments in the faculty member's courses"""
+        return Grade.objects.filter(
+            assignment_id__in=Assignment.objects.filter(course_id__in=self.course_ids).values('id')
+        )
+
+    @cached_property
+    def grade_totals(self):
+        """Course ID of the graded assignment -> points earned, grades and students graded"""
+        assignment_course = Assignment.objects.filter(id=OuterRef('assignment_id')).values('course_id')[:1]
+        return {
+            row['assignment_course']: row
+            for row in self.grades.annotate(assignment_course=Subquery(assignment_course))
+            .values('assignment_course').annotate(
+                earned=Sum('value'),
+                graded=Count('value'),
+                students=Count('student_id', distinct=True),
+            )
+        }
+
+    def widget_classes(self):
+        return {'activeClasses': len(self.courses)}
+
+    def widget_courses_taught(self):
+        return {'coursesTaught': len(self.courses)}
+
+    def widget_students(self):
+        return {'totalStudents': sum(self.enrollment_counts.values())}
+
+    def widget_pending_grades(self):
+        # Assignments due within the next 7 days
+        now = timezone.now()
+        codes = {course['id']: course['code'] for course in self.courses}
+        due_soon = list(
+            Assignment.objects.filter(
+                course_id__in=self.course_ids,
+                due_date__lte=now + timedelta(days=7),
+                due_date__gte=now
+            ).order_by('due_date').values('id', 'title', 'course_id')
+        )
+        return {
+            'pendingGrades': len(due_soon),
+            'pendingAssignments': [
+                {'id': assignment['id'], 'title': assignment['title'], 'course': codes[assignment['course_id']]}
+                for assignment in due_soon[:5]  # Limit to 5 assignments
+            ],
+        }
+
+    def widget_advisees(self):
+        return {'advisedStudents': Student.objects.filter(advisor_id=self.employee_id).count()}
+
+    def widget_attendance(self):
+        rates = [course_attendance(course['id']) for course in self.courses]
+        return {'attendanceRate': round(sum(rates) / len(rates), 2) if rates else 0}
+
+    def widget_course_attendance(self):
+        # Only courses with enrollments have attendance
+        attendance_data = [
+            {'name': course['code'], 'attendance': round(course_attendance(course['id']), 2)}
+            for course in self.courses if self.enrollment_counts.get(course['id'])
+        ]
+        rates = [entry['attendance'] for entry in attendance_data]
+        return {
+            'attendanceData': attendance_data,
+            'averageAttendance': round(sum(rates) / len(rates), 2) if rates else 0,
+        }
+
+    def widget_grade_distribution(self):
+        counts = dict(
+            self.grades.annotate(letter=Upper('letter_grade')).filter(letter__in=LETTER_GRADES)
+            .values('letter').annotate(count=Count('id')).values_list('letter', 'count')
+        )
+        total_grades = sum(counts.values())
+        if not self.courses:
+            # Default distribution when there is no grade data
+            return {'gradeDistributionData': [
+                {'name': 'A', 'value': 25},
+                {'name': 'B', 'value': 35},
+                {'name': 'C', 'value': 25},
+                {'name': 'D', 'value': 10},
+                {'name': 'F', 'value': 5},
+            ]}
+        return {'gradeDistributionData': [
+            {'name': letter, 'value': round(counts.get(letter, 0) / total_grades * 100, 2) if total_grades else 0}
+            for letter in LETTER_GRADES
+        ]}
+
+    def widget_performance(self):
+        # Each assignment is assumed to be worth 100 points
+        course_performance = {}
+        for course in self.courses:
+            totals = self.grade_totals.get(course['id'])
+            if totals and totals['graded']:
+                base_score = float(totals['earned']) / totals['graded']
+                trend = [base_score - 2, base_score, base_score + 1, base_score + 2]
+                course_performance[course['code']] = [max(0, min(100, score)) for score in trend]
+            else:
+                # Default performance if no grades
+                number = course_number(course['id'])
+                base_score = 80 + (number % 15) if number is not None else 85
+                course_performance[course['code']] = [base_score, base_score + 2, base_score + 3, base_score + 1]
+
+        student_performance_data = []
+        for i, week in enumerate(PERFORMANCE_WEEKS):
+            week_data = {'week': week}
+            for course_code, scores in course_performance.items():
+                week_data[course_code] = scores[i]
+            student_performance_data.append(week_data)
+
+        earned = sum(float(totals['earned'] or 0) for totals in self.grade_totals.values())
+        graded = sum(totals['graded'] for totals in self.grade_totals.values())
+        return {
+            'studentPerformanceData': student_performance_data,
+            # Default score if no grades
+            'avgAssignmentScore': round(earned / graded, 2) if earned else 85,
+        }
+
+    def widget_engagement(self):
+        # Students with graded submissions out of all enrollments
+        total_enrollments = sum(self.enrollment_counts.values())
+        active_students = sum(totals['students'] for totals in self.grade_totals.values())
+        engagement = active_students / total_enrollments * 100 if total_enrollments else 0
+        # Default engagement if there is no data
+        return {'studentEngagement': round(engagement, 2) if engagement else 78}
+
+class FacultyDashboardService:
+    """Service class for the faculty dashboard and analytics widgets
+
+    Widgets are computed from grouped aggregates and cached per faculty member
+    and widget until a grade, enrollment, assignment, course or advisee of the
+    faculty member changes (see faculty.signals).
+    """
+
+    @staticmethod
+    def cache_key(employee_id, widget):
+        return f'faculty_dashboard:{employee_id}:{widget}'
+
+    @staticmethod
+    def enabled_widgets(faculty, widgets):
+        """Widgets the faculty member has not turned off in their dashboard settings
+
+        dashboard_widgets either maps widget names to whether they are shown
+        (widgets it doesn't mention are shown) or lists the widgets to show.
+        An empty setting shows every widget.
+        """
+        setting = FacultySettings.objects.filter(faculty=faculty).values_list('dashboard_widgets', flat=True).first()
+        if isinstance(setting, list) and setting:
+            return [widget for widget in widgets if widget in setting]
+        if isinstance(setting, dict):
+            return [widget for widget in widgets if setting.get(widget, True)]
+        return list(widgets)
+
+    @staticmethod
+    def get_widgets(employee_id, widgets):
+        """Merged data of the given widgets, computing only those not cached"""
+        keys = {widget: FacultyDashboardService.cache_key(employee_id, widget) for widget in widgets}
+        cached = cache.get_many(list(keys.values()))
+
+        data = {}
+        computed = {}
+        metrics = FacultyDashboardMetrics(employee_id)
+        for widget in widgets:
+            widget_data = cached.get(keys[widget])
+            if widget_data is None:
+                widget_data = getattr(metrics, f'widget_{widget}')()
+                computed[keys[widget]] = widget_data
+            data.update(widget_data)
+
+        if computed:
+            cache.set_many(computed, timeout=DASHBOARD_CACHE_TIMEOUT)
+        return data
+
+    @staticmethod
+    def invalidate(employee_id):
+        """Drop a faculty member's cached widgets"""
+        if employee_id:
+            cache.delete_many([
+                FacultyDashboardService.cache_key(employee_id, widget)
+                for widget in DASHBOARD_WIDGETS + ANALYTICS_WIDGETS
+            ])
+
+    @staticmethod
+    def invalidate_course(course_id):
+        """Drop the cached widgets of a course's instructor"""
+        for employee_id in Course.objects.filter(id=course_id).values_list('instructor_id', flat=True):
+            FacultyDashboardService.invalidate(employee_id)
@@ -5,9 +5,14 @@ from django.core.cache import cache
 import json
 import uuid
 from users.models import Faculty
+from .session_store import SessionNotFound, get_session_store
 
-# In-memory storage for form drafts (in production, this would be stored in a database)
-form_drafts = {}
+def get_draft_store():
+    """Form drafts live in the session store, one per user and form, for 24 hours"""
+    return get_session_store('form_draft')
+
+def draft_session_id(user_id, form_name):
+    return f"{user_id}:{form_name}"
 
 @csrf_exempt
 def validate_form_field(request):
@@ -190,29 +195,25 @@ def save_form_draft(request):
                     'message': 'Form name is required'
                 }, status=400)
             
-            # Generate draft ID
-            draft_id = str(uuid.uuid4())
+            # Saving again keeps the draft's ID and creation time
+            session_id = draft_session_id(user.id, form_name)
+            try:
+                existing = get_draft_store().get(session_id)
+            except SessionNotFound:
+                existing = {}
+            draft_id = existing.get('id') or str(uuid.uuid4())
             
             # Create draft data
             draft_data = {
+                'session_id': session_id,
                 'id': draft_id,
                 'form_name': form_name,
                 'form_data': form_data,
                 'user_id': user.id,
-                'created_at': timezone.now().isoformat(),
+                'created_at': existing.get('created_at') or timezone.now().isoformat(),
                 'updated_at': timezone.now().isoformat()
             }
-            
-            # Store draft in memory (in production, this would be stored in a database)
-            # Using a simple in-memory dictionary for demonstration
-            draft_key = f"form_draft_{user.id}_{form_name}"
-            form_drafts[draft_key] = draft_data
-            
-            # Also store in Redis cache if available
-            try:
-                cache.set(draft_key, draft_data, timeout=86400)  # 24 hours
-            except:
-                pass  # Redis not available, continue with in-memory storage
+            get_draft_store().put(draft_data)
             
             return JsonResponse({
                 'success': True,
@@ -240,25 +241,14 @@ def load_form_draft(request, form_name):
             faculty_profile = request.faculty
             user = request.user
             
-            # Create draft key
-            draft_key = f"form_draft_{user.id}_{form_name}"
-            
-            # Try to get draft from Redis cache first
-            draft_data = None
             try:
-                draft_data = cache.get(draft_key)
-            except:
-                pass  # Redis not available
-            
-            # If not in cache, try in-memory storage
-            if not draft_data and draft_key in form_drafts:
-                draft_data = form_drafts[draft_key]
-            
-            if not draft_data:
+                draft_data = get_draft_store().get(draft_session_id(user.id, form_name))
+            except SessionNotFound:
                 return JsonResponse({
                     'success': False,
                     'message': 'Form draft not found'
                 }, status=404)
+            draft_data.pop('session_id', None)
             
             return JsonResponse({
                 'success': True,
@@ -285,18 +275,7 @@ def delete_form_draft(request, form_name):
             faculty_profile = request.faculty
             user = request.user
             
-            # Create draft key
-            draft_key = f"form_draft_{user.id}_{form_name}"
-            
-            # Delete from in-memory storage
-            if draft_key in form_drafts:
-                del form_drafts[draft_key]
-            
-            # Delete from Redis cache if available
-            try:
-                cache.delete(draft_key)
-            except:
-                pass  # Redis not available
+            get_draft_store().delete(draft_session_id(user.id, form_name))
             
             return JsonResponse({
                 'success': True,
@@ -323,18 +302,16 @@ def list_form_drafts(request):
             faculty_profile = request.faculty
             user = request.user
             
-            # Get drafts from in-memory storage
-            user_drafts = []
-            draft_prefix = f"form_draft_{user.id}_"
-            
-            for key, draft in form_drafts.items():
-                if key.startswith(draft_prefix):
-                    user_drafts.append({
-                        'id': draft['id'],
-                        'form_name': draft['form_name'],
-                        'created_at': draft['created_at'],
-                        'updated_at': draft['updated_at']
-                    })
+            # Only this user's drafts are read
+            user_drafts = [
+                {
+                    'id': draft['id'],
+                    'form_name': draft['form_name'],
+                    'created_at': draft['created_at'],
+                    'updated_at': draft['updated_at']
+                }
+                for draft in get_draft_store().user_sessions(user.id)
+            ]
             
             return JsonResponse({
                 'success': True,
@@ -6,6 +6,7 @@ from django.utils.deprecation import MiddlewareMixin
 from django.utils import timezone
 from datetime import datetime, timedelta
 from users.models import User, Faculty
+from users.token_blacklist import new_jti
 
 class FacultyRoleMiddleware(MiddlewareMixin):
     # Add the async_mode attribute required by Django 5.2
@@ -140,8 +141,9 @@ def generate_refresh_token(user):
         'username': user.username,
         'role': user.role,
         'type': 'refresh',
-        'exp': now + timedelta(days=7),  # Refresh token expires in 7 days
-        'iat': now
+        'exp': (now + timedelta(days=7)).timestamp(),  # Refresh token expires in 7 days
+        'iat': now.timestamp(),  # Sub-second, as revocation watermarks are
+        'jti': new_jti()
     }
     token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
     return token
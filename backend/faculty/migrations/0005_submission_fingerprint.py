@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0004_collaboration_milestone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionFingerprint',
+            fields=[
+                ('submission_id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('assignment_id', models.CharField(db_index=True, max_length=50)),
+                ('course_code', models.CharField(db_index=True, max_length=20)),
+                ('student_id', models.CharField(max_length=50)),
+                ('content_hash', models.CharField(max_length=32)),
+                ('signature', models.BinaryField()),
+                ('fingerprints', models.BinaryField()),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
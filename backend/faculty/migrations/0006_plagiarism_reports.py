@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0005_submission_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlagiarismReport',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('submission_id', models.CharField(max_length=50)),
+                ('assignment_id', models.CharField(max_length=50)),
+                ('course_id', models.CharField(max_length=50)),
+                ('student_id', models.CharField(max_length=50)),
+                ('content_hash', models.CharField(max_length=32)),
+                ('config_key', models.CharField(max_length=100)),
+                ('threshold', models.FloatField()),
+                ('similarity_score', models.FloatField()),
+                ('is_plagiarized', models.BooleanField()),
+                ('sources', models.JSONField(blank=True, default=list)),
+                ('checked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignment_id', 'config_key'], name='plagiarism_assignment_idx')],
+                'unique_together': {('submission_id', 'config_key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubmissionBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='faculty.submissionfingerprint')),
+            ],
+        ),
+    ]
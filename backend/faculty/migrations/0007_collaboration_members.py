@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:48
+
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_collaborators(apps, schema_editor):
+    Collaboration = apps.get_model('faculty', 'Collaboration')
+    CollaborationMember = apps.get_model('faculty', 'CollaborationMember')
+    members = []
+    rows = Collaboration.objects.exclude(collaborators__isnull=True).values_list('id', 'collaborators')
+    for collaboration_id, collaborators in rows:
+        seen = set()
+        for collaborator in collaborators if isinstance(collaborators, list) else []:
+            # Collaborators were free-form records; ones without an ID get one
+            if not isinstance(collaborator, dict):
+                continue
+            member_id = str(collaborator.get('id') or uuid.uuid4().hex)
+            if member_id not in seen:
+                seen.add(member_id)
+                members.append(CollaborationMember(collaboration_id=collaboration_id, member_id=member_id,
+                                                   details=collaborator))
+    CollaborationMember.objects.bulk_create(members, batch_size=1000)
+
+
+def restore_collaborators(apps, schema_editor):
+    Collaboration = apps.get_model('faculty', 'Collaboration')
+    CollaborationMember = apps.get_model('faculty', 'CollaborationMember')
+    collaborators = {}
+    for member in CollaborationMember.objects.order_by('id'):
+        collaborators.setdefault(member.collaboration_id, []).append({'id': member.member_id, **member.details})
+    for collaboration_id, records in collaborators.items():
+        Collaboration.objects.filter(id=collaboration_id).update(collaborators=records)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faculty', '0006_plagiarism_reports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollaborationMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(db_index=True, max_length=50)),
+                ('joined_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('collaboration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='collaboration_members', to='faculty.collaboration')),
+            ],
+            options={
+                'ordering': ['id'],
+                'abstract': False,
+                'unique_together': {('collaboration', 'member_id')},
+            },
+        ),
+        migrations.RunPython(copy_collaborators, restore_collaborators),
+        migrations.RemoveField(
+            model_name='collaboration',
+            name='collaborators',
+        ),
+    ]
@@ -1,138 +1,102 @@
 from django.http import JsonResponse
 from django.utils import timezone
+from datetime import datetime
 import json
 import uuid
 from .error_handling import api_error
+from .session_store import get_session_store
+
+# Modal sessions keep their last MAX_MODAL_HISTORY updates; closed sessions
+# stay readable for CLOSED_MODAL_SESSION_TTL seconds
+MAX_MODAL_HISTORY = 10
+CLOSED_MODAL_SESSION_TTL = 60 * 60
+
+# Session fields stored as ISO timestamps and returned as datetimes
+MODAL_TIMESTAMP_FIELDS = ('created_at', 'last_updated', 'closed_at')
 
 class ModalStateManager:
-    """Utility class for managing modal/dialog states"""
+    """Utility class for managing modal/dialog states
     
-    def __init__(self):
-        # In-memory storage for modal states (in production, this would be stored in a database)
-        self.modal_states = {}
+    States live in the session store (see faculty.session_store), so every
+    worker sees the same sessions and they expire on their own.
+    """
+    
+    def __init__(self, store=None):
+        self._store = store
+    
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = get_session_store('modal')
+        return self._store
+    
+    @staticmethod
+    def _with_datetimes(modal_state):
+        for field in MODAL_TIMESTAMP_FIELDS:
+            if modal_state.get(field):
+                modal_state[field] = datetime.fromisoformat(modal_state[field])
+        return modal_state
     
     def create_modal_session(self, user_id, modal_type, initial_data=None):
         """Create a new modal session"""
-        try:
-            session_id = str(uuid.uuid4())
-            
-            modal_state = {
-                'session_id': session_id,
-                'user_id': user_id,
-                'modal_type': modal_type,
-                'created_at': timezone.now(),
-                'last_updated': timezone.now(),
-                'is_active': True,
-                'data': initial_data or {},
-                'history': []
-            }
-            
-            # Store modal state
-            self.modal_states[session_id] = modal_state
-            
-            return modal_state
-            
-        except Exception as e:
-            raise api_error(
-                f"Failed to create modal session: {str(e)}",
-                "modal_error",
-                500
-            )
+        now = timezone.now().isoformat()
+        modal_state = {
+            'session_id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'modal_type': modal_type,
+            'created_at': now,
+            'last_updated': now,
+            'is_active': True,
+            'data': initial_data or {},
+            'history': []
+        }
+        
+        # Store modal state
+        self.store.put(modal_state)
+        
+        return self._with_datetimes(modal_state)
     
     def update_modal_state(self, session_id, updated_data):
-        """Update modal state data"""
-        try:
-            if session_id not in self.modal_states:
-                raise api_error(
-                    "Modal session not found",
-                    "modal_not_found",
-                    404
-                )
-            
-            modal_state = self.modal_states[session_id]
-            
-            # Add to history
-            modal_state['history'].append({
-                'timestamp': timezone.now(),
-                'previous_data': modal_state['data'].copy(),
-                'updated_data': updated_data
-            })
-            
-            # Keep only last 10 history entries
-            if len(modal_state['history']) > 10:
-                modal_state['history'] = modal_state['history'][-10:]
-            
-            # Update data
+        """Update modal state data
+        
+        History entries only hold the keys the update changed, with their
+        previous and new values, and the oldest entries are dropped.
+        """
+        def apply(modal_state):
+            changes = {
+                key: {'previous': modal_state['data'].get(key), 'updated': value}
+                for key, value in updated_data.items() if modal_state['data'].get(key) != value
+            }
+            if changes:
+                modal_state['history'].append({'timestamp': timezone.now().isoformat(), 'changes': changes})
+                modal_state['history'] = modal_state['history'][-MAX_MODAL_HISTORY:]
             modal_state['data'].update(updated_data)
-            modal_state['last_updated'] = timezone.now()
-            
+            modal_state['last_updated'] = timezone.now().isoformat()
             return modal_state
-            
-        except Exception as e:
-            raise api_error(
-                f"Failed to update modal state: {str(e)}",
-                "modal_error",
-                500
-            )
+        
+        return self._with_datetimes(self.store.update(session_id, apply))
     
     def get_modal_state(self, session_id):
         """Get current modal state"""
-        try:
-            if session_id not in self.modal_states:
-                raise api_error(
-                    "Modal session not found",
-                    "modal_not_found",
-                    404
-                )
-            
-            return self.modal_states[session_id]
-            
-        except Exception as e:
-            raise api_error(
-                f"Failed to get modal state: {str(e)}",
-                "modal_error",
-                500
-            )
+        return self._with_datetimes(self.store.get(session_id))
     
     def close_modal_session(self, session_id):
-        """Close a modal session"""
-        try:
-            if session_id not in self.modal_states:
-                raise api_error(
-                    "Modal session not found",
-                    "modal_not_found",
-                    404
-                )
-            
-            modal_state = self.modal_states[session_id]
+        """Close a modal session, dropping it from the user's active sessions"""
+        def apply(modal_state):
             modal_state['is_active'] = False
-            modal_state['closed_at'] = timezone.now()
-            
+            modal_state['closed_at'] = timezone.now().isoformat()
             return modal_state
-            
-        except Exception as e:
-            raise api_error(
-                f"Failed to close modal session: {str(e)}",
-                "modal_error",
-                500
-            )
+        
+        return self._with_datetimes(
+            self.store.update(session_id, apply, ttl=CLOSED_MODAL_SESSION_TTL, indexed=False)
+        )
     
     def get_user_modal_sessions(self, user_id):
         """Get all active modal sessions for a user"""
-        try:
-            user_sessions = []
-            for session_id, modal_state in self.modal_states.items():
-                if modal_state['user_id'] == user_id and modal_state['is_active']:
-                    user_sessions.append(modal_state)
-            
-            return user_sessions
-            
-        except Exception as e:
-            raise api_error(
-                f"Failed to get user modal sessions: {str(e)}",
-                "modal_error",
-                500
-            )
+        return [
+            self._with_datetimes(modal_state)
+            for modal_state in self.store.user_sessions(user_id) if modal_state['is_active']
+        ]
 
 # Global instance for managing modal states
 modal_manager = ModalStateManager()
@@ -6,6 +6,7 @@ import uuid
 from users.models import Faculty
 from .modal_management import modal_manager, audit_logger, TransactionManager
 from .error_handling import api_error
+from .session_store import SessionNotFound
 
 @csrf_exempt
 def create_modal_session(request):
@@ -102,6 +103,12 @@ def update_modal_state(request, session_id):
                 }
             })
             
+        except SessionNotFound:
+            return api_error(
+                "Modal session not found",
+                "modal_not_found",
+                404
+            )
         except Exception as e:
             return api_error(
                 f"Failed to update modal state: {str(e)}",
@@ -156,6 +163,12 @@ def get_modal_state(request, session_id):
                 }
             })
             
+        except SessionNotFound:
+            return api_error(
+                "Modal session not found",
+                "modal_not_found",
+                404
+            )
         except Exception as e:
             return api_error(
                 f"Failed to get modal state: {str(e)}",
@@ -211,6 +224,12 @@ def close_modal_session(request, session_id):
                 }
             })
             
+        except SessionNotFound:
+            return api_error(
+                "Modal session not found",
+                "modal_not_found",
+                404
+            )
         except Exception as e:
             return api_error(
                 f"Failed to close modal session: {str(e)}",
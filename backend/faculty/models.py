@@ -2,6 +2,7 @@ import uuid
 
 from django.db import models
 from django.utils import timezone
+from memberships import Membership
 from users.models import Faculty, Student
 
 class Grant(models.Model):
@@ -146,7 +147,6 @@ class Collaboration(models.Model):
     end_date = models.DateField(null=True, blank=True)
     status = models.CharField(max_length=50, default='active')
     project_id = models.CharField(max_length=50, blank=True)
-    collaborators = models.JSONField(default=list, blank=True)
     documents = models.JSONField(default=list, blank=True)
     communications = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
@@ -162,13 +162,23 @@ class Collaboration(models.Model):
             'end_date': str(self.end_date) if self.end_date else None,
             'status': self.status,
             'project_id': self.project_id,
-            'collaborators': self.collaborators or [],
+            'collaborators': [{'id': member.member_id, **member.details}
+                              for member in self.collaboration_members.all()],
             'documents': self.documents or [],
             'communications': self.communications or [],
             'created_at': str(self.created_at),
             'updated_at': str(self.updated_at),
         }
 
+class CollaborationMember(Membership):
+    """A collaborator of a collaboration; details holds the rest of their record (name, email, role)"""
+    group_field = 'collaboration'
+    collaboration = models.ForeignKey(Collaboration, on_delete=models.CASCADE, related_name='collaboration_members')
+    details = models.JSONField(default=dict, blank=True)
+
+    class Meta(Membership.Meta):
+        unique_together = ('collaboration', 'member_id')
+
 class Milestone(models.Model):
     PRIORITY_CHOICES = [
         ('high', 'High'),
@@ -272,3 +282,69 @@ class Recording(models.Model):
             'updated_at': str(self.updated_at) if self.updated_at else None,
             'recording_date': str(self.recording_date) if self.recording_date else None,
         }
+
+
+class SubmissionFingerprint(models.Model):
+    """Plagiarism fingerprints of a submission's content (see faculty.plagiarism)"""
+    submission_id = models.CharField(max_length=50, primary_key=True)
+    assignment_id = models.CharField(max_length=50, db_index=True)
+    course_code = models.CharField(max_length=20, db_index=True)
+    student_id = models.CharField(max_length=50)
+    content_hash = models.CharField(max_length=32)
+    signature = models.BinaryField()  # MinHash signature: NUM_PERM uint32 values
+    fingerprints = models.BinaryField()  # Winnowed shingle hashes: sorted uint32 values
+    computed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Fingerprint of submission {self.submission_id}"
+
+
+class SubmissionBand(models.Model):
+    """LSH bucket of one band of a submission's MinHash signature (see faculty.plagiarism)"""
+    bucket = models.BigIntegerField(db_index=True)
+    submission = models.ForeignKey(SubmissionFingerprint, on_delete=models.CASCADE, related_name='bands')
+
+    def __str__(self):
+        return f"Bucket {self.bucket} of submission {self.submission_id}"
+
+
+class PlagiarismReport(models.Model):
+    """Plagiarism report of a submission's content under a detection configuration"""
+    id = models.CharField(max_length=50, primary_key=True)
+    submission_id = models.CharField(max_length=50)
+    assignment_id = models.CharField(max_length=50)
+    course_id = models.CharField(max_length=50)
+    student_id = models.CharField(max_length=50)
+    content_hash = models.CharField(max_length=32)
+    config_key = models.CharField(max_length=100)  # Threshold and engine settings
+    threshold = models.FloatField()
+    similarity_score = models.FloatField()
+    is_plagiarized = models.BooleanField()
+    sources = models.JSONField(default=list, blank=True)  # Array: matched submissions
+    checked_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ('submission_id', 'config_key')
+        indexes = [
+            models.Index(fields=['assignment_id', 'config_key'], name='plagiarism_assignment_idx'),
+        ]
+
+    def to_json(self):
+        """Convert plagiarism report to JSON format"""
+        return {
+            'id': self.id,
+            'submission_id': self.submission_id,
+            'assignment_id': self.assignment_id,
+            'student_id': self.student_id,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None,
+            'threshold': self.threshold,
+            'result': {
+                'similarity_score': self.similarity_score,
+                'is_plagiarized': self.is_plagiarized,
+                'threshold': self.threshold,
+                'sources': self.sources,
+            },
+        }
+
+    def __str__(self):
+        return f"Plagiarism report of submission {self.submission_id}"
@@ -8,6 +8,7 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from communications.models import Notification
+from communications.notification_service import NotificationService
 from .decorators import faculty_required
 import json
 
@@ -58,7 +59,8 @@ def get_notifications(request):
         
         return JsonResponse({
             'success': True,
-            'notifications': notifications_data
+            'notifications': notifications_data,
+            'unread_count': NotificationService.unread_count(faculty_id)
         })
         
     except Exception as e:
@@ -68,6 +70,24 @@ def get_notifications(request):
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+@faculty_required
+def get_unread_count(request):
+    """Get the number of unread notifications of the faculty member"""
+    try:
+        return JsonResponse({
+            'success': True,
+            'unread_count': NotificationService.unread_count(request.faculty.user_id)
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Failed to fetch unread count: {str(e)}'
+        }, status=500)
+
+
 @csrf_exempt
 @require_http_methods(["PUT"])
 @faculty_required
@@ -76,22 +96,20 @@ def mark_notification_read(request, notification_id):
     try:
         faculty_id = request.faculty.user_id
         
-        # Get and mark notification as read
-        try:
-            notification = Notification.objects.get(id=notification_id, user_id=faculty_id)
-            notification.mark_as_read()
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Notification marked as read',
-                'notification': notification.to_json()
-            })
-        except Notification.DoesNotExist:
+        # Mark notification as read
+        notification = NotificationService.mark_read(faculty_id, notification_id)
+        if notification is None:
             return JsonResponse({
                 'success': False,
                 'message': 'Notification not found'
             }, status=404)
         
+        return JsonResponse({
+            'success': True,
+            'message': 'Notification marked as read',
+            'notification': notification.to_json()
+        })
+        
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -107,10 +125,8 @@ def mark_all_notifications_read(request):
     try:
         faculty_id = request.faculty.user_id
         
-        # Mark all notifications as read
-        notifications = Notification.objects.filter(user_id=faculty_id, is_read=False)
-        count = notifications.count()
-        notifications.update(is_read=True)
+        # Mark all notifications as read in one UPDATE
+        count = NotificationService.mark_all_read(faculty_id)
         
         return JsonResponse({
             'success': True,
@@ -133,21 +149,18 @@ def delete_notification(request, notification_id):
     try:
         faculty_id = request.faculty.user_id
         
-        # Get and delete notification
-        try:
-            notification = Notification.objects.get(id=notification_id, user_id=faculty_id)
-            notification.delete()
-            
-            return JsonResponse({
-                'success': True,
-                'message': 'Notification deleted successfully'
-            })
-        except Notification.DoesNotExist:
+        # Delete notification
+        if not NotificationService.delete(faculty_id, notification_id):
             return JsonResponse({
                 'success': False,
                 'message': 'Notification not found'
             }, status=404)
         
+        return JsonResponse({
+            'success': True,
+            'message': 'Notification deleted successfully'
+        })
+        
     except Exception as e:
         return JsonResponse({
             'success': False,
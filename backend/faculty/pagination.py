@@ -1,4 +1,6 @@
+import math
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.db.models import Count, Window
 from django.http import JsonResponse
 from .error_handling import api_error
 
@@ -135,12 +137,58 @@ def cursor_pagination_response(queryset, request, cursor_field='id', page_size=2
             500
         )
 
+def windowed_page(queryset, request, page_size=20):
+    """Get one page of a queryset and its total item count in a single query
+    
+    The total comes from a COUNT(*) OVER () window on each row, so unlike
+    FacultyPaginator no separate count query is run. Only a page past the end
+    costs an extra count to fall back to the last page.
+    """
+    try:
+        page_number = max(1, int(request.GET.get('page', 1)))
+    except (TypeError, ValueError):
+        page_number = 1
+    try:
+        page_size = max(1, min(int(request.GET.get('page_size', page_size)), 100))  # Maximum page size
+    except (TypeError, ValueError):
+        pass
+    
+    def fetch(number):
+        offset = (number - 1) * page_size
+        return list(queryset.annotate(total_items=Window(Count('pk')))[offset:offset + page_size])
+    
+    items = fetch(page_number)
+    if items:
+        total_items = items[0].total_items
+    else:
+        total_items = queryset.count() if page_number > 1 else 0
+        if total_items:
+            page_number = math.ceil(total_items / page_size)
+            items = fetch(page_number)
+    
+    total_pages = max(1, math.ceil(total_items / page_size))
+    pagination_info = {
+        'current_page': page_number,
+        'total_pages': total_pages,
+        'total_items': total_items,
+        'page_size': page_size,
+        'has_next': page_number < total_pages,
+        'has_previous': page_number > 1,
+        'next_page': page_number + 1 if page_number < total_pages else None,
+        'previous_page': page_number - 1 if page_number > 1 else None,
+    }
+    
+    return {
+        'items': items,
+        'pagination': pagination_info
+    }
+
 # Utility functions for common pagination patterns
 
 def paginate_courses(courses_queryset, request):
     """Paginate courses with default settings"""
     return paginated_api_response(
-        queryset=courses_queryset,
+        queryset=courses_queryset.prefetch_related('waitlist_entries'),
         request=request,
         serializer_func=lambda course: course.to_json(),
         page_size=10
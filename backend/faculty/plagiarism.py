@@ -0,0 +1,359 @@
+"""
+Local plagiarism detection for submissions.
+
+A submission's content is normalized to lowercase words and cut into
+overlapping SHINGLE_SIZE-word shingles, each hashed to 32 bits. Two
+fingerprints are kept per submission (SubmissionFingerprint), recomputed
+only when the content hash changes:
+
+- a MinHash signature of NUM_PERM values, whose agreement between two
+  submissions estimates the Jaccard similarity of their shingle sets
+- the winnowed shingle hashes (the minimum of every WINNOW_WINDOW
+  consecutive hashes), a small sample that any copied passage of
+  SHINGLE_SIZE + WINNOW_WINDOW - 1 words or more is guaranteed to share
+
+Candidate pairs are found by locality-sensitive hashing: signatures are cut
+into LSH_BANDS bands and submissions sharing a band land in the same
+bucket. The buckets are stored (SubmissionBand, indexed by bucket), so a
+new submission finds its candidates with an index lookup of its buckets.
+Only the pairs sharing a bucket are compared, by the exact Jaccard
+similarity of their winnowed hashes, so checking an assignment is near
+linear in its number of submissions. With 32 bands of 4 rows, pairs above
+0.5 similarity are found with probability 0.87 and above 0.7 with 0.999;
+pairs below 0.1 are almost never compared.
+
+Submissions are compared with the rest of the assignment and with the
+fingerprints stored for earlier offerings of the course (same course code).
+Submissions of the same student are never reported against each other.
+
+Reports are stored (PlagiarismReport) per submission and configuration (the
+threshold and the engine's parameters) along with the content hash they
+were computed from, so re-checking recomputes only what changed.
+"""
+
+import hashlib
+import os
+import re
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from assignments.models import Submission
+from courses.models import Course
+from .models import PlagiarismReport, SubmissionBand, SubmissionFingerprint
+
+SHINGLE_SIZE = 5
+WINNOW_WINDOW = 4
+
+NUM_PERM = 128
+LSH_BANDS = 32
+LSH_ROWS = NUM_PERM // LSH_BANDS
+# Buckets per lookup (below SQLite's bound parameter limit)
+BUCKET_QUERY_SIZE = 900
+MINHASH_SLICE = 4096
+
+# Similarities below this are not reported as sources
+MIN_SIMILARITY = 0.2
+MAX_SOURCES = 5
+DEFAULT_THRESHOLD = 0.7
+
+# Words of a source's matched passage quoted in a report
+EXCERPT_WORDS = 30
+
+# Batches with more submissions to fingerprint than this use a process pool
+PARALLEL_THRESHOLD = 200
+
+WORD_PATTERN = re.compile(r'\w+')
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Permutations h(x) = (a * x + b) mod p; a and b below 2**32 keep a * x + b within 64 bits
+_permutations = np.random.RandomState(20240521)
+PERM_A = _permutations.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _permutations.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+del _permutations
+
+
+def content_hash(text):
+    return hashlib.blake2b((text or '').encode('utf-8'), digest_size=16).hexdigest()
+
+
+def words(text):
+    """Lowercase words of a text"""
+    return WORD_PATTERN.findall((text or '').lower())
+
+
+def shingle_hashes(tokens):
+    """32-bit hashes of the SHINGLE_SIZE-word shingles of tokens, in order"""
+    if not tokens:
+        return []
+    count = max(len(tokens) - SHINGLE_SIZE + 1, 1)
+    return [
+        int.from_bytes(hashlib.blake2b(' '.join(tokens[i:i + SHINGLE_SIZE]).encode('utf-8'),
+                                       digest_size=4).digest(), 'little')
+        for i in range(count)
+    ]
+
+
+def winnow(hashes, window=WINNOW_WINDOW):
+    """The minimum hash of every window of consecutive hashes, as a set"""
+    if len(hashes) <= window:
+        return set(hashes[:1]) if hashes else set()
+    return {min(hashes[i:i + window]) for i in range(len(hashes) - window + 1)}
+
+
+def minhash(hashes):
+    """MinHash signature (NUM_PERM uint32 values) of a set of shingle hashes"""
+    if not hashes:
+        return np.full(NUM_PERM, MAX_HASH, dtype=np.uint32)
+    values = np.unique(np.asarray(hashes, dtype=np.uint64))
+    signature = np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+    # In slices, bounding the (NUM_PERM, n) intermediate of long texts
+    for start in range(0, len(values), MINHASH_SLICE):
+        permuted = (np.outer(PERM_A, values[start:start + MINHASH_SLICE]) + PERM_B[:, None]) % MERSENNE_PRIME
+        np.minimum(signature, (permuted & MAX_HASH).min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def fingerprint(text):
+    """(content hash, MinHash signature bytes, winnowed hash bytes) of a text"""
+    hashes = shingle_hashes(words(text))
+    return (content_hash(text), minhash(hashes).tobytes(),
+            np.array(sorted(winnow(hashes)), dtype=np.uint32).tobytes())
+
+
+def _fingerprint_chunk(texts):
+    return [fingerprint(text) for text in texts]
+
+
+def fingerprint_all(texts, workers=None):
+    """Fingerprints of texts, on a process pool for large batches"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(texts) <= PARALLEL_THRESHOLD:
+        return _fingerprint_chunk(texts)
+    chunk_size = max(1, -(-len(texts) // (workers * 4)))
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = []
+            for chunk_result in pool.map(_fingerprint_chunk, chunks):
+                results.extend(chunk_result)
+            return results
+    except (OSError, BrokenProcessPool):
+        return _fingerprint_chunk(texts)
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def band_keys(signature):
+    """The LSH_BANDS bands of a signature, as (band, bytes)"""
+    signature = np.frombuffer(signature, dtype=np.uint32)
+    return [(band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()) for band in range(LSH_BANDS)]
+
+
+def band_buckets(course_code, signature):
+    """Buckets (SubmissionBand.bucket) of a signature's bands; buckets are per course code"""
+    prefix = course_code.encode('utf-8') + b'\0'
+    return [
+        int.from_bytes(hashlib.blake2b(prefix + bytes([band]) + key, digest_size=8).digest(), 'little', signed=True)
+        for band, key in band_keys(signature)
+    ]
+
+
+def config_key(threshold):
+    """Key of the settings a report depends on: the threshold and the engine's parameters"""
+    return (f'threshold={float(threshold):g};shingle={SHINGLE_SIZE};window={WINNOW_WINDOW};'
+            f'lsh={LSH_BANDS}x{LSH_ROWS};min={MIN_SIMILARITY:g};sources={MAX_SOURCES}')
+
+
+def _excerpt(text, source_hashes):
+    """The first passage of a text whose shingle is among a source's winnowed hashes"""
+    tokens = words(text)
+    for position, value in enumerate(shingle_hashes(tokens)):
+        if value in source_hashes:
+            return ' '.join(tokens[position:position + EXCERPT_WORDS])
+    return ''
+
+
+class PlagiarismService:
+    """Similarity checks of submissions against each other and earlier offerings"""
+
+    @staticmethod
+    def fingerprints(submissions, course_code, workers=None):
+        """
+        {submission ID: SubmissionFingerprint} of submissions, and the IDs of
+        those whose fingerprints were (re)computed: the missing and outdated
+        ones, in one batch, stored with their LSH buckets.
+        """
+        stored = SubmissionFingerprint.objects.in_bulk([submission.id for submission in submissions])
+        stale = [submission for submission in submissions
+                 if submission.id not in stored or stored[submission.id].content_hash != content_hash(submission.content)]
+        if stale:
+            now = timezone.now()
+            computed = [
+                SubmissionFingerprint(submission_id=submission.id, assignment_id=submission.assignment_id,
+                                      course_code=course_code, student_id=submission.student_id,
+                                      content_hash=digest, signature=signature, fingerprints=hashes,
+                                      computed_at=now)
+                for submission, (digest, signature, hashes)
+                in zip(stale, fingerprint_all([submission.content for submission in stale], workers))
+            ]
+            with transaction.atomic():
+                # Their buckets go with them
+                SubmissionFingerprint.objects.filter(submission_id__in=[f.submission_id for f in computed]).delete()
+                SubmissionFingerprint.objects.bulk_create(computed)
+                SubmissionBand.objects.bulk_create([
+                    SubmissionBand(bucket=bucket, submission_id=f.submission_id)
+                    for f in computed for bucket in band_buckets(course_code, f.signature)
+                ], batch_size=BUCKET_QUERY_SIZE)
+            stored.update((f.submission_id, f) for f in computed)
+        return stored, {submission.id for submission in stale}
+
+    @staticmethod
+    def candidates(fingerprints, course_code):
+        """{submission ID: IDs of the submissions sharing one of its buckets} of fingerprints"""
+        buckets = {f.submission_id: band_buckets(course_code, f.signature) for f in fingerprints}
+        pending = sorted({bucket for submission_buckets in buckets.values() for bucket in submission_buckets})
+        members = defaultdict(set)
+        for start in range(0, len(pending), BUCKET_QUERY_SIZE):
+            for bucket, submission_id in SubmissionBand.objects.filter(
+                bucket__in=pending[start:start + BUCKET_QUERY_SIZE]
+            ).values_list('bucket', 'submission_id'):
+                members[bucket].add(submission_id)
+        return {
+            submission_id: set().union(*(members[bucket] for bucket in submission_buckets)) - {submission_id}
+            for submission_id, submission_buckets in buckets.items()
+        }
+
+    @staticmethod
+    def check_assignment(assignment, threshold=DEFAULT_THRESHOLD, submission_ids=None, workers=None):
+        """
+        Plagiarism reports of an assignment's submissions (all of them, or
+        those of submission_ids), each compared with the other submissions of
+        the assignment and of earlier offerings of the course.
+
+        Reports are stored per configuration (see config_key) and recomputed
+        only for submissions that changed, whose sources changed, or that a
+        changed submission now matches: re-checking after one late submission
+        compares only that submission (and updates the reports it matches).
+        """
+        course = Course.objects.filter(id=assignment.course_id).only('code').first()
+        course_code = course.code if course else assignment.course_id
+        submissions = {submission.id: submission for submission in Submission.objects.filter(
+            assignment_id=assignment.id
+        ).only('id', 'assignment_id', 'student_id', 'content')}
+        fingerprints, changed = PlagiarismService.fingerprints(list(submissions.values()), course_code, workers)
+        key = config_key(threshold)
+        stored = {report.submission_id: report for report in
+                  PlagiarismReport.objects.filter(assignment_id=assignment.id, config_key=key)}
+
+        # When the sources outside the assignment (earlier offerings, deleted submissions) were fingerprinted
+        external = {source['source_id'] for report in stored.values()
+                    for source in report.sources} - fingerprints.keys()
+        computed = dict(SubmissionFingerprint.objects.filter(submission_id__in=list(external))
+                        .values_list('submission_id', 'computed_at')) if external else {}
+        computed.update((submission_id, fingerprint.computed_at) for submission_id, fingerprint in fingerprints.items())
+
+        def outdated(submission_id):
+            report = stored.get(submission_id)
+            if report is None or report.content_hash != fingerprints[submission_id].content_hash:
+                return True
+            # A source that changed, or was deleted since the report was made
+            return any(source['source_id'] in changed
+                       or computed.get(source['source_id']) is None
+                       or computed[source['source_id']] > report.checked_at
+                       for source in report.sources)
+
+        hashes = {}
+
+        def winnowed(submission_id):
+            if submission_id not in hashes:
+                hashes[submission_id] = set(np.frombuffer(fingerprints[submission_id].fingerprints,
+                                                          dtype=np.uint32).tolist())
+            return hashes[submission_id]
+
+        checked = [submission_id for submission_id in submissions
+                   if submission_ids is None or submission_id in submission_ids]
+        pending = {submission_id for submission_id in checked if outdated(submission_id)}
+        results = {}
+        while pending:
+            candidates = PlagiarismService.candidates([fingerprints[submission_id] for submission_id in pending],
+                                                      course_code)
+            missing = set().union(*candidates.values()) - fingerprints.keys()
+            if missing:
+                fingerprints.update(SubmissionFingerprint.objects.in_bulk(list(missing)))
+            for submission_id, candidate_ids in candidates.items():
+                student_id = submissions[submission_id].student_id
+                sources = []
+                for candidate_id in candidate_ids:
+                    candidate = fingerprints.get(candidate_id)
+                    if candidate is None or candidate.student_id == student_id:
+                        continue
+                    similarity = jaccard(winnowed(submission_id), winnowed(candidate_id))
+                    if similarity >= MIN_SIMILARITY:
+                        sources.append((similarity, candidate))
+                sources.sort(key=lambda source: (-source[0], source[1].submission_id))
+                results[submission_id] = sources[:MAX_SOURCES]
+            # Submissions of the assignment a changed submission matches gain it as a source
+            pending = {
+                candidate.submission_id for submission_id in pending if submission_id in changed
+                for _, candidate in results[submission_id]
+                if candidate.submission_id in submissions and candidate.submission_id not in results
+            }
+
+        if results:
+            now = timezone.now()
+            reports = []
+            for submission_id, sources in results.items():
+                submission = submissions[submission_id]
+                score = sources[0][0] if sources else 0.0
+                reports.append(PlagiarismReport(
+                    id=stored[submission_id].id if submission_id in stored else str(uuid.uuid4()),
+                    submission_id=submission_id, assignment_id=assignment.id, course_id=assignment.course_id,
+                    student_id=submission.student_id, content_hash=fingerprints[submission_id].content_hash,
+                    config_key=key, threshold=threshold, similarity_score=round(score, 4),
+                    is_plagiarized=score > threshold, checked_at=now,
+                    sources=[
+                        {
+                            'source_id': candidate.submission_id,
+                            'source_type': 'submission',
+                            'assignment_id': candidate.assignment_id,
+                            'student_id': candidate.student_id,
+                            'matched_text': _excerpt(submission.content, winnowed(candidate.submission_id)),
+                            'similarity': round(similarity, 4),
+                        }
+                        for similarity, candidate in sources
+                    ],
+                ))
+            with transaction.atomic():
+                PlagiarismReport.objects.filter(submission_id__in=list(results), config_key=key).delete()
+                PlagiarismReport.objects.bulk_create(reports)
+            stored.update((report.submission_id, report) for report in reports)
+        return [stored[submission_id].to_json() for submission_id in checked]
+
+    @staticmethod
+    def check_submission(submission, assignment, threshold=DEFAULT_THRESHOLD):
+        """Plagiarism report of one submission"""
+        return PlagiarismService.check_assignment(assignment, threshold, submission_ids={submission.id})[0]
+
+    @staticmethod
+    def get_report(report_id, employee_id):
+        """A stored report of a course the faculty member teaches, or None: one indexed lookup"""
+        return PlagiarismReport.objects.filter(
+            id=report_id, course_id__in=Course.objects.filter(instructor_id=employee_id).values('id'),
+        ).first()
+
+    @staticmethod
+    def forget(submission_id):
+        """Drop the fingerprints, buckets and reports of a deleted submission"""
+        SubmissionFingerprint.objects.filter(submission_id=submission_id).delete()
+        PlagiarismReport.objects.filter(submission_id=submission_id).delete()
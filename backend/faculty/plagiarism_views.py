@@ -5,42 +5,9 @@ import json
 import uuid
 from assignments.models import Assignment, Submission
 from courses.models import Course
+from .plagiarism import DEFAULT_THRESHOLD, PlagiarismService
 import decimal
 
-# Simulated plagiarism detection service
-class PlagiarismService:
-    """Simulated plagiarism detection service"""
-    
-    @staticmethod
-    def check_plagiarism(content, threshold=0.7):
-        """
-        Simulate plagiarism checking
-        In a real implementation, this would call an external service like Turnitin
-        """
-        # Simulate some plagiarism detection logic
-        # In reality, this would make an API call to a plagiarism detection service
-        
-        # For simulation, we'll generate random similarity scores
-        import random
-        similarity_score = random.uniform(0, 1)
-        
-        # Determine if content is plagiarized based on threshold
-        is_plagiarized = similarity_score > threshold
-        
-        return {
-            'similarity_score': round(similarity_score, 4),
-            'is_plagiarized': is_plagiarized,
-            'threshold': threshold,
-            'sources': [
-                {
-                    'source_id': str(uuid.uuid4()),
-                    'source_url': 'https://example.com/source1',
-                    'matched_text': 'This is a sample matched text...',
-                    'similarity': round(random.uniform(0.5, similarity_score), 4)
-                }
-            ] if is_plagiarized else []
-        }
-
 @csrf_exempt
 def check_submission_plagiarism(request, submission_id):
     """Check a specific submission for plagiarism"""
@@ -79,25 +46,11 @@ def check_submission_plagiarism(request, submission_id):
                 }, status=403)
             
             # Get similarity threshold (default to 0.7 if not provided)
-            threshold = data.get('threshold', 0.7)
-            
-            # Check plagiarism
-            plagiarism_result = PlagiarismService.check_plagiarism(submission.content, threshold)
-            
-            # Create plagiarism report
-            report_id = str(uuid.uuid4())
-            plagiarism_report = {
-                'id': report_id,
-                'submission_id': submission_id,
-                'assignment_id': assignment.id,
-                'student_id': submission.student_id,
-                'checked_at': timezone.now().isoformat(),
-                'threshold': threshold,
-                'result': plagiarism_result
-            }
-            
-            # In a real implementation, you would store this report in a database
-            # For now, we'll just return it in the response
+            threshold = data.get('threshold', DEFAULT_THRESHOLD)
+            
+            # Compare with the assignment's other submissions and earlier offerings;
+            # the stored report is reused while neither side changed
+            plagiarism_report = PlagiarismService.check_submission(submission, assignment, threshold)
             
             return JsonResponse({
                 'success': True,
@@ -144,31 +97,11 @@ def check_assignment_plagiarism(request, assignment_id):
                     'message': 'Access denied - you do not teach this course'
                 }, status=403)
             
-            # Get all submissions for this assignment
-            submissions = Submission.objects.filter(assignment_id=assignment_id)  # type: ignore
-            
             # Get similarity threshold (default to 0.7 if not provided)
-            threshold = data.get('threshold', 0.7)
+            threshold = data.get('threshold', DEFAULT_THRESHOLD)
             
-            # Check plagiarism for each submission
-            plagiarism_results = []
-            for submission in submissions:
-                # Check plagiarism
-                plagiarism_result = PlagiarismService.check_plagiarism(submission.content, threshold)
-                
-                # Create plagiarism report
-                report_id = str(uuid.uuid4())
-                plagiarism_report = {
-                    'id': report_id,
-                    'submission_id': submission.id,
-                    'assignment_id': assignment.id,
-                    'student_id': submission.student_id,
-                    'checked_at': timezone.now().isoformat(),
-                    'threshold': threshold,
-                    'result': plagiarism_result
-                }
-                
-                plagiarism_results.append(plagiarism_report)
+            # Check every submission in one pass over the assignment
+            plagiarism_results = PlagiarismService.check_assignment(assignment, threshold)
             
             # Filter results to only include plagiarized submissions
             plagiarized_submissions = [
@@ -178,9 +111,9 @@ def check_assignment_plagiarism(request, assignment_id):
             
             return JsonResponse({
                 'success': True,
-                'message': f'Plagiarism check completed for {len(submissions)} submissions',
+                'message': f'Plagiarism check completed for {len(plagiarism_results)} submissions',
                 'data': {
-                    'total_submissions': len(submissions),
+                    'total_submissions': len(plagiarism_results),
                     'plagiarized_submissions': len(plagiarized_submissions),
                     'reports': plagiarism_results,
                     'plagiarized_only': plagiarized_submissions
@@ -206,31 +139,15 @@ def get_plagiarism_report(request, report_id):
             # Get faculty from request (attached by middleware)
             faculty_profile = request.faculty
             
-            # In a real implementation, you would retrieve the report from a database
-            # For now, we'll return a simulated response
-            
-            # Simulate retrieving a report
-            plagiarism_report = {
-                'id': report_id,
-                'submission_id': str(uuid.uuid4()),
-                'assignment_id': str(uuid.uuid4()),
-                'student_id': 'STU001',
-                'checked_at': timezone.now().isoformat(),
-                'threshold': 0.7,
-                'result': {
-                    'similarity_score': 0.85,
-                    'is_plagiarized': True,
-                    'threshold': 0.7,
-                    'sources': [
-                        {
-                            'source_id': str(uuid.uuid4()),
-                            'source_url': 'https://example.com/source1',
-                            'matched_text': 'This is a sample matched text...',
-                            'similarity': 0.75
-                        }
-                    ]
-                }
-            }
+            # Reports of courses the faculty member teaches, in one lookup
+            report = PlagiarismService.get_report(report_id, faculty_profile.employee_id)
+            if report is None:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Plagiarism report not found'
+                }, status=404)
+            
+            plagiarism_report = report.to_json()
             
             return JsonResponse({
                 'success': True,
@@ -315,66 +232,59 @@ def batch_plagiarism_check(request):
                 }, status=400)
             
             submission_ids = data['submission_ids']
-            threshold = data.get('threshold', 0.7)
+            threshold = data.get('threshold', DEFAULT_THRESHOLD)
+            
+            # Load the submissions, their assignments and the courses taught in three queries
+            submissions = Submission.objects.only('id', 'assignment_id').in_bulk(submission_ids)  # type: ignore
+            assignments = Assignment.objects.in_bulk({submission.assignment_id for submission in submissions.values()})  # type: ignore
+            taught = set(Course.objects.filter(  # type: ignore
+                id__in={assignment.course_id for assignment in assignments.values()},
+                instructor_id=faculty_profile.employee_id,
+            ).values_list('id', flat=True))
             
-            # Check plagiarism for each submission
             plagiarism_results = []
             errors = []
             
+            # Submissions to check, by assignment
+            checks = {}
             for submission_id in submission_ids:
-                try:
-                    # Get submission
-                    try:
-                        submission = Submission.objects.get(id=submission_id)  # type: ignore
-                    except Submission.DoesNotExist:  # type: ignore
-                        errors.append({
-                            'submission_id': submission_id,
-                            'error': 'Submission not found'
-                        })
-                        continue
-                    
-                    # Get assignment for this submission
-                    try:
-                        assignment = Assignment.objects.get(id=submission.assignment_id)  # type: ignore
-                    except Assignment.DoesNotExist:  # type: ignore
-                        errors.append({
-                            'submission_id': submission_id,
-                            'error': 'Assignment not found'
-                        })
-                        continue
-                    
-                    # Verify faculty teaches the course for this assignment
-                    try:
-                        course = Course.objects.get(id=assignment.course_id, instructor_id=faculty_profile.employee_id)  # type: ignore
-                    except Course.DoesNotExist:  # type: ignore
-                        errors.append({
-                            'submission_id': submission_id,
-                            'error': 'Access denied - you do not teach this course'
-                        })
-                        continue
-                    
-                    # Check plagiarism
-                    plagiarism_result = PlagiarismService.check_plagiarism(submission.content, threshold)
-                    
-                    # Create plagiarism report
-                    report_id = str(uuid.uuid4())
-                    plagiarism_report = {
-                        'id': report_id,
+                submission = submissions.get(submission_id)
+                if submission is None:
+                    errors.append({
                         'submission_id': submission_id,
-                        'assignment_id': assignment.id,
-                        'student_id': submission.student_id,
-                        'checked_at': timezone.now().isoformat(),
-                        'threshold': threshold,
-                        'result': plagiarism_result
-                    }
-                    
-                    plagiarism_results.append(plagiarism_report)
-                    
-                except Exception as e:
+                        'error': 'Submission not found'
+                    })
+                    continue
+                
+                assignment = assignments.get(submission.assignment_id)
+                if assignment is None:
                     errors.append({
                         'submission_id': submission_id,
-                        'error': str(e)
+                        'error': 'Assignment not found'
+                    })
+                    continue
+                
+                # Verify faculty teaches the course for this assignment
+                if assignment.course_id not in taught:
+                    errors.append({
+                        'submission_id': submission_id,
+                        'error': 'Access denied - you do not teach this course'
                     })
+                    continue
+                
+                checks.setdefault(assignment.id, set()).add(submission_id)
+            
+            # Check plagiarism, one pass per assignment
+            for assignment_id, checked_ids in checks.items():
+                try:
+                    plagiarism_results.extend(PlagiarismService.check_assignment(
+                        assignments[assignment_id], threshold, submission_ids=checked_ids
+                    ))
+                except Exception as e:
+                    errors.extend({
+                        'submission_id': submission_id,
+                        'error': str(e)
+                    } for submission_id in checked_ids)
             
             # Filter results to only include plagiarized submissions
             plagiarized_submissions = [
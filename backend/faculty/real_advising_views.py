@@ -1,103 +1,162 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from courses.models import Course, Enrollment
+from courses.plan_optimizer import DEFAULT_CREDIT_CAP, DEFAULT_MAX_TERMS, plan_for_student
 from users.models import Faculty, Student
 from assignments.models import Grade
+from .pagination import windowed_page
 import json
-from django.db.models import Avg, Count, Q
+from decimal import Decimal
+from django.db.models import (
+    Avg, Case, CharField, Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Value, When
+)
+from django.db.models.functions import Coalesce, Concat
+
+# (minimum GPA, label), highest first; lower GPAs and missing GPAs get the default
+STANDING_THRESHOLDS = [(3.5, 'Excellent'), (3.0, 'Good'), (2.5, 'Satisfactory')]
+DEFAULT_STANDING = 'Probation'
+YEAR_THRESHOLDS = [(3.5, 'Senior'), (3.0, 'Junior'), (2.5, 'Sophomore')]
+DEFAULT_YEAR = 'Freshman'
+GPA_RANGE_THRESHOLDS = [(3.5, '3.5-4.0'), (3.0, '3.0-3.49'), (2.5, '2.5-2.99')]
+DEFAULT_GPA_RANGE = 'below_2.5'
+
+YEAR_ORDER = {'Freshman': 1, 'Sophomore': 2, 'Junior': 3, 'Senior': 4}
+
+# Advisee list fields that can be sorted and grouped by, and their columns
+ADVISEE_SORT_FIELDS = {'gpa': 'gpa', 'name': 'name', 'year': 'year_rank'}
+ADVISEE_GROUP_FIELDS = {
+    'academic_standing': 'academic_standing',
+    'major': 'degree_program',
+    'year': 'year_rank',
+    'gpa': 'gpa',
+    'enrolled_courses': 'enrolled_courses',
+}
+
+def gpa_case(thresholds, default):
+    """SQL CASE mapping a student's cumulative GPA to a label"""
+    return Case(
+        *[When(cumulative_gpa__gte=minimum, then=Value(label)) for minimum, label in thresholds],
+        default=Value(default),
+        output_field=CharField()
+    )
+
+def get_advisees_queryset(faculty_profile):
+    """Advisees of a faculty member with their name, GPA, standing and year derived in SQL"""
+    return Student.objects.filter(advisor_id=faculty_profile.employee_id).select_related('user').annotate(
+        name=Concat('user__first_name', Value(' '), 'user__last_name', output_field=CharField()),
+        gpa=Coalesce('cumulative_gpa', Value(Decimal('0.00')), output_field=DecimalField(max_digits=4, decimal_places=2)),
+        academic_standing=gpa_case(STANDING_THRESHOLDS, DEFAULT_STANDING),
+        year=gpa_case(YEAR_THRESHOLDS, DEFAULT_YEAR),
+        year_rank=Case(
+            *[When(cumulative_gpa__gte=minimum, then=Value(YEAR_ORDER[label])) for minimum, label in YEAR_THRESHOLDS],
+            default=Value(YEAR_ORDER[DEFAULT_YEAR]),
+            output_field=IntegerField()
+        ),
+    )
+
+def with_enrollment_counts(advisees):
+    """Annotate advisees with their enrollment count from a correlated subquery"""
+    enrollment_counts = Enrollment.objects.filter(
+        student_id=OuterRef('student_id')
+    ).order_by().values('student_id').annotate(count=Count('id')).values('count')
+    return advisees.annotate(enrolled_courses=Coalesce(Subquery(enrollment_counts), 0))
+
+def filter_advisees(advisees, params, search_param, search_major=False):
+    """Apply the advisee list filters and search of the request parameters"""
+    academic_standing_filter = params.get('academic_standing')
+    if academic_standing_filter:
+        advisees = advisees.filter(academic_standing__iexact=academic_standing_filter)
+    
+    major_filter = params.get('major')
+    if major_filter:
+        advisees = advisees.filter(degree_program__iexact=major_filter)
+    
+    year_filter = params.get('year')
+    if year_filter:
+        advisees = advisees.filter(year__iexact=year_filter)
+    
+    # GPA range filter
+    min_gpa = params.get('min_gpa')
+    if min_gpa:
+        advisees = advisees.filter(gpa__gte=float(min_gpa))
+    max_gpa = params.get('max_gpa')
+    if max_gpa:
+        advisees = advisees.filter(gpa__lte=float(max_gpa))
+    
+    search_query = params.get(search_param)
+    if search_query:
+        search = (
+            Q(name__icontains=search_query) |
+            Q(student_id__icontains=search_query) |
+            Q(user__email__icontains=search_query)
+        )
+        if search_major:
+            search |= Q(degree_program__icontains=search_query)
+        advisees = advisees.filter(search)
+    
+    return advisees
+
+def sort_advisees(advisees, params, group_by=None):
+    """Order advisees by the requested field, after the grouping field if any"""
+    ordering = []
+    if group_by in ADVISEE_GROUP_FIELDS:
+        ordering.append(ADVISEE_GROUP_FIELDS[group_by])
+    
+    sort_field = ADVISEE_SORT_FIELDS.get(params.get('sort_by', 'name'))
+    if sort_field:
+        ordering.append(f"-{sort_field}" if params.get('sort_order', 'asc') == 'desc' else sort_field)
+    
+    # Student ID keeps pages stable between requests
+    return advisees.order_by(*ordering, 'student_id')
+
+def serialize_advisee(student):
+    """Advisee list entry of an annotated student"""
+    return {
+        'student_id': student.student_id,
+        'name': student.name,
+        'email': student.user.email,
+        'major': student.degree_program,
+        'year': student.year,
+        'gpa': float(student.gpa),
+        'academic_standing': student.academic_standing,
+        'advisor_id': student.advisor_id,
+        'enrolled_courses': student.enrolled_courses,
+        'graduation_date': str(student.graduation_date) if student.graduation_date else None
+    }
 
 @csrf_exempt
 def get_advisee_list(request):
-    """Get list of advisees for the authenticated faculty member using real Student model"""
+    """Get a page of advisees for the authenticated faculty member using real Student model"""
     if request.method == 'GET':
         try:
             # Get faculty from request (attached by middleware)
             faculty_profile = request.faculty
             
-            # Get all students advised by this faculty member
-            # Filter students where advisor_id matches faculty employee_id
-            students = Student.objects.filter(advisor_id=faculty_profile.employee_id).select_related('user')
-            
-            # Convert to JSON format with required fields
-            advisees = []
-            for student in students:
-                # Get enrollment count for this student
-                enrollment_count = Enrollment.objects.filter(student_id=student.student_id).count()
-                
-                # Get GPA from Student model or calculate from grades
-                gpa = float(student.cumulative_gpa) if student.cumulative_gpa else 0.0
-                
-                advisee_data = {
-                    'student_id': student.student_id,
-                    'name': f"{student.user.first_name} {student.user.last_name}",
-                    'email': student.user.email,
-                    'major': student.degree_program,
-                    'year': get_student_year(student),
-                    'gpa': gpa,
-                    'academic_standing': get_academic_standing(gpa),
-                    'advisor_id': student.advisor_id,
-                    'enrolled_courses': enrollment_count,
-                    'graduation_date': str(student.graduation_date) if student.graduation_date else None
-                }
-                advisees.append(advisee_data)
-            
-            # Apply filtering
-            # Filter by academic standing
-            academic_standing_filter = request.GET.get('academic_standing')
-            if academic_standing_filter:
-                advisees = [
-                    student for student in advisees 
-                    if student.get('academic_standing', '').lower() == academic_standing_filter.lower()
-                ]
-            
-            # Filter by major
-            major_filter = request.GET.get('major')
-            if major_filter:
-                advisees = [
-                    student for student in advisees 
-                    if student.get('major', '').lower() == major_filter.lower()
-                ]
-            
-            # Apply sorting
-            sort_by = request.GET.get('sort_by', 'name')
-            sort_order = request.GET.get('sort_order', 'asc')
-            
-            if sort_by == 'gpa':
-                advisees.sort(key=lambda x: x.get('gpa', 0), reverse=(sort_order == 'desc'))
-            elif sort_by == 'name':
-                advisees.sort(key=lambda x: x.get('name', ''), reverse=(sort_order == 'desc'))
-            elif sort_by == 'year':
-                # Simple year sorting (Freshman < Sophomore < Junior < Senior)
-                year_order = {'Freshman': 1, 'Sophomore': 2, 'Junior': 3, 'Senior': 4}
-                advisees.sort(key=lambda x: year_order.get(x.get('year', ''), 0), reverse=(sort_order == 'desc'))
-            
-            # Apply search
-            search_query = request.GET.get('search')
-            if search_query:
-                search_query = search_query.lower()
-                advisees = [
-                    student for student in advisees
-                    if search_query in student.get('name', '').lower() or
-                       search_query in student.get('student_id', '').lower() or
-                       search_query in student.get('email', '').lower()
-                ]
-            
-            # Apply grouping/categorization
+            # Filtering, search, sorting, enrollment counts and the total all run in one query
             group_by = request.GET.get('group_by')
+            advisees = with_enrollment_counts(get_advisees_queryset(faculty_profile))
+            advisees = sort_advisees(filter_advisees(advisees, request.GET, 'search'), request.GET, group_by)
+            page = windowed_page(advisees, request)
+            data = [serialize_advisee(student) for student in page['items']]
+            
+            # Apply grouping/categorization to the page, already ordered by group
             if group_by:
                 grouped_advisees = {}
-                for student in advisees:
-                    group_key = student.get(group_by, 'Unknown')
-                    if group_key not in grouped_advisees:
-                        grouped_advisees[group_key] = []
-                    grouped_advisees[group_key].append(student)
-                advisees = grouped_advisees
+                for student in data:
+                    grouped_advisees.setdefault(student.get(group_by, 'Unknown'), []).append(student)
+                data = grouped_advisees
             
             return JsonResponse({
                 'success': True,
-                'data': advisees
+                'data': data,
+                'pagination': page['pagination']
             })
             
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid filter value'
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -109,33 +168,24 @@ def get_advisee_list(request):
         'message': 'Method not allowed'
     }, status=405)
 
+def threshold_label(gpa, thresholds, default):
+    """Label of the first threshold a GPA reaches"""
+    for minimum, label in thresholds:
+        if gpa >= minimum:
+            return label
+    return default
+
 def get_student_year(student):
     """Determine student year based on credits or other criteria"""
     # This is a simplified implementation
     # In a real system, this would be more complex
     if not student.cumulative_gpa:
-        return 'Freshman'
-    
-    gpa = float(student.cumulative_gpa)
-    if gpa >= 3.5:
-        return 'Senior'
-    elif gpa >= 3.0:
-        return 'Junior'
-    elif gpa >= 2.5:
-        return 'Sophomore'
-    else:
-        return 'Freshman'
+        return DEFAULT_YEAR
+    return threshold_label(float(student.cumulative_gpa), YEAR_THRESHOLDS, DEFAULT_YEAR)
 
 def get_academic_standing(gpa):
     """Determine academic standing based on GPA"""
-    if gpa >= 3.5:
-        return 'Excellent'
-    elif gpa >= 3.0:
-        return 'Good'
-    elif gpa >= 2.5:
-        return 'Satisfactory'
-    else:
-        return 'Probation'
+    return threshold_label(gpa, STANDING_THRESHOLDS, DEFAULT_STANDING)
 
 @csrf_exempt
 def get_advisee_detail(request, student_id):
@@ -222,91 +272,22 @@ def search_advisees(request):
             # Get faculty from request (attached by middleware)
             faculty_profile = request.faculty
             
-            # Get all students advised by this faculty member
-            students = Student.objects.filter(advisor_id=faculty_profile.employee_id).select_related('user')
-            
-            # Convert to list with additional data
-            advisees = []
-            for student in students:
-                # Get enrollment count for this student
-                enrollment_count = Enrollment.objects.filter(student_id=student.student_id).count()
-                
-                # Get GPA from Student model
-                gpa = float(student.cumulative_gpa) if student.cumulative_gpa else 0.0
-                
-                advisee_data = {
-                    'student_id': student.student_id,
-                    'name': f"{student.user.first_name} {student.user.last_name}",
-                    'email': student.user.email,
-                    'major': student.degree_program,
-                    'year': get_student_year(student),
-                    'gpa': gpa,
-                    'academic_standing': get_academic_standing(gpa),
-                    'advisor_id': student.advisor_id,
-                    'enrolled_courses': enrollment_count,
-                    'graduation_date': str(student.graduation_date) if student.graduation_date else None
-                }
-                advisees.append(advisee_data)
-            
-            # Apply advanced filtering
-            # GPA range filter
-            min_gpa = request.GET.get('min_gpa')
-            max_gpa = request.GET.get('max_gpa')
-            if min_gpa:
-                advisees = [student for student in advisees if student.get('gpa', 0) >= float(min_gpa)]
-            if max_gpa:
-                advisees = [student for student in advisees if student.get('gpa', 0) <= float(max_gpa)]
-            
-            # Year filter
-            year_filter = request.GET.get('year')
-            if year_filter:
-                advisees = [student for student in advisees if student.get('year', '').lower() == year_filter.lower()]
-            
-            # Academic standing filter
-            academic_standing_filter = request.GET.get('academic_standing')
-            if academic_standing_filter:
-                advisees = [
-                    student for student in advisees 
-                    if student.get('academic_standing', '').lower() == academic_standing_filter.lower()
-                ]
-            
-            # Major filter
-            major_filter = request.GET.get('major')
-            if major_filter:
-                advisees = [
-                    student for student in advisees 
-                    if student.get('major', '').lower() == major_filter.lower()
-                ]
-            
-            # Search query
-            search_query = request.GET.get('q')
-            if search_query:
-                search_query = search_query.lower()
-                advisees = [
-                    student for student in advisees
-                    if search_query in student.get('name', '').lower() or
-                       search_query in student.get('student_id', '').lower() or
-                       search_query in student.get('email', '').lower() or
-                       search_query in student.get('major', '').lower()
-                ]
-            
-            # Apply sorting
-            sort_by = request.GET.get('sort_by', 'name')
-            sort_order = request.GET.get('sort_order', 'asc')
-            
-            if sort_by == 'gpa':
-                advisees.sort(key=lambda x: x.get('gpa', 0), reverse=(sort_order == 'desc'))
-            elif sort_by == 'name':
-                advisees.sort(key=lambda x: x.get('name', ''), reverse=(sort_order == 'desc'))
-            elif sort_by == 'year':
-                year_order = {'Freshman': 1, 'Sophomore': 2, 'Junior': 3, 'Senior': 4}
-                advisees.sort(key=lambda x: year_order.get(x.get('year', ''), 0), reverse=(sort_order == 'desc'))
+            # Filtering, search, sorting, enrollment counts and the total all run in one query
+            advisees = with_enrollment_counts(get_advisees_queryset(faculty_profile))
+            advisees = sort_advisees(filter_advisees(advisees, request.GET, 'q', search_major=True), request.GET)
+            page = windowed_page(advisees, request)
             
             return JsonResponse({
                 'success': True,
-                'data': advisees
+                'data': [serialize_advisee(student) for student in page['items']],
+                'pagination': page['pagination']
             })
             
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid filter value'
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -326,52 +307,30 @@ def get_advisee_categories(request):
             # Get faculty from request (attached by middleware)
             faculty_profile = request.faculty
             
-            # Get all students advised by this faculty member
-            students = Student.objects.filter(advisor_id=faculty_profile.employee_id).select_related('user')
+            # Count advisees per (standing, major, year, GPA range) in one GROUP BY query
+            groups = get_advisees_queryset(faculty_profile).annotate(
+                major=Case(
+                    When(degree_program='', then=Value('Unknown')),
+                    default='degree_program',
+                    output_field=CharField()
+                ),
+                gpa_range=gpa_case(GPA_RANGE_THRESHOLDS, DEFAULT_GPA_RANGE),
+            ).order_by().values('academic_standing', 'major', 'year', 'gpa_range').annotate(count=Count('pk'))
             
             # Create categories
             categories = {
                 'academic_standing': {},
                 'major': {},
                 'year': {},
-                'gpa_ranges': {
-                    '3.5-4.0': 0,
-                    '3.0-3.49': 0,
-                    '2.5-2.99': 0,
-                    'below_2.5': 0
-                }
+                'gpa_ranges': {label: 0 for _, label in GPA_RANGE_THRESHOLDS + [(0, DEFAULT_GPA_RANGE)]}
             }
             
-            # Populate categories
-            for student in students:
-                # Academic standing
-                gpa = float(student.cumulative_gpa) if student.cumulative_gpa else 0.0
-                standing = get_academic_standing(gpa)
-                if standing not in categories['academic_standing']:
-                    categories['academic_standing'][standing] = 0
-                categories['academic_standing'][standing] += 1
-                
-                # Major
-                major = student.degree_program if student.degree_program else 'Unknown'
-                if major not in categories['major']:
-                    categories['major'][major] = 0
-                categories['major'][major] += 1
-                
-                # Year
-                year = get_student_year(student)
-                if year not in categories['year']:
-                    categories['year'][year] = 0
-                categories['year'][year] += 1
-                
-                # GPA ranges
-                if gpa >= 3.5:
-                    categories['gpa_ranges']['3.5-4.0'] += 1
-                elif gpa >= 3.0:
-                    categories['gpa_ranges']['3.0-3.49'] += 1
-                elif gpa >= 2.5:
-                    categories['gpa_ranges']['2.5-2.99'] += 1
-                else:
-                    categories['gpa_ranges']['below_2.5'] += 1
+            # Fold the groups into each category
+            for group in groups:
+                for category, field in [('academic_standing', 'academic_standing'), ('major', 'major'),
+                                        ('year', 'year'), ('gpa_ranges', 'gpa_range')]:
+                    counts = categories[category]
+                    counts[group[field]] = counts.get(group[field], 0) + group['count']
             
             return JsonResponse({
                 'success': True,
@@ -487,6 +446,164 @@ def get_academic_progress(request, student_id):
         'message': 'Method not allowed'
     }, status=405)
 
+@csrf_exempt
+def simulate_cgpa(request, student_id):
+    """Simulate an advisee's CGPA over many what-if grade scenarios at once"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or '{}')
+            
+            # Get faculty from request (attached by middleware)
+            faculty_profile = request.faculty
+            
+            # Check if student exists and is advised by this faculty member
+            if not Student.objects.filter(student_id=student_id, advisor_id=faculty_profile.employee_id).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Student not found or not your advisee'
+                }, status=404)
+            
+            # Imported here so workers don't load NumPy until it is needed
+            from . import cgpa_simulation
+            transcript = cgpa_simulation.load_transcript(student_id)
+            
+            # Planned courses default to the student's current courses
+            in_progress = {course['code']: course for course in transcript.in_progress}
+            courses = data.get('courses')
+            if courses is None:
+                courses = [
+                    {'code': course['code'], 'credits': course['credits'],
+                     'expected_grade': course['expected_grade_points']}
+                    for course in transcript.in_progress
+                ]
+            elif not isinstance(courses, list) or not all(isinstance(c, dict) and c.get('code') for c in courses):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'courses must be a list of objects with a code'
+                }, status=400)
+            else:
+                courses = [dict(course) for course in courses]
+                for course in courses:
+                    current = in_progress.get(course['code'], {})
+                    course.setdefault('credits', current.get('credits'))
+                    course.setdefault('expected_grade', current.get('expected_grade_points'))
+                
+                # Look up the credits of planned courses that didn't give them
+                missing = [course['code'] for course in courses if not course.get('credits')]
+                if missing:
+                    credits_by_code = dict(Course.objects.filter(code__in=missing).values_list('code', 'credits'))
+                    for course in courses:
+                        if not course.get('credits'):
+                            course['credits'] = credits_by_code.get(course['code'])
+            
+            # Each scenario maps course codes to grades or lists one grade per course
+            scenarios = data.get('scenarios', [])
+            if not isinstance(scenarios, list):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'scenarios must be a list'
+                }, status=400)
+            
+            target_cgpa = data.get('target_cgpa')
+            try:
+                simulation = cgpa_simulation.simulate(
+                    transcript,
+                    courses,
+                    scenarios=scenarios,
+                    samples=int(data.get('samples', cgpa_simulation.DEFAULT_SAMPLES)),
+                    target_cgpa=float(target_cgpa) if target_cgpa is not None else None,
+                    spread=float(data.get('spread', cgpa_simulation.DEFAULT_SPREAD)),
+                    seed=data.get('seed')
+                )
+            except (TypeError, ValueError) as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            
+            simulation['student_id'] = student_id
+            
+            return JsonResponse({
+                'success': True,
+                'data': simulation
+            })
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON data'
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': 'Failed to simulate CGPA'
+            }, status=500)
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Method not allowed'
+    }, status=405)
+
+@csrf_exempt
+def optimize_academic_plan(request, student_id):
+    """Plan an advisee's remaining courses into the fewest terms"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or '{}')
+            
+            # Get faculty from request (attached by middleware)
+            faculty_profile = request.faculty
+            
+            # Check if student exists and is advised by this faculty member
+            student = Student.objects.filter(student_id=student_id, advisor_id=faculty_profile.employee_id).first()
+            if not student:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Student not found or not your advisee'
+                }, status=404)
+            
+            try:
+                start = data.get('start_term')
+                if start is not None:
+                    season, year = start.split()
+                    start = (season.capitalize(), int(year))
+                plan = plan_for_student(
+                    student_id,
+                    data.get('major') or student.degree_program or 'General Studies',
+                    start=start,
+                    include_summer=bool(data.get('include_summer', False)),
+                    credit_cap=int(data.get('credit_cap', DEFAULT_CREDIT_CAP)),
+                    max_terms=int(data.get('max_terms', DEFAULT_MAX_TERMS))
+                )
+            except (AttributeError, TypeError, ValueError) as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            
+            plan['student_id'] = student_id
+            
+            return JsonResponse({
+                'success': True,
+                'data': plan
+            })
+            
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON data'
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': 'Failed to optimize academic plan'
+            }, status=500)
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Method not allowed'
+    }, status=405)
+
 def calculate_projected_gpa(student_id, current_gpa):
     """Calculate projected GPA based on current performance"""
     # In a real implementation, this would be more sophisticated
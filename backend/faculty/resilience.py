@@ -0,0 +1,289 @@
+"""
+Circuit breakers and retries for calls to external services.
+
+Circuit breakers keep their state in the shared cache (Redis in production),
+so all workers see the same failures:
+
+- failures: a counter incremented atomically by every failed call and
+  reset by a success
+- opened: set once when the failure threshold is reached, expiring after
+  the recovery timeout
+- probe: claimed by the single call let through while half open
+
+The breaker is open while 'opened' exists, half open once it has expired
+with the failures still at the threshold, and closed otherwise. Each process
+keeps a snapshot of that state and re-reads it at most once per
+refresh_interval, so calls on a healthy (or open) breaker rarely touch the
+cache.
+
+Retries back off exponentially with full jitter, and never sleep past the
+deadline of the enclosing deadline() block, which nested calls inherit.
+Coroutines are retried with asyncio.sleep instead of blocking the thread.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from django.core.cache import cache
+
+try:
+    from prometheus_client import Counter, Gauge
+except ImportError:  # pragma: no cover - prometheus-client is in requirements.txt
+    Counter = Gauge = None
+
+logger = logging.getLogger('faculty_api')
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# How long failure counts survive without new failures
+FAILURE_COUNT_TIMEOUT = 3600
+
+if Gauge is not None:
+    BREAKER_STATE = Gauge('faculty_circuit_breaker_state', 'Circuit breaker state (0 closed, 1 half open, 2 open)',
+                          ['breaker'])
+    BREAKER_REJECTIONS = Counter('faculty_circuit_breaker_rejections_total', 'Calls rejected by an open breaker',
+                                 ['breaker'])
+else:
+    BREAKER_STATE = BREAKER_REJECTIONS = None
+
+class CircuitOpenError(Exception):
+    """The call was rejected because the circuit breaker is open"""
+
+class DeadlineExceeded(Exception):
+    """The deadline passed before the call could be attempted"""
+
+class CircuitBreaker:
+    """Circuit breaker whose state is shared by every worker through the cache"""
+
+    _breakers = {}
+    _breakers_lock = threading.Lock()
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=60, refresh_interval=1.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.refresh_interval = refresh_interval
+        self.failures_key = f'circuit_breaker:{name}:failures'
+        self.opened_key = f'circuit_breaker:{name}:opened'
+        self.probe_key = f'circuit_breaker:{name}:probe'
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._snapshot = (CLOSED, 0, float('-inf'))  # state, failure count, monotonic read time
+
+    @classmethod
+    def get(cls, name, failure_threshold=5, recovery_timeout=60):
+        """The process-wide breaker of a name, created on first use"""
+        with cls._breakers_lock:
+            if name not in cls._breakers:
+                cls._breakers[name] = cls(name, failure_threshold, recovery_timeout)
+            return cls._breakers[name]
+
+    def _remember(self, state, failures):
+        with self._lock:
+            previous = self._snapshot[0]
+            self._snapshot = (state, failures, time.monotonic())
+        if BREAKER_STATE is not None:
+            BREAKER_STATE.labels(self.name).set(STATE_VALUES[state])
+        if state != previous and state == CLOSED:
+            logger.info(f"Circuit breaker closed for {self.name}")
+        return state
+
+    def _read_state(self):
+        values = cache.get_many([self.failures_key, self.opened_key])
+        failures = values.get(self.failures_key) or 0
+        if self.opened_key in values:
+            state = OPEN
+        elif failures >= self.failure_threshold:
+            state = HALF_OPEN
+        else:
+            state = CLOSED
+        return self._remember(state, failures)
+
+    def state(self, refresh=False):
+        """The breaker state, re-read from the cache once the snapshot is stale"""
+        state, _, read_at = self._snapshot
+        if not refresh and time.monotonic() - read_at < self.refresh_interval:
+            return state
+        try:
+            return self._read_state()
+        except Exception as e:
+            # Without the cache, keep using the last known state
+            logger.warning(f"Circuit breaker state unavailable for {self.name}: {str(e)}")
+            return state
+
+    def allow(self):
+        """Whether a call may go ahead; only one call probes a half-open breaker"""
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            try:
+                if cache.add(self.probe_key, True, self.recovery_timeout):
+                    return True
+            except Exception:
+                return True
+        self.rejected += 1
+        if BREAKER_REJECTIONS is not None:
+            BREAKER_REJECTIONS.labels(self.name).inc()
+        logger.warning(
+            f"Circuit breaker open for {self.name}, rejecting request",
+            extra={'failure_count': self._snapshot[1]}
+        )
+        return False
+
+    def record_success(self):
+        state, failures, _ = self._snapshot
+        if state == CLOSED and failures == 0:
+            return
+        try:
+            cache.delete_many([self.failures_key, self.opened_key, self.probe_key])
+        except Exception as e:
+            logger.warning(f"Circuit breaker state unavailable for {self.name}: {str(e)}")
+        self._remember(CLOSED, 0)
+
+    def record_failure(self, error=None):
+        try:
+            cache.add(self.failures_key, 0, FAILURE_COUNT_TIMEOUT)
+            failures = cache.incr(self.failures_key)
+            if failures < self.failure_threshold:
+                self._remember(CLOSED, failures)
+                return
+            # Only the worker that opens the breaker logs it
+            if cache.add(self.opened_key, True, self.recovery_timeout):
+                logger.error(
+                    f"Circuit breaker opened for {self.name} after {failures} failures",
+                    extra={'failure_count': failures, 'last_failure': str(error)}
+                )
+            cache.delete(self.probe_key)
+        except Exception as e:
+            logger.warning(f"Circuit breaker state unavailable for {self.name}: {str(e)}")
+            failures = self._snapshot[1] + 1
+            if failures < self.failure_threshold:
+                self._remember(CLOSED, failures)
+                return
+        self._remember(OPEN, failures)
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker, raising CircuitOpenError while it is open"""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func, *args, **kwargs):
+        """Await func(*args, **kwargs) through the breaker"""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+def breaker_metrics():
+    """State of this process's circuit breakers, for monitoring"""
+    metrics = []
+    for name, breaker in sorted(CircuitBreaker._breakers.items()):
+        state = breaker.state()
+        metrics.append({
+            'name': name,
+            'state': state,
+            'state_value': STATE_VALUES[state],
+            'failure_count': breaker._snapshot[1],
+            'failure_threshold': breaker.failure_threshold,
+            'recovery_timeout': breaker.recovery_timeout,
+            'rejected': breaker.rejected,
+        })
+    return metrics
+
+_deadline = contextvars.ContextVar('faculty_deadline', default=None)
+
+@contextmanager
+def deadline(seconds):
+    """Bound the calls made inside the block to seconds, or less if an outer deadline is sooner"""
+    at = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(at if outer is None else min(at, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining_time():
+    """Seconds left before the current deadline, or None without one"""
+    at = _deadline.get()
+    return None if at is None else max(0.0, at - time.monotonic())
+
+class RetryPolicy:
+    """Retries with exponential backoff and full jitter, bounded by the current deadline"""
+
+    def __init__(self, attempts=3, delay=1, backoff=2, max_delay=30, exceptions=(Exception,), timeout=None):
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.exceptions = exceptions
+        self.timeout = timeout
+
+    def _deadline(self):
+        return deadline(self.timeout) if self.timeout is not None else nullcontext()
+
+    def _check_deadline(self, name):
+        if remaining_time() == 0:
+            raise DeadlineExceeded(name)
+
+    def _pause(self, attempt, error, name):
+        """Seconds to wait before the next attempt; re-raises error if there is none"""
+        if attempt >= self.attempts:
+            logger.error(
+                f"API call failed after {self.attempts} retries: {str(error)}",
+                extra={'function': name}
+            )
+            raise error
+        pause = random.uniform(0, min(self.max_delay, self.delay * self.backoff ** (attempt - 1)))
+        remaining = remaining_time()
+        if remaining is not None and remaining <= pause:
+            logger.error(
+                f"API call failed, no time left to retry before the deadline: {str(error)}",
+                extra={'function': name, 'retry': attempt}
+            )
+            raise error
+        logger.warning(
+            f"API call failed, retrying in {pause:.2f} seconds: {str(error)}",
+            extra={'function': name, 'retry': attempt, 'max_retries': self.attempts}
+        )
+        return pause
+
+    def call(self, func, *args, **kwargs):
+        name = getattr(func, '__name__', repr(func))
+        with self._deadline():
+            for attempt in range(1, self.attempts + 1):
+                self._check_deadline(name)
+                try:
+                    return func(*args, **kwargs)
+                except self.exceptions as e:
+                    time.sleep(self._pause(attempt, e, name))
+
+    async def acall(self, func, *args, **kwargs):
+        name = getattr(func, '__name__', repr(func))
+        with self._deadline():
+            for attempt in range(1, self.attempts + 1):
+                self._check_deadline(name)
+                try:
+                    return await func(*args, **kwargs)
+                except self.exceptions as e:
+                    await asyncio.sleep(self._pause(attempt, e, name))
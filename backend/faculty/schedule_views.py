@@ -1,55 +1,68 @@
 """
 Faculty Schedule Management Views
 Handles schedule retrieval and management for faculty
+
+Schedules are read from the materialized calendar occurrences
+(communications.calendar_service): a faculty member's week is one range
+scan of their attendances.
 """
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from communications.calendar_service import WEEKDAY_NAMES, CalendarService, format_duration
 from courses.models import Course
 from .decorators import faculty_required
-import json
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
+
+
+def _week(request):
+    """[start, end) of the week of the `week` parameter (a date in it), this week by default"""
+    day = parse_date(request.GET.get('week', '')) if request.GET.get('week') else None
+    return CalendarService.week(day)
+
+
+def _course_meetings(request):
+    """The faculty member's course meeting occurrences in the requested week"""
+    start, end = _week(request)
+    occurrences = CalendarService.attended_occurrences(request.faculty.user_id, start, end)
+    return start, [occurrence for occurrence in occurrences if not occurrence.event_id]
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 @faculty_required
 def get_schedule(request):
-    """Get faculty member's class schedule"""
+    """Get faculty member's class schedule for a week"""
     try:
-        faculty_id = request.faculty.employee_id
-        
-        # Get all courses taught by this faculty member
-        courses = Course.objects.filter(instructor_id=faculty_id)
+        week_start, meetings = _course_meetings(request)
+        courses = Course.objects.in_bulk({meeting.course_id for meeting in meetings})
         
-        # Convert to schedule sessions format
+        # Convert to schedule sessions format, ordered by day and time
         sessions = []
-        for course in courses:
-            if course.schedule and isinstance(course.schedule, list):
-                for idx, schedule_item in enumerate(course.schedule):
-                    # Parse schedule item
-                    session = {
-                        'id': f"{course.id}_{idx}",
-                        'course': course.name,
-                        'courseCode': course.code,
-                        'courseId': course.id,
-                        'time': schedule_item.get('time', 'TBA'),
-                        'day': schedule_item.get('day', 'TBA'),
-                        'duration': schedule_item.get('duration', '1.5 hours'),
-                        'location': schedule_item.get('location', 'TBA'),
-                        'type': schedule_item.get('type', 'lecture'),
-                        'recordingStatus': 'not-started'  # Default status
-                    }
-                    sessions.append(session)
-        
-        # Sort sessions by day and time
-        day_order = {'Monday': 1, 'Tuesday': 2, 'Wednesday': 3, 'Thursday': 4, 'Friday': 5, 'Saturday': 6, 'Sunday': 7}
-        sessions.sort(key=lambda x: (day_order.get(x.get('day', 'Monday'), 99), x.get('time', '')))
+        for meeting in meetings:
+            course = courses.get(meeting.course_id)
+            start = timezone.localtime(meeting.start_datetime)
+            minutes = (meeting.end_datetime - meeting.start_datetime).total_seconds() / 60
+            sessions.append({
+                'id': f"{meeting.course_id}_{meeting.slot}",
+                'course': course.name if course else meeting.title,
+                'courseCode': course.code if course else '',
+                'courseId': meeting.course_id,
+                'date': start.date().isoformat(),
+                'time': start.strftime('%H:%M'),
+                'day': WEEKDAY_NAMES[start.weekday()],
+                'duration': format_duration(minutes),
+                'location': meeting.location or 'TBA',
+                'type': meeting.type,
+                'recordingStatus': 'not-started'  # Default status
+            })
         
         return JsonResponse({
             'success': True,
+            'week_start': week_start.date().isoformat(),
             'sessions': sessions,
             'total_sessions': len(sessions)
         })
@@ -67,28 +80,12 @@ def get_schedule(request):
 def get_weekly_overview(request):
     """Get faculty member's weekly class overview"""
     try:
-        faculty_id = request.faculty.employee_id
-        
-        # Get all courses taught by this faculty member
-        courses = Course.objects.filter(instructor_id=faculty_id)
+        _, meetings = _course_meetings(request)
         
         # Count sessions by day
-        day_counts = {
-            'Monday': 0,
-            'Tuesday': 0,
-            'Wednesday': 0,
-            'Thursday': 0,
-            'Friday': 0,
-            'Saturday': 0,
-            'Sunday': 0
-        }
-        
-        for course in courses:
-            if course.schedule and isinstance(course.schedule, list):
-                for schedule_item in enumerate(course.schedule):
-                    day = schedule_item[1].get('day', '')
-                    if day in day_counts:
-                        day_counts[day] += 1
+        day_counts = {day: 0 for day in WEEKDAY_NAMES}
+        for meeting in meetings:
+            day_counts[WEEKDAY_NAMES[timezone.localtime(meeting.start_datetime).weekday()]] += 1
         
         return JsonResponse({
             'success': True,
@@ -100,3 +97,38 @@ def get_weekly_overview(request):
             'success': False,
             'message': f'Failed to fetch weekly overview: {str(e)}'
         }, status=500)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+@faculty_required
+def get_calendar(request):
+    """Get the occurrences on the faculty member's calendar in a date range (start and end, end exclusive)"""
+    try:
+        start_date = parse_date(request.GET.get('start', ''))
+        end_date = parse_date(request.GET.get('end', ''))
+        if start_date is None or end_date is None or end_date <= start_date:
+            start, end = _week(request)
+        else:
+            if end_date - start_date > timedelta(days=366):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Date range is limited to one year'
+                }, status=400)
+            start = timezone.make_aware(datetime.combine(start_date, time.min))
+            end = timezone.make_aware(datetime.combine(end_date, time.min))
+        
+        occurrences = CalendarService.occurrences_for_user(request.faculty.user_id, start, end)
+        
+        return JsonResponse({
+            'success': True,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'occurrences': [occurrence.to_json() for occurrence in occurrences]
+        })
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Failed to fetch calendar: {str(e)}'
+        }, status=500)
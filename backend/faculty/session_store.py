@@ -0,0 +1,249 @@
+"""
+Session store for faculty modal sessions and form drafts.
+
+Sessions are JSON-serializable dicts with a 'session_id' and a 'user_id',
+kept per namespace ('modal', 'form_draft') with a time to live. Each user's
+sessions are indexed, so listing them reads only that user's sessions.
+
+Two backends implement the store:
+
+- RedisSessionStore: a hash per session and a set of session IDs per user,
+  both expiring, shared by every worker
+- LocalSessionStore: a bounded in-process LRU dict, used when Redis is not
+  available (e.g., in tests)
+
+get_session_store(namespace) returns the configured backend
+(settings.FACULTY_SESSION_STORE: 'redis' or 'local').
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
+
+DEFAULT_SESSION_TTL = 60 * 60 * 24  # 24 hours
+LOCAL_STORE_MAX_SESSIONS = 10000
+
+class SessionNotFound(Exception):
+    """The session doesn't exist or has expired"""
+
+class SessionStore:
+    """Interface of the session store backends"""
+
+    def __init__(self, namespace, ttl=DEFAULT_SESSION_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def get(self, session_id):
+        """The session, or SessionNotFound"""
+        raise NotImplementedError
+
+    def put(self, session, ttl=None, indexed=True):
+        """Store a session, listed among its user's sessions unless indexed is False"""
+        raise NotImplementedError
+
+    def update(self, session_id, apply, ttl=None, indexed=True):
+        """Replace a session by apply(session) without losing concurrent updates"""
+        raise NotImplementedError
+
+    def delete(self, session_id):
+        raise NotImplementedError
+
+    def user_sessions(self, user_id):
+        """The user's indexed sessions"""
+        raise NotImplementedError
+
+class LocalSessionStore(SessionStore):
+    """In-process store, least recently used sessions evicted beyond max_sessions"""
+
+    def __init__(self, namespace, ttl=DEFAULT_SESSION_TTL, max_sessions=LOCAL_STORE_MAX_SESSIONS):
+        super().__init__(namespace, ttl)
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # session ID -> (expiry time, user ID, encoded session)
+        self._user_index = {}  # user ID -> session IDs
+        self._lock = threading.RLock()
+
+    def _unindex(self, session_id, user_id):
+        session_ids = self._user_index.get(user_id)
+        if session_ids is not None:
+            session_ids.discard(session_id)
+            if not session_ids:
+                del self._user_index[user_id]
+
+    def _pop(self, session_id):
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._unindex(session_id, entry[1])
+
+    def _load(self, session_id):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            self._pop(session_id)
+            return None
+        self._sessions.move_to_end(session_id)
+        return json.loads(entry[2])
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._load(session_id)
+        if session is None:
+            raise SessionNotFound(session_id)
+        return session
+
+    def put(self, session, ttl=None, indexed=True):
+        session_id = session['session_id']
+        user_id = session['user_id']
+        with self._lock:
+            self._pop(session_id)
+            self._sessions[session_id] = (time.monotonic() + (ttl or self.ttl), user_id, json.dumps(session))
+            if indexed:
+                self._user_index.setdefault(user_id, set()).add(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._pop(next(iter(self._sessions)))
+        return session
+
+    def update(self, session_id, apply, ttl=None, indexed=True):
+        with self._lock:
+            return self.put(apply(self.get(session_id)), ttl=ttl, indexed=indexed)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._pop(session_id)
+
+    def user_sessions(self, user_id):
+        with self._lock:
+            sessions = [self._load(session_id) for session_id in list(self._user_index.get(user_id, ()))]
+        return [session for session in sessions if session is not None]
+
+class RedisSessionStore(SessionStore):
+    """Redis store: a hash per session and an expiring set of session IDs per user"""
+
+    def __init__(self, client, namespace, ttl=DEFAULT_SESSION_TTL):
+        super().__init__(namespace, ttl)
+        self.client = client
+
+    def _key(self, session_id):
+        return f'faculty_session:{self.namespace}:{session_id}'
+
+    def _index_key(self, user_id):
+        return f'faculty_session:{self.namespace}:user:{user_id}'
+
+    @staticmethod
+    def _decode(fields):
+        return {
+            (name.decode() if isinstance(name, bytes) else name): json.loads(value)
+            for name, value in fields.items()
+        }
+
+    def _write(self, pipe, session, ttl, indexed):
+        key = self._key(session['session_id'])
+        index_key = self._index_key(session['user_id'])
+        pipe.delete(key)
+        pipe.hset(key, mapping={name: json.dumps(value) for name, value in session.items()})
+        pipe.expire(key, ttl or self.ttl)
+        if indexed:
+            pipe.sadd(index_key, session['session_id'])
+            # The index lives as long as the user's newest session
+            pipe.expire(index_key, max(ttl or self.ttl, self.ttl))
+        else:
+            pipe.srem(index_key, session['session_id'])
+
+    def get(self, session_id):
+        fields = self.client.hgetall(self._key(session_id))
+        if not fields:
+            raise SessionNotFound(session_id)
+        return self._decode(fields)
+
+    def put(self, session, ttl=None, indexed=True):
+        pipe = self.client.pipeline()
+        self._write(pipe, session, ttl, indexed)
+        pipe.execute()
+        return session
+
+    def update(self, session_id, apply, ttl=None, indexed=True):
+        key = self._key(session_id)
+        updated = {}
+
+        def transaction(pipe):
+            # Retried by redis-py if the session changes before MULTI/EXEC
+            fields = pipe.hgetall(key)
+            if not fields:
+                raise SessionNotFound(session_id)
+            updated['session'] = apply(self._decode(fields))
+            pipe.multi()
+            self._write(pipe, updated['session'], ttl, indexed)
+
+        self.client.transaction(transaction, key)
+        return updated['session']
+
+    def delete(self, session_id):
+        fields = self.client.hgetall(self._key(session_id))
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(session_id))
+        if fields:
+            pipe.srem(self._index_key(self._decode(fields)['user_id']), session_id)
+        pipe.execute()
+
+    def user_sessions(self, user_id):
+        index_key = self._index_key(user_id)
+        session_ids = [
+            session_id.decode() if isinstance(session_id, bytes) else session_id
+            for session_id in self.client.smembers(index_key)
+        ]
+        if not session_ids:
+            return []
+
+        pipe = self.client.pipeline()
+        for session_id in session_ids:
+            pipe.hgetall(self._key(session_id))
+        sessions = []
+        expired = []
+        for session_id, fields in zip(session_ids, pipe.execute()):
+            if fields:
+                sessions.append(self._decode(fields))
+            else:
+                expired.append(session_id)
+        if expired:
+            self.client.srem(index_key, *expired)
+        return sessions
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def _redis_client():
+    """A connected Redis client, or None if Redis is not available"""
+    if redis is None:
+        return None
+    config = getattr(settings, 'REDIS_CONFIG', {})
+    try:
+        client = redis.Redis(
+            host=config.get('HOST', 'localhost'),
+            port=config.get('PORT', 6379),
+            db=config.get('DB', 0),
+            socket_connect_timeout=config.get('SOCKET_CONNECT_TIMEOUT', 2),
+            socket_timeout=config.get('SOCKET_TIMEOUT', 2),
+            retry_on_timeout=config.get('RETRY_ON_TIMEOUT', False),
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Info: Redis not available for faculty sessions ({type(e).__name__}). Using in-process storage.")
+        return None
+
+def get_session_store(namespace):
+    """The session store of a namespace, created on first use"""
+    with _stores_lock:
+        if namespace not in _stores:
+            client = None
+            if getattr(settings, 'FACULTY_SESSION_STORE', 'redis') == 'redis':
+                client = _redis_client()
+            _stores[namespace] = RedisSessionStore(client, namespace) if client else LocalSessionStore(namespace)
+        return _stores[namespace]
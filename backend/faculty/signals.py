@@ -1,10 +1,70 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from users.models import Faculty
+from assignments.models import Assignment, Grade, Submission
+from courses.models import Course, Enrollment
+from users.models import Faculty, Student
+from .dashboard_service import FacultyDashboardService
 from .models import FacultySettings
 
+# The field naming the faculty member whose dashboard a row is shown on
+DASHBOARD_OWNER_FIELDS = {Course: 'instructor_id', Student: 'advisor_id'}
+
+def _invalidate_owner(instance, employee_id):
+    """Drop the owner's widgets, and its owner's before the save if that differs (see remember_dashboard_owner)"""
+    FacultyDashboardService.invalidate(employee_id)
+    previous = instance.__dict__.pop('_previous_dashboard_owner', employee_id)
+    if previous != employee_id:
+        FacultyDashboardService.invalidate(previous)
+
 @receiver(post_save, sender=Faculty)
 def create_faculty_settings(sender, instance, created, **kwargs):
     """Create FacultySettings when a Faculty profile is created"""
     if created:
-        FacultySettings.objects.create(faculty=instance)
\ No newline at end of file
+        FacultySettings.objects.create(faculty=instance)
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_course_dashboard(sender, instance, **kwargs):
+    """Drop the instructor's cached dashboard widgets when course data changes"""
+    if kwargs.get('raw'):
+        return
+    FacultyDashboardService.invalidate_course(instance.course_id)
+
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Student)
+def remember_dashboard_owner(sender, instance, **kwargs):
+    """Keep the faculty member an existing row is shown to, so a save moving it invalidates both"""
+    field = DASHBOARD_OWNER_FIELDS[sender]
+    update_fields = kwargs.get('update_fields')
+    if kwargs.get('raw') or instance._state.adding or (update_fields and field not in update_fields):
+        return
+    instance._previous_dashboard_owner = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_instructor_dashboard(sender, instance, **kwargs):
+    """Drop the instructor's cached dashboard widgets when one of their courses changes"""
+    if kwargs.get('raw'):
+        return
+    _invalidate_owner(instance, instance.instructor_id)
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_advisor_dashboard(sender, instance, **kwargs):
+    """Drop the advisor's cached dashboard widgets when an advisee changes"""
+    if kwargs.get('raw'):
+        return
+    _invalidate_owner(instance, instance.advisor_id)
+
+@receiver(post_delete, sender=Submission)
+def forget_submission_plagiarism(sender, instance, **kwargs):
+    """Drop a deleted submission's fingerprints and plagiarism reports"""
+    if kwargs.get('raw'):
+        return
+    # Imported here: the plagiarism engine loads numpy, which startup must not
+    from .plagiarism import PlagiarismService
+    PlagiarismService.forget(instance.id)
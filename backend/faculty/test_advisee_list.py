@@ -0,0 +1,90 @@
+"""
+Tests for the advisee list, search and category endpoints
+"""
+
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+
+from courses.models import Enrollment
+from users.models import Faculty, Student
+from .real_advising_views import get_advisee_categories, get_advisee_list, search_advisees
+
+User = get_user_model()
+
+
+class AdviseeListTest(TestCase):
+    def setUp(self):
+        advisor = User.objects.create_user(username='advisor', password='pw', role='faculty', mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=advisor, employee_id='FAC001')
+
+        # 40 advisees: GPAs 2.0, 2.5, 3.0, 3.5 and missing in turn, two enrollments each
+        gpas = [Decimal('2.0'), Decimal('2.5'), Decimal('3.0'), Decimal('3.5'), None]
+        for i in range(40):
+            user = User.objects.create_user(
+                username=f'student{i}', password=None, role='student', mfa_enabled=False,
+                first_name='Student', last_name=f'{i:02d}', email=f'student{i}@example.com'
+            )
+            Student.objects.create(
+                user=user, student_id=f'STU{i:03d}', advisor_id='FAC001', cumulative_gpa=gpas[i % 5],
+                degree_program='Biology' if i % 2 else 'Physics'
+            )
+            for course in ('CS101', 'MA101'):
+                Enrollment.objects.create(id=f'e{i}{course}', student_id=f'STU{i:03d}', course_id=course)
+
+        other = User.objects.create_user(username='other', password='pw', role='student', mfa_enabled=False)
+        Student.objects.create(user=other, student_id='OTHER', advisor_id='FAC999', cumulative_gpa=Decimal('4.0'))
+
+    def get(self, view, **params):
+        request = RequestFactory().get('/', params)
+        request.faculty = self.faculty
+        return json.loads(view(request).content)
+
+    def test_list_is_one_query_per_page(self):
+        with self.assertNumQueries(1):
+            response = self.get(get_advisee_list, sort_by='gpa', sort_order='desc', page=2, page_size=10)
+
+        self.assertEqual(response['pagination']['total_items'], 40)
+        self.assertEqual(response['pagination']['total_pages'], 4)
+        self.assertEqual(len(response['data']), 10)
+        # 8 advisees have a 3.5, so page 2 holds the last six 3.0s and the first 2.5s
+        self.assertEqual([student['gpa'] for student in response['data']], [3.0] * 6 + [2.5] * 4)
+        first = response['data'][0]
+        self.assertEqual(first['academic_standing'], 'Good')
+        self.assertEqual(first['year'], 'Junior')
+        self.assertEqual(first['enrolled_courses'], 2)
+
+    def test_filters_search_and_grouping(self):
+        response = self.get(get_advisee_list, academic_standing='probation', major='biology', page_size=100)
+        # GPA 2.0 and missing GPAs among the odd (Biology) students
+        self.assertEqual(len(response['data']), 8)
+        self.assertTrue(all(s['academic_standing'] == 'Probation' for s in response['data']))
+
+        response = self.get(get_advisee_list, search='student7@', page_size=100)
+        self.assertEqual([s['student_id'] for s in response['data']], ['STU007'])
+
+        response = self.get(get_advisee_list, group_by='year', page_size=100)
+        self.assertEqual({year: len(students) for year, students in response['data'].items()},
+                         {'Freshman': 16, 'Sophomore': 8, 'Junior': 8, 'Senior': 8})
+
+        with self.assertNumQueries(1):
+            response = self.get(search_advisees, q='physics', min_gpa='2.5', max_gpa='3.0', sort_by='name')
+        self.assertEqual([s['student_id'] for s in response['data']],
+                         ['STU002', 'STU006', 'STU012', 'STU016', 'STU022', 'STU026', 'STU032', 'STU036'])
+
+        response = self.get(search_advisees, page=99, page_size=15)
+        self.assertEqual(response['pagination']['current_page'], 3)
+        self.assertEqual(len(response['data']), 10)
+
+    def test_categories_come_from_one_group_by_query(self):
+        with self.assertNumQueries(1):
+            response = self.get(get_advisee_categories)
+
+        self.assertEqual(response['data'], {
+            'academic_standing': {'Excellent': 8, 'Good': 8, 'Satisfactory': 8, 'Probation': 16},
+            'major': {'Biology': 20, 'Physics': 20},
+            'year': {'Senior': 8, 'Junior': 8, 'Sophomore': 8, 'Freshman': 16},
+            'gpa_ranges': {'3.5-4.0': 8, '3.0-3.49': 8, '2.5-2.99': 8, 'below_2.5': 16},
+        })
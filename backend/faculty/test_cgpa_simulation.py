@@ -0,0 +1,106 @@
+"""
+Tests for the what-if CGPA simulation engine
+"""
+
+import json
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from assignments.models import Grade
+from courses.models import Course, Enrollment
+from users.models import Faculty, Student
+from . import cgpa_simulation
+from .cgpa_simulation import Transcript
+from .real_advising_views import simulate_cgpa
+
+User = get_user_model()
+
+
+class CgpaSimulationEngineTest(SimpleTestCase):
+    def setUp(self):
+        # 30 credits at 3.0
+        self.transcript = Transcript('STU001', [15, 15], [3.3, 2.7])
+
+    def test_explicit_scenarios_match_hand_computation(self):
+        courses = [{'code': 'CS301', 'credits': 3}, {'code': 'MA201', 'credits': 4}]
+        result = cgpa_simulation.simulate(
+            self.transcript, courses, samples=0,
+            scenarios=[{'CS301': 'A', 'MA201': 'A'}, {'CS301': 'F'}, {'MA201': 2.0}]
+        )
+
+        self.assertEqual(result['scenarios'], [
+            round((90 + 28) / 37, 3),
+            round((90 + 0 + 12) / 37, 3),   # MA201 defaults to the current CGPA
+            round((90 + 9 + 8) / 37, 3),
+        ])
+        # Scenarios can also list one grade per course
+        rows = cgpa_simulation.simulate(self.transcript, courses, samples=0, scenarios=[['A', 'A'], ['F', 3.0]])
+        self.assertEqual(rows['scenarios'], [round((90 + 28) / 37, 3), round((90 + 12) / 37, 3)])
+
+        for bad in ([{'CS301': 'Z'}], [{'XX101': 'A'}], [['A']]):
+            with self.assertRaises(ValueError):
+                cgpa_simulation.simulate(self.transcript, courses, samples=0, scenarios=bad)
+
+    def test_target_probability_and_minimal_grades(self):
+        courses = [{'code': 'CS301', 'credits': 3, 'expected_grade': 'B'},
+                   {'code': 'MA201', 'credits': 3, 'expected_grade': 'B'}]
+        result = cgpa_simulation.simulate(self.transcript, courses, samples=10000, target_cgpa=3.1, seed=7)
+
+        # 3.1 over 36 credits needs 21.6 more quality points than the 90 held: 3.6 per course
+        self.assertAlmostEqual(result['target']['required_average_grade_points'], 3.6)
+        # With the other course at a B, one course alone needs 4.2: out of reach
+        self.assertEqual([g['grade'] for g in result['target']['minimal_grades']], [None, None])
+        self.assertLess(result['distribution']['probability_of_target'], 0.5)
+        self.assertEqual(result['distribution']['count'], 10000)
+
+        easy = cgpa_simulation.simulate(self.transcript, courses, samples=0, target_cgpa=2.9)
+        # 2.9 needs 104.4: 90 held + 9 from the other B leaves 1.8 per course, a C
+        self.assertEqual([g['grade'] for g in easy['target']['minimal_grades']], ['C', 'C'])
+
+    def test_samples_snap_to_grade_levels(self):
+        sampled = cgpa_simulation.sample_grade_points([3.0, 3.7], 1000, rng=np.random.default_rng(0))
+        self.assertEqual(sampled.shape, (1000, 2))
+        self.assertTrue(np.isin(sampled, cgpa_simulation.GRADE_LEVELS).all())
+
+
+class SimulateCgpaViewTest(TestCase):
+    def setUp(self):
+        advisor = User.objects.create_user(username='advisor', password='pw', role='faculty', mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=advisor, employee_id='FAC001')
+        student = User.objects.create_user(username='student', password='pw', role='student', mfa_enabled=False)
+        Student.objects.create(user=student, student_id='STU001', advisor_id='FAC001')
+
+        for course_id, credits in [('CS101', 3), ('CS201', 4), ('CS301', 3)]:
+            Course.objects.create(
+                id=course_id, code=course_id, name=course_id, description='', credits=credits,
+                instructor_id='FAC001', department='CS', enrollment_limit=30,
+                start_date='2024-09-01', end_date='2024-12-15'
+            )
+        Enrollment.objects.create(id='e1', student_id='STU001', course_id='CS101', status='completed', grade='A')
+        Enrollment.objects.create(id='e2', student_id='STU001', course_id='CS201', status='completed')
+        Enrollment.objects.create(id='e3', student_id='STU001', course_id='CS301', status='active')
+        Grade.objects.create(id='g1', student_id='STU001', course_id='CS201', value=85, max_points=100, weight=1)
+
+    def post(self, student_id, body):
+        request = RequestFactory().post('/', data=json.dumps(body), content_type='application/json')
+        request.faculty = self.faculty
+        return simulate_cgpa(request, student_id)
+
+    def test_simulates_current_courses_from_transcript(self):
+        response = self.post('STU001', {'scenarios': [{'CS301': 'A'}], 'samples': 500,
+                                        'target_cgpa': 3.5, 'seed': 1})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)['data']
+
+        # CS101 at its recorded A, CS201 from its graded work (85% -> B)
+        self.assertAlmostEqual(data['current_cgpa'], round((4.0 * 3 + 3.0 * 4) / 7, 3))
+        self.assertEqual([course['code'] for course in data['courses']], ['CS301'])
+        self.assertEqual(data['scenarios'], [round((24 + 12) / 10, 3)])
+        self.assertEqual(data['distribution']['count'], 500)
+
+    def test_rejects_other_advisors_students_and_bad_input(self):
+        self.assertEqual(self.post('STU999', {}).status_code, 404)
+        self.assertEqual(self.post('STU001', {'courses': [{'credits': 3}]}).status_code, 400)
+        self.assertEqual(self.post('STU001', {'samples': 10 ** 6}).status_code, 400)
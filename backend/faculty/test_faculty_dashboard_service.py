@@ -0,0 +1,133 @@
+"""
+Tests for the faculty dashboard and analytics widgets
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from assignments.models import Assignment, Grade
+from courses.models import Course, Enrollment
+from users.models import Faculty, Student
+from .models import FacultySettings
+from .views import analytics, dashboard_overview
+
+User = get_user_model()
+
+
+class FacultyDashboardServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='faculty', password='pw', role='faculty', mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=self.user, employee_id='FAC001')
+
+        now = timezone.now()
+        # 12 courses with three students each; every course has one assignment due
+        # in three days, graded for two students with an A (90) and a B (80)
+        for i in range(1, 13):
+            course_id = f'COURSE{i:03d}'
+            Course.objects.create(
+                id=course_id, code=f'CS{i:03d}', name=f'Course {i}', description='', credits=3,
+                instructor_id='FAC001', department='CSE', enrollment_limit=30,
+                start_date='2026-09-01', end_date='2026-12-15'
+            )
+            Enrollment.objects.bulk_create([
+                Enrollment(id=f'{course_id}-e{n}', student_id=f'STU{n}', course_id=course_id) for n in range(3)
+            ])
+            Assignment.objects.create(
+                id=f'{course_id}-a', course_id=course_id, title=f'Homework {i}', description='',
+                due_date=now + timedelta(days=3), points=100, type='homework', start_date=now,
+                allow_late_submission=False, late_penalty=0, max_submissions=1, visible_to_students=True, weight=1
+            )
+            for n, (value, letter) in enumerate([(90, 'A'), (80, 'b')]):
+                Grade.objects.create(
+                    id=f'{course_id}-g{n}', student_id=f'STU{n}', course_id=course_id,
+                    assignment_id=f'{course_id}-a', value=value, max_points=100, letter_grade=letter, weight=1
+                )
+
+        advisee = User.objects.create_user(username='advisee', password=None, role='student', mfa_enabled=False)
+        Student.objects.create(user=advisee, student_id='STU0', advisor_id='FAC001')
+
+    def get(self, view):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.faculty = self.faculty
+        return json.loads(view(request).content)
+
+    def test_dashboard_takes_a_fixed_number_of_queries_and_is_cached(self):
+        with self.assertNumQueries(5):
+            data = self.get(dashboard_overview)
+
+        self.assertEqual(data['activeClasses'], 12)
+        self.assertEqual(data['totalStudents'], 36)
+        self.assertEqual(data['pendingGrades'], 12)
+        self.assertEqual(len(data['pendingAssignments']), 5)
+        self.assertEqual(data['advisedStudents'], 1)
+        # Courses 1-12 attend 76-87%
+        self.assertEqual(data['attendanceRate'], 81.5)
+
+        # Only the widget settings are read once the widgets are cached
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(dashboard_overview), data)
+
+    def test_analytics_aggregates_grades_per_course(self):
+        with self.assertNumQueries(4):
+            data = self.get(analytics)
+
+        self.assertEqual(data['coursesTaught'], 12)
+        self.assertEqual(data['averageAttendance'], 81.5)
+        self.assertEqual(data['gradeDistributionData'], [
+            {'name': 'A', 'value': 50.0}, {'name': 'B', 'value': 50.0}, {'name': 'C', 'value': 0.0},
+            {'name': 'D', 'value': 0.0}, {'name': 'F', 'value': 0.0},
+        ])
+        self.assertEqual(data['studentPerformanceData'][0]['CS001'], 83.0)
+        self.assertEqual(data['studentPerformanceData'][3]['CS012'], 87.0)
+        self.assertEqual(data['avgAssignmentScore'], 85.0)
+        self.assertEqual(data['studentEngagement'], 66.67)
+
+        with self.assertNumQueries(0):
+            self.get(analytics)
+
+    def test_writes_invalidate_the_instructors_widgets(self):
+        self.get(analytics)
+        Grade.objects.filter(id='COURSE001-g1').update(letter_grade='F')
+        # Saving through the model fires the invalidation signal
+        grade = Grade.objects.get(id='COURSE001-g0')
+        grade.value = Decimal('70')
+        grade.save()
+
+        data = self.get(analytics)
+        self.assertEqual(data['gradeDistributionData'][4], {'name': 'F', 'value': 4.17})
+        self.assertEqual(data['studentPerformanceData'][1]['CS001'], 75.0)
+
+        Enrollment.objects.create(id='new', student_id='STU9', course_id='COURSE002')
+        self.assertEqual(self.get(dashboard_overview)['totalStudents'], 37)
+
+    def test_reassigning_drops_the_previous_owners_widgets(self):
+        self.get(dashboard_overview)
+        course = Course.objects.get(id='COURSE001')
+        course.instructor_id = 'FAC002'
+        course.save()
+        advisee = Student.objects.get(student_id='STU0')
+        advisee.advisor_id = 'FAC002'
+        advisee.save()
+
+        data = self.get(dashboard_overview)
+        self.assertEqual(data['activeClasses'], 11)
+        self.assertEqual(data['advisedStudents'], 0)
+
+    def test_disabled_widgets_are_not_computed(self):
+        FacultySettings.objects.filter(faculty=self.faculty).update(
+            dashboard_widgets={'pending_grades': False, 'advisees': False}
+        )
+        with self.assertNumQueries(3):
+            data = self.get(dashboard_overview)
+        self.assertEqual(set(data), {'activeClasses', 'totalStudents', 'attendanceRate'})
+
+        FacultySettings.objects.filter(faculty=self.faculty).update(dashboard_widgets=['advisees'])
+        self.assertEqual(self.get(dashboard_overview), {'advisedStudents': 1})
@@ -0,0 +1,228 @@
+"""
+Tests for the local plagiarism engine and the plagiarism views
+"""
+
+import json
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from assignments.models import Assignment, Submission
+from courses.models import Course
+from users.models import Faculty
+from . import plagiarism_views
+from .models import PlagiarismReport, SubmissionBand, SubmissionFingerprint
+from .plagiarism import PlagiarismService, band_buckets, fingerprint, jaccard, shingle_hashes, winnow, words
+
+User = get_user_model()
+
+VOCABULARY = [f'word{i}' for i in range(5000)]
+
+
+def essay(rng, length=300):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(length))
+
+
+def edited(rng, text, fraction):
+    """text with a fraction of its words replaced"""
+    tokens = text.split()
+    for position in rng.sample(range(len(tokens)), int(len(tokens) * fraction)):
+        tokens[position] = rng.choice(VOCABULARY)
+    return ' '.join(tokens)
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_near_duplicates_share_buckets_and_fingerprints(self):
+        rng = random.Random(1)
+        original = essay(rng)
+        copy = edited(rng, original, 0.02).upper()
+        unrelated = essay(rng)
+
+        buckets = set(band_buckets('CS101', fingerprint(copy)[1]))
+        self.assertTrue(buckets & set(band_buckets('CS101', fingerprint(original)[1])))
+        self.assertFalse(buckets & set(band_buckets('CS101', fingerprint(unrelated)[1])))
+        # Buckets are per course code
+        self.assertFalse(buckets & set(band_buckets('MA101', fingerprint(original)[1])))
+
+        original_hashes = winnow(shingle_hashes(words(original)))
+        self.assertGreater(jaccard(original_hashes, winnow(shingle_hashes(words(copy)))), 0.7)
+        self.assertLess(jaccard(original_hashes, winnow(shingle_hashes(words(unrelated)))), 0.05)
+
+    def test_short_and_empty_texts(self):
+        self.assertEqual(len(shingle_hashes(words('Two words'))), 1)
+        self.assertEqual(winnow([]), set())
+        digest, signature, hashes = fingerprint('')
+        self.assertEqual((len(signature), hashes), (128 * 4, b''))
+
+
+class PlagiarismServiceTest(TestCase):
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.faculty_user = User.objects.create_user(username='knuth', password=None, role='faculty',
+                                                     mfa_enabled=False)
+        self.faculty = Faculty.objects.create(user=self.faculty_user, employee_id='FAC001', department='CSE')
+        for course_id in ('CS101-F25', 'CS101-F26'):
+            Course.objects.create(id=course_id, code='CS101', name='Writing', description='', credits=3,
+                                  instructor_id='FAC001', department='CSE', enrollment_limit=2000,
+                                  start_date='2026-09-01', end_date='2026-12-15')
+        self.assignment = self.create_assignment('A1', 'CS101-F26')
+
+    def create_assignment(self, assignment_id, course_id):
+        now = timezone.now()
+        return Assignment.objects.create(
+            id=assignment_id, course_id=course_id, title='Essay', description='', due_date=now, points=100,
+            type='homework', start_date=now, allow_late_submission=True, late_penalty=0, max_submissions=1,
+            visible_to_students=True, weight=10,
+        )
+
+    def submit(self, submission_id, content, student_id=None, assignment_id='A1'):
+        return Submission.objects.create(id=submission_id, assignment_id=assignment_id,
+                                         student_id=student_id or f'STU-{submission_id}', content=content,
+                                         late_submission=False)
+
+    def faculty_request(self, body):
+        request = RequestFactory().post('/', json.dumps(body), content_type='application/json')
+        request.user = self.faculty_user
+        request.faculty = self.faculty
+        return request
+
+    def test_a_thousand_essays_are_checked_in_seconds(self):
+        texts = [essay(self.rng) for _ in range(1000)]
+        # Five copied essays, lightly edited
+        copies = {f's{i}': f's{i + 500}' for i in range(5)}
+        for original, copy in copies.items():
+            texts[int(copy[1:])] = edited(self.rng, texts[int(original[1:])], 0.03)
+        Submission.objects.bulk_create([
+            Submission(id=f's{i}', assignment_id='A1', student_id=f'STU{i}', content=text, late_submission=False)
+            for i, text in enumerate(texts)
+        ])
+
+        started = time.perf_counter()
+        reports = PlagiarismService.check_assignment(self.assignment, threshold=0.5, workers=1)
+        self.assertLess(time.perf_counter() - started, 30)
+
+        flagged = {report['submission_id']: report for report in reports if report['result']['is_plagiarized']}
+        self.assertEqual(set(flagged), set(copies) | set(copies.values()))
+        source = flagged['s500']['result']['sources'][0]
+        self.assertEqual((source['source_id'], source['student_id']), ('s0', 'STU0'))
+        self.assertIn(source['matched_text'].split()[0], texts[500].split())
+        self.assertEqual(SubmissionFingerprint.objects.count(), 1000)
+        self.assertEqual(SubmissionBand.objects.count(), 1000 * 32)
+        self.assertEqual(PlagiarismReport.objects.count(), 1000)
+
+        # A late submission copying s10 is the only one compared, and s10's report gains it as a source
+        checked_at = PlagiarismReport.objects.get(submission_id='s2').checked_at
+        self.submit('late', edited(self.rng, texts[10], 0.03))
+        # Its fingerprints and buckets written, one bucket lookup for it and one for s10, the reports written
+        with self.assertNumQueries(16):
+            reports = PlagiarismService.check_assignment(self.assignment, threshold=0.5, workers=1)
+        reports = {report['submission_id']: report for report in reports}
+        self.assertEqual(reports['late']['result']['sources'][0]['source_id'], 's10')
+        self.assertEqual(reports['s10']['result']['sources'][0]['source_id'], 'late')
+        self.assertEqual(PlagiarismReport.objects.filter(checked_at__gt=checked_at).count(), 2)
+
+    def test_fingerprints_are_reused_until_the_content_changes(self):
+        text = essay(self.rng)
+        self.submit('s1', text)
+        self.submit('s2', essay(self.rng))
+        PlagiarismService.check_assignment(self.assignment)
+        computed_at = SubmissionFingerprint.objects.get(submission_id='s1').computed_at
+
+        # Course, submissions, stored fingerprints and stored reports
+        with self.assertNumQueries(4):
+            reports = PlagiarismService.check_assignment(self.assignment)
+        self.assertFalse(any(report['result']['is_plagiarized'] for report in reports))
+        self.assertEqual(len({report['id'] for report in reports}), 2)
+
+        Submission.objects.filter(id='s2').update(content=text)
+        reports = {report['submission_id']: report for report in PlagiarismService.check_assignment(self.assignment)}
+        self.assertEqual(reports['s2']['result']['similarity_score'], 1.0)
+        # s1's report is recomputed as s2 now matches it, its fingerprints are not
+        self.assertEqual(reports['s1']['result']['sources'][0]['source_id'], 's2')
+        self.assertEqual(SubmissionFingerprint.objects.get(submission_id='s1').computed_at, computed_at)
+
+        # s2 no longer matches, so s1's report drops it
+        Submission.objects.filter(id='s2').update(content=essay(self.rng))
+        PlagiarismService.check_assignment(self.assignment, submission_ids={'s2'})
+        reports = {report['submission_id']: report for report in PlagiarismService.check_assignment(self.assignment)}
+        self.assertEqual(reports['s1']['result']['sources'], [])
+
+        # Another threshold is another report
+        report = PlagiarismService.check_assignment(self.assignment, threshold=0.3)[0]
+        self.assertNotEqual(report['id'], reports[report['submission_id']]['id'])
+        self.assertEqual(PlagiarismReport.objects.count(), 4)
+
+        Submission.objects.get(id='s1').delete()
+        self.assertFalse(PlagiarismReport.objects.filter(submission_id='s1').exists())
+        self.assertFalse(SubmissionBand.objects.filter(submission_id='s1').exists())
+
+    def test_earlier_offerings_are_compared_and_own_work_is_not(self):
+        text = essay(self.rng)
+        self.create_assignment('A0', 'CS101-F25')
+        self.submit('old', text, assignment_id='A0')
+        PlagiarismService.check_assignment(Assignment.objects.get(id='A0'))
+
+        self.submit('new', edited(self.rng, text, 0.02))
+        self.submit('resubmitted', text, student_id='STU-old')
+        report = PlagiarismService.check_submission(Submission.objects.get(id='new'), self.assignment)
+        self.assertTrue(report['result']['is_plagiarized'])
+        self.assertEqual({source['source_id'] for source in report['result']['sources']}, {'old', 'resubmitted'})
+
+        # The same student's earlier work is not a source
+        report = PlagiarismService.check_submission(Submission.objects.get(id='resubmitted'), self.assignment)
+        self.assertEqual([source['source_id'] for source in report['result']['sources']], ['new'])
+
+    def test_deleted_sources_clear_the_flag(self):
+        text = essay(self.rng)
+        self.create_assignment('A0', 'CS101-F25')
+        self.submit('old', text, assignment_id='A0')
+        PlagiarismService.check_assignment(Assignment.objects.get(id='A0'))
+        self.submit('s1', text)
+        self.submit('s2', text)
+        reports = {report['submission_id']: report for report in PlagiarismService.check_assignment(self.assignment)}
+        self.assertEqual({source['source_id'] for source in reports['s1']['result']['sources']}, {'old', 's2'})
+
+        # Deleted in this assignment and in an earlier offering
+        Submission.objects.filter(id__in=['s2', 'old']).delete()
+        report = PlagiarismService.check_assignment(self.assignment)[0]
+        self.assertEqual((report['result']['is_plagiarized'], report['result']['sources']), (False, []))
+
+    def test_batch_check(self):
+        text = essay(self.rng)
+        self.submit('s1', text)
+        self.submit('s2', text)
+        Course.objects.create(id='MA101', code='MA101', name='Algebra', description='', credits=3,
+                              instructor_id='FAC002', department='MATH', enrollment_limit=30,
+                              start_date='2026-09-01', end_date='2026-12-15')
+        self.create_assignment('M1', 'MA101')
+        self.submit('m1', text, assignment_id='M1')
+        PlagiarismService.check_assignment(self.assignment, threshold=0.9)
+
+        # Submissions, assignments and courses taught, then the stored reports of A1
+        with self.assertNumQueries(3 + 4):
+            response = plagiarism_views.batch_plagiarism_check(self.faculty_request({
+                'submission_ids': ['s1', 's2', 'm1', 'missing'], 'threshold': 0.9,
+            }))
+        data = json.loads(response.content)['data']
+        self.assertEqual(data['processed_submissions'], 2)
+        self.assertEqual(data['plagiarized_submissions'], 2)
+        self.assertEqual({error['submission_id']: error['error'] for error in data['errors']}, {
+            'm1': 'Access denied - you do not teach this course', 'missing': 'Submission not found',
+        })
+
+    def test_reports_are_fetched_by_their_instructor(self):
+        self.submit('s1', essay(self.rng))
+        report = PlagiarismService.check_assignment(self.assignment)[0]
+
+        request = RequestFactory().get('/')
+        request.user = self.faculty_user
+        request.faculty = self.faculty
+        with self.assertNumQueries(1):
+            response = plagiarism_views.get_plagiarism_report(request, report['id'])
+        self.assertEqual(json.loads(response.content)['data'], report)
+
+        Course.objects.filter(id='CS101-F26').update(instructor_id='FAC002')
+        self.assertEqual(plagiarism_views.get_plagiarism_report(request, report['id']).status_code, 404)
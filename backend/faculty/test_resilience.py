@@ -0,0 +1,149 @@
+"""
+Tests for the shared circuit breaker and the retry policy
+"""
+
+import asyncio
+import json
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from .api_utils import circuit_breaker, retry_api_call
+from .resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryPolicy,
+    breaker_metrics, deadline, remaining_time,
+)
+
+
+def failing(error=ValueError):
+    raise error('down')
+
+
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_state_is_shared_between_workers(self):
+        # Two breakers of the same name stand for two worker processes
+        first = CircuitBreaker('grades', failure_threshold=3, recovery_timeout=60, refresh_interval=0)
+        second = CircuitBreaker('grades', failure_threshold=3, recovery_timeout=60, refresh_interval=0)
+        for breaker in (first, second, first):
+            with self.assertRaises(ValueError):
+                breaker.call(failing)
+
+        self.assertEqual(second.state(), OPEN)
+        with self.assertRaises(CircuitOpenError):
+            second.call(lambda: 'ok')
+        self.assertEqual(second.rejected, 1)
+
+        # Once the recovery timeout passes, a single call probes the service
+        cache.delete(first.opened_key)
+        self.assertEqual(first.state(), HALF_OPEN)
+        self.assertTrue(first.allow())
+        self.assertFalse(second.allow())
+        first.record_success()
+        self.assertEqual(second.state(), CLOSED)
+        self.assertEqual(second.call(lambda: 'ok'), 'ok')
+
+    def test_failed_probe_reopens_the_breaker(self):
+        breaker = CircuitBreaker('library', failure_threshold=1, recovery_timeout=60, refresh_interval=0)
+        with self.assertRaises(ValueError):
+            breaker.call(failing)
+        cache.delete(breaker.opened_key)
+
+        with self.assertRaises(ValueError):
+            breaker.call(failing)
+        self.assertEqual(breaker.state(), OPEN)
+
+    def test_snapshot_spares_cache_reads(self):
+        breaker = CircuitBreaker('search', failure_threshold=2, refresh_interval=60)
+        self.assertEqual(breaker.state(), CLOSED)
+        # Another worker opens the breaker; this one notices after refresh_interval
+        cache.set(breaker.opened_key, True)
+        self.assertEqual(breaker.state(), CLOSED)
+        self.assertEqual(breaker.state(refresh=True), OPEN)
+
+    def test_decorator_returns_503_while_open(self):
+        calls = []
+
+        @circuit_breaker(failure_threshold=1, recovery_timeout=60)
+        def flaky_view(request):
+            calls.append(request)
+            raise ConnectionError('down')
+
+        with self.assertRaises(ConnectionError):
+            flaky_view('request')
+        response = flaky_view('request')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.content)['success'], False)
+        self.assertEqual(len(calls), 1)
+
+        metrics = {metric['name']: metric for metric in breaker_metrics()}
+        self.assertEqual(metrics['flaky_view']['state'], OPEN)
+        self.assertEqual(metrics['flaky_view']['rejected'], 1)
+
+
+class RetryPolicyTest(SimpleTestCase):
+    def test_retries_until_success(self):
+        attempts = []
+
+        @retry_api_call(max_retries=3, delay=0.01)
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError('down')
+            return 'ok'
+
+        self.assertEqual(flaky(), 'ok')
+        self.assertEqual(len(attempts), 3)
+
+        with self.assertRaises(ValueError):
+            RetryPolicy(attempts=2, delay=0.01).call(failing)
+
+    def test_retries_stop_at_the_deadline(self):
+        attempts = []
+
+        def slow_failure():
+            attempts.append(remaining_time())
+            raise ConnectionError('down')
+
+        started = time.monotonic()
+        with deadline(5):
+            with deadline(60):
+                # The inner block inherits the sooner deadline
+                self.assertLessEqual(remaining_time(), 5)
+            with self.assertRaises(ConnectionError):
+                RetryPolicy(attempts=5, delay=100, max_delay=100).call(slow_failure)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertIsNone(remaining_time())
+
+        with deadline(0):
+            with self.assertRaises(DeadlineExceeded):
+                RetryPolicy().call(slow_failure)
+
+    def test_coroutines_are_retried_without_blocking(self):
+        attempts = []
+
+        @retry_api_call(max_retries=3, delay=0.01)
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise ConnectionError('down')
+            return 'ok'
+
+        async def run():
+            ticks = []
+
+            async def ticker():
+                for _ in range(3):
+                    ticks.append(1)
+                    await asyncio.sleep(0)
+
+            result, _ = await asyncio.gather(flaky(), ticker())
+            return result, ticks
+
+        result, ticks = asyncio.run(run())
+        self.assertEqual(result, 'ok')
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(len(ticks), 3)
@@ -0,0 +1,143 @@
+"""
+Tests for the modal session and form draft store
+"""
+
+import json
+import time
+import unittest
+import uuid
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from . import session_store
+from .form_views import list_form_drafts, load_form_draft, save_form_draft
+from .modal_management import MAX_MODAL_HISTORY, ModalStateManager
+from .session_store import LocalSessionStore, RedisSessionStore, SessionNotFound
+
+
+class SessionStoreContract:
+    """Behaviour every session store backend must have"""
+
+    def make_store(self, **options):
+        raise NotImplementedError
+
+    def test_sessions_are_indexed_per_user(self):
+        store = self.make_store()
+        store.put({'session_id': 's1', 'user_id': 1, 'data': {'a': 1}})
+        store.put({'session_id': 's2', 'user_id': 1, 'data': {}})
+        store.put({'session_id': 's3', 'user_id': 2, 'data': {}})
+
+        self.assertEqual(store.get('s1')['data'], {'a': 1})
+        self.assertEqual(sorted(s['session_id'] for s in store.user_sessions(1)), ['s1', 's2'])
+
+        # Unindexed sessions stay readable but are no longer listed
+        store.update('s2', lambda session: {**session, 'closed': True}, indexed=False)
+        self.assertTrue(store.get('s2')['closed'])
+        self.assertEqual([s['session_id'] for s in store.user_sessions(1)], ['s1'])
+
+        store.delete('s1')
+        self.assertEqual(store.user_sessions(1), [])
+        with self.assertRaises(SessionNotFound):
+            store.get('s1')
+        with self.assertRaises(SessionNotFound):
+            store.update('s1', lambda session: session)
+
+    def test_sessions_expire(self):
+        store = self.make_store()
+        store.put({'session_id': 's1', 'user_id': 1}, ttl=1)
+        time.sleep(1.1)
+        with self.assertRaises(SessionNotFound):
+            store.get('s1')
+        self.assertEqual(store.user_sessions(1), [])
+
+
+class LocalSessionStoreTest(SessionStoreContract, SimpleTestCase):
+    def make_store(self, **options):
+        return LocalSessionStore('test', **options)
+
+    def test_least_recently_used_sessions_are_evicted(self):
+        store = self.make_store(max_sessions=2)
+        store.put({'session_id': 's1', 'user_id': 1})
+        store.put({'session_id': 's2', 'user_id': 1})
+        store.get('s1')
+        store.put({'session_id': 's3', 'user_id': 1})
+
+        with self.assertRaises(SessionNotFound):
+            store.get('s2')
+        self.assertEqual(sorted(s['session_id'] for s in store.user_sessions(1)), ['s1', 's3'])
+
+
+@unittest.skipUnless(session_store._redis_client(), 'Redis is not available')
+class RedisSessionStoreTest(SessionStoreContract, SimpleTestCase):
+    def make_store(self, **options):
+        store = RedisSessionStore(session_store._redis_client(), f'test-{uuid.uuid4()}', **options)
+        self.addCleanup(lambda: [store.client.delete(key) for key in store.client.scan_iter(
+            f'faculty_session:{store.namespace}:*')])
+        return store
+
+
+class ModalStateManagerTest(SimpleTestCase):
+    def setUp(self):
+        self.manager = ModalStateManager(LocalSessionStore('modal'))
+
+    def test_history_is_compacted_and_capped(self):
+        session = self.manager.create_modal_session(7, 'course_creation', {'name': 'Draft', 'credits': 3})
+        session_id = session['session_id']
+
+        # Updates that change nothing leave no history
+        self.manager.update_modal_state(session_id, {'credits': 3})
+        self.assertEqual(self.manager.get_modal_state(session_id)['history'], [])
+
+        for credits in range(MAX_MODAL_HISTORY + 5):
+            state = self.manager.update_modal_state(session_id, {'credits': credits, 'name': 'Draft'})
+        self.assertEqual(len(state['history']), MAX_MODAL_HISTORY)
+        self.assertEqual(state['history'][-1]['changes'], {'credits': {'previous': 13, 'updated': 14}})
+        self.assertEqual(state['data'], {'name': 'Draft', 'credits': 14})
+        self.assertGreaterEqual(state['last_updated'], state['created_at'])
+
+    def test_closed_sessions_leave_the_user_listing(self):
+        first = self.manager.create_modal_session(7, 'course_creation')
+        self.manager.create_modal_session(7, 'course_update')
+        self.manager.create_modal_session(8, 'course_update')
+
+        closed = self.manager.close_modal_session(first['session_id'])
+        self.assertFalse(closed['is_active'])
+        self.assertIsNotNone(closed['closed_at'])
+        self.assertEqual([s['modal_type'] for s in self.manager.get_user_modal_sessions(7)], ['course_update'])
+
+        with self.assertRaises(SessionNotFound):
+            self.manager.get_modal_state('missing')
+
+
+@override_settings(FACULTY_SESSION_STORE='local')
+class FormDraftViewsTest(SimpleTestCase):
+    def setUp(self):
+        session_store._stores.pop('form_draft', None)
+        self.addCleanup(session_store._stores.pop, 'form_draft', None)
+
+    def call(self, view, method='get', user_id=5, body=None, *args):
+        factory = RequestFactory()
+        if method == 'post':
+            request = factory.post('/', data=json.dumps(body), content_type='application/json')
+        else:
+            request = getattr(factory, method)('/')
+        request.user = type('User', (), {'id': user_id})()
+        request.faculty = None
+        response = view(request, *args)
+        return response.status_code, json.loads(response.content)
+
+    def test_drafts_round_trip(self):
+        _, saved = self.call(save_form_draft, 'post', body={'form_name': 'syllabus', 'form_data': {'week': 1}})
+        _, resaved = self.call(save_form_draft, 'post', body={'form_name': 'syllabus', 'form_data': {'week': 2}})
+        self.assertEqual(saved['draft_id'], resaved['draft_id'])
+        self.call(save_form_draft, 'post', user_id=6, body={'form_name': 'syllabus', 'form_data': {}})
+
+        status, loaded = self.call(load_form_draft, 'get', 5, None, 'syllabus')
+        self.assertEqual(status, 200)
+        self.assertEqual(loaded['draft']['form_data'], {'week': 2})
+
+        _, listed = self.call(list_form_drafts)
+        self.assertEqual([draft['form_name'] for draft in listed['drafts']], ['syllabus'])
+
+        status, _ = self.call(load_form_draft, 'get', 5, None, 'grading')
+        self.assertEqual(status, 404)
@@ -14,6 +14,7 @@ from . import notification_views
 from . import announcement_views
 from . import schedule_views
 from . import publication_views
+from . import assignment_views
 
 urlpatterns = [
     # Authentication endpoints
@@ -62,6 +63,8 @@ urlpatterns = [
     # Assignment endpoints
     path('assignments/', views.assignments_list, name='faculty_assignments_list'),
     path('assignments/<str:assignment_id>/', views.assignment_detail, name='faculty_assignment_detail'),
+    path('assignments/<str:assignment_id>/analytics/', assignment_views.get_assignment_analytics, name='faculty_assignment_analytics'),
+    path('assignments/<str:assignment_id>/statistics/', assignment_views.calculate_grade_statistics, name='faculty_assignment_statistics'),
     
     # Grade endpoints
     path('grades/<str:grade_id>/', views.update_grade, name='faculty_update_grade'),
@@ -72,6 +75,8 @@ urlpatterns = [
     path('advising/advisees/categories/', real_advising_views.get_advisee_categories, name='faculty_advisees_categories'),
     path('advising/advisees/<str:student_id>/', real_advising_views.get_advisee_detail, name='faculty_advisee_detail'),
     path('advising/advisees/<str:student_id>/progress/', real_advising_views.get_academic_progress, name='faculty_advisee_progress'),
+    path('advising/advisees/<str:student_id>/cgpa-simulation/', real_advising_views.simulate_cgpa, name='faculty_advisee_cgpa_simulation'),
+    path('advising/advisees/<str:student_id>/academic-plan/', real_advising_views.optimize_academic_plan, name='faculty_advisee_academic_plan'),
     
     # Appointment endpoints
     path('appointments/', appointment_views.get_appointments, name='faculty_appointments_list'),
@@ -82,6 +87,7 @@ urlpatterns = [
     
     # Notification endpoints
     path('notifications/', notification_views.get_notifications, name='faculty_notifications_list'),
+    path('notifications/unread-count/', notification_views.get_unread_count, name='faculty_notifications_unread_count'),
     path('notifications/<str:notification_id>/mark-read/', notification_views.mark_notification_read, name='faculty_notifications_mark_read'),
     path('notifications/mark-all-read/', notification_views.mark_all_notifications_read, name='faculty_notifications_mark_all_read'),
     path('notifications/<str:notification_id>/delete/', notification_views.delete_notification, name='faculty_notifications_delete'),
@@ -132,6 +138,7 @@ urlpatterns = [
     # Schedule endpoints
     path('schedule/', schedule_views.get_schedule, name='faculty_schedule'),
     path('schedule/weekly-overview/', schedule_views.get_weekly_overview, name='faculty_weekly_overview'),
+    path('schedule/calendar/', schedule_views.get_calendar, name='faculty_calendar'),
     
     # Recording endpoints
     path('recordings/', recording_views.get_recordings, name='faculty_recordings'),
@@ -8,6 +8,7 @@ import json
 
 # Import our new decorators
 from .decorators import faculty_required, faculty_permission_required
+from .dashboard_service import ANALYTICS_WIDGETS, DASHBOARD_WIDGETS, FacultyDashboardService
 
 def check_faculty_role(request):
     """Check if the authenticated user has faculty role"""
@@ -29,71 +30,9 @@ def check_faculty_permission(request, permission_codename, attributes=None):
 def dashboard_overview(request):
     """Get faculty dashboard overview"""
     try:
-        # Get courses taught by this faculty
-        courses = Course.objects.filter(instructor_id=request.faculty.employee_id)  # type: ignore
-        active_classes = courses.count()
-        
-        # Calculate total students across all courses using Enrollment model
-        total_students = 0
-        for course in courses:
-            total_students += Enrollment.objects.filter(course_id=course.id).count()
-        
-        # Get pending assignments (assignments due within next 7 days)
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        pending_assignments = []
-        pending_grades = 0
-        
-        for course in courses:
-            # Get assignments for this course that are due soon
-            assignments = Assignment.objects.filter(
-                course_id=course.id,
-                due_date__lte=timezone.now() + timedelta(days=7),
-                due_date__gte=timezone.now()
-            )  # type: ignore
-            
-            for assignment in assignments:
-                pending_assignments.append({
-                    'id': assignment.id,
-                    'title': assignment.title,
-                    'course': course.code
-                })
-            
-            # Count submissions that need grading
-            # Check for submissions without grades
-            pending_grades += assignments.count()
-        
-        # Get advised students
-        from users.models import Student
-        advised_students = Student.objects.filter(advisor_id=request.faculty.employee_id).count()
-        
-        # Calculate attendance rate based on course data
-        attendance_rate = 0
-        course_count = courses.count()
-        if course_count > 0:
-            # Calculate average attendance across all courses
-            total_attendance = 0
-            for course in courses:
-                # Calculate a realistic attendance rate based on course ID
-                # In a real system, this would come from actual attendance records
-                # Extract numeric part from course ID (e.g., COURSE001 -> 1)
-                try:
-                    course_num = int(''.join(filter(str.isdigit, course.id)))
-                    base_attendance = 75 + (course_num % 20)  # Vary between 75-95%
-                except ValueError:
-                    base_attendance = 85  # Default value if we can't extract a number
-                total_attendance += min(base_attendance, 100)  # Cap at 100%
-            attendance_rate = total_attendance / course_count
-        
-        data = {
-            'activeClasses': active_classes,
-            'totalStudents': total_students,
-            'pendingGrades': pending_grades,
-            'advisedStudents': advised_students,
-            'attendanceRate': round(attendance_rate, 2),
-            'pendingAssignments': pending_assignments[:5]  # Limit to 5 assignments
-        }
+        # Only the widgets enabled in the faculty member's settings are computed
+        widgets = FacultyDashboardService.enabled_widgets(request.faculty, DASHBOARD_WIDGETS)
+        data = FacultyDashboardService.get_widgets(request.faculty.employee_id, widgets)  # type: ignore
         
         return JsonResponse(data)
     
@@ -109,7 +48,7 @@ def courses_list(request):
     """Get faculty courses list"""
     try:
         # Get courses taught by this faculty
-        courses_qs = Course.objects.filter(instructor_id=request.faculty.employee_id)  # type: ignore
+        courses_qs = Course.objects.filter(instructor_id=request.faculty.employee_id).prefetch_related('waitlist_entries')  # type: ignore
         
         # Convert to JSON format
         courses = [course.to_json() for course in courses_qs]
@@ -440,221 +379,7 @@ def research_projects(request):
 def analytics(request):
     """Get faculty analytics"""
     try:
-        # Get courses taught by this faculty
-        courses = Course.objects.filter(instructor_id=request.faculty.employee_id)  # type: ignore
-        
-        # Generate analytics data with real information
-        # Get real attendance data from enrollments
-        attendance_data = []
-        total_attendance_rate = 0
-        course_count = 0
-        
-        for course in courses:
-            # Get enrollments for this course
-            enrollments = Enrollment.objects.filter(course_id=course.id)  # type: ignore
-            
-            # Calculate attendance rate for this course based on actual attendance records
-            if enrollments.exists():
-                total_count = enrollments.count()
-                # In a real system, we would have an Attendance model to track this
-                # For now, we'll calculate a more realistic attendance rate based on course data
-                # Let's assume a realistic attendance rate between 75-95% based on course ID
-                # Extract numeric part from course ID (e.g., COURSE001 -> 1)
-                try:
-                    course_num = int(''.join(filter(str.isdigit, course.id)))
-                    base_attendance = 75 + (course_num % 20)  # Vary between 75-95%
-                except ValueError:
-                    base_attendance = 85  # Default value if we can't extract a number
-                attendance_rate = min(base_attendance, 100)  # Cap at 100%
-                
-                attendance_data.append({
-                    'name': course.code,
-                    'attendance': round(attendance_rate, 2),
-                })
-                
-                total_attendance_rate += attendance_rate
-                course_count += 1
-        
-        # Calculate average attendance
-        avg_attendance = 0
-        if course_count > 0:
-            avg_attendance = total_attendance_rate / course_count
-        
-        # Get real grade distribution data
-        grade_distribution_data = []
-        if courses.exists():
-            # Get all assignments for courses taught by this faculty
-            course_ids = [course.id for course in courses]
-            assignments = Assignment.objects.filter(course_id__in=course_ids)  # type: ignore
-            assignment_ids = [assignment.id for assignment in assignments]
-            
-            # Get all grades for these assignments
-            grades = Grade.objects.filter(assignment_id__in=assignment_ids)  # type: ignore
-            
-            # Count grades by letter grade
-            grade_counts = {'A': 0, 'B': 0, 'C': 0, 'D': 0, 'F': 0}
-            total_grades = 0
-            
-            for grade in grades:
-                if grade.letter_grade:
-                    letter = grade.letter_grade.upper()
-                    if letter in grade_counts:
-                        grade_counts[letter] += 1
-                        total_grades += 1
-            
-            # Convert to percentages
-            for letter, count in grade_counts.items():
-                percentage = 0
-                if total_grades > 0:
-                    percentage = (count / total_grades) * 100
-                grade_distribution_data.append({
-                    'name': letter,
-                    'value': round(percentage, 2)
-                })
-        
-        # If no grade data, use default distribution
-        if not grade_distribution_data:
-            grade_distribution_data = [
-                {'name': 'A', 'value': 25},
-                {'name': 'B', 'value': 35},
-                {'name': 'C', 'value': 25},
-                {'name': 'D', 'value': 10},
-                {'name': 'F', 'value': 5},
-            ]
-        
-        # Get student performance over time (using real enrollment data)
-        student_performance_data = []
-        weeks = ['Week 1', 'Week 2', 'Week 3', 'Week 4']
-        
-        # Generate performance data for each course based on actual grade data
-        course_performance = {}
-        for course in courses:
-            course_code = course.code
-            # Get assignments for this course
-            course_assignments = Assignment.objects.filter(course_id=course.id)  # type: ignore
-            assignment_ids = [assignment.id for assignment in course_assignments]
-            
-            # Calculate performance based on actual grades for this course
-            course_grades = Grade.objects.filter(assignment_id__in=assignment_ids)  # type: ignore
-            if course_grades.exists():
-                total_points = 0
-                earned_points = 0
-                grade_count = 0
-                
-                for grade in course_grades:
-                    if grade.value is not None:
-                        total_points += 100  # Assuming each assignment is worth 100 points
-                        earned_points += float(grade.value)
-                        grade_count += 1
-                
-                if total_points > 0:
-                    avg_score = (earned_points / total_points) * 100
-                    # Create a trend over weeks with some variation
-                    base_score = avg_score
-                    course_performance[course_code] = [
-                        max(0, min(100, base_score - 2)),  # Week 1
-                        max(0, min(100, base_score)),      # Week 2
-                        max(0, min(100, base_score + 1)),  # Week 3
-                        max(0, min(100, base_score + 2))   # Week 4
-                    ]
-                else:
-                    # Default performance if no grades
-                    # Extract numeric part from course ID (e.g., COURSE001 -> 1)
-                    try:
-                        course_num = int(''.join(filter(str.isdigit, course.id)))
-                        base_score = 80 + (course_num % 15)  # Vary between 80-95
-                    except ValueError:
-                        base_score = 85  # Default value if we can't extract a number
-                    course_performance[course_code] = [
-                        base_score,
-                        base_score + 2,
-                        base_score + 3,
-                        base_score + 1
-                    ]
-            else:
-                # Default performance if no grades
-                # Extract numeric part from course ID (e.g., COURSE001 -> 1)
-                try:
-                    course_num = int(''.join(filter(str.isdigit, course.id)))
-                    base_score = 80 + (course_num % 15)  # Vary between 80-95
-                except ValueError:
-                    base_score = 85  # Default value if we can't extract a number
-                course_performance[course_code] = [
-                    base_score,
-                    base_score + 2,
-                    base_score + 3,
-                    base_score + 1
-                ]
-        
-        # Format data by week
-        for i, week in enumerate(weeks):
-            week_data = {'week': week}
-            for course_code, scores in course_performance.items():
-                if i < len(scores):
-                    week_data[course_code] = scores[i]
-            student_performance_data.append(week_data)
-        
-        # Calculate average assignment score based on real grades
-        avg_assignment_score = 0
-        total_points = 0
-        earned_points = 0
-        grade_count = 0
-        
-        # Get all grades for assignments in courses taught by this faculty
-        if courses.exists():
-            course_ids = [course.id for course in courses]
-            assignments = Assignment.objects.filter(course_id__in=course_ids)  # type: ignore
-            assignment_ids = [assignment.id for assignment in assignments]
-            grades = Grade.objects.filter(assignment_id__in=assignment_ids)  # type: ignore
-            
-            for grade in grades:
-                if grade.value is not None:
-                    total_points += 100  # Assuming each assignment is worth 100 points
-                    earned_points += float(grade.value)
-                    grade_count += 1
-            
-            if total_points > 0:
-                avg_assignment_score = (earned_points / total_points) * 100
-        
-        # If no grades, use default
-        if avg_assignment_score == 0:
-            avg_assignment_score = 85
-        
-        # Calculate student engagement based on actual submission data
-        student_engagement = 0
-        total_enrollments = 0
-        active_students = 0
-        
-        for course in courses:
-            enrollments = Enrollment.objects.filter(course_id=course.id)  # type: ignore
-            total_enrollments += enrollments.count()
-            
-            # Count students with assignment submissions
-            assignments = Assignment.objects.filter(course_id=course.id)  # type: ignore
-            if assignments.exists():
-                assignment_ids = [assignment.id for assignment in assignments]
-                # Count distinct students who have submitted assignments
-                submission_count = Grade.objects.filter(assignment_id__in=assignment_ids).distinct('student_id').count()  # type: ignore
-                active_students += submission_count
-        
-        if total_enrollments > 0:
-            student_engagement = (active_students / total_enrollments) * 100
-        
-        # If no engagement data, use default
-        if student_engagement == 0:
-            student_engagement = 78
-        
-        courses_taught = courses.count()
-        
-        data = {
-            'attendanceData': attendance_data,
-            'gradeDistributionData': grade_distribution_data,
-            'studentPerformanceData': student_performance_data,
-            'averageAttendance': round(avg_attendance, 2),
-            'avgAssignmentScore': round(avg_assignment_score, 2),
-            'studentEngagement': round(student_engagement, 2),
-            'coursesTaught': courses_taught,
-        }
+        data = FacultyDashboardService.get_widgets(request.faculty.employee_id, ANALYTICS_WIDGETS)  # type: ignore
         
         return JsonResponse(data)
     
@@ -6,6 +6,7 @@ from django.db.models import Count, Sum
 from django.utils import timezone
 from datetime import timedelta
 import json
+from dashboard_metrics import get_dashboard_metrics
 
 def check_finance_admin_role(request):
     """Check if the authenticated user has finance admin role"""
@@ -28,35 +29,8 @@ def dashboard_overview(request):
         return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
     
     try:
-        # Get payment statistics
-        total_payments = Payment.objects.count()
-        total_payment_amount = Payment.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        # Get recent payments
-        recent_payments = Payment.objects.filter(
-            created_at__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        # Get pending financial aid applications
-        pending_aid_applications = FinancialAid.objects.filter(status='pending').count()
-        
-        # Get overdue payments
-        overdue_payments = Payment.objects.filter(
-            due_date__lt=timezone.now().date(),
-            status='pending'
-        ).count()
-        
-        # Get payment statistics by type
-        payments_by_type = Payment.objects.values('type').annotate(count=Count('type'))
-        
-        data = {
-            'totalPayments': total_payments,
-            'totalPaymentAmount': float(total_payment_amount),
-            'recentPayments': recent_payments,
-            'pendingAidApplications': pending_aid_applications,
-            'overduePayments': overdue_payments,
-            'paymentsByType': list(payments_by_type),
-        }
+        # Payment counters come from one statement, cached briefly (see dashboard_metrics)
+        data = get_dashboard_metrics('finance_admin')
     
     except Exception as e:
         return JsonResponse({'success': False, 'message': 'Failed to fetch dashboard data'}, status=500)
@@ -0,0 +1,44 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from library.search_indexing import DRAIN_BATCH_SIZE, SearchIndexer
+
+# Longest wait between attempts after failed drains (the wait doubles from --interval)
+MAX_BACKOFF = 300
+
+class Command(BaseCommand):
+    help = 'Index the search documents recorded in the outbox (run continuously with --loop)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DRAIN_BATCH_SIZE,
+                            help='Outbox entries applied per collection and batch')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep draining, sleeping while the outbox is empty')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to sleep while the outbox is empty')
+    
+    def handle(self, *args, **options):
+        total = {}
+        backoff = options['interval']
+        while True:
+            try:
+                applied = SearchIndexer.drain(batch_size=options['batch_size'])
+            except Exception as e:
+                if not options['loop']:
+                    raise
+                # The failed batch stays in the outbox; drop a broken DB connection and try again
+                self.stderr.write(f'Draining the search outbox failed, retrying in {backoff:.0f}s: {e}')
+                close_old_connections()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            backoff = options['interval']
+            for collection, counts in applied.items():
+                for key, count in counts.items():
+                    total[(collection, key)] = total.get((collection, key), 0) + count
+            if not applied:
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        summary = ', '.join(f'{count} {collection} {key}' for (collection, key), count in sorted(total.items()))
+        self.stdout.write(self.style.SUCCESS(f'Drained the search outbox: {summary or "nothing to index"}'))
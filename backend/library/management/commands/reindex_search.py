@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from library.search_indexing import SearchIndexer
+from search_service import LIBRARY_BOOKS, REINDEX_BATCH_SIZE, TRANSCRIPTS
+
+class Command(BaseCommand):
+    help = 'Rebuild the local search index from the database and upsert it into Typesense'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--collection', choices=[LIBRARY_BOOKS, TRANSCRIPTS], action='append',
+                            help='Collection to reindex (default: all)')
+        parser.add_argument('--batch-size', type=int, default=REINDEX_BATCH_SIZE,
+                            help='Documents indexed per batch')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue an interrupted run from its checkpoint')
+        parser.add_argument('--local-only', action='store_true',
+                            help='Rebuild only the local index')
+    
+    def handle(self, *args, **options):
+        for collection in options['collection'] or [LIBRARY_BOOKS, TRANSCRIPTS]:
+            self.stdout.write(f'Reindexing {collection}...')
+            counts = SearchIndexer.reindex(collection, batch_size=options['batch_size'], resume=options['resume'],
+                                           local_only=options['local_only'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Indexed {counts['local']} {collection} documents locally and {counts['typesense']} in Typesense"
+            ))
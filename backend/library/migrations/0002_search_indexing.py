@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchReindexCheckpoint',
+            fields=[
+                ('collection', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('last_id', models.CharField(blank=True, max_length=50)),
+                ('indexed', models.IntegerField(default=0)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchIndexChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('collection', models.CharField(choices=[('library_books', 'Library books'), ('transcripts', 'Transcripts')], max_length=20)),
+                ('document_id', models.CharField(max_length=50)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('collection', 'document_id')},
+            },
+        ),
+    ]
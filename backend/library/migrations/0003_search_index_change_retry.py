@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_search_indexing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchindexchange',
+            name='retry_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -98,4 +98,35 @@ class LibraryBook(models.Model):
         }
     
     def __str__(self):
-        return f"Library Book: {self.title} by {self.author}"
\ No newline at end of file
+        return f"Library Book: {self.title} by {self.author}"
+
+class SearchIndexChange(models.Model):
+    """A search document whose source row changed since it was last indexed (the indexing outbox)"""
+    COLLECTION_CHOICES = [
+        ('library_books', 'Library books'),  # document ID: LibraryBook ID
+        ('transcripts', 'Transcripts'),  # document ID: Grade ID
+    ]
+    
+    collection = models.CharField(max_length=20, choices=COLLECTION_CHOICES)
+    document_id = models.CharField(max_length=50)
+    changed_at = models.DateTimeField(default=timezone.now)
+    retry_at = models.DateTimeField(null=True, blank=True)  # claimed by a drain, or deferred, until then
+    
+    class Meta:
+        unique_together = ('collection', 'document_id')
+    
+    def __str__(self):
+        return f"{self.collection}: {self.document_id}"
+
+
+class SearchReindexCheckpoint(models.Model):
+    """Progress of the last reindex run of a collection, for resuming it"""
+    collection = models.CharField(max_length=20, primary_key=True)
+    last_id = models.CharField(max_length=50, blank=True)  # last source row indexed
+    indexed = models.IntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.collection}: {self.indexed} indexed"
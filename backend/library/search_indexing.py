@@ -0,0 +1,122 @@
+"""
+Indexing pipeline of the search collections (library books and transcripts).
+
+Incremental: saving or deleting a LibraryBook or Grade records the document
+in the SearchIndexChange outbox, in the same transaction as the change. The
+drain_search_outbox worker takes the outbox in batches and re-indexes those
+documents: rows still in the database are upserted, the others deleted.
+A batch is claimed (retry_at set) in a short transaction and applied outside
+it, so slow backends hold no row locks; its entries are removed once every
+backend has applied them. A failed batch is released, a batch Typesense is
+down for is deferred for RETRY_DELAY, and a batch whose worker died is taken
+again after CLAIM_TIMEOUT. A change made while its entry is claimed releases
+the claim, so the entry stays and is applied again.
+
+Bulk: reindex() walks a collection's rows in ID order and indexes them in
+batches (through the Typesense JSONL import endpoint), checkpointing the last
+ID after each batch so an interrupted run can resume where it stopped. The
+local index is kept in place during the run; documents whose rows are gone
+are deleted once it completes.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+import search_service
+from .models import SearchIndexChange, SearchReindexCheckpoint
+
+DRAIN_BATCH_SIZE = 500
+CLAIM_TIMEOUT = timedelta(minutes=5)
+RETRY_DELAY = timedelta(seconds=30)
+
+
+class SearchIndexer:
+    """Outbox and reindex runs of the search collections"""
+
+    @staticmethod
+    def mark_changed(collection, document_id):
+        """Record that a document needs re-indexing"""
+        SearchIndexChange.objects.bulk_create(
+            [SearchIndexChange(collection=collection, document_id=str(document_id))],
+            update_conflicts=True, unique_fields=['collection', 'document_id'], update_fields=['changed_at', 'retry_at'],
+        )
+
+    @staticmethod
+    def drain(batch_size=DRAIN_BATCH_SIZE, service=None):
+        """Apply one batch of outbox entries per collection, returning the counts applied (or deferred)"""
+        service = service or search_service.search_service
+        counts = {}
+        for collection, _ in SearchIndexChange.COLLECTION_CHOICES:
+            now = timezone.now()
+            claimed_until = now + CLAIM_TIMEOUT
+            with transaction.atomic():
+                changes = list(
+                    SearchIndexChange.objects.select_for_update(skip_locked=True)
+                    .filter(Q(retry_at__isnull=True) | Q(retry_at__lte=now), collection=collection)
+                    .order_by('changed_at', 'id')[:batch_size]
+                )
+                if not changes:
+                    continue
+                SearchIndexChange.objects.filter(pk__in=[change.pk for change in changes]).update(retry_at=claimed_until)
+            # Entries changed since are no longer claimed and stay in the outbox
+            claimed = SearchIndexChange.objects.filter(pk__in=[change.pk for change in changes], retry_at=claimed_until)
+            try:
+                counts[collection] = service.apply_changes(collection, [change.document_id for change in changes])
+            except search_service.SearchBackendUnavailable as e:
+                # Applied locally; kept until Typesense takes them
+                print(f"Typesense unavailable, deferring {len(changes)} {collection} changes: {e}")
+                claimed.update(retry_at=timezone.now() + RETRY_DELAY)
+                counts[collection] = {'deferred': len(changes)}
+                continue
+            except Exception:
+                claimed.update(retry_at=None)
+                raise
+            claimed.delete()
+        return counts
+
+    @staticmethod
+    def pending():
+        return SearchIndexChange.objects.count()
+
+    @staticmethod
+    def reindex(collection, batch_size=search_service.REINDEX_BATCH_SIZE, resume=False, local_only=False,
+                service=None):
+        """Index every document of a collection, resuming the last run if resume is set"""
+        service = service or search_service.search_service
+        checkpoint = SearchReindexCheckpoint.objects.filter(collection=collection).first()
+        if not (resume and checkpoint and checkpoint.completed_at is None):
+            checkpoint = SearchReindexCheckpoint(collection=collection)
+            checkpoint.save()
+
+        use_typesense = not local_only and service.mode != 'local' and service.typesense.available()
+        counts = {'local': checkpoint.indexed, 'typesense': 0}
+        for last_id, documents in service.source_documents(collection, batch_size, after=checkpoint.last_id or None):
+            counts['local'] += service.local.index_documents(collection, documents)
+            if use_typesense:
+                try:
+                    counts['typesense'] += service.typesense.index_documents(collection, documents)
+                except search_service.SearchBackendUnavailable as e:
+                    print(f"Typesense unavailable, reindexing {collection} locally only: {e}")
+                    use_typesense = False
+            checkpoint.last_id = str(last_id)
+            checkpoint.indexed = counts['local']
+            checkpoint.save(update_fields=['last_id', 'indexed', 'updated_at'])
+
+        # Documents of rows deleted before or during the run
+        stale = service.local.document_ids(collection) - {
+            str(pk) for pk in service.source_rows(collection).values_list('pk', flat=True)
+        }
+        if stale:
+            service.local.delete_documents(collection, stale)
+            if use_typesense:
+                try:
+                    service.typesense.delete_documents(collection, stale)
+                except search_service.SearchBackendUnavailable as e:
+                    print(f"Typesense unavailable, stale {collection} documents left there: {e}")
+
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=['completed_at', 'updated_at'])
+        return counts
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from assignments.models import Grade
+from search_service import LIBRARY_BOOKS, TRANSCRIPTS
+from .models import LibraryBook
+from .search_indexing import SearchIndexer
+
+@receiver(post_save, sender=LibraryBook)
+@receiver(post_delete, sender=LibraryBook)
+def mark_library_book_changed(sender, instance, **kwargs):
+    """Re-index the book's search document on the next outbox drain"""
+    if kwargs.get('raw'):
+        return
+    SearchIndexer.mark_changed(LIBRARY_BOOKS, instance.id)
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def mark_transcript_changed(sender, instance, **kwargs):
+    """Re-index the grade's transcript document on the next outbox drain"""
+    if kwargs.get('raw'):
+        return
+    SearchIndexer.mark_changed(TRANSCRIPTS, instance.id)
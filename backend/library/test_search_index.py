@@ -0,0 +1,133 @@
+"""
+Tests for the local search index and the Typesense fallback
+"""
+
+import json
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+import search_service as search_module
+import search_views
+from assignments.models import Grade
+from courses.models import Course
+from search_backends import LocalSearchBackend, TypesenseBackend
+from search_service import LIBRARY_BOOKS, TRANSCRIPTS, SearchService
+from users.models import Faculty, Student
+from .models import LibraryBook
+
+User = get_user_model()
+
+# A server nothing listens on, failing fast
+UNREACHABLE_TYPESENSE = {
+    'nodes': [{'host': '127.0.0.1', 'port': '9', 'protocol': 'http'}],
+    'api_key': 'test',
+    'connection_timeout_seconds': 0.2,
+    'num_retries': 0,
+}
+
+
+def book(book_id, title, author, created_at=0, status='available'):
+    return {'id': book_id, 'title': title, 'author': author, 'isbn': '', 'call_number': f'QA{book_id}',
+            'status': status, 'created_at': created_at}
+
+
+class LocalSearchBackendTest(SimpleTestCase):
+    def setUp(self):
+        self.index = LocalSearchBackend(':memory:')
+        self.index.index_documents(LIBRARY_BOOKS, [
+            book('1', 'Introduction to Algorithms', 'Cormen', created_at=1),
+            book('2', 'Algorithms', 'Sedgewick', created_at=1, status='checkedout'),
+            book('3', 'Database System Concepts', 'Silberschatz', created_at=2),
+        ])
+
+    def search(self, query, filters=None):
+        return [hit['document']['id'] for hit in self.index.search(LIBRARY_BOOKS, query, filters)]
+
+    def test_prefix_matching_and_ranking(self):
+        # Newest first, then by BM25: the shorter title matches 'algorithms' better
+        self.assertEqual(self.search('algo'), ['2', '1'])
+        self.assertEqual(self.search('intro algorithm'), ['1'])
+        self.assertEqual(self.search('silberschatz'), ['3'])
+        self.assertEqual(self.search('*'), ['3', '1', '2'])
+        self.assertEqual(self.search('"quotes" AND (syntax'), [])
+
+    def test_filters(self):
+        self.assertEqual(self.search('algorithms', {'status': 'available'}), ['1'])
+        self.assertEqual(self.search('', {'status': ['checkedout', 'available'], 'author': 'Cormen'}), ['1'])
+        with self.assertRaises(ValueError):
+            self.search('algorithms', {'status = 1 OR 1': 'x'})
+
+    def test_documents_are_replaced_and_deleted(self):
+        self.index.index_documents(LIBRARY_BOOKS, [book('2', 'Compilers', 'Aho', created_at=1)])
+        self.assertEqual(self.search('algorithms'), ['1'])
+        self.assertEqual(self.search('compilers'), ['2'])
+
+        self.index.delete_document(LIBRARY_BOOKS, '1')
+        self.assertEqual(self.search('algorithms'), [])
+        self.assertEqual(self.index.count(LIBRARY_BOOKS), 2)
+
+
+class SearchFallbackTest(SimpleTestCase):
+    def test_unreachable_typesense_falls_back_to_the_local_index(self):
+        service = SearchService(TypesenseBackend(UNREACHABLE_TYPESENSE), LocalSearchBackend(':memory:'), mode='auto')
+        self.assertTrue(service.index_library_book(book('1', 'Operating Systems', 'Tanenbaum')))
+
+        self.assertIs(service.search_backend(), service.local)
+        hits = service.search_library_books('operating')
+        self.assertEqual(hits[0]['document']['title'], 'Operating Systems')
+        self.assertTrue(service.delete_library_book('1'))
+        self.assertEqual(service.search_library_books('operating'), [])
+
+    def test_forced_typesense_reports_no_results(self):
+        service = SearchService(TypesenseBackend(UNREACHABLE_TYPESENSE), LocalSearchBackend(':memory:'),
+                                mode='typesense')
+        service.index_library_book(book('1', 'Operating Systems', 'Tanenbaum'))
+        self.assertEqual(service.search_library_books('operating'), [])
+
+
+class ReindexTest(TestCase):
+    def setUp(self):
+        self.service = SearchService(TypesenseBackend(UNREACHABLE_TYPESENSE), LocalSearchBackend(':memory:'))
+        self.original_service = search_module.search_service
+        search_module.search_service = search_views.search_service = self.service
+        self.addCleanup(setattr, search_module, 'search_service', self.original_service)
+        self.addCleanup(setattr, search_views, 'search_service', self.original_service)
+
+        faculty_user = User.objects.create_user(username='turing', first_name='Alan', last_name='Turing',
+                                                password=None, role='faculty', mfa_enabled=False)
+        Faculty.objects.create(user=faculty_user, employee_id='FAC001')
+        student_user = User.objects.create_user(username='ada', first_name='Ada', last_name='Lovelace',
+                                                password=None, role='student', mfa_enabled=False)
+        Student.objects.create(user=student_user, student_id='STU001')
+        Course.objects.create(id='CS101', code='CS101', name='Computability', description='', credits=3,
+                              instructor_id='FAC001', department='CSE', enrollment_limit=30,
+                              start_date='2026-09-01', end_date='2026-12-15')
+        Grade.objects.create(id='g1', student_id='STU001', course_id='CS101', value=Decimal('92'),
+                             max_points=Decimal('100'), letter_grade='A', weight=Decimal('1'),
+                             created_at=datetime(2026, 10, 1, tzinfo=dt_timezone.utc))
+        for i in range(5):
+            LibraryBook.objects.create(id=f'b{i}', title=f'Volume {i} of Knuth', author='Knuth', isbn='',
+                                       call_number=f'QA76.{i}', renewal_count=0)
+
+    def test_reindex_command_rebuilds_the_local_index(self):
+        out = StringIO()
+        call_command('reindex_search', batch_size=2, stdout=out)
+        self.assertIn('Indexed 5 library_books documents locally and 0 in Typesense', out.getvalue())
+        self.assertEqual(self.service.local.count(LIBRARY_BOOKS), 5)
+
+        hits = self.service.search_transcripts('lovelace', {'course_id': 'CS101'})
+        self.assertEqual(hits[0]['document'], {
+            'id': 'g1', 'student_id': 'STU001', 'student_name': 'Ada Lovelace', 'course_id': 'CS101',
+            'course_name': 'Computability', 'grade': 'A', 'points': 92.0, 'semester': 'Fall', 'year': 2026,
+            'instructor': 'Alan Turing', 'department': 'CSE', 'created_at': 1790812800,
+        })
+
+        request = RequestFactory().post('/', json.dumps({'query': 'knuth 3'}), content_type='application/json')
+        response = json.loads(search_views.search_library_books(request).content)
+        self.assertEqual([hit['document']['id'] for hit in response['results']], ['b3'])
+        self.assertEqual(self.service.search(TRANSCRIPTS, 'turing')[0]['document']['id'], 'g1')
@@ -0,0 +1,184 @@
+"""
+Tests for the search indexing outbox and the batched, resumable reindex
+"""
+
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.test import TestCase
+
+import search_backends
+from assignments.models import Grade
+from search_backends import LocalSearchBackend, TypesenseBackend
+from search_service import LIBRARY_BOOKS, TRANSCRIPTS, SearchService
+from .models import LibraryBook, SearchIndexChange, SearchReindexCheckpoint
+from .search_indexing import SearchIndexer
+
+
+class MockTypesense(BaseHTTPRequestHandler):
+    """The Typesense endpoints the backend uses: health, JSONL import and delete by filter"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, body, content_type='application/json'):
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.respond(json.dumps({'ok': True}))
+
+    def do_POST(self):
+        collection = urlparse(self.path).path.split('/')[2]
+        lines = self.rfile.read(int(self.headers['Content-Length'])).decode().splitlines()
+        self.server.imports.append((collection, len(lines)))
+        for line in lines:
+            document = json.loads(line)
+            self.server.documents.setdefault(collection, {})[document['id']] = document
+        self.respond('\n'.join(json.dumps({'success': True}) for _ in lines), 'text/plain')
+
+    def do_DELETE(self):
+        url = urlparse(self.path)
+        collection = url.path.split('/')[2]
+        ids = parse_qs(url.query)['filter_by'][0].split('[', 1)[1].rstrip(']').split(',')
+        documents = self.server.documents.setdefault(collection, {})
+        deleted = sum(documents.pop(document_id.strip('`'), None) is not None for document_id in ids)
+        self.respond(json.dumps({'num_deleted': deleted}))
+
+
+class SearchIndexingTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), MockTypesense)
+        self.server.imports = []
+        self.server.documents = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.service = SearchService(TypesenseBackend({
+            'nodes': [{'host': '127.0.0.1', 'port': str(self.server.server_port), 'protocol': 'http'}],
+            'api_key': 'test',
+            'connection_timeout_seconds': 2,
+            'num_retries': 0,
+        }), LocalSearchBackend(':memory:'), mode='auto')
+
+    def create_books(self, count):
+        for i in range(count):
+            LibraryBook.objects.create(id=f'b{i:02}', title=f'Volume {i} of Knuth', author='Knuth', isbn='',
+                                       call_number=f'QA76.{i}', renewal_count=0)
+
+    def outbox(self):
+        return set(SearchIndexChange.objects.values_list('collection', 'document_id'))
+
+    def test_writes_are_recorded_in_the_outbox(self):
+        self.create_books(2)
+        LibraryBook.objects.get(id='b00').save()
+        Grade.objects.create(id='g1', student_id='STU001', course_id='CS101', value=Decimal('92'),
+                             max_points=Decimal('100'), letter_grade='A', weight=Decimal('1'))
+        self.assertEqual(self.outbox(), {(LIBRARY_BOOKS, 'b00'), (LIBRARY_BOOKS, 'b01'), (TRANSCRIPTS, 'g1')})
+
+    def test_drain_upserts_and_deletes(self):
+        self.create_books(3)
+        self.assertEqual(SearchIndexer.drain(service=self.service), {LIBRARY_BOOKS: {'indexed': 3, 'deleted': 0}})
+        self.assertEqual(SearchIndexer.pending(), 0)
+        self.assertEqual(len(self.server.documents[LIBRARY_BOOKS]), 3)
+
+        LibraryBook.objects.filter(id='b01').update(title='Concrete Mathematics')
+        SearchIndexer.mark_changed(LIBRARY_BOOKS, 'b01')
+        LibraryBook.objects.get(id='b02').delete()
+        self.assertEqual(SearchIndexer.drain(service=self.service), {LIBRARY_BOOKS: {'indexed': 1, 'deleted': 1}})
+
+        self.assertEqual(set(self.server.documents[LIBRARY_BOOKS]), {'b00', 'b01'})
+        self.assertEqual(self.server.documents[LIBRARY_BOOKS]['b01']['title'], 'Concrete Mathematics')
+        self.assertEqual(self.service.local.count(LIBRARY_BOOKS), 2)
+        self.assertEqual(self.service.local.search(LIBRARY_BOOKS, 'concrete')[0]['document']['id'], 'b01')
+        self.assertEqual(SearchIndexer.drain(service=self.service), {})
+
+    def test_failed_drain_keeps_the_outbox(self):
+        self.create_books(2)
+        with mock.patch.object(self.service.local, 'index_documents', side_effect=RuntimeError('disk full')):
+            with self.assertRaises(RuntimeError):
+                SearchIndexer.drain(service=self.service)
+        self.assertEqual(self.outbox(), {(LIBRARY_BOOKS, 'b00'), (LIBRARY_BOOKS, 'b01')})
+
+    def test_changes_wait_for_typesense(self):
+        self.create_books(2)
+        self.service.typesense.mark_unavailable()
+        self.assertEqual(SearchIndexer.drain(service=self.service), {LIBRARY_BOOKS: {'deferred': 2}})
+        # Searchable locally meanwhile, and not taken again before the retry delay
+        self.assertEqual(self.service.local.count(LIBRARY_BOOKS), 2)
+        self.assertEqual(SearchIndexer.drain(service=self.service), {})
+        self.assertEqual(self.outbox(), {(LIBRARY_BOOKS, 'b00'), (LIBRARY_BOOKS, 'b01')})
+
+        LibraryBook.objects.get(id='b01').delete()
+        SearchIndexChange.objects.update(retry_at=None)
+        self.service.typesense._checked_at = float('-inf')
+        self.assertEqual(SearchIndexer.drain(service=self.service), {LIBRARY_BOOKS: {'indexed': 1, 'deleted': 1}})
+        self.assertEqual(set(self.server.documents[LIBRARY_BOOKS]), {'b00'})
+        self.assertEqual(SearchIndexer.pending(), 0)
+
+    def test_changes_made_while_draining_are_kept(self):
+        self.create_books(2)
+        apply_changes = self.service.apply_changes
+
+        def changed_meanwhile(collection, document_ids):
+            self.assertEqual(SearchIndexChange.objects.filter(retry_at__isnull=True).count(), 0)
+            SearchIndexer.mark_changed(LIBRARY_BOOKS, 'b01')
+            return apply_changes(collection, document_ids)
+
+        with mock.patch.object(self.service, 'apply_changes', changed_meanwhile):
+            SearchIndexer.drain(service=self.service)
+        self.assertEqual(self.outbox(), {(LIBRARY_BOOKS, 'b01')})
+        self.assertEqual(SearchIndexer.drain(service=self.service), {LIBRARY_BOOKS: {'indexed': 1, 'deleted': 0}})
+
+    def test_imports_are_batched(self):
+        self.create_books(5)
+        with mock.patch.object(search_backends, 'IMPORT_BATCH_SIZE', 2):
+            counts = SearchIndexer.reindex(LIBRARY_BOOKS, service=self.service)
+        self.assertEqual(counts, {'local': 5, 'typesense': 5})
+        self.assertEqual(self.server.imports, [(LIBRARY_BOOKS, 2), (LIBRARY_BOOKS, 2), (LIBRARY_BOOKS, 1)])
+
+    def test_reindex_resumes_from_its_checkpoint(self):
+        self.create_books(5)
+        source_documents = self.service.source_documents
+
+        def interrupted(*args, **kwargs):
+            batches = source_documents(*args, **kwargs)
+            yield next(batches)
+            raise KeyboardInterrupt
+
+        with mock.patch.object(self.service, 'source_documents', interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                SearchIndexer.reindex(LIBRARY_BOOKS, batch_size=2, service=self.service)
+        checkpoint = SearchReindexCheckpoint.objects.get(collection=LIBRARY_BOOKS)
+        self.assertEqual((checkpoint.last_id, checkpoint.indexed, checkpoint.completed_at), ('b01', 2, None))
+
+        self.server.imports.clear()
+        counts = SearchIndexer.reindex(LIBRARY_BOOKS, batch_size=2, resume=True, service=self.service)
+        self.assertEqual(counts, {'local': 5, 'typesense': 3})
+        self.assertEqual(self.server.imports, [(LIBRARY_BOOKS, 2), (LIBRARY_BOOKS, 1)])
+        self.assertEqual(self.service.local.count(LIBRARY_BOOKS), 5)
+        checkpoint.refresh_from_db()
+        self.assertIsNotNone(checkpoint.completed_at)
+
+        # The local index stays searchable during a run; documents of deleted rows go once it completes
+        document = self.service.local.search(LIBRARY_BOOKS, 'knuth')[0]['document']
+        self.service.local.index_documents(LIBRARY_BOOKS, [dict(document, id='gone')])
+        with mock.patch.object(self.service, 'source_documents', interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                SearchIndexer.reindex(LIBRARY_BOOKS, batch_size=2, local_only=True, service=self.service)
+        self.assertEqual(self.service.local.count(LIBRARY_BOOKS), 6)
+
+        # A completed run starts over
+        counts = SearchIndexer.reindex(LIBRARY_BOOKS, batch_size=2, resume=True, local_only=True,
+                                       service=self.service)
+        self.assertEqual(counts, {'local': 5, 'typesense': 0})
+        self.assertNotIn('gone', self.service.local.document_ids(LIBRARY_BOOKS))
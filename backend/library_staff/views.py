@@ -6,6 +6,7 @@ from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
 import json
+from dashboard_metrics import get_dashboard_metrics
 
 def check_library_staff_role(request):
     """Check if the authenticated user has library staff role"""
@@ -28,35 +29,8 @@ def dashboard_overview(request):
         return JsonResponse({'success': False, 'message': 'Access denied'}, status=403)
     
     try:
-        # Get library statistics
-        total_books = LibraryBook.objects.count()
-        available_books = LibraryBook.objects.filter(status='available').count()
-        borrowed_books = LibraryBook.objects.filter(status='borrowed').count()
-        reserved_books = LibraryBook.objects.filter(status='reserved').count()
-        
-        # Get overdue books
-        overdue_books = LibraryBook.objects.filter(
-            due_date__lt=timezone.now().date(),
-            status='borrowed'
-        ).count()
-        
-        # Get recent checkouts
-        recent_checkouts = LibraryBook.objects.filter(
-            checkout_date__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        # Get reservation requests
-        reservation_requests = LibraryBook.objects.filter(status='reserved').count()
-        
-        data = {
-            'totalBooks': total_books,
-            'availableBooks': available_books,
-            'borrowedBooks': borrowed_books,
-            'reservedBooks': reserved_books,
-            'overdueBooks': overdue_books,
-            'recentCheckouts': recent_checkouts,
-            'reservationRequests': reservation_requests,
-        }
+        # Library counters come from one statement, cached briefly (see dashboard_metrics)
+        data = get_dashboard_metrics('library_staff')
     
     except Exception as e:
         return JsonResponse({'success': False, 'message': 'Failed to fetch dashboard data'}, status=500)
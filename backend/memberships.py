@@ -0,0 +1,117 @@
+"""
+Membership tables: who belongs to a group (an event's attendees, an
+activity's participants, a collaboration's collaborators, a course's
+waitlist).
+
+Each relation is a concrete subclass of Membership with a foreign key to
+its group, named by the subclass's group_field, and a member_id. A row per
+member replaces the JSON arrays the groups used to hold:
+
+- (group, member_id) is unique, so joining twice, or two users joining
+  at once, can't duplicate or lose a member
+- member_id is indexed, so the groups of a member are an index lookup
+- members are ordered by when they joined (the auto-increment ID), which
+  is also waitlist order
+
+Joining a group with a capacity locks the group's row, so concurrent joins
+are counted one at a time and the capacity is never exceeded.
+"""
+
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+
+class MembershipFull(Exception):
+    """The group is at capacity"""
+
+
+class MembershipQuerySet(models.QuerySet):
+    def of(self, group):
+        """Memberships of a group, in joining order"""
+        return self.filter(**{self.model.group_field: group}).order_by('id')
+
+    def member_ids(self, group):
+        return list(self.of(group).values_list('member_id', flat=True))
+
+    def group_ids(self, member_id):
+        """IDs of the groups of a member"""
+        return list(self.filter(member_id=str(member_id)).order_by('id')
+                    .values_list(f'{self.model.group_field}_id', flat=True))
+
+    def is_member(self, group, member_id):
+        return self.of(group).filter(member_id=str(member_id)).exists()
+
+    def position(self, group, member_id):
+        """1-based position of a member in joining order (0 if not a member)"""
+        membership = self.of(group).filter(member_id=str(member_id)).first()
+        if membership is None:
+            return 0
+        return self.of(group).filter(id__lte=membership.id).count()
+
+    def add(self, group, member_id, capacity=None, **fields):
+        """
+        Add a member, returning (membership, created).
+
+        Raises:
+            MembershipFull: The group already has capacity members
+        """
+        member_id = str(member_id)
+        with transaction.atomic():
+            if capacity is not None:
+                # Joins of the group wait for each other here
+                list(type(group).objects.select_for_update().filter(pk=group.pk).values_list('pk'))
+            existing = self.of(group).filter(member_id=member_id).first()
+            if existing is not None:
+                return existing, False
+            if capacity is not None and self.of(group).count() >= capacity:
+                raise MembershipFull(f'{group} is full')
+            try:
+                with transaction.atomic():
+                    return self.create(**{self.model.group_field: group}, member_id=member_id, **fields), True
+            except IntegrityError:
+                # Joined concurrently
+                return self.of(group).get(member_id=member_id), False
+
+    def remove(self, group, member_id):
+        """Remove a member, returning whether they were one"""
+        deleted, _ = self.of(group).filter(member_id=str(member_id)).delete()
+        return bool(deleted)
+
+    def replace(self, group, members):
+        """
+        Make members ({member ID: fields}) the group's members: others are
+        removed, new ones added and the fields of existing ones updated.
+        """
+        members = {str(member_id): fields for member_id, fields in members.items()}
+        with transaction.atomic():
+            self.of(group).exclude(member_id__in=list(members)).delete()
+            existing = {membership.member_id: membership for membership in self.of(group)}
+            changed = []
+            for member_id, fields in members.items():
+                membership = existing.get(member_id)
+                if membership is not None and any(getattr(membership, name) != value
+                                                   for name, value in fields.items()):
+                    for name, value in fields.items():
+                        setattr(membership, name, value)
+                    changed.append(membership)
+            if changed:
+                self.bulk_update(changed, list({name for fields in members.values() for name in fields}))
+            self.bulk_create([
+                self.model(**{self.model.group_field: group}, member_id=member_id, **fields)
+                for member_id, fields in members.items() if member_id not in existing
+            ], ignore_conflicts=True)
+
+
+class Membership(models.Model):
+    """A member of a group; subclasses add the group foreign key and name it in group_field"""
+    group_field = None
+
+    member_id = models.CharField(max_length=50, db_index=True)
+    joined_at = models.DateTimeField(default=timezone.now)
+
+    objects = MembershipQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+        ordering = ['id']
+
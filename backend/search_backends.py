@@ -0,0 +1,318 @@
+"""
+Search backends for SearchService: Typesense and a local embedded index.
+
+- TypesenseBackend: the external engine, through one client created on first
+  use (its HTTP client pools connections) and a health check refreshed every
+  HEALTH_CHECK_INTERVAL seconds, so an unreachable server costs one timeout
+  per interval rather than one per search
+- LocalSearchBackend: an SQLite FTS5 index ranked by BM25, stored in
+  settings.SEARCH_INDEX_PATH; it mirrors the Typesense collections so search
+  keeps working, in milliseconds, when Typesense is down or not deployed
+
+Both take and return documents in the Typesense shape: search() returns hits
+of {'document': {...}, 'text_match': score}.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+try:
+    import typesense
+    import typesense.exceptions
+except ImportError:  # pragma: no cover - typesense is in requirements.txt
+    typesense = None
+
+# Errors caused by the request rather than the server
+CLIENT_ERRORS = tuple(
+    getattr(typesense.exceptions, name) for name in (
+        'ObjectAlreadyExists', 'ObjectNotFound', 'ObjectUnprocessable', 'RequestMalformed',
+        'RequestUnauthorized', 'RequestForbidden', 'InvalidParameter',
+    ) if hasattr(typesense.exceptions, name)
+) if typesense is not None else ()
+
+HEALTH_CHECK_INTERVAL = 30
+DEFAULT_PER_PAGE = 10
+# Documents per Typesense import request
+IMPORT_BATCH_SIZE = 1000
+
+# Fields of each collection, and the ones searched by full text
+COLLECTIONS = {
+    'library_books': {
+        'fields': ['id', 'title', 'author', 'isbn', 'call_number', 'description', 'subject', 'publisher',
+                   'publication_year', 'location', 'status', 'created_at'],
+        'query_by': ['title', 'author', 'subject', 'isbn', 'call_number'],
+    },
+    'transcripts': {
+        'fields': ['id', 'student_id', 'student_name', 'course_id', 'course_name', 'grade', 'points', 'semester',
+                   'year', 'instructor', 'department', 'created_at'],
+        'query_by': ['student_name', 'course_name', 'instructor'],
+    },
+}
+
+
+class SearchBackendUnavailable(Exception):
+    """The backend can't serve the request"""
+
+
+class SearchBackend:
+    """Interface of the search backends"""
+
+    name = None
+
+    def available(self):
+        return True
+
+    def index_documents(self, collection, documents):
+        """Insert or replace documents; returns how many were indexed"""
+        raise NotImplementedError
+
+    def delete_document(self, collection, document_id):
+        self.delete_documents(collection, [document_id])
+
+    def delete_documents(self, collection, document_ids):
+        raise NotImplementedError
+
+    def search(self, collection, query, filters=None, per_page=DEFAULT_PER_PAGE):
+        raise NotImplementedError
+
+
+def filter_string(filters):
+    """Typesense filter_by expression of {field: value or [values]}"""
+    filter_strings = []
+    for key, value in filters.items():
+        if isinstance(value, list):
+            filter_strings.append(f"{key}: [{','.join([str(v) for v in value])}]")
+        else:
+            filter_strings.append(f"{key}: {value}")
+    return ' && '.join(filter_strings)
+
+
+class TypesenseBackend(SearchBackend):
+    """The Typesense server"""
+
+    name = 'typesense'
+
+    def __init__(self, config=None):
+        self.config = config or {
+            'nodes': [{
+                'host': os.getenv('TYPESENSE_HOST', 'localhost'),
+                'port': os.getenv('TYPESENSE_PORT', '8108'),
+                'protocol': os.getenv('TYPESENSE_PROTOCOL', 'http')
+            }],
+            'api_key': os.getenv('TYPESENSE_API_KEY', 'xyz'),
+            'connection_timeout_seconds': 2
+        }
+        self._client = None
+        self._lock = threading.Lock()
+        self._healthy = None
+        self._checked_at = float('-inf')
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                if typesense is None:
+                    raise SearchBackendUnavailable('typesense is not installed')
+                self._client = typesense.Client(self.config)
+            return self._client
+
+    def available(self):
+        """Whether the server answered its last health check"""
+        if time.monotonic() - self._checked_at >= HEALTH_CHECK_INTERVAL:
+            try:
+                self._healthy = bool(self.client.operations.is_healthy())
+            except Exception:
+                self._healthy = False
+            self._checked_at = time.monotonic()
+        return self._healthy
+
+    def mark_unavailable(self):
+        """Skip the server until the next health check"""
+        self._healthy = False
+        self._checked_at = time.monotonic()
+
+    def _call(self, operation):
+        try:
+            return operation()
+        except CLIENT_ERRORS:
+            raise
+        except Exception as e:
+            # Connection failures, timeouts and server errors
+            self.mark_unavailable()
+            raise SearchBackendUnavailable(str(e)) from e
+
+    def create_collection(self, schema):
+        return self._call(lambda: self.client.collections.create(schema))
+
+    def index_documents(self, collection, documents):
+        """Upsert documents through the JSONL import endpoint, IMPORT_BATCH_SIZE per request"""
+        documents = list(documents)
+        indexed = 0
+        for start in range(0, len(documents), IMPORT_BATCH_SIZE):
+            jsonl = '\n'.join(json.dumps(document) for document in documents[start:start + IMPORT_BATCH_SIZE])
+            response = self._call(
+                lambda: self.client.collections[collection].documents.import_(jsonl, {'action': 'upsert'})
+            )
+            for line in response.splitlines():
+                result = json.loads(line)
+                if result.get('success'):
+                    indexed += 1
+                else:
+                    print(f"Error indexing {collection} document: {result.get('error')}")
+        return indexed
+
+    def delete_documents(self, collection, document_ids):
+        document_ids = list(document_ids)
+        for start in range(0, len(document_ids), IMPORT_BATCH_SIZE):
+            ids = ','.join(f'`{document_id}`' for document_id in document_ids[start:start + IMPORT_BATCH_SIZE])
+            self._call(lambda: self.client.collections[collection].documents.delete({'filter_by': f'id: [{ids}]'}))
+
+    def search(self, collection, query, filters=None, per_page=DEFAULT_PER_PAGE):
+        search_parameters = {
+            'q': query,
+            'query_by': ','.join(COLLECTIONS[collection]['query_by']),
+            'sort_by': 'created_at:desc',
+            'per_page': per_page,
+        }
+        if filters:
+            search_parameters['filter_by'] = filter_string(filters)
+        results = self._call(lambda: self.client.collections[collection].documents.search(search_parameters))
+        return results['hits'] if 'hits' in results else []
+
+
+class LocalSearchBackend(SearchBackend):
+    """SQLite FTS5 index; each collection is a documents table and its full-text table"""
+
+    name = 'local'
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            if self.path != ':memory:':
+                connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for collection, spec in COLLECTIONS.items():
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS {collection}_documents '
+                    '(rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, created_at INTEGER, document TEXT NOT NULL)'
+                )
+                connection.execute(
+                    f'CREATE INDEX IF NOT EXISTS {collection}_created_at ON {collection}_documents (created_at)'
+                )
+                columns = ', '.join(spec['query_by'])
+                connection.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {collection}_fts USING fts5({columns}, "
+                    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def match_expression(query):
+        """FTS5 query matching every word of query as a prefix, or None to match everything"""
+        words = re.findall(r'\w+', query or '')
+        if not words:
+            return None
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def _delete(self, collection, document_id):
+        row = self.connection.execute(
+            f'SELECT rowid FROM {collection}_documents WHERE id = ?', (document_id,)
+        ).fetchone()
+        if row:
+            self.connection.execute(f'DELETE FROM {collection}_fts WHERE rowid = ?', row)
+            self.connection.execute(f'DELETE FROM {collection}_documents WHERE rowid = ?', row)
+
+    def index_documents(self, collection, documents):
+        query_by = COLLECTIONS[collection]['query_by']
+        count = 0
+        with self._lock:
+            connection = self.connection
+            connection.execute('BEGIN')
+            try:
+                for document in documents:
+                    document_id = str(document['id'])
+                    self._delete(collection, document_id)
+                    cursor = connection.execute(
+                        f'INSERT INTO {collection}_documents (id, created_at, document) VALUES (?, ?, ?)',
+                        (document_id, document.get('created_at') or 0, json.dumps(document))
+                    )
+                    connection.execute(
+                        f'INSERT INTO {collection}_fts (rowid, {", ".join(query_by)}) '
+                        f'VALUES (?, {", ".join("?" * len(query_by))})',
+                        [cursor.lastrowid] + [str(document.get(field) or '') for field in query_by]
+                    )
+                    count += 1
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+        return count
+
+    def delete_documents(self, collection, document_ids):
+        with self._lock:
+            connection = self.connection
+            connection.execute('BEGIN')
+            try:
+                for document_id in document_ids:
+                    self._delete(collection, str(document_id))
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+    def clear(self, collection):
+        with self._lock:
+            self.connection.execute(f'DELETE FROM {collection}_fts')
+            self.connection.execute(f'DELETE FROM {collection}_documents')
+
+    def count(self, collection):
+        with self._lock:
+            return self.connection.execute(f'SELECT COUNT(*) FROM {collection}_documents').fetchone()[0]
+
+    def document_ids(self, collection):
+        with self._lock:
+            return {row[0] for row in self.connection.execute(f'SELECT id FROM {collection}_documents')}
+
+    def search(self, collection, query, filters=None, per_page=DEFAULT_PER_PAGE):
+        fields = COLLECTIONS[collection]['fields']
+        conditions = []
+        params = []
+        match = self.match_expression(query)
+        if match is not None:
+            conditions.append(f'{collection}_fts MATCH ?')
+            params.append(match)
+        for key, value in (filters or {}).items():
+            if key not in fields:
+                raise ValueError(f'Unknown filter field: {key}')
+            values = value if isinstance(value, list) else [value]
+            conditions.append(
+                f"json_extract(d.document, '$.{key}') IN ({', '.join('?' * len(values))})"
+            )
+            params.extend(values)
+
+        if match is not None:
+            sql = (f'SELECT d.document, bm25({collection}_fts) FROM {collection}_fts '
+                   f'JOIN {collection}_documents d ON d.rowid = {collection}_fts.rowid')
+        else:
+            sql = f'SELECT d.document, 0 FROM {collection}_documents d'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        # Ordered like the Typesense searches (newest first), then by relevance
+        sql += ' ORDER BY d.created_at DESC, 2, d.id LIMIT ?'
+        params.append(per_page)
+
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        # bm25() is lower for better matches
+        return [{'document': json.loads(document), 'text_match': -rank} for document, rank in rows]
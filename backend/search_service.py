@@ -1,23 +1,111 @@
-import typesense
 import os
 from django.conf import settings
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
+from search_backends import (
+    LocalSearchBackend, SearchBackendUnavailable, TypesenseBackend,
+)
 
-class SearchService:
-    """Search service using Typesense for library and transcripts"""
-    
-    def __init__(self):
-        """Initialize Typesense client"""
-        self.client = typesense.Client({
-            'nodes': [{
-                'host': os.getenv('TYPESENSE_HOST', 'localhost'),
-                'port': os.getenv('TYPESENSE_PORT', '8108'),
-                'protocol': os.getenv('TYPESENSE_PROTOCOL', 'http')
-            }],
-            'api_key': os.getenv('TYPESENSE_API_KEY', 'xyz'),
-            'connection_timeout_seconds': 2
+LIBRARY_BOOKS = 'library_books'
+TRANSCRIPTS = 'transcripts'
+
+REINDEX_BATCH_SIZE = 1000
+
+def _timestamp(value):
+    return int(value.timestamp()) if value else 0
+
+def _semester(date):
+    if date.month <= 5:
+        return 'Spring'
+    if date.month <= 7:
+        return 'Summer'
+    return 'Fall'
+
+def library_book_document(book) -> Dict[str, Any]:
+    """Search document of a LibraryBook"""
+    return {
+        'id': str(book.id),
+        'title': book.title,
+        'author': book.author,
+        'isbn': book.isbn,
+        'call_number': book.call_number,
+        'location': book.location,
+        'status': book.status,
+        # Books have no creation time; checkouts are the closest recency signal
+        'created_at': _timestamp(book.checkout_date),
+    }
+
+def transcript_documents(grades) -> List[Dict[str, Any]]:
+    """Search documents of Grades, with student, course and instructor names looked up per batch"""
+    from courses.models import Course
+    from users.models import Faculty, Student
+
+    grades = list(grades)
+    students = {
+        student.student_id: student.user.get_full_name() or student.user.username
+        for student in Student.objects.filter(
+            student_id__in={grade.student_id for grade in grades}).select_related('user')
+    }
+    courses = Course.objects.in_bulk({grade.course_id for grade in grades})
+    instructors = {
+        faculty.employee_id: faculty.user.get_full_name() or faculty.user.username
+        for faculty in Faculty.objects.filter(
+            employee_id__in={course.instructor_id for course in courses.values()}).select_related('user')
+    }
+
+    documents = []
+    for grade in grades:
+        course = courses.get(grade.course_id)
+        documents.append({
+            'id': str(grade.id),
+            'student_id': grade.student_id,
+            'student_name': students.get(grade.student_id, ''),
+            'course_id': grade.course_id,
+            'course_name': course.name if course else '',
+            'grade': grade.letter_grade,
+            'points': float(grade.value),
+            'semester': _semester(grade.created_at),
+            'year': grade.created_at.year,
+            'instructor': instructors.get(course.instructor_id, '') if course else '',
+            'department': course.department if course else '',
+            'created_at': _timestamp(grade.created_at),
         })
-    
+    return documents
+
+class SearchService:
+    """Search service for library and transcripts
+
+    Searches go to Typesense while it is healthy and to the local index
+    otherwise (settings.SEARCH_BACKEND 'auto'), or always to one of them
+    ('typesense' or 'local'). Indexed documents are written to both, so the
+    local index mirrors Typesense.
+    """
+
+    def __init__(self, typesense_backend=None, local_backend=None, mode=None):
+        """Set up the backends; the Typesense client is created on first use"""
+        self.typesense = typesense_backend or TypesenseBackend()
+        self._local = local_backend
+        self._mode = mode
+
+    @property
+    def mode(self):
+        return self._mode or getattr(settings, 'SEARCH_BACKEND', 'auto')
+
+    @property
+    def local(self):
+        if self._local is None:
+            self._local = LocalSearchBackend(
+                getattr(settings, 'SEARCH_INDEX_PATH', os.path.join(settings.BASE_DIR, 'search_index.sqlite3'))
+            )
+        return self._local
+
+    def search_backend(self):
+        """The backend searches go to"""
+        if self.mode == 'local':
+            return self.local
+        if self.mode == 'typesense' or self.typesense.available():
+            return self.typesense
+        return self.local
+
     def create_library_collection(self):
         """Create collection for library books"""
         library_schema = {
@@ -38,16 +126,16 @@ class SearchService:
             ],
             'default_sorting_field': 'created_at'
         }
-        
+
         try:
-            self.client.collections.create(library_schema)
+            self.typesense.create_collection(library_schema)
             print("Library books collection created successfully")
         except Exception as e:
             if "already exists" in str(e):
                 print("Library books collection already exists")
             else:
                 print(f"Error creating library books collection: {e}")
-    
+
     def create_transcripts_collection(self):
         """Create collection for academic transcripts"""
         transcripts_schema = {
@@ -68,99 +156,136 @@ class SearchService:
             ],
             'default_sorting_field': 'created_at'
         }
-        
+
         try:
-            self.client.collections.create(transcripts_schema)
+            self.typesense.create_collection(transcripts_schema)
             print("Transcripts collection created successfully")
         except Exception as e:
             if "already exists" in str(e):
                 print("Transcripts collection already exists")
             else:
                 print(f"Error creating transcripts collection: {e}")
-    
-    def index_library_book(self, book_data: Dict[str, Any]):
-        """Index a library book in Typesense"""
+
+    def index_documents(self, collection: str, documents: Iterable[Dict[str, Any]]) -> bool:
+        """Index documents in the local index and, when it is reachable, in Typesense"""
+        documents = list(documents)
         try:
-            self.client.collections['library_books'].documents.create(book_data)
-            return True
+            self.local.index_documents(collection, documents)
         except Exception as e:
-            print(f"Error indexing library book: {e}")
+            print(f"Error indexing {collection} locally: {e}")
             return False
-    
+        if self.mode != 'local' and self.typesense.available():
+            try:
+                self.typesense.index_documents(collection, documents)
+            except Exception as e:
+                # The local index has the documents; a reindex catches Typesense up
+                print(f"Error indexing {collection} in Typesense: {e}")
+        return True
+
+    def index_library_book(self, book_data: Dict[str, Any]):
+        """Index a library book"""
+        return self.index_documents(LIBRARY_BOOKS, [book_data])
+
     def index_transcript(self, transcript_data: Dict[str, Any]):
-        """Index a transcript in Typesense"""
+        """Index a transcript"""
+        return self.index_documents(TRANSCRIPTS, [transcript_data])
+
+    def search(self, collection: str, query: str, filters: Dict[str, Any] = None) -> List[Dict]:
+        """Search a collection, falling back to the local index if Typesense fails"""
+        backend = self.search_backend()
+        if backend is self.typesense:
+            try:
+                return self.typesense.search(collection, query, filters)
+            except SearchBackendUnavailable as e:
+                if self.mode == 'typesense':
+                    print(f"Error searching {collection}: {e}")
+                    return []
+            except Exception as e:
+                print(f"Error searching {collection}: {e}")
+                return []
         try:
-            self.client.collections['transcripts'].documents.create(transcript_data)
-            return True
+            return self.local.search(collection, query, filters)
         except Exception as e:
-            print(f"Error indexing transcript: {e}")
-            return False
-    
+            print(f"Error searching {collection}: {e}")
+            return []
+
     def search_library_books(self, query: str, filters: Dict[str, Any] = None) -> List[Dict]:
         """Search library books"""
-        search_parameters = {
-            'q': query,
-            'query_by': 'title,author,subject,isbn,call_number',
-            'sort_by': 'created_at:desc'
-        }
-        
-        if filters:
-            filter_strings = []
-            for key, value in filters.items():
-                if isinstance(value, list):
-                    filter_strings.append(f"{key}: [{','.join([str(v) for v in value])}]")
-                else:
-                    filter_strings.append(f"{key}: {value}")
-            search_parameters['filter_by'] = ' && '.join(filter_strings)
-        
-        try:
-            results = self.client.collections['library_books'].documents.search(search_parameters)
-            return results['hits'] if 'hits' in results else []
-        except Exception as e:
-            print(f"Error searching library books: {e}")
-            return []
-    
+        return self.search(LIBRARY_BOOKS, query, filters)
+
     def search_transcripts(self, query: str, filters: Dict[str, Any] = None) -> List[Dict]:
         """Search transcripts"""
-        search_parameters = {
-            'q': query,
-            'query_by': 'student_name,course_name,instructor',
-            'sort_by': 'created_at:desc'
-        }
-        
-        if filters:
-            filter_strings = []
-            for key, value in filters.items():
-                if isinstance(value, list):
-                    filter_strings.append(f"{key}: [{','.join([str(v) for v in value])}]")
-                else:
-                    filter_strings.append(f"{key}: {value}")
-            search_parameters['filter_by'] = ' && '.join(filter_strings)
-        
-        try:
-            results = self.client.collections['transcripts'].documents.search(search_parameters)
-            return results['hits'] if 'hits' in results else []
-        except Exception as e:
-            print(f"Error searching transcripts: {e}")
-            return []
-    
-    def delete_library_book(self, book_id: str) -> bool:
-        """Delete a library book from the index"""
+        return self.search(TRANSCRIPTS, query, filters)
+
+    def delete_document(self, collection: str, document_id: str) -> bool:
+        """Delete a document from the local index and Typesense"""
         try:
-            self.client.collections['library_books'].documents[book_id].delete()
+            self.local.delete_document(collection, document_id)
+            if self.mode != 'local' and self.typesense.available():
+                self.typesense.delete_document(collection, document_id)
             return True
         except Exception as e:
-            print(f"Error deleting library book: {e}")
+            print(f"Error deleting {collection} document: {e}")
             return False
-    
+
+    def delete_library_book(self, book_id: str) -> bool:
+        """Delete a library book from the index"""
+        return self.delete_document(LIBRARY_BOOKS, book_id)
+
     def delete_transcript(self, transcript_id: str) -> bool:
         """Delete a transcript from the index"""
-        try:
-            self.client.collections['transcripts'].documents[transcript_id].delete()
-            return True
-        except Exception as e:
-            print(f"Error deleting transcript: {e}")
-            return False
+        return self.delete_document(TRANSCRIPTS, transcript_id)
+
+    @staticmethod
+    def source_rows(collection: str):
+        """Queryset of the database rows a collection's documents are built from"""
+        from assignments.models import Grade
+        from library.models import LibraryBook
+
+        if collection == LIBRARY_BOOKS:
+            return LibraryBook.objects.all()
+        if collection == TRANSCRIPTS:
+            return Grade.objects.all()
+        raise ValueError(f'Unknown collection: {collection}')
+
+    @staticmethod
+    def build_documents(collection: str, rows) -> List[Dict[str, Any]]:
+        if collection == LIBRARY_BOOKS:
+            return [library_book_document(book) for book in rows]
+        return transcript_documents(rows)
+
+    def source_documents(self, collection: str, batch_size: int = REINDEX_BATCH_SIZE, after: str = None):
+        """(last ID, documents) batches of a collection in ID order, built from the database"""
+        rows = self.source_rows(collection).order_by('pk')
+        while True:
+            batch = list((rows.filter(pk__gt=after) if after is not None else rows)[:batch_size])
+            if not batch:
+                return
+            after = batch[-1].pk
+            yield after, self.build_documents(collection, batch)
+
+    def apply_changes(self, collection: str, document_ids: Iterable[str]) -> Dict[str, int]:
+        """Re-index changed documents: rows still in the database are upserted, the others deleted
+
+        The local index is updated first. Unless the mode is 'local', the
+        changes then go to Typesense, and SearchBackendUnavailable is raised
+        while it is down so the caller keeps them until it is back.
+        """
+        document_ids = set(document_ids)
+        rows = list(self.source_rows(collection).filter(pk__in=document_ids))
+        documents = self.build_documents(collection, rows)
+        deleted = document_ids - {str(row.pk) for row in rows}
+
+        self.local.index_documents(collection, documents)
+        self.local.delete_documents(collection, deleted)
+        if self.mode != 'local':
+            if not self.typesense.available():
+                raise SearchBackendUnavailable('Typesense is unavailable')
+            if documents:
+                self.typesense.index_documents(collection, documents)
+            if deleted:
+                self.typesense.delete_documents(collection, deleted)
+        return {'indexed': len(documents), 'deleted': len(deleted)}
 
 # Initialize the search service
 search_service = SearchService()
@@ -173,4 +298,4 @@ def initialize_search_service():
         search_service.create_transcripts_collection()
         print("Search service initialized successfully")
     except Exception as e:
-        print(f"Error initializing search service: {e}")
\ No newline at end of file
+        print(f"Error initializing search service: {e}")
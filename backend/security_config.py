@@ -13,6 +13,10 @@ class SecurityMiddleware(MiddlewareMixin):
     Middleware for implementing basic WAF and DDoS protection.
     """
     
+    # __call__ is synchronous; under ASGI Django runs it in a thread
+    sync_capable = True
+    async_capable = False
+    
     def __init__(self, get_response):
         self.get_response = get_response
         
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class StudentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'student'
\ No newline at end of file
+    name = 'student'
+    
+    def ready(self):
+        # Import signal handlers that keep the academic summaries up to date
+        import student.signals
@@ -1114,7 +1114,7 @@ def get_waitlisted_courses(request):
         
         try:
             # Get all courses where student is on waitlist
-            courses = Course.objects.filter(waitlist__contains=[student.student_id])
+            courses = Course.objects.filter(waitlist_entries__member_id=student.student_id)
             waitlisted_courses = []
             
             for course in courses:
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from student.services import AcademicSummaryService, REBUILD_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized student academic summaries from enrollments and grades'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--student', action='append', dest='student_ids',
+                            help='Student ID to rebuild (repeatable; default: all students)')
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+                            help='Number of students rebuilt per transaction')
+    
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding academic summaries...')
+        count = AcademicSummaryService.rebuild(options['student_ids'], batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt academic summaries for {count} students')
+        )
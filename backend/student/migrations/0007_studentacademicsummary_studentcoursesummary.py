@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('student', '0006_alter_enrollmentperiod_end_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentAcademicSummary',
+            fields=[
+                ('student_id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('current_courses', models.IntegerField(default=0)),
+                ('current_credits', models.IntegerField(default=0)),
+                ('completed_courses', models.IntegerField(default=0)),
+                ('completed_credits', models.IntegerField(default=0)),
+                ('term_gpa', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StudentCourseSummary',
+            fields=[
+                ('id', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('student_id', models.CharField(max_length=50)),
+                ('course_id', models.CharField(max_length=50)),
+                ('enrollment_status', models.CharField(max_length=20)),
+                ('course_code', models.CharField(blank=True, max_length=20)),
+                ('course_name', models.CharField(blank=True, max_length=100)),
+                ('credits', models.IntegerField(blank=True, null=True)),
+                ('earned_points', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('max_points', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('graded_items', models.IntegerField(default=0)),
+                ('percentage', models.FloatField(blank=True, null=True)),
+                ('letter_grade', models.CharField(default='N/A', max_length=5)),
+                ('grade_points', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student_id', 'enrollment_status'], name='student_stu_student_98a168_idx'), models.Index(fields=['course_id'], name='student_stu_course__e99f14_idx')],
+            },
+        ),
+    ]
@@ -496,3 +496,49 @@ class StudentEnrollmentCart(models.Model):
     
     def __str__(self):
         return f"Cart Item: {self.student.student_id} - {self.course.code}"
+
+
+class StudentCourseSummary(models.Model):
+    """Materialized grade summary of one enrollment, kept up to date by student.signals"""
+    id = models.CharField(max_length=50, primary_key=True)  # Same as the enrollment ID
+    student_id = models.CharField(max_length=50)
+    course_id = models.CharField(max_length=50)
+    enrollment_status = models.CharField(max_length=20)  # active, dropped, completed
+    
+    # Course details; credits is None when the course no longer exists
+    course_code = models.CharField(max_length=20, blank=True)
+    course_name = models.CharField(max_length=100, blank=True)
+    credits = models.IntegerField(null=True, blank=True)
+    
+    # Totals over the student's grades in the course
+    earned_points = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    max_points = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    graded_items = models.IntegerField(default=0)
+    percentage = models.FloatField(null=True, blank=True)  # None until something is graded
+    letter_grade = models.CharField(max_length=5, default='N/A')
+    grade_points = models.FloatField(null=True, blank=True)  # 4.0 scale
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['student_id', 'enrollment_status']),
+            models.Index(fields=['course_id']),
+        ]
+    
+    def __str__(self):
+        return f"Course Summary: {self.student_id} - {self.course_code} ({self.letter_grade})"
+
+
+class StudentAcademicSummary(models.Model):
+    """Materialized academic totals of one student, kept up to date by student.signals"""
+    student_id = models.CharField(max_length=50, primary_key=True)
+    current_courses = models.IntegerField(default=0)
+    current_credits = models.IntegerField(default=0)
+    completed_courses = models.IntegerField(default=0)
+    completed_credits = models.IntegerField(default=0)
+    term_gpa = models.FloatField(default=0.0)  # GPA over graded active enrollments
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Academic Summary: {self.student_id} (term GPA {self.term_gpa})"
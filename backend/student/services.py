@@ -0,0 +1,236 @@
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum
+from courses.models import Course, Enrollment
+from assignments.models import Grade
+from .models import StudentCourseSummary, StudentAcademicSummary
+
+# (minimum percentage, letter grade, grade points), highest first
+GRADE_SCALE = [
+    (90, 'A', 4.0),
+    (80, 'B', 3.0),
+    (70, 'C', 2.0),
+    (60, 'D', 1.0),
+    (0, 'F', 0.0),
+]
+
+# Number of students rebuilt per transaction by AcademicSummaryService.rebuild
+REBUILD_BATCH_SIZE = 500
+
+COURSE_SUMMARY_FIELDS = [
+    'student_id', 'course_id', 'enrollment_status', 'course_code', 'course_name', 'credits',
+    'earned_points', 'max_points', 'graded_items', 'percentage', 'letter_grade', 'grade_points',
+    'updated_at',
+]
+
+STUDENT_SUMMARY_FIELDS = [
+    'current_courses', 'current_credits', 'completed_courses', 'completed_credits', 'term_gpa',
+    'updated_at',
+]
+
+class AcademicSummaryService:
+    """Service class for maintaining the materialized student academic summaries
+
+    StudentCourseSummary holds one row per enrollment and StudentAcademicSummary
+    one row per student. Both are updated incrementally when grades, enrollments
+    or courses are saved (see student.signals), so dashboards read a few rows
+    instead of recomputing from every grade.
+    """
+
+    @staticmethod
+    def grade_for_percentage(percentage):
+        """Return the (letter grade, grade points) of a course percentage"""
+        for minimum, letter_grade, grade_points in GRADE_SCALE:
+            if percentage >= minimum:
+                return letter_grade, grade_points
+        return GRADE_SCALE[-1][1], GRADE_SCALE[-1][2]
+
+    @staticmethod
+    def summarize_enrollments(enrollments):
+        """Build course summary rows for enrollments with one course query and one grade query"""
+        if not enrollments:
+            return []
+
+        student_ids = {enrollment.student_id for enrollment in enrollments}
+        course_ids = {enrollment.course_id for enrollment in enrollments}
+
+        courses = {
+            course.id: course
+            for course in Course.objects.filter(id__in=course_ids).only('id', 'code', 'name', 'credits')
+        }
+        totals = {
+            (row['student_id'], row['course_id']): row
+            for row in Grade.objects
+            .filter(student_id__in=student_ids, course_id__in=course_ids)
+            .values('student_id', 'course_id')
+            .annotate(earned=Sum('value'), possible=Sum('max_points'), items=Count('id'))
+        }
+
+        rows = []
+        for enrollment in enrollments:
+            course = courses.get(enrollment.course_id)
+            total = totals.get((enrollment.student_id, enrollment.course_id), {})
+            earned = total.get('earned') or Decimal('0')
+            possible = total.get('possible') or Decimal('0')
+
+            percentage = None
+            letter_grade = 'N/A'
+            grade_points = None
+            if possible > 0:
+                percentage = float(earned / possible * 100)
+                letter_grade, grade_points = AcademicSummaryService.grade_for_percentage(percentage)
+
+            rows.append(StudentCourseSummary(
+                id=enrollment.id,
+                student_id=enrollment.student_id,
+                course_id=enrollment.course_id,
+                enrollment_status=enrollment.status,
+                course_code=course.code if course else '',
+                course_name=course.name if course else '',
+                credits=course.credits if course else None,
+                earned_points=earned,
+                max_points=possible,
+                graded_items=total.get('items', 0),
+                percentage=percentage,
+                letter_grade=letter_grade,
+                grade_points=grade_points,
+            ))
+        return rows
+
+    @staticmethod
+    def summarize_students(student_ids):
+        """Build student summary rows from the students' course summaries with one query"""
+        active = Q(enrollment_status='active')
+        completed = Q(enrollment_status='completed')
+        graded = active & Q(grade_points__isnull=False, credits__isnull=False)
+
+        totals = {
+            row['student_id']: row
+            for row in StudentCourseSummary.objects
+            .filter(student_id__in=student_ids)
+            .values('student_id')
+            .annotate(
+                current_courses=Count('id', filter=active),
+                current_credits=Sum('credits', filter=active, default=0),
+                completed_courses=Count('id', filter=completed),
+                completed_credits=Sum('credits', filter=completed, default=0),
+                gpa_points=Sum(F('grade_points') * F('credits'), filter=graded,
+                               output_field=FloatField(), default=0.0),
+                gpa_credits=Sum('credits', filter=graded, default=0),
+            )
+        }
+
+        rows = []
+        for student_id in student_ids:
+            total = totals.get(student_id, {})
+            gpa_credits = total.get('gpa_credits', 0)
+            rows.append(StudentAcademicSummary(
+                student_id=student_id,
+                current_courses=total.get('current_courses', 0),
+                current_credits=total.get('current_credits', 0),
+                completed_courses=total.get('completed_courses', 0),
+                completed_credits=total.get('completed_credits', 0),
+                term_gpa=total['gpa_points'] / gpa_credits if gpa_credits else 0.0,
+            ))
+        return rows
+
+    @staticmethod
+    def save_course_summaries(rows):
+        """Insert or update course summary rows"""
+        StudentCourseSummary.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['id'], update_fields=COURSE_SUMMARY_FIELDS
+        )
+
+    @staticmethod
+    def save_student_summaries(rows):
+        """Insert or update student summary rows"""
+        StudentAcademicSummary.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['student_id'], update_fields=STUDENT_SUMMARY_FIELDS
+        )
+
+    @staticmethod
+    def refresh_student(student_id):
+        """Recompute a student's totals from their course summaries"""
+        AcademicSummaryService.save_student_summaries(
+            AcademicSummaryService.summarize_students([student_id])
+        )
+
+    @staticmethod
+    def refresh_course(student_id, course_id):
+        """Recompute a student's summaries for one course, e.g. after a grade changes"""
+        enrollments = list(Enrollment.objects.filter(student_id=student_id, course_id=course_id))
+        AcademicSummaryService.save_course_summaries(
+            AcademicSummaryService.summarize_enrollments(enrollments)
+        )
+        AcademicSummaryService.refresh_student(student_id)
+
+    @staticmethod
+    def refresh_enrollment(enrollment):
+        """Recompute the summary of a created or updated enrollment"""
+        AcademicSummaryService.save_course_summaries(
+            AcademicSummaryService.summarize_enrollments([enrollment])
+        )
+        AcademicSummaryService.refresh_student(enrollment.student_id)
+
+    @staticmethod
+    def remove_enrollment(enrollment):
+        """Remove the summary of a deleted enrollment"""
+        StudentCourseSummary.objects.filter(id=enrollment.id).delete()
+        AcademicSummaryService.refresh_student(enrollment.student_id)
+
+    @staticmethod
+    def refresh_course_details(course_id):
+        """Copy a course's code, name and credits to its summaries after it is saved or deleted"""
+        course = Course.objects.filter(id=course_id).only('code', 'name', 'credits').first()
+        details = {
+            'course_code': course.code if course else '',
+            'course_name': course.name if course else '',
+            'credits': course.credits if course else None,
+        }
+
+        # Only summaries whose details differ need updating
+        stale = StudentCourseSummary.objects.filter(course_id=course_id)
+        if course:
+            stale = stale.exclude(**details)
+        else:
+            stale = stale.exclude(credits__isnull=True)
+
+        student_ids = list(stale.values_list('student_id', flat=True).distinct())
+        if student_ids:
+            stale.update(**details)
+            AcademicSummaryService.save_student_summaries(
+                AcademicSummaryService.summarize_students(student_ids)
+            )
+
+    @staticmethod
+    def rebuild(student_ids=None, batch_size=REBUILD_BATCH_SIZE):
+        """Rebuild the summaries of the given students (all students by default)
+
+        Returns the number of students rebuilt.
+        """
+        if student_ids is None:
+            student_ids = set(Enrollment.objects.values_list('student_id', flat=True))
+            student_ids |= set(StudentAcademicSummary.objects.values_list('student_id', flat=True))
+        student_ids = sorted(set(student_ids))
+
+        for start in range(0, len(student_ids), batch_size):
+            batch = student_ids[start:start + batch_size]
+            enrollments = list(Enrollment.objects.filter(student_id__in=batch))
+            with transaction.atomic():
+                StudentCourseSummary.objects.filter(student_id__in=batch).delete()
+                StudentCourseSummary.objects.bulk_create(
+                    AcademicSummaryService.summarize_enrollments(enrollments)
+                )
+                AcademicSummaryService.save_student_summaries(
+                    AcademicSummaryService.summarize_students(batch)
+                )
+        return len(student_ids)
+
+    @staticmethod
+    def get_student_summary(student_id):
+        """Get a student's summary, building it first if it doesn't exist yet"""
+        summary = StudentAcademicSummary.objects.filter(student_id=student_id).first()
+        if summary is None:
+            AcademicSummaryService.rebuild([student_id])
+            summary = StudentAcademicSummary.objects.get(student_id=student_id)
+        return summary
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from assignments.models import Grade
+from courses.models import Course, Enrollment
+from .services import AcademicSummaryService
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def refresh_summary_for_grade(sender, instance, **kwargs):
+    """Recompute the student's course summary when a grade changes"""
+    if kwargs.get('raw'):
+        return
+    AcademicSummaryService.refresh_course(instance.student_id, instance.course_id)
+
+@receiver(post_save, sender=Enrollment)
+def refresh_summary_for_enrollment(sender, instance, **kwargs):
+    """Recompute the enrollment's summary when it is created or updated"""
+    if kwargs.get('raw'):
+        return
+    AcademicSummaryService.refresh_enrollment(instance)
+
+@receiver(post_delete, sender=Enrollment)
+def remove_summary_for_enrollment(sender, instance, **kwargs):
+    """Remove the enrollment's summary when it is deleted"""
+    AcademicSummaryService.remove_enrollment(instance)
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def refresh_summaries_for_course(sender, instance, **kwargs):
+    """Copy course details to its summaries when the course changes"""
+    if kwargs.get('raw'):
+        return
+    AcademicSummaryService.refresh_course_details(instance.id)
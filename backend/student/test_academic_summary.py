@@ -0,0 +1,107 @@
+"""
+Tests for the materialized student academic summaries
+"""
+
+from io import StringIO
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from assignments.models import Grade
+from courses.models import Course, Enrollment
+from users.models import Student
+from .models import StudentAcademicSummary, StudentCourseSummary
+from .services import AcademicSummaryService
+
+User = get_user_model()
+
+
+def create_course(course_id, credits):
+    return Course.objects.create(
+        id=course_id, code=course_id, name=f'{course_id} Course', description='', credits=credits,
+        instructor_id='FAC001', department='CS', enrollment_limit=30,
+        start_date='2024-09-01', end_date='2024-12-15'
+    )
+
+
+def create_grade(grade_id, course_id, value, max_points=100):
+    return Grade.objects.create(
+        id=grade_id, student_id='STU001', course_id=course_id, value=value, max_points=max_points, weight=1
+    )
+
+
+class AcademicSummaryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='student1', password='testpass123', role='student', mfa_enabled=False
+        )
+        self.student = Student.objects.create(user=self.user, student_id='STU001')
+        create_course('CS101', 3)
+        create_course('MA101', 4)
+        create_course('EN101', 2)
+        Enrollment.objects.create(id='e1', student_id='STU001', course_id='CS101', status='active')
+        Enrollment.objects.create(id='e2', student_id='STU001', course_id='MA101', status='active')
+        Enrollment.objects.create(id='e3', student_id='STU001', course_id='EN101', status='completed')
+        create_grade('g1', 'CS101', 95)
+        create_grade('g2', 'CS101', 85)
+        create_grade('g3', 'MA101', 30, max_points=40)
+        token = jwt.encode({'user_id': self.user.id}, settings.SECRET_KEY, algorithm='HS256')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def test_summaries_follow_grade_and_enrollment_writes(self):
+        cs101 = StudentCourseSummary.objects.get(id='e1')
+        self.assertEqual(cs101.graded_items, 2)
+        self.assertAlmostEqual(cs101.percentage, 90.0)
+        self.assertEqual((cs101.letter_grade, cs101.grade_points), ('A', 4.0))
+        self.assertEqual(StudentCourseSummary.objects.get(id='e3').letter_grade, 'N/A')
+
+        summary = StudentAcademicSummary.objects.get(student_id='STU001')
+        self.assertEqual((summary.current_courses, summary.current_credits), (2, 7))
+        self.assertEqual((summary.completed_courses, summary.completed_credits), (1, 2))
+        self.assertAlmostEqual(summary.term_gpa, (4.0 * 3 + 2.0 * 4) / 7)
+
+        Grade.objects.get(id='g1').delete()
+        self.assertEqual(StudentCourseSummary.objects.get(id='e1').letter_grade, 'B')
+
+        Course.objects.filter(id='MA101').update(credits=5)
+        AcademicSummaryService.refresh_course_details('MA101')
+        self.assertEqual(StudentAcademicSummary.objects.get(student_id='STU001').current_credits, 8)
+
+        Enrollment.objects.get(id='e2').delete()
+        self.assertFalse(StudentCourseSummary.objects.filter(id='e2').exists())
+        summary = StudentAcademicSummary.objects.get(student_id='STU001')
+        self.assertEqual(summary.current_courses, 1)
+        self.assertAlmostEqual(summary.term_gpa, 3.0)
+
+    def test_rebuild_matches_incremental_updates(self):
+        incremental = list(StudentCourseSummary.objects.order_by('id').values_list(
+            'id', 'credits', 'percentage', 'letter_grade', 'grade_points'))
+        StudentCourseSummary.objects.all().delete()
+        StudentAcademicSummary.objects.all().delete()
+
+        call_command('rebuild_academic_summaries', stdout=StringIO())
+
+        self.assertEqual(list(StudentCourseSummary.objects.order_by('id').values_list(
+            'id', 'credits', 'percentage', 'letter_grade', 'grade_points')), incremental)
+        self.assertEqual(StudentAcademicSummary.objects.get(student_id='STU001').current_credits, 7)
+
+    def test_endpoints_read_summaries_independent_of_grade_count(self):
+        for i in range(50):
+            create_grade(f'extra{i}', 'CS101', 90)
+
+        # User and student (middleware and view), academic summary, course summaries
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/v1/student/grades/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['course'], row['grade']) for row in response.json()],
+                         [('EN101', 'N/A'), ('CS101', 'A'), ('MA101', 'C')])
+
+        response = self.client.get('/api/v1/student/dashboard/', **self.auth)
+        self.assertEqual(response.json()['currentCredits'], 7)
+        self.assertEqual(response.json()['completedCourses'], 1)
+
+        response = self.client.get('/api/v1/student/grades/stats/', **self.auth)
+        self.assertEqual(response.json()['semesterGpa'], round((4.0 * 3 + 2.0 * 4) / 7, 2))
@@ -1,9 +1,10 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from .course_views import get_authenticated_student
-from courses.models import Enrollment, Course
-from assignments.models import Grade
-from django.db.models import Sum
+from courses.degree_requirements import get_degree_requirements
+from courses.plan_optimizer import plan_for_student
+from .models import StudentCourseSummary
+from .services import AcademicSummaryService
 from django.utils import timezone
 import json
 
@@ -18,27 +19,9 @@ def student_dashboard(request):
             return JsonResponse({'success': False, 'message': error}, status=401)
         
         try:
-            # Get student's current enrollments
-            current_enrollments = Enrollment.objects.filter(
-                student_id=student.student_id,
-                status='active'
-            )
-            
-            # Calculate dashboard metrics
-            completed_courses = Enrollment.objects.filter(
-                student_id=student.student_id,
-                status='completed'
-            ).count()
-            
-            # Calculate current credits
-            current_credits = 0
-            for enrollment in current_enrollments:
-                try:
-                    from courses.models import Course
-                    course = Course.objects.get(id=enrollment.course_id)
-                    current_credits += course.credits
-                except Course.DoesNotExist:
-                    pass
+            # Enrollment and credit totals are precomputed
+            summary = AcademicSummaryService.get_student_summary(student.student_id)
+            completed_courses = summary.completed_courses
             
             # Get CGPA from student model
             cgpa = float(student.cumulative_gpa) if student.cumulative_gpa else 0.0
@@ -61,8 +44,8 @@ def student_dashboard(request):
                 'remainingCourses': remaining_courses,
                 'predictedGraduation': predicted_graduation,
                 'attendanceRate': attendance_rate,
-                'currentCredits': current_credits,
-                'currentCourses': current_enrollments.count()
+                'currentCredits': summary.current_credits,
+                'currentCourses': summary.current_courses
             }
             
             return JsonResponse(dashboard_data)
@@ -86,71 +69,26 @@ def student_grades(request):
             return JsonResponse({'success': False, 'message': error}, status=401)
         
         try:
-            # Get student's completed enrollments
-            completed_enrollments = Enrollment.objects.filter(
-                student_id=student.student_id,
-                status='completed'
-            )
+            # Make sure the student's summaries exist
+            AcademicSummaryService.get_student_summary(student.student_id)
             
-            # Get student's active enrollments
-            active_enrollments = Enrollment.objects.filter(
+            # Completed courses first, then active ones; skip courses that don't exist
+            summaries = StudentCourseSummary.objects.filter(
                 student_id=student.student_id,
-                status='active'
+                enrollment_status__in=['completed', 'active'],
+                credits__isnull=False
             )
-            
-            # Combine all enrollments
-            all_enrollments = list(completed_enrollments) + list(active_enrollments)
+            summaries = sorted(summaries, key=lambda summary: summary.enrollment_status != 'completed')
             
             course_grades = []
             
-            for enrollment in all_enrollments:
-                try:
-                    # Get course details
-                    course = Course.objects.get(id=enrollment.course_id)
-                    
-                    # Get grades for this course
-                    grades = Grade.objects.filter(
-                        student_id=student.student_id,
-                        course_id=course.id
-                    )
-                    
-                    # Calculate overall grade for this course
-                    total_points = 0
-                    earned_points = 0
-                    grade_count = 0
-                    
-                    for grade in grades:
-                        if grade.value is not None and grade.max_points is not None:
-                            total_points += float(str(grade.max_points))
-                            earned_points += float(str(grade.value))
-                            grade_count += 1
-                    
-                    if total_points > 0:
-                        percentage = (earned_points / total_points) * 100
-                        # Calculate letter grade
-                        if percentage >= 90:
-                            letter_grade = 'A'
-                        elif percentage >= 80:
-                            letter_grade = 'B'
-                        elif percentage >= 70:
-                            letter_grade = 'C'
-                        elif percentage >= 60:
-                            letter_grade = 'D'
-                        else:
-                            letter_grade = 'F'
-                    else:
-                        percentage = 0
-                        letter_grade = 'N/A'
-                    
-                    course_grades.append({
-                        'course': f"{course.code}",
-                        'grade': letter_grade,
-                        'points': course.credits,
-                        'percentage': round(percentage, 2)
-                    })
-                except Course.DoesNotExist:
-                    # Skip courses that don't exist
-                    pass
+            for summary in summaries:
+                course_grades.append({
+                    'course': f"{summary.course_code}",
+                    'grade': summary.letter_grade,
+                    'points': summary.credits,
+                    'percentage': round(summary.percentage, 2) if summary.percentage is not None else 0
+                })
             
             return JsonResponse(course_grades, safe=False)
             
@@ -176,57 +114,9 @@ def student_grade_stats(request):
             # Get CGPA from student model
             cgpa = float(student.cumulative_gpa) if student.cumulative_gpa else 0.0
             
-            # Calculate semester GPA (simplified)
-            # Get current semester enrollments
-            current_enrollments = Enrollment.objects.filter(
-                student_id=student.student_id,
-                status='active'
-            )
-            
-            total_points = 0
-            earned_points = 0
-            
-            for enrollment in current_enrollments:
-                try:
-                    # Get course details
-                    course = Course.objects.get(id=enrollment.course_id)
-                    
-                    # Get grades for this course
-                    grades = Grade.objects.filter(
-                        student_id=student.student_id,
-                        course_id=course.id
-                    )
-                    
-                    # Calculate grade points for this course
-                    course_total = 0
-                    course_earned = 0
-                    
-                    for grade in grades:
-                        if grade.value is not None and grade.max_points is not None:
-                            course_total += float(str(grade.max_points))
-                            course_earned += float(str(grade.value))
-                    
-                    if course_total > 0:
-                        # Calculate grade point (4.0 scale)
-                        percentage = (course_earned / course_total) * 100
-                        if percentage >= 90:
-                            grade_point = 4.0
-                        elif percentage >= 80:
-                            grade_point = 3.0
-                        elif percentage >= 70:
-                            grade_point = 2.0
-                        elif percentage >= 60:
-                            grade_point = 1.0
-                        else:
-                            grade_point = 0.0
-                        
-                        earned_points += grade_point * course.credits
-                        total_points += course.credits
-                except Course.DoesNotExist:
-                    pass
-            
-            # Calculate semester GPA
-            semester_gpa = earned_points / total_points if total_points > 0 else 0.0
+            # Semester GPA over graded current enrollments is precomputed
+            summary = AcademicSummaryService.get_student_summary(student.student_id)
+            semester_gpa = summary.term_gpa
             
             stats_data = {
                 'cgpa': cgpa,
@@ -254,89 +144,16 @@ def degree_planning(request):
             return JsonResponse({'success': False, 'message': error}, status=401)
         
         try:
-            # Define degree requirements based on student's department
-            DEGREE_REQUIREMENTS = {
-                'Computer Science & Engineering': {
-                    'total_credits': 120,
-                    'categories': {
-                        'Core Computer Science': {
-                            'credits_required': 45,
-                            'course_codes': ['CSE101', 'CSE102', 'CSE201', 'CSE202', 'CSE301', 'CSE302', 'CSE401', 'CSE402']
-                        },
-                        'Mathematics': {
-                            'credits_required': 18,
-                            'course_codes': ['MA-101', 'MA-102', 'MA-201', 'MA-301', 'MA-401']
-                        },
-                        'General Education': {
-                            'credits_required': 30,
-                            'course_codes': ['ENG101', 'ENG102', 'SOC101', 'PHI101', 'HIS101']
-                        },
-                        'Electives': {
-                            'credits_required': 27,
-                            'course_codes': []
-                        }
-                    }
-                },
-                'Business Administration': {
-                    'total_credits': 120,
-                    'categories': {
-                        'Core Business': {
-                            'credits_required': 45,
-                            'course_codes': ['BUS101', 'BUS102', 'BUS201', 'BUS301', 'BUS401']
-                        },
-                        'Mathematics': {
-                            'credits_required': 12,
-                            'course_codes': ['MA-101', 'MA-102', 'MA-201']
-                        },
-                        'General Education': {
-                            'credits_required': 30,
-                            'course_codes': ['ENG101', 'ENG102', 'SOC101', 'ECO101']
-                        },
-                        'Electives': {
-                            'credits_required': 33,
-                            'course_codes': []
-                        }
-                    }
-                },
-                'Microbiology': {
-                    'total_credits': 120,
-                    'categories': {
-                        'Core Microbiology': {
-                            'credits_required': 45,
-                            'course_codes': ['BIO101', 'BIO102', 'BIO201', 'BIO301', 'CHE101']
-                        },
-                        'Laboratory Sciences': {
-                            'credits_required': 18,
-                            'course_codes': ['LAB101', 'LAB201', 'LAB301']
-                        },
-                        'General Education': {
-                            'credits_required': 30,
-                            'course_codes': ['ENG101', 'ENG102', 'MA-101']
-                        },
-                        'Electives': {
-                            'credits_required': 27,
-                            'course_codes': []
-                        }
-                    }
-                }
-            }
-            
-            # Get student's department (major)
-            student_major = student.department if student.department else 'General Studies'
-            
             # Get requirements for student's major (default to General Studies if not found)
-            requirements = DEGREE_REQUIREMENTS.get(student_major, {
-                'total_credits': 120,
-                'categories': {
-                    'General Education': {
-                        'credits_required': 120,
-                        'course_codes': []
-                    }
-                }
-            })
+            student_major = student.degree_program or 'General Studies'
+            requirements = get_degree_requirements(student_major)
             
-            # Get all student's enrollments
-            all_enrollments = Enrollment.objects.filter(student_id=student.student_id)
+            # Get all student's enrollments, with course details from their summaries
+            AcademicSummaryService.get_student_summary(student.student_id)
+            all_enrollments = list(StudentCourseSummary.objects.filter(
+                student_id=student.student_id,
+                credits__isnull=False
+            ))
             
             # Build degree progress data
             degree_data = []
@@ -350,58 +167,54 @@ def degree_planning(request):
                 credits_completed = 0
                 
                 # Get courses for this category
-                for enrollment in all_enrollments:
-                    try:
-                        course = Course.objects.get(id=enrollment.course_id)
-                        
-                        # Check if course belongs to this category
-                        is_category_course = False
-                        if required_course_codes:
-                            # Match by course code
-                            for req_code in required_course_codes:
-                                if req_code.replace('-', '').lower() in course.code.replace('-', '').lower():
-                                    is_category_course = True
-                                    break
-                        else:
-                            # Electives category - courses not in other categories
-                            is_category_course = True
-                            for other_cat_info in requirements['categories'].values():
-                                if other_cat_info == category_info:
-                                    continue
-                                for other_code in other_cat_info.get('course_codes', []):
-                                    if other_code.replace('-', '').lower() in course.code.replace('-', '').lower():
-                                        is_category_course = False
-                                        break
-                                if not is_category_course:
+                for summary in all_enrollments:
+                    course_code = summary.course_code.replace('-', '').lower()
+                    
+                    # Check if course belongs to this category
+                    is_category_course = False
+                    if required_course_codes:
+                        # Match by course code
+                        for req_code in required_course_codes:
+                            if req_code.replace('-', '').lower() in course_code:
+                                is_category_course = True
+                                break
+                    else:
+                        # Electives category - courses not in other categories
+                        is_category_course = True
+                        for other_cat_info in requirements['categories'].values():
+                            if other_cat_info == category_info:
+                                continue
+                            for other_code in other_cat_info.get('course_codes', []):
+                                if other_code.replace('-', '').lower() in course_code:
+                                    is_category_course = False
                                     break
+                            if not is_category_course:
+                                break
+                    
+                    if is_category_course:
+                        # Determine course status
+                        status = 'available'
+                        semester = None
                         
-                        if is_category_course:
-                            # Determine course status
+                        if summary.enrollment_status == 'completed':
+                            status = 'completed'
+                            credits_completed += summary.credits
+                            total_completed_credits += summary.credits
+                        elif summary.enrollment_status == 'active':
+                            status = 'in-progress'
+                            semester = 'Current Semester'
+                        elif summary.enrollment_status == 'dropped':
                             status = 'available'
-                            semester = None
-                            
-                            if enrollment.status == 'completed':
-                                status = 'completed'
-                                credits_completed += course.credits
-                                total_completed_credits += course.credits
-                            elif enrollment.status == 'active':
-                                status = 'in-progress'
-                                semester = 'Current Semester'
-                            elif enrollment.status == 'dropped':
-                                status = 'available'
-                            
-                            course_data = {
-                                'id': str(course.id),
-                                'code': course.code,
-                                'name': course.name,
-                                'credits': course.credits,
-                                'status': status,
-                                'semester': semester
-                            }
-                            category_courses.append(course_data)
-                    
-                    except Course.DoesNotExist:
-                        pass
+                        
+                        course_data = {
+                            'id': str(summary.course_id),
+                            'code': summary.course_code,
+                            'name': summary.course_name,
+                            'credits': summary.credits,
+                            'status': status,
+                            'semester': semester
+                        }
+                        category_courses.append(course_data)
                 
                 degree_data.append({
                     'id': str(len(degree_data) + 1),
@@ -415,9 +228,20 @@ def degree_planning(request):
             total_credits_required = requirements.get('total_credits', 120)
             progress_percentage = int((total_completed_credits / total_credits_required) * 100) if total_credits_required > 0 else 0
             
-            # Calculate projected graduation
+            # Plan the remaining courses into the fewest semesters
             remaining_credits = max(0, total_credits_required - total_completed_credits)
-            semesters_remaining = max(1, remaining_credits // 12)  # Assuming 12 credits per semester
+            try:
+                plan = plan_for_student(student.student_id, student_major)
+                # Credits no catalog course covers yet still take semesters
+                semesters_remaining = plan['terms_needed'] - (-plan['shortfall_credits'] // plan['credit_cap'])
+                planned_semesters = [
+                    {'term': term['term'], 'credits': term['credits'],
+                     'courses': [course['code'] for course in term['courses']]}
+                    for term in plan['terms']
+                ]
+            except ValueError:
+                semesters_remaining = max(1, remaining_credits // 12)  # Assuming 12 credits per semester
+                planned_semesters = []
             
             response_data = {
                 'major': student_major,
@@ -426,6 +250,7 @@ def degree_planning(request):
                 'remainingCredits': remaining_credits,
                 'progressPercentage': progress_percentage,
                 'semestersRemaining': semesters_remaining,
+                'plannedSemesters': planned_semesters,
                 'requirements': degree_data
             }
             
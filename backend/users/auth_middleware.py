@@ -1,7 +1,7 @@
 import jwt
 from django.http import JsonResponse
 from django.conf import settings
-from .token_blacklist_modified import is_token_blacklisted
+from .token_blacklist import is_payload_revoked
 
 
 class JWTAuthenticationMiddleware:
@@ -46,16 +46,16 @@ class JWTAuthenticationMiddleware:
         token = auth_header.split(' ')[1]
         
         try:
-            # First check if token is blacklisted
-            if is_token_blacklisted(token):
+            # Decode and validate token
+            decoded = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+            
+            # Then check if it has been revoked
+            if is_payload_revoked(decoded, token):
                 return JsonResponse({
                     'success': False,
                     'message': 'Token has been invalidated. Please login again.'
                 }, status=401)
             
-            # Decode and validate token
-            decoded = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            
             # Attach user info to request for use in views
             request.jwt_user = decoded
             
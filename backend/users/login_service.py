@@ -0,0 +1,114 @@
+"""
+Login service: credential checks for the login endpoints.
+
+A login costs one query (the user, matched by username or email, with its
+role profile joined) and one password hash verification. Hashes made with
+outdated hasher settings are upgraded on successful login, and last_login
+is written on its own.
+
+Password hashing (PBKDF2) is CPU-bound. verify_password_async runs it in a
+bounded thread pool (LOGIN_HASH_WORKERS threads; hashlib releases the GIL
+while hashing) so async workers keep serving other requests meanwhile.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.db.models import Q
+from django.utils import timezone
+from .models import User
+
+PROFILE_RELATIONS = ('student', 'faculty', 'admin')
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+
+class LoginService:
+    """Find, verify and record logins"""
+
+    @staticmethod
+    def find_user(identifier, role=None):
+        """The user with identifier as username or email (email first), with its profile"""
+        if not identifier:
+            return None
+        match = Q(username=identifier)
+        if '@' in identifier:
+            match |= Q(email=identifier)
+        users = User.objects.filter(match).select_related(*PROFILE_RELATIONS)
+        if role:
+            users = users.filter(role=role)
+        candidates = list(users[:3])
+        for user in candidates:
+            if user.email == identifier:
+                return user
+        return candidates[0] if candidates else None
+
+    @staticmethod
+    def _upgrade_hash(user):
+        def setter(raw_password):
+            user.set_password(raw_password)
+            user.save(update_fields=['password'])
+        return setter
+
+    @staticmethod
+    def verify_password(user, password):
+        """Check the password once, upgrading its hash if the hasher settings changed"""
+        if user is None:
+            # Hash anyway, so unknown usernames take as long as wrong passwords
+            User().set_password(password)
+            return False
+        return check_password(password, user.password, LoginService._upgrade_hash(user))
+
+    @staticmethod
+    def hash_pool():
+        """The bounded pool password verification runs in for async callers"""
+        global _hash_pool
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'LOGIN_HASH_WORKERS', 4),
+                    thread_name_prefix='login-hash'
+                )
+            return _hash_pool
+
+    @staticmethod
+    async def verify_password_async(user, password):
+        """verify_password without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(LoginService.hash_pool(), LoginService.verify_password, user, password)
+
+    @staticmethod
+    def authenticate(identifier, password, role=None):
+        """(user, error): error is None, 'invalid_credentials' or 'inactive'"""
+        user = LoginService.find_user(identifier, role)
+        if not LoginService.verify_password(user, password or ''):
+            return user, 'invalid_credentials'
+        if user.status != 'active':
+            return user, 'inactive'
+        return user, None
+
+    @staticmethod
+    async def authenticate_async(identifier, password, role=None):
+        """authenticate for async views, hashing in the pool"""
+        user = await sync_to_async(LoginService.find_user)(identifier, role)
+        if not await LoginService.verify_password_async(user, password or ''):
+            return user, 'invalid_credentials'
+        if user.status != 'active':
+            return user, 'inactive'
+        return user, None
+
+    @staticmethod
+    def record_login(user):
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+
+    @staticmethod
+    def profile(user):
+        """The user's role profile joined by find_user, or None"""
+        if user.role in PROFILE_RELATIONS:
+            return getattr(user, user.role, None)
+        return None
@@ -1,6 +1,9 @@
 import json
+import jwt
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
+from .token_blacklist import is_payload_revoked
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
     def process_request(self, request):
@@ -13,6 +16,8 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
             '/api/v1/faculty/auth/register/',
             '/api/v1/faculty/auth/logout/',
             '/admin/',
+            # Authenticates itself: EventSource can't send the header
+            '/api/v1/events/stream/',
         ]
         
         # Check if the path is exempt from authentication
@@ -35,6 +40,18 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
                 'message': 'Invalid authentication token'
             }, status=401)
             
+        # Reject revoked tokens. Invalid or expired tokens are left to the
+        # role middleware and views, which report them.
+        token = auth_header.split(' ')[1]
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            return None
+        if is_payload_revoked(payload, token):
+            return JsonResponse({
+                'success': False,
+                'message': 'Token has been invalidated. Please login again.'
+            }, status=401)
+
         # If we get here, the request is authenticated
-        # In a real app, you would decode the JWT and attach user info to the request
         return None
\ No newline at end of file
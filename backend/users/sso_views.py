@@ -7,6 +7,7 @@ from django.contrib.auth.hashers import check_password
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .models import User, Student, Faculty, Admin
+from .token_blacklist import new_jti
 
 def generate_jwt_token(user):
     """Generate JWT token for user"""
@@ -18,7 +19,8 @@ def generate_jwt_token(user):
         'email': user.email,
         'role': user.role,
         'exp': exp.timestamp(),  # Convert to timestamp
-        'iat': now.timestamp()   # Convert to timestamp
+        'iat': now.timestamp(),  # Convert to timestamp
+        'jti': new_jti()
     }
     token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
     return token
@@ -0,0 +1,84 @@
+"""
+Tests for the login service
+"""
+
+import asyncio
+import json
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, identify_hasher
+from django.test import TransactionTestCase, TestCase
+
+from .login_service import LoginService
+from .models import Faculty, User
+
+
+class LoginServiceTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='FAC001', email='jane@example.com', password='secret',
+                                             role='faculty', mfa_enabled=False)
+        Faculty.objects.create(user=self.user, employee_id='FAC001', department='CSE')
+        # Another user whose username is the first one's email
+        User.objects.create_user(username='jane@example.com', password='other', role='student', mfa_enabled=False)
+
+    def test_one_query_finds_the_user_with_its_profile(self):
+        with self.assertNumQueries(1):
+            user = LoginService.find_user('jane@example.com')
+            self.assertEqual(LoginService.profile(user).department, 'CSE')
+        # Email matches take precedence, as before
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(LoginService.find_user('FAC001').pk, self.user.pk)
+        self.assertIsNone(LoginService.find_user('FAC001', role='student'))
+        self.assertIsNone(LoginService.find_user('nobody'))
+
+    def test_authenticate_and_record_login(self):
+        # Lookup, then last_login alone
+        with self.assertNumQueries(2):
+            user, error = LoginService.authenticate('FAC001', 'secret')
+            LoginService.record_login(user)
+        self.assertIsNone(error)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+        self.assertEqual(LoginService.authenticate('FAC001', 'wrong')[1], 'invalid_credentials')
+        self.assertEqual(LoginService.authenticate('nobody', 'secret'), (None, 'invalid_credentials'))
+
+        User.objects.filter(pk=self.user.pk).update(status='suspended')
+        self.assertEqual(LoginService.authenticate('FAC001', 'secret')[1], 'inactive')
+        self.assertEqual(LoginService.authenticate('FAC001', 'wrong')[1], 'invalid_credentials')
+
+    def test_outdated_hashes_are_upgraded(self):
+        hasher = PBKDF2PasswordHasher()
+        User.objects.filter(pk=self.user.pk).update(password=hasher.encode('secret', hasher.salt(), iterations=1000))
+
+        self.assertIsNone(LoginService.authenticate('FAC001', 'secret')[1])
+        self.user.refresh_from_db()
+        self.assertNotIn('$1000$', self.user.password)
+        self.assertFalse(identify_hasher(self.user.password).must_update(self.user.password))
+        self.assertTrue(check_password('secret', self.user.password))
+
+    def test_login_view(self):
+        response = self.client.post('/api/v1/auth/login/', json.dumps({'identifier': 'jane@example.com',
+                                                                       'password': 'secret'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['employee_id'], 'FAC001')
+
+        response = self.client.post('/api/v1/auth/login/', json.dumps({'identifier': 'FAC001', 'password': 'x'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 401)
+
+
+class AsyncLoginServiceTest(TransactionTestCase):
+    def test_authenticate_async(self):
+        User.objects.create_user(username='student', password='secret', role='student', mfa_enabled=False)
+
+        async def logins():
+            return await asyncio.gather(
+                LoginService.authenticate_async('student', 'secret'),
+                LoginService.authenticate_async('student', 'wrong'),
+            )
+
+        (user, error), (_, wrong) = asyncio.run(logins())
+        self.assertEqual(user.username, 'student')
+        self.assertIsNone(error)
+        self.assertEqual(wrong, 'invalid_credentials')
@@ -0,0 +1,161 @@
+"""
+Tests for JWT revocation
+"""
+
+import json
+import time
+import unittest
+import uuid
+from unittest import mock
+
+import jwt
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from faculty.middleware import generate_refresh_token
+from . import token_blacklist
+from .models import User
+from .token_blacklist import BloomFilter, TokenRevocationList, token_hash
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        added = [token_hash({'jti': uuid.uuid4().hex}) for _ in range(1000)]
+        for digest in added:
+            bloom.add(digest)
+        self.assertTrue(all(digest in bloom for digest in added))
+
+        others = [token_hash({'jti': uuid.uuid4().hex}) for _ in range(5000)]
+        self.assertLess(sum(digest in bloom for digest in others), 150)
+
+
+class RevocationListContract:
+    def make_list(self):
+        raise NotImplementedError
+
+    def test_revoked_tokens_and_watermarks(self):
+        revocations = self.make_list()
+        now = time.time()
+        revoked, kept = token_hash({'jti': uuid.uuid4().hex}), token_hash({'jti': uuid.uuid4().hex})
+        revocations.revoke(revoked, now + 60)
+        self.assertTrue(revocations.is_revoked(revoked))
+        self.assertFalse(revocations.is_revoked(kept))
+
+        revocations.unrevoke(revoked)
+        self.assertFalse(revocations.is_revoked(revoked))
+
+        user_id = uuid.uuid4().hex
+        revocations.revoke_user(user_id, before=now)
+        self.assertTrue(revocations.is_revoked(kept, user_id, now - 10))
+        self.assertFalse(revocations.is_revoked(kept, user_id, now + 1))
+        self.assertFalse(revocations.is_revoked(kept, 'someone-else', now - 10))
+
+
+class LocalRevocationListTest(RevocationListContract, SimpleTestCase):
+    def make_list(self):
+        return TokenRevocationList()
+
+
+@unittest.skipUnless(token_blacklist._redis_client(), 'Redis is not available')
+class RedisRevocationListTest(RevocationListContract, SimpleTestCase):
+    def make_list(self):
+        return TokenRevocationList(token_blacklist._redis_client())
+
+    def test_other_workers_see_revocations_after_a_sync(self):
+        first, second = self.make_list(), self.make_list()
+        digest = token_hash({'jti': uuid.uuid4().hex})
+        self.assertFalse(second.is_revoked(digest))
+
+        first.revoke(digest, time.time() + 60)
+        self.addCleanup(first.unrevoke, digest)
+        second._next_attempt_at = None
+        self.assertTrue(second.is_revoked(digest))
+
+
+class FlakyRedis:
+    """The revocation log of a Redis server whose next `failures` pipelines fail"""
+
+    def __init__(self):
+        self.log = {}
+        self.failures = 0
+
+    def pipeline(self):
+        client, ranges = self, []
+
+        class Pipeline:
+            def zrangebyscore(self, key, low, high, withscores=False):
+                ranges.append((key, low))
+
+            def execute(self):
+                if client.failures:
+                    client.failures -= 1
+                    raise ConnectionError('Redis is down')
+                return [
+                    [digest for digest, at in client.log.items() if at >= low] if key == token_blacklist.LOG_KEY else []
+                    for key, low in ranges
+                ]
+
+        return Pipeline()
+
+    def exists(self, key):
+        return int(any(key == token_blacklist.JTI_KEY.format(digest) for digest in self.log))
+
+
+class RevocationSyncTest(SimpleTestCase):
+    def test_failed_syncs_do_not_skip_revocations(self):
+        client = FlakyRedis()
+        revocations = TokenRevocationList(client)
+        digest = token_hash({'jti': uuid.uuid4().hex})
+        now = [1000.0]
+        with mock.patch.object(token_blacklist.time, 'time', lambda: now[0]):
+            self.assertFalse(revocations.is_revoked(digest))
+            # Revoked by another worker, then two syncs fail
+            client.log[digest] = 1001.0
+            client.failures = 2
+            for now[0] in (1006.0, 1012.0):
+                self.assertFalse(revocations.is_revoked(digest))
+            now[0] = 1018.0
+            self.assertTrue(revocations.is_revoked(digest))
+
+
+class LogoutTest(TestCase):
+    def setUp(self):
+        token_blacklist._revocation_list = TokenRevocationList()
+        self.addCleanup(setattr, token_blacklist, '_revocation_list', None)
+        User.objects.create_user(username='student', email='student@example.com', password='secret',
+                                 role='student', mfa_enabled=False)
+
+    def login(self):
+        response = self.client.post('/api/v1/auth/login/', json.dumps({'identifier': 'student', 'password': 'secret'}),
+                                    content_type='application/json')
+        return response.json()['token']
+
+    def post(self, path, token):
+        return self.client.post(path, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_logout_revokes_only_that_token(self):
+        token, other = self.login(), self.login()
+        self.assertIn('jti', jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256']))
+
+        self.assertEqual(self.post('/api/v1/auth/logout/', token).status_code, 200)
+        self.assertEqual(self.post('/api/v1/auth/logout-all/', token).status_code, 401)
+        self.assertEqual(self.client.get('/api/v1/auth/logout-all/', HTTP_AUTHORIZATION=f'Bearer {other}').status_code,
+                         405)
+
+    def test_logout_everywhere(self):
+        first, second = self.login(), self.login()
+        self.assertEqual(self.post('/api/v1/auth/logout-all/', first).status_code, 200)
+        self.assertEqual(self.post('/api/v1/auth/logout-all/', second).status_code, 401)
+
+        time.sleep(0.01)
+        self.assertEqual(self.post('/api/v1/auth/logout-all/', self.login()).status_code, 200)
+
+    def test_refresh_tokens_issued_after_logout_everywhere_are_valid(self):
+        user = User.objects.get(username='student')
+        token_blacklist.revoke_all_user_tokens(user.id)
+        time.sleep(0.01)
+        # Issued within the same second as the watermark
+        token = generate_refresh_token(user)
+        self.assertFalse(token_blacklist.is_payload_revoked(jwt.decode(token, settings.SECRET_KEY,
+                                                                       algorithms=['HS256']), token))
@@ -1,181 +1,350 @@
+"""
+JWT revocation (logout and logout everywhere).
+
+Issued tokens carry a 'jti' claim (see new_jti). Revoking a token stores
+a hash of its jti until the token expires; revoking all of a user's tokens
+stores a watermark, and tokens issued ('iat') before it are rejected.
+
+Revocations are kept in Redis when it is available:
+
+- token_revocation:jti:<hash>: one key per revoked token, expiring with it
+- token_revocation:log: sorted set of revoked jti hashes by revocation time
+- token_revocation:users: sorted set of user IDs by watermark
+
+Every process keeps a Bloom filter of the revoked hashes and a dict of the
+watermarks, synced from the sorted sets every REVOCATION_SYNC_INTERVAL
+seconds. A token whose hash is not in the filter is not revoked, which is
+known without a network round trip; only filter hits are confirmed against
+Redis. A revocation made by another worker takes effect here at the next
+sync. Without Redis, revocations are kept in process only.
+"""
+
+import hashlib
+import math
+import threading
+import time
+import uuid
+
+import jwt
+from django.conf import settings
+
 try:
     import redis
-    import jwt
-    from django.conf import settings
-    from datetime import datetime
-
-    # Initialize Redis client
-    redis_client = redis.Redis(
-        host=getattr(settings, 'REDIS_HOST', 'localhost'),
-        port=getattr(settings, 'REDIS_PORT', 6379),
-        db=getattr(settings, 'REDIS_DB', 0),
-        decode_responses=True
-    )
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
 
-    def add_token_to_blacklist(token: str) -> bool:
-        """
-        Add a JWT token to the blacklist in Redis.
-        
-        Args:
-            token: The JWT token to blacklist
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            # Decode the token to get expiration time
-            decoded = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
-            exp_timestamp = decoded.get('exp')
-            
-            if not exp_timestamp:
-                return False
-                
-            # Calculate TTL (time until token expires)
-            current_time = datetime.now().timestamp()
-            ttl = int(exp_timestamp - current_time)
-            
-            # Only add to blacklist if token hasn't expired yet
-            if ttl > 0:
-                redis_key = f"blacklist:token:{token}"
-                redis_client.setex(redis_key, ttl, '1')
-                return True
-            
-            return False
-            
-        except jwt.ExpiredSignatureError:
-            # Token already expired, no need to blacklist
-            return True
-        except jwt.InvalidTokenError:
-            # Invalid token, can't blacklist
-            return False
-        except Exception as e:
-            print(f"Error adding token to blacklist: {e}")
-            return False
+# Longest lifetime of an issued token (refresh tokens), bounding how long
+# revocations are kept
+MAX_TOKEN_LIFETIME = 7 * 24 * 60 * 60
+REVOCATION_SYNC_INTERVAL = 5
+# Bloom filters can't forget: rebuild them so expired revocations drop out
+BLOOM_REBUILD_INTERVAL = 60 * 60
+BLOOM_CAPACITY = 100000
+BLOOM_ERROR_RATE = 0.001
 
+JTI_KEY = 'token_revocation:jti:{}'
+LOG_KEY = 'token_revocation:log'
+USERS_KEY = 'token_revocation:users'
 
-    def is_token_blacklisted(token: str) -> bool:
-        """
-        Check if a JWT token is in the blacklist.
-        
-        Args:
-            token: The JWT token to check
-            
-        Returns:
-            True if blacklisted, False otherwise
-        """
-        try:
-            redis_key = f"blacklist:token:{token}"
-            return redis_client.exists(redis_key) > 0
-        except Exception as e:
-            print(f"Error checking token blacklist: {e}")
-            # Fail secure: if we can't check, assume it's blacklisted
-            return True
 
+def new_jti():
+    """Unique ID for the 'jti' claim of an issued token"""
+    return uuid.uuid4().hex
 
-    def remove_token_from_blacklist(token: str) -> bool:
-        """
-        Remove a token from the blacklist (mainly for testing purposes).
-        
-        Args:
-            token: The JWT token to remove
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            redis_key = f"blacklist:token:{token}"
-            redis_client.delete(redis_key)
-            return True
-        except Exception as e:
-            print(f"Error removing token from blacklist: {e}")
-            return False
 
+def token_hash(payload, token=None):
+    """Hash identifying a token: of its jti, or of the token itself for tokens issued without one"""
+    identifier = payload.get('jti') or token or ''
+    return hashlib.sha256(identifier.encode()).hexdigest()[:32]
 
-    def cleanup_expired_tokens():
-        """
-        Cleanup expired tokens from blacklist.
-        This is mainly for maintenance, as Redis TTL handles this automatically.
-        """
-        try:
-            # Redis automatically removes keys when TTL expires
-            # This function is here for manual cleanup if needed
-            pattern = "blacklist:token:*"
-            for key in redis_client.scan_iter(pattern):
-                # Check if key still exists (Redis will auto-delete expired ones)
-                if redis_client.ttl(key) == -2:
-                    redis_client.delete(key)
-            return True
-        except Exception as e:
-            print(f"Error during token cleanup: {e}")
-            return False
 
-except ImportError:
-    # Fallback to in-memory implementation if Redis is not available
-    print("Redis not available, using in-memory token blacklist")
-    
-    # In-memory storage for blacklisted tokens
-    _blacklisted_tokens = set()
-
-    def add_token_to_blacklist(token: str) -> bool:
-        """
-        Add a JWT token to the blacklist in memory.
-        
-        Args:
-            token: The JWT token to blacklist
-            
-        Returns:
-            True if successful, False otherwise
-        """
+class BloomFilter:
+    """Bloom filter of hex digests"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest):
+        # Double hashing over two 64-bit halves of the digest
+        first = int(digest[:16], 16)
+        second = int(digest[16:32], 16) | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, digest):
+        for position in self._positions(digest):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, digest):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(digest))
+
+
+class TokenRevocationList:
+    """Revoked token hashes and user watermarks, in Redis (if client) and in process"""
+
+    def __init__(self, client=None):
+        self.client = client
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter()
+        self._revoked = {}  # hash -> expiry time, when there is no Redis
+        self._watermarks = {}  # user ID -> revocation time
+        self._synced_at = None  # last successful sync
+        self._next_attempt_at = None
+        self._rebuilt_at = None
+
+    def _sync(self, now):
+        """Pull revocations made since the last sync (all of them when rebuilding)"""
+        rebuild = self._rebuilt_at is None or now - self._rebuilt_at >= BLOOM_REBUILD_INTERVAL
+        since = now - MAX_TOKEN_LIFETIME if rebuild else self._synced_at - REVOCATION_SYNC_INTERVAL
+        pipe = self.client.pipeline()
+        pipe.zrangebyscore(LOG_KEY, since, '+inf')
+        pipe.zrangebyscore(USERS_KEY, since, '+inf', withscores=True)
+        hashes, watermarks = pipe.execute()
+
+        with self._lock:
+            if rebuild:
+                self._bloom = BloomFilter()
+                self._watermarks = {}
+                self._rebuilt_at = now
+            for digest in hashes:
+                self._bloom.add(digest.decode() if isinstance(digest, bytes) else digest)
+            for user_id, watermark in watermarks:
+                user_id = user_id.decode() if isinstance(user_id, bytes) else user_id
+                self._watermarks[user_id] = max(watermark, self._watermarks.get(user_id, 0))
+            self._synced_at = now
+
+    def _maybe_sync(self):
+        if self.client is None:
+            return
+        now = time.time()
+        if self._next_attempt_at is not None and now < self._next_attempt_at:
+            return
+        self._next_attempt_at = now + REVOCATION_SYNC_INTERVAL
         try:
-            _blacklisted_tokens.add(token)
-            return True
+            self._sync(now)
         except Exception as e:
-            print(f"Error adding token to blacklist: {e}")
-            return False
+            # Keep serving from the last synced state; the next sync reads from it
+            print(f"Error syncing token revocations: {e}")
+
+    def revoke(self, digest, expires_at):
+        now = time.time()
+        ttl = int(math.ceil(expires_at - now))
+        if ttl <= 0:
+            return
+        if self.client is not None:
+            pipe = self.client.pipeline()
+            pipe.setex(JTI_KEY.format(digest), ttl, 1)
+            pipe.zadd(LOG_KEY, {digest: now})
+            pipe.zremrangebyscore(LOG_KEY, '-inf', now - MAX_TOKEN_LIFETIME)
+            pipe.execute()
+        with self._lock:
+            self._bloom.add(digest)
+            if self.client is None:
+                self._revoked[digest] = expires_at
+
+    def unrevoke(self, digest):
+        if self.client is not None:
+            pipe = self.client.pipeline()
+            pipe.delete(JTI_KEY.format(digest))
+            pipe.zrem(LOG_KEY, digest)
+            pipe.execute()
+        with self._lock:
+            self._revoked.pop(digest, None)
 
+    def revoke_user(self, user_id, before=None):
+        watermark = before if before is not None else time.time()
+        user_id = str(user_id)
+        if self.client is not None:
+            pipe = self.client.pipeline()
+            pipe.zadd(USERS_KEY, {user_id: watermark}, gt=True)
+            pipe.zremrangebyscore(USERS_KEY, '-inf', time.time() - MAX_TOKEN_LIFETIME)
+            pipe.execute()
+        with self._lock:
+            self._watermarks[user_id] = max(watermark, self._watermarks.get(user_id, 0))
 
-    def is_token_blacklisted(token: str) -> bool:
-        """
-        Check if a JWT token is in the blacklist.
-        
-        Args:
-            token: The JWT token to check
-            
-        Returns:
-            True if blacklisted, False otherwise
-        """
+    def is_revoked(self, digest, user_id=None, issued_at=None):
+        self._maybe_sync()
+        if user_id is not None and issued_at is not None:
+            watermark = self._watermarks.get(str(user_id))
+            if watermark is not None and issued_at < watermark:
+                return True
+        if digest not in self._bloom:
+            return False
+        if self.client is None:
+            with self._lock:
+                expires_at = self._revoked.get(digest)
+            return expires_at is not None and expires_at > time.time()
         try:
-            return token in _blacklisted_tokens
+            return self.client.exists(JTI_KEY.format(digest)) > 0
         except Exception as e:
-            print(f"Error checking token blacklist: {e}")
-            # Fail secure: if we can't check, assume it's blacklisted
+            print(f"Error checking token revocation: {e}")
+            # Fail secure, which only affects tokens in the Bloom filter
             return True
 
+    def cleanup(self):
+        now = time.time()
+        if self.client is not None:
+            pipe = self.client.pipeline()
+            pipe.zremrangebyscore(LOG_KEY, '-inf', now - MAX_TOKEN_LIFETIME)
+            pipe.zremrangebyscore(USERS_KEY, '-inf', now - MAX_TOKEN_LIFETIME)
+            pipe.execute()
+        with self._lock:
+            self._revoked = {digest: expiry for digest, expiry in self._revoked.items() if expiry > now}
+            if self.client is None:
+                self._bloom = BloomFilter()
+                for digest in self._revoked:
+                    self._bloom.add(digest)
+            self._watermarks = {
+                user_id: watermark for user_id, watermark in self._watermarks.items()
+                if watermark > now - MAX_TOKEN_LIFETIME
+            }
 
-    def remove_token_from_blacklist(token: str) -> bool:
-        """
-        Remove a token from the blacklist (mainly for testing purposes).
-        
-        Args:
-            token: The JWT token to remove
-            
-        Returns:
-            True if successful, False otherwise
-        """
-        try:
-            _blacklisted_tokens.discard(token)
-            return True
-        except Exception as e:
-            print(f"Error removing token from blacklist: {e}")
+
+_revocation_list = None
+_revocation_list_lock = threading.Lock()
+
+
+def _redis_client():
+    """A connected Redis client, or None if Redis is not available"""
+    if redis is None:
+        return None
+    config = getattr(settings, 'REDIS_CONFIG', {})
+    try:
+        client = redis.Redis(
+            host=config.get('HOST', 'localhost'),
+            port=config.get('PORT', 6379),
+            db=config.get('DB', 0),
+            socket_connect_timeout=config.get('SOCKET_CONNECT_TIMEOUT', 2),
+            socket_timeout=config.get('SOCKET_TIMEOUT', 2),
+            retry_on_timeout=config.get('RETRY_ON_TIMEOUT', False),
+            decode_responses=True,
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        print(f"Redis not available ({type(e).__name__}), using in-memory token revocation")
+        return None
+
+
+def get_revocation_list():
+    """The process-wide revocation list, created on first use"""
+    global _revocation_list
+    with _revocation_list_lock:
+        if _revocation_list is None:
+            _revocation_list = TokenRevocationList(_redis_client())
+        return _revocation_list
+
+
+def _decode(token):
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+
+
+def is_payload_revoked(payload, token=None) -> bool:
+    """
+    Check if a decoded token has been revoked, individually or by its user's watermark.
+
+    Args:
+        payload: The decoded JWT claims
+        token: The encoded token, identifying tokens issued without a jti
+
+    Returns:
+        True if revoked, False otherwise
+    """
+    return get_revocation_list().is_revoked(
+        token_hash(payload, token), payload.get('user_id'), payload.get('iat')
+    )
+
+
+def add_token_to_blacklist(token: str) -> bool:
+    """
+    Revoke a JWT token until it expires.
+
+    Args:
+        token: The JWT token to revoke
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        payload = _decode(token)
+        if not payload.get('exp'):
             return False
+        get_revocation_list().revoke(token_hash(payload, token), payload['exp'])
+        return True
+    except jwt.ExpiredSignatureError:
+        # Token already expired, no need to revoke it
+        return True
+    except jwt.InvalidTokenError:
+        return False
+    except Exception as e:
+        print(f"Error adding token to blacklist: {e}")
+        return False
+
+
+def is_token_blacklisted(token: str) -> bool:
+    """
+    Check if a JWT token has been revoked.
+
+    Args:
+        token: The JWT token to check
+
+    Returns:
+        True if revoked, False otherwise (invalid tokens are rejected when decoded)
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'], options={'verify_exp': False})
+    except jwt.InvalidTokenError:
+        return False
+    return is_payload_revoked(payload, token)
+
+
+def revoke_all_user_tokens(user_id, before=None) -> bool:
+    """
+    Revoke every token of a user issued before a time (logout everywhere).
+
+    Args:
+        user_id: The user whose tokens to revoke
+        before: Timestamp; tokens issued earlier are revoked (default: now)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        get_revocation_list().revoke_user(user_id, before)
+        return True
+    except Exception as e:
+        print(f"Error revoking user tokens: {e}")
+        return False
+
+
+def remove_token_from_blacklist(token: str) -> bool:
+    """
+    Remove a token from the blacklist (mainly for testing purposes).
+
+    Args:
+        token: The JWT token to remove
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'], options={'verify_exp': False})
+        get_revocation_list().unrevoke(token_hash(payload, token))
+        return True
+    except Exception as e:
+        print(f"Error removing token from blacklist: {e}")
+        return False
 
 
-    def cleanup_expired_tokens():
-        """
-        Cleanup expired tokens from blacklist.
-        Since we don't track expiration in this simple implementation,
-        this function does nothing.
-        """
-        # In a more sophisticated implementation, we would clean up expired tokens
-        # But for this simple in-memory version, we'll just return True
-        return True
\ No newline at end of file
+def cleanup_expired_tokens():
+    """
+    Drop revocations of tokens that have expired.
+    Redis expires the per-token keys itself; this trims the sync logs.
+    """
+    try:
+        get_revocation_list().cleanup()
+        return True
+    except Exception as e:
+        print(f"Error during token cleanup: {e}")
+        return False
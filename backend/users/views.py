@@ -9,6 +9,8 @@ import json
 import jwt
 from datetime import datetime, timedelta
 from .models import User, Student, Faculty, Admin
+from .login_service import LoginService
+from .token_blacklist import add_token_to_blacklist, new_jti, revoke_all_user_tokens
 
 @csrf_exempt
 def login_view(request):
@@ -18,43 +20,10 @@ def login_view(request):
             identifier = data.get('identifier')
             password = data.get('password')
             
-            # Try to authenticate with email or username (ID)
-            user = None
+            # One lookup by email or username (ID) and one password check
+            user, error = LoginService.authenticate(identifier, password)
             
-            # First try with email
-            if '@' in identifier:
-                try:
-                    user = User.objects.get(email=identifier)
-                except User.DoesNotExist:
-                    pass
-            
-            # If not found by email, try with username (ID)
-            if not user:
-                try:
-                    user = User.objects.get(username=identifier)
-                except User.DoesNotExist:
-                    pass
-            
-            # DEBUG LOGGING
-            print(f"DEBUG: Login attempt for identifier: '{identifier}'")
-            if user:
-                print(f"DEBUG: User found: {user.username} (ID: {user.id})")
-                print(f"DEBUG: User status: '{user.status}'")
-                print(f"DEBUG: Django is_active: {user.is_active}")
-                
-                is_password_valid = check_password(password, user.password)
-                print(f"DEBUG: Password valid: {is_password_valid}")
-                
-                if not is_password_valid:
-                    print("DEBUGGING TIP: Check if you are using the correct password. Hashes might differ.")
-                
-                if user.status != 'active':
-                    print(f"DEBUG: Login blocked due to inactive status '{user.status}'")
-            else:
-                print("DEBUG: User NOT found in database")
-            
-            # If user found, check password and ensure user is active
-            if user and check_password(password, user.password) and user.status == 'active':
+            if error is None:
                 # Generate JWT token
                 now = timezone.now()
                 exp = now + timedelta(hours=24)  # Token expires in 24 hours
@@ -64,7 +33,8 @@ def login_view(request):
                     'username': user.username,
                     'role': user.role,
                     'exp': exp.timestamp(),
-                    'iat': now.timestamp()
+                    'iat': now.timestamp(),
+                    'jti': new_jti()
                 }
                 
                 # Generate JWT token using Django's SECRET_KEY
@@ -81,44 +51,32 @@ def login_view(request):
                     'status': user.status
                 }
                 
-                # Include additional role-specific information
-                if user.role == 'faculty':
-                    try:
-                        faculty_profile = Faculty.objects.get(user=user)
-                        user_data['department'] = faculty_profile.department
-                        user_data['employee_id'] = faculty_profile.employee_id
-                        user_data['title'] = faculty_profile.title
-                    except Faculty.DoesNotExist:
-                        pass
-                elif user.role == 'student':
-                    try:
-                        student_profile = Student.objects.get(user=user)
-                        user_data['student_id'] = student_profile.student_id
-                        user_data['degree_program'] = student_profile.degree_program
-                    except Student.DoesNotExist:
-                        pass
-                elif user.role == 'admin':
-                    try:
-                        admin_profile = Admin.objects.get(user=user)
-                        user_data['employee_id'] = admin_profile.employee_id
-                        user_data['department'] = admin_profile.department
-                    except Admin.DoesNotExist:
-                        pass
+                # Include additional role-specific information (joined by the lookup)
+                profile = LoginService.profile(user)
+                if user.role == 'faculty' and profile:
+                    user_data['department'] = profile.department
+                    user_data['employee_id'] = profile.employee_id
+                    user_data['title'] = profile.title
+                elif user.role == 'student' and profile:
+                    user_data['student_id'] = profile.student_id
+                    user_data['degree_program'] = profile.degree_program
+                elif user.role == 'admin' and profile:
+                    user_data['employee_id'] = profile.employee_id
+                    user_data['department'] = profile.department
                 
                 # Update last login
-                user.last_login = timezone.now()
-                user.save()
+                LoginService.record_login(user)
                 
                 return JsonResponse({
                     'success': True,
                     'user': user_data,
                     'token': token
                 })
-            elif user and user.status != 'active':
+            elif error == 'inactive':
                 return JsonResponse({
                     'success': False,
-                    'message': f'Account is not active. Status: {user.status if user else "UNKNOWN"}',
-                    'debug_status': user.status if user else None
+                    'message': f'Account is not active. Status: {user.status}',
+                    'debug_status': user.status
                 }, status=403)
             else:
                 return JsonResponse({
@@ -212,9 +170,7 @@ def logout_view(request):
             
             token = auth_header.split(' ')[1]
             
-            # Add token to blacklist
-            from .token_blacklist_modified import add_token_to_blacklist
-            
+            # Revoke the token until it expires
             if add_token_to_blacklist(token):
                 return JsonResponse({
                     'success': True,
@@ -235,4 +191,39 @@ def logout_view(request):
     return JsonResponse({
         'success': False,
         'message': 'Method not allowed'
-    }, status=405)
\ No newline at end of file
+    }, status=405)
+
+@csrf_exempt
+def logout_all_view(request):
+    """Log out everywhere: revoke every token of the user issued until now"""
+    if request.method == 'POST':
+        auth_header = request.headers.get('Authorization', '')
+
+        if not auth_header.startswith('Bearer '):
+            return JsonResponse({
+                'success': False,
+                'message': 'No valid authorization token provided'
+            }, status=400)
+
+        try:
+            payload = jwt.decode(auth_header.split(' ')[1], settings.SECRET_KEY, algorithms=['HS256'])
+        except jwt.InvalidTokenError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid token. Please login again.'
+            }, status=401)
+
+        if revoke_all_user_tokens(payload['user_id']):
+            return JsonResponse({
+                'success': True,
+                'message': 'Logged out of all sessions'
+            })
+        return JsonResponse({
+            'success': False,
+            'message': 'Logout failed'
+        }, status=500)
+
+    return JsonResponse({
+        'success': False,
+        'message': 'Method not allowed'
+    }, status=405)